@@ -0,0 +1,73 @@
+"""
+/api/canonicalize endpoint - Shrink learned Tuya IR codes.
+
+Learned codes carry the blaster's timing jitter, which defeats the Tuya
+compressor. This endpoint re-emits a code with canonical timings (through its
+protocol when it decodes, by snapping timings to clusters otherwise) and
+reports how much smaller it got.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from app.api import code_budget
+from app.services import canonicalizer
+
+router = APIRouter()
+
+
+class CanonicalizeRequest(BaseModel):
+    """Request model for /api/canonicalize"""
+
+    tuya_code: str
+
+
+class CanonicalizeResponse(BaseModel):
+    """Response model for /api/canonicalize"""
+
+    tuya_code: str  # Canonical code (the original if it couldn't be shrunk)
+    method: str  # "protocol", "clustered" or "unchanged"
+    protocol: Optional[str] = None  # Decoded protocol name, if any
+    original_length: int  # Characters
+    canonical_length: int  # Characters
+    ratio: float  # canonical_length / original_length
+
+
+@router.post("/canonicalize", response_model=CanonicalizeResponse)
+async def canonicalize(request: CanonicalizeRequest):
+    """
+    Rewrite a learned Tuya IR code with canonical timings.
+
+    Example:
+        POST /api/canonicalize
+        {"tuya_code": "BvQMFwbeAb4gARFdAb4BlQTeAV0B..."}
+
+        Response:
+        {
+            "tuya_code": "...",
+            "method": "protocol",
+            "protocol": "FUJITSU_AC",
+            "original_length": 204,
+            "canonical_length": 56,
+            "ratio": 0.275
+        }
+
+    Raises:
+        HTTPException 400: Invalid Tuya code
+        HTTPException 413/422: Code over its decoding budget (see code_budget.py)
+    """
+    try:
+        result = canonicalizer.canonicalize(request.tuya_code, code_budget.request_budget())
+    except ValueError as e:
+        raise code_budget.invalid_request(e)
+
+    return CanonicalizeResponse(
+        tuya_code=result.tuya_code,
+        method=result.method,
+        protocol=result.protocol,
+        original_length=result.original_length,
+        canonical_length=result.canonical_length,
+        ratio=round(result.ratio, 3),
+    )
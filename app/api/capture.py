@@ -0,0 +1,126 @@
+"""
+/ws/capture WebSocket - Decode a raw capture while it is still arriving.
+
+A blaster that can stream its raw IR capture sends the timings here in
+chunks as they come, rather than one Tuya code once the remote has finished.
+Each connection feeds them to an incremental decoder (see
+app/core/ir_protocols/ir_stream.py), which reports back as soon as it
+learns something: the protocol families still possible as a frame's
+header arrives, then the decoded capture (and the generated command it is,
+if recognised) as soon as a frame completes it.
+
+Client messages (JSON):
+    {"timings": [3324, 1574, 448, ...]}  The next durations, in microseconds,
+                                         alternately marks and spaces
+    {"end": true}                        The current capture is complete
+                                         (may accompany "timings")
+
+A space of at least 100 ms also ends a capture, so one connection can carry
+many captures.
+
+Server messages (JSON):
+    {"event": "candidates", "capture": 0, "frame": 0, "protocols": ["FUJITSU_AC", ...]}
+    {"event": "decoded", "capture": 0, "frame": 0, "protocol": "FUJITSU_AC",
+     "state": "1463001010fe09...", "command": "24_cool_auto", "command_match": "fingerprint"}
+    {"event": "unknown", "capture": 0, "frame": 0, "timings": 211}
+    {"event": "error", "capture": 0, "frame": 0, "error": "too_many_timings",
+     "message": ..., "limit": 2048}
+
+"command" and "command_match" are null for a capture no generated command
+matches. A decoded capture reports what the decoder read, and names the
+command only if that is the command's protocol and state; the index alone
+only speaks for captures no decoder knows. A capture over the decoding budget
+(see code_budget.py) is answered with the budget's error, and one a decoder
+fails on with "decode_failed"; either is skipped. A malformed message is
+answered with an "invalid_message" error (without "capture" and "frame") and
+ignored. Either way, the connection carries on.
+"""
+
+import json
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from starlette.concurrency import run_in_threadpool
+
+from app.api import code_budget
+from app.core.ir_protocols import decode_type_t
+from app.core.ir_protocols.ir_stream import stream_decoder_t, stream_event_t
+from app.services import code_index
+
+router = APIRouter()
+
+
+def _parse(text: str) -> Dict[str, Any]:
+    """A client message, validated; ValueError if it isn't one"""
+    message = json.loads(text)
+    if not isinstance(message, dict) or not ({"timings", "end"} & message.keys()):
+        raise ValueError('Expected {"timings": [...]} and/or {"end": true}')
+    timings = message.setdefault("timings", [])
+    if not isinstance(timings, list) or not all(
+        isinstance(t, int) and not isinstance(t, bool) and t >= 0 for t in timings
+    ):
+        raise ValueError('"timings" must be a list of non-negative integers (microseconds)')
+    return message
+
+
+def _describe(event: stream_event_t) -> Dict[str, Any]:
+    """The server message for a decoder event"""
+    where = {"capture": event.capture, "frame": event.frame}
+    if event.kind == "candidates":
+        return {"event": "candidates", **where, "protocols": event.protocols}
+    if event.kind == "error":
+        return {"event": "error", **where, **event.error.detail()}
+
+    # A generated command, or a re-learned copy of one, is recognised from its
+    # payload and timing layout
+    fingerprint = code_index.timing_fingerprint(event.timings)
+    match = code_index.get_code_index().lookup_fingerprint(fingerprint)
+    if event.kind == "decoded":
+        # What the decoder read stands; the index only names the command it is
+        results = event.results
+        protocol = decode_type_t(results.decode_type).name
+        state = bytes(results.state[: results.bits // 8])
+        if match is not None and (match.protocol, bytes(match.state)) != (protocol, state):
+            match = None
+    elif match is not None:
+        protocol, state = match.protocol, bytes(match.state)
+    else:
+        return {"event": "unknown", **where, "timings": len(event.timings)}
+    return {
+        "event": "decoded",
+        **where,
+        "protocol": protocol,
+        "state": state.hex(),
+        "command": match.command if match else None,
+        "command_match": "fingerprint" if match else None,
+    }
+
+
+def _handle(decoder: stream_decoder_t, message: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The server messages answering a client message"""
+    events = decoder.feed(message["timings"])
+    if message.get("end"):
+        events += decoder.end()
+    return [_describe(event) for event in events]
+
+
+@router.websocket("/ws/capture")
+async def capture(websocket: WebSocket):
+    """Decode the captures streamed over the connection as they arrive."""
+    await websocket.accept()
+    decoder = stream_decoder_t(code_budget.request_budget())
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = _parse(text)
+            except ValueError as e:  # Including malformed JSON
+                await websocket.send_json(
+                    {"event": "error", "error": "invalid_message", "message": str(e)}
+                )
+                continue
+            # Decoding and command lookup are CPU-bound; keep them off the event loop.
+            for reply in await run_in_threadpool(_handle, decoder, message):
+                await websocket.send_json(reply)
+    except WebSocketDisconnect:
+        pass
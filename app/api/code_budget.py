@@ -0,0 +1,44 @@
+"""
+Decoding budgets for the Tuya codes in requests, and the errors they raise.
+
+Every endpoint that decodes a code from a request decodes it within the
+configured budget (see app/core/decode_budget.py), so a hostile or corrupted
+code is rejected with a structured 4xx error rather than tying up a worker:
+
+    400  malformed_code            Not base64, or not a valid Tuya stream
+    413  code_too_long             More base64 characters than DECODE_MAX_CODE_LENGTH
+    413  payload_too_large         Decompresses past DECODE_MAX_PAYLOAD_BYTES
+    413  too_many_timings          More durations than DECODE_MAX_TIMINGS
+    422  decode_deadline_exceeded  Decoding took longer than DECODE_TIME_LIMIT
+
+The response body is {"detail": {"error": ..., "message": ..., "limit": ...}}.
+"""
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from app.core.decode_budget import DecodeBudget, TuyaCodeError
+
+
+def request_budget() -> DecodeBudget:
+    """The configured budget, its time limit starting now; 0 settings are unlimited."""
+    from app.settings import settings
+
+    return DecodeBudget(
+        max_code_length=settings.decode_max_code_length or None,
+        max_payload_bytes=settings.decode_max_payload_bytes or None,
+        max_timings=settings.decode_max_timings or None,
+        time_limit=settings.decode_time_limit or None,
+    ).start()
+
+
+def invalid_request(error: ValueError) -> HTTPException:
+    """The HTTPException for a request rejected with error; 400 unless it is a TuyaCodeError."""
+    if isinstance(error, TuyaCodeError):
+        return HTTPException(status_code=error.status_code, detail=error.detail())
+    return HTTPException(status_code=400, detail=str(error))
+
+
+async def tuya_code_error_handler(request: Request, error: TuyaCodeError) -> JSONResponse:
+    """Answer a TuyaCodeError an endpoint didn't catch with its structured 4xx."""
+    return JSONResponse(status_code=error.status_code, content={"detail": error.detail()})
@@ -0,0 +1,151 @@
+"""
+/api/commands endpoints - Browse a protocol's full command space.
+
+Besides temperature, mode and fan, the command space includes swing positions,
+on/off features (turbo, econo, quiet, ...) and Fahrenheit temperatures, which
+makes it too big to send whole. These endpoints list it a filtered page at a
+time, or fetch single commands by index or name; only the returned commands
+are encoded (see app/services/command_space.py).
+
+1. GET /api/commands - List a page of a protocol's commands
+2. GET /api/commands/{protocol}/{command} - Get one command by index or name
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from app.core.ir_protocols import decode_type_t
+from app.services.command_space import CommandSpace, get_command_space
+
+router = APIRouter()
+
+# Page size of GET /api/commands, by default and at most.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class SpaceCommand(BaseModel):
+    """One command of a command space"""
+
+    index: int  # Position in the protocol's command space
+    name: str  # e.g. "24_cool_auto" or "75F_cool_auto_swing-off_turbo"
+    description: str
+    tuya_code: str
+
+
+class CommandsResponse(BaseModel):
+    """Response model for GET /api/commands"""
+
+    protocol: str
+    total: int  # Commands matching the filter, across all pages
+    page: int
+    page_size: int
+    commands: List[SpaceCommand]
+
+
+def _space(protocol: str) -> CommandSpace:
+    try:
+        protocol_type = decode_type_t[protocol.strip().upper()]
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown protocol '{protocol}'")
+    try:
+        return get_command_space(protocol_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _command(space: CommandSpace, index: int) -> SpaceCommand:
+    cmd = space.command(index)
+    return SpaceCommand(
+        index=index, name=cmd.name, description=cmd.description, tuya_code=cmd.tuya_code
+    )
+
+
+@router.get("/commands", response_model=CommandsResponse)
+async def list_commands(
+    protocol: str,
+    mode: Optional[str] = None,
+    temperature: Optional[int] = None,
+    fan: Optional[str] = None,
+    swing: Optional[str] = None,
+    features: Optional[str] = None,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+):
+    """
+    List a page of a protocol's commands, optionally filtered.
+
+    Args:
+        protocol: Protocol name, e.g. "FUJITSU_AC" (case-insensitive)
+        mode, temperature, fan, swing: Only commands with these settings.
+            Temperatures are matched in either unit (24 is 24C, 75 is 75F).
+        features: Comma-separated features the commands must have on
+        page: Page number, from 1
+        page_size: Commands per page, 1-500
+
+    Without filters, power_on and power_off are the last two commands.
+
+    Raises:
+        HTTPException 400: Unknown protocol, unknown setting or invalid page
+
+    Example:
+        GET /api/commands?protocol=FUJITSU_AC&mode=cool&page=3&page_size=2
+
+        Response:
+        {
+            "protocol": "FUJITSU_AC",
+            "total": 300,
+            "page": 3,
+            "page_size": 2,
+            "commands": [
+                {"index": 304, "name": "16_cool_quiet_swing-off",
+                 "description": "16°C, Cool, Quiet fan, Swing off", "tuya_code": "..."},
+                {"index": 305, "name": "16_cool_quiet",
+                 "description": "16°C, Cool, Quiet fan", "tuya_code": "..."}
+            ]
+        }
+    """
+    if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}",
+        )
+
+    space = _space(protocol)
+    wanted = [f.strip() for f in (features or "").split(",") if f.strip()]
+    filters = dict(mode=mode, temperature=temperature, fan=fan, swing=swing, features=wanted)
+    try:
+        total = space.count(**filters)
+        indexes = space.select((page - 1) * page_size, page_size, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CommandsResponse(
+        protocol=space.metadata.protocol_name,
+        total=total,
+        page=page,
+        page_size=page_size,
+        commands=[_command(space, index) for index in indexes],
+    )
+
+
+@router.get("/commands/{protocol}/{command}", response_model=SpaceCommand)
+async def get_command(protocol: str, command: str):
+    """
+    Get one command of a protocol by its index or name.
+
+    Example:
+        GET /api/commands/FUJITSU_AC/24_cool_high_swing-off
+
+    Raises:
+        HTTPException 400: Unknown protocol
+        HTTPException 404: No command with this index or name
+    """
+    space = _space(protocol)
+    try:
+        index = int(command) if command.isdigit() else space.lookup(command)
+        return _command(space, index)
+    except (IndexError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,122 @@
+"""
+/api/devices endpoints - Stateful device sessions.
+
+A hub that tracks a device's state can seed a session from an identified code
+and then send only deltas (temperature, mode, fan, swing, power). Each delta
+returns the single Tuya code for the device's new full state, instead of the
+whole command set.
+
+1. POST /api/devices - Create a session from a Tuya IR code
+2. PATCH /api/devices/{device_id} - Apply a delta and get the new Tuya code
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any, Optional
+from pydantic import BaseModel
+
+from app.api import code_budget
+from app.services import device_sessions
+
+router = APIRouter()
+
+
+class CreateDeviceRequest(BaseModel):
+    """Request model for POST /api/devices"""
+
+    tuya_code: str
+
+
+class DeviceResponse(BaseModel):
+    """Response model for POST /api/devices"""
+
+    device_id: str
+    protocol: str
+    manufacturer: str
+    state: str  # Raw protocol state bytes as hex
+    current_state: Dict[str, Any]  # Temperature, mode, fan, swing, power as read back
+
+
+class DeviceDeltaRequest(BaseModel):
+    """Request model for PATCH /api/devices/{device_id}; omitted fields are unchanged"""
+
+    temperature: Optional[int] = None
+    mode: Optional[str] = None  # Mode name as listed in operation_modes
+    fan: Optional[str] = None  # Fan name as listed in fan_modes
+    swing: Optional[str] = None  # Swing name, for protocols with swing support
+    power: Optional[bool] = None
+
+
+class DeviceCommandResponse(BaseModel):
+    """Response model for PATCH /api/devices/{device_id}"""
+
+    device_id: str
+    protocol: str
+    tuya_code: str  # Full-state command to transmit
+    state: str
+    current_state: Dict[str, Any]
+
+
+@router.post("/devices", response_model=DeviceResponse, status_code=201)
+async def create_device(request: CreateDeviceRequest):
+    """
+    Create a device session seeded from an identified Tuya IR code.
+
+    The code is decoded and its state bytes loaded into the protocol's AC class
+    via setRaw(), so later deltas start from exactly what the remote last sent.
+
+    Raises:
+        HTTPException 400: Code not recognized or protocol not supported
+        HTTPException 413/422: Code over its decoding budget (see code_budget.py)
+    """
+    try:
+        session = device_sessions.store.create(request.tuya_code, code_budget.request_budget())
+    except ValueError as e:
+        raise code_budget.invalid_request(e)
+
+    return DeviceResponse(
+        device_id=session.device_id,
+        protocol=session.metadata.protocol_name,
+        manufacturer=session.metadata.manufacturer,
+        state=bytes(session.raw_state()).hex(),
+        current_state=session.current_state(),
+    )
+
+
+@router.patch("/devices/{device_id}", response_model=DeviceCommandResponse)
+async def update_device(device_id: str, request: DeviceDeltaRequest):
+    """
+    Apply a delta to a device session and return the new Tuya code.
+
+    Example:
+        PATCH /api/devices/3f2a...
+        {"fan": "high"}
+
+        Response:
+        {"device_id": "3f2a...", "protocol": "FUJITSU_AC", "tuya_code": "...", ...}
+
+    Raises:
+        HTTPException 404: Unknown device id
+        HTTPException 400: Setting unknown or out of range for the protocol
+    """
+    try:
+        tuya_code = device_sessions.store.apply(
+            device_id,
+            temperature=request.temperature,
+            mode=request.mode,
+            fan=request.fan,
+            swing=request.swing,
+            power=request.power,
+        )
+        session = device_sessions.store.get(device_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown device '{device_id}'")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return DeviceCommandResponse(
+        device_id=device_id,
+        protocol=session.metadata.protocol_name,
+        tuya_code=tuya_code,
+        state=bytes(session.raw_state()).hex(),
+        current_state=session.current_state(),
+    )
@@ -0,0 +1,75 @@
+"""
+/api/health and /api/ready endpoints - Liveness and readiness probes.
+
+A worker warms up in the background when it starts (see
+app/services/warmup.py). It is alive as soon as it answers, but should only
+get traffic once warm, so an orchestrator probes the two separately.
+
+1. GET /api/health - Liveness: the worker is up
+2. GET /api/ready - Readiness: warm-up is complete (503 until then)
+"""
+
+from typing import Dict, List
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from app.services import command_generator, warmup
+
+router = APIRouter()
+
+
+class WarmupResponse(BaseModel):
+    """Warm-up progress of the worker"""
+
+    level: str  # "none", "imports", "protocols" or "commands"
+    stage: str  # Stage running, "pending" before the start or "done"
+    ready: bool
+    durations: Dict[str, float]  # Seconds taken by each finished stage
+    failures: List[str]  # Protocols (or stages) left cold, with the error
+
+
+class HealthResponse(BaseModel):
+    """Response model for GET /api/health"""
+
+    status: str  # Always "ok"
+    protocols: int  # Protocols with full command generation support
+    warmup: WarmupResponse
+
+
+@router.get("/health", response_model=HealthResponse)
+async def health():
+    """
+    Report that the worker is alive, whether or not it has warmed up.
+
+    Example:
+        GET /api/health
+
+        Response:
+        {
+            "status": "ok",
+            "protocols": 29,
+            "warmup": {"level": "protocols", "stage": "done", "ready": true,
+                       "durations": {"imports": 0.01, ...}, "failures": [...]}
+        }
+    """
+    return HealthResponse(
+        status="ok",
+        protocols=len(command_generator._generator.registry.list_supported()),
+        warmup=WarmupResponse(**warmup.status()),
+    )
+
+
+@router.get("/ready", response_model=WarmupResponse, responses={503: {"model": WarmupResponse}})
+async def ready():
+    """
+    Report whether the worker has warmed up and should get traffic.
+
+    Returns 200 once warm-up is complete, 503 while it is running (or when it
+    was never started, as without the app's lifespan).
+    """
+    status = warmup.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content=WarmupResponse(**status).model_dump())
+    return WarmupResponse(**status)
@@ -3,17 +3,28 @@
 
 This endpoint accepts a Tuya IR code, auto-detects the protocol using the unified
 IRrecv::decode() dispatcher, and returns the protocol type along with the decoded
-state and all available commands.
+state and all available commands. Codes this service generated (or re-learned
+copies of them) are recognised from the reverse code index without decoding,
+and the response says which command they are. When no decoder recognises the
+code, the message layout is inferred from the timings instead (see
+ir_infer.py), so an unsupported remote still gets its bytes, checksums and bit
+encoding back.
 
 Supports 91+ protocol variants across 46 manufacturers from IRremoteESP8266.
 """
 
-from fastapi import APIRouter, HTTPException
+from functools import partial
+
+from fastapi import APIRouter, Header, HTTPException
 from typing import Dict, List, Any, Optional
 
-from app.core.tuya_encoder import decode_ir
+from app.core.tuya_encoder import decode_ir, encode_ir
 from app.core.ir_protocols import decode, decode_results, decode_type_t
-from app.services import command_generator
+from app.core.ir_protocols.ir_infer import inferProtocol, inferred_protocol_t, sendInferred
+from app.core.ir_protocols.ir_layout import packTimings
+from app.api import code_budget
+from app.api.responses import CommandSet, command_set_response, prepare_command_set
+from app.services import code_index, command_generator, request_coalescing
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -33,6 +44,42 @@ class CommandInfo(BaseModel):
     tuya_code: str
 
 
+class InferredSection(BaseModel):
+    """One section of an inferred message layout"""
+
+    nbytes: int  # State bytes carried (0 for a constant)
+    hdrmark: int
+    hdrspace: int
+    footermark: int
+    gap: int
+    bits: int = 0  # Constant bits sent in place of state bytes
+    value: int = 0  # Their value
+    inverted: bool = False  # Each byte is followed by its inverse
+
+
+class InferredChecksum(BaseModel):
+    """A checksum byte found in an inferred state"""
+
+    kind: str  # "sum8", "neg_sum8", "xor8" or "nibble_sum8"
+    start: int  # First state byte covered
+    index: int  # State byte holding the checksum of state[start:index]
+
+
+class InferredProtocol(BaseModel):
+    """Layout inferred from a code no decoder recognised"""
+
+    encoding: str  # "pulse_distance", "pulse_width" or "pulse_distance_width"
+    onemark: int
+    onespace: int
+    zeromark: int
+    zerospace: int
+    msb_first: bool
+    sections: List[InferredSection]
+    state: List[int]  # Payload bytes
+    checksums: List[InferredChecksum]
+    tuya_code: str  # The code re-sent from the inferred layout, with nominal timings
+
+
 class IdentifyResponse(BaseModel):
     """Response model for /api/identify"""
 
@@ -48,25 +95,85 @@ class IdentifyResponse(BaseModel):
     notes: Optional[str] = None  # Additional notes about the protocol
     detected_state: Optional[Dict[str, Any]] = None  # Current state from the IR code
     model: Optional[str] = None  # Specific model if detected
+    command: Optional[str] = None  # Generated command this code is, if recognised
+    command_match: Optional[str] = None  # "code" or "fingerprint", how it was recognised
+    inferred: Optional[InferredProtocol] = None  # Only when the protocol is unknown
+
+
+def _inferred_response(inferred: inferred_protocol_t) -> InferredProtocol:
+    """Describe an inferred protocol for the response"""
+    timing = inferred.layout.timing
+    signal = command_generator._prepare_timings_for_tuya(packTimings(sendInferred(inferred)))
+    return InferredProtocol(
+        encoding=inferred.encoding,
+        onemark=timing.onemark,
+        onespace=timing.onespace,
+        zeromark=timing.zeromark,
+        zerospace=timing.zerospace,
+        msb_first=timing.MSBfirst,
+        sections=[
+            InferredSection(
+                nbytes=section.size(0),
+                hdrmark=section.hdrmark,
+                hdrspace=section.hdrspace,
+                footermark=section.footermark,
+                gap=section.gap,
+                bits=section.bits,
+                value=section.value,
+                inverted=section.inverted,
+            )
+            for section in inferred.layout.sections
+        ],
+        state=list(inferred.state),
+        checksums=[
+            InferredChecksum(kind=c.kind, start=c.start, index=c.index)
+            for c in inferred.checksums
+        ],
+        tuya_code=encode_ir(signal),
+    )
+
+
+def _generate(protocol_type: decode_type_t, state_bytes: List[int], decoded: bool) -> CommandSet:
+    """
+    Generate a protocol's command set and encode its commands for the response.
+
+    Runs in the threadpool. A decoded protocol's commands are indexed here too,
+    as fingerprinting them takes a decode_ir() and inferProtocol() per command.
+    """
+    command_set = prepare_command_set(
+        command_generator.identify_protocol_and_generate_commands(protocol_type, state_bytes)
+    )
+    index = code_index.get_code_index()
+    if decoded and protocol_type not in index and command_generator.is_supported(protocol_type):
+        index.add_commands(protocol_type, command_set.result["commands"])
+    return command_set
 
 
 @router.post("/identify", response_model=IdentifyResponse)
-async def identify(request: IdentifyRequest):
+async def identify(
+    request: IdentifyRequest,
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+):
     """
     Identify HVAC protocol from Tuya IR code and generate complete command set.
 
     This unified endpoint:
-    1. Decodes the Tuya IR code to raw timings
-    2. Auto-detects the protocol using IRrecv::decode() (tries all 91+ variants)
+    1. Looks the code up in the reverse index of generated commands, by the
+       code itself and then by its timing fingerprint; a hit skips step 2
+    2. Decodes the Tuya IR code and auto-detects the protocol using
+       IRrecv::decode() (tries all 91+ variants)
     3. Extracts manufacturer and protocol information
     4. Generates all available commands for that specific protocol variant
     5. Returns temperature ranges, operation modes, and fan modes
+    6. If no protocol matched, infers the message layout from the timings
 
     Supports 91+ protocol variants across 46 manufacturers.
 
     Args:
         request: IdentifyRequest with:
             - tuyaCode: base64-encoded Tuya IR code (required)
+        accept_encoding: Accept-Encoding header; the body is sent zstd, brotli
+            or gzip compressed when the client accepts it (see responses.py)
 
     Returns:
         IdentifyResponse with:
@@ -75,9 +182,12 @@ async def identify(request: IdentifyRequest):
             - commands: Complete command set
             - temperature/mode/fan capabilities
             - confidence: Detection confidence (always 1.0)
+            - command: The generated command the code is, if recognised
+            - inferred: Inferred layout and payload, if the protocol is unknown
 
     Raises:
         HTTPException 400: Invalid Tuya code or protocol not recognized
+        HTTPException 413/422: Code over its decoding budget (see code_budget.py)
         HTTPException 500: Internal error during analysis
 
     Example:
@@ -97,46 +207,60 @@ async def identify(request: IdentifyRequest):
             ...
         }
     """
-    # Step 1: Decode Tuya code to timings
-    timings = decode_ir(request.tuya_code)
+    # Step 1: A code we generated is recognised from the code itself
+    index = code_index.get_code_index()
+    match = index.lookup_code(request.tuya_code)
+
+    layout = None
+    budget = code_budget.request_budget()
+    if match is None:
+        # Step 2: Decode Tuya code to timings, within the request's budget
+        timings = decode_ir(request.tuya_code, budget)
 
-    # Step 2: Auto-detect protocol using unified IRrecv::decode() dispatcher
-    results = decode_results()
-    results.rawbuf = timings
-    results.rawlen = len(timings)
+        # Step 3: A re-learned copy of one is recognised from its payload
+        layout = inferProtocol(timings)
+        if layout is not None:
+            match = index.lookup_fingerprint(code_index.inferred_fingerprint(layout))
 
-    decode(results)
+    if match is not None:
+        protocol_type = match.protocol_type
+        state_bytes = list(match.state)
+        decoded = True
+    else:
+        # Step 4: Auto-detect protocol using unified IRrecv::decode() dispatcher
+        results = decode_results()
+        results.rawbuf = timings
+        results.rawlen = len(timings)
 
-    # Step 3: Extract state bytes
-    byte_count = results.bits // 8
-    state_bytes = results.state[:byte_count]
+        decoded = decode(results, budget=budget)
 
-    # Step 4: Get protocol info and commands in one call
-    result = command_generator.identify_protocol_and_generate_commands(
-        results.decode_type, state_bytes
+        # Extract state bytes
+        byte_count = results.bits // 8
+        protocol_type = results.decode_type
+        state_bytes = results.state[:byte_count]
+
+    # Step 5: Get protocol info and commands in one call, shared by identical
+    # requests arriving at about the same time. A fully supported protocol's
+    # command set doesn't depend on the state, so every code of it shares one
+    # (an index hit included); other protocols' sets are built from the state.
+    if command_generator.is_supported(protocol_type):
+        key = (int(protocol_type),)
+    else:
+        key = (int(protocol_type), bytes(state_bytes))
+    command_set = await request_coalescing.get_coalescer("identify").run(
+        key, partial(_generate, protocol_type, state_bytes, decoded)
     )
 
-    # Convert service CommandInfo to API CommandInfo
-    commands = [
-        CommandInfo(
-            name=cmd.name,
-            description=cmd.description,
-            tuya_code=cmd.tuya_code,
-        )
-        for cmd in result["commands"]
-    ]
-
-    # Step 5: Build and return response
-    return IdentifyResponse(
-        protocol=result["protocol"],
-        manufacturer=result["manufacturer"],
-        commands=commands,
-        min_temperature=result["min_temperature"],
-        max_temperature=result["max_temperature"],
-        operation_modes=result["operation_modes"],
-        fan_modes=result["fan_modes"],
-        confidence=result.get("confidence", 1.0),
-        notes=result.get("notes"),
-        detected_state=result.get("detected_state"),
-        model=result.get("model"),
+    # Step 6: No decoder knew it; describe the layout inferred from the timings
+    inferred = None
+    if not decoded and layout is not None:
+        inferred = _inferred_response(layout)
+
+    # Step 7: Build and return response, around the already encoded commands
+    return await command_set_response(
+        command_set,
+        accept_encoding,
+        command=match.command if match else None,
+        command_match=("code" if match.exact else "fingerprint") if match else None,
+        inferred=inferred,
     )
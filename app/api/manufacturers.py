@@ -2,29 +2,39 @@
 /api/manufacturers endpoint - List manufacturers and generate commands from known good codes.
 
 This endpoint provides two features:
-1. GET /api/manufacturers - List all manufacturers with known good IR codes
+1. GET /api/manufacturers - List (or search) manufacturers with known good IR codes
 2. POST /api/generate-from-manufacturer - Generate complete command set for a manufacturer
 
 These endpoints enable the HVAC Setup Wizard to configure devices without requiring
-manual IR code learning, by using pre-validated codes from the test_codes module.
+manual IR code learning, by using pre-validated codes from the known codes catalog
+(see app/services/code_catalog.py), which the test_codes module seeds.
 """
 
-from fastapi import APIRouter, HTTPException
+from functools import partial
+
+from fastapi import APIRouter, Header, HTTPException
 from typing import List, Optional, Any, Dict
 from pydantic import BaseModel
 
-from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES, get_test_codes
 from app.core.tuya_encoder import decode_ir
 from app.core.ir_protocols import decode, decode_results
-from app.services import command_generator
+from app.api.responses import CommandSet, command_set_response, prepare_command_set
+from app.services import code_catalog, command_generator, request_coalescing
 
 router = APIRouter()
 
+# Page size of GET /api/manufacturers, by default and at most.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
 
 class ManufacturersResponse(BaseModel):
     """Response model for /api/manufacturers"""
 
     manufacturers: List[str]
+    total: int  # Manufacturers listed (or matched) across all pages
+    offset: int
+    limit: int
 
 
 class ManufacturerRequest(BaseModel):
@@ -58,36 +68,88 @@ class GenerateResponse(BaseModel):
 
 
 @router.get("/manufacturers", response_model=ManufacturersResponse)
-async def list_manufacturers():
+async def list_manufacturers(
+    q: Optional[str] = None, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE
+):
     """
-    List all manufacturers with known good IR codes.
+    List manufacturers with known good IR codes, or search them by name.
+
+    These manufacturers can be used with the /api/generate-from-manufacturer
+    endpoint to generate complete command sets without requiring manual IR
+    code learning.
 
-    Returns manufacturers that have at least one validated IR code in the
-    test_codes database. These manufacturers can be used with the
-    /api/generate-from-manufacturer endpoint to generate complete command sets
-    without requiring manual IR code learning.
+    Args:
+        q: Partly typed manufacturer name. Typos are tolerated: names starting
+            with q come first, then names sharing most of its letter trigrams.
+            Without q, all manufacturers are listed in name order.
+        offset: Results to skip
+        limit: Page size, 1-1000
 
     Returns:
         ManufacturersResponse with:
-            - manufacturers: List of manufacturer names with known good codes
+            - manufacturers: Manufacturer names on this page
+            - total: Manufacturers listed or matched (searches rank at most 100)
+
+    Raises:
+        HTTPException 400: Invalid offset or limit
 
     Example:
-        GET /api/manufacturers
+        GET /api/manufacturers?q=mitsbishi
 
         Response:
         {
-            "manufacturers": ["Fujitsu", "Mitsubishi", "Panasonic"]
+            "manufacturers": ["Mitsubishi"],
+            "total": 1,
+            "offset": 0,
+            "limit": 100
         }
     """
-    # Only return manufacturers with actual codes (non-empty dict)
-    available = [
-        name.title() for name, codes in ALL_KNOWN_GOOD_CODES.items() if codes
-    ]
-    return ManufacturersResponse(manufacturers=sorted(available))
+    if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"offset must be >= 0 and limit between 1 and {MAX_PAGE_SIZE}",
+        )
+
+    catalog = code_catalog.get_code_catalog()
+    if q is None or not q.strip():
+        manufacturers = catalog.manufacturers(offset, limit)
+        total = catalog.manufacturer_count()
+    else:
+        matches = catalog.search_manufacturers(q)
+        manufacturers = matches[offset : offset + limit]
+        total = len(matches)
+    return ManufacturersResponse(
+        manufacturers=manufacturers, total=total, offset=offset, limit=limit
+    )
+
+
+def _generate_from_code(tuya_code: str) -> CommandSet:
+    """Identify a known good code's protocol and generate its full command set."""
+    # Decode the Tuya code to raw timings
+    timings = decode_ir(tuya_code)
+
+    # Use the unified IRrecv::decode() dispatcher to identify protocol
+    results = decode_results()
+    results.rawbuf = timings
+    results.rawlen = len(timings)
+
+    decode(results)
+
+    # Extract state bytes
+    byte_count = results.bits // 8
+    state_bytes = results.state[:byte_count]
+
+    # Generate full command set, with its commands encoded for the response
+    return prepare_command_set(
+        command_generator.identify_protocol_and_generate_commands(results.decode_type, state_bytes)
+    )
 
 
 @router.post("/generate-from-manufacturer", response_model=GenerateResponse)
-async def generate_from_manufacturer(request: ManufacturerRequest):
+async def generate_from_manufacturer(
+    request: ManufacturerRequest,
+    accept_encoding: Optional[str] = Header(None, include_in_schema=False),
+):
     """
     Generate complete command set for a manufacturer using known good codes.
 
@@ -98,6 +160,8 @@ async def generate_from_manufacturer(request: ManufacturerRequest):
     Args:
         request: ManufacturerRequest with:
             - manufacturer: Manufacturer name (case-insensitive, e.g., "Fujitsu")
+        accept_encoding: Accept-Encoding header; the body is sent zstd, brotli
+            or gzip compressed when the client accepts it (see responses.py)
 
     Returns:
         GenerateResponse with:
@@ -126,58 +190,29 @@ async def generate_from_manufacturer(request: ManufacturerRequest):
         }
     """
     # Get known good codes for this manufacturer
-    manufacturer_key = request.manufacturer.lower()
-    codes = get_test_codes(manufacturer_key)
+    catalog = code_catalog.get_code_catalog()
+    codes = catalog.get_codes(request.manufacturer)
 
     if not codes:
+        suggestions = catalog.search_manufacturers(request.manufacturer)[:5]
+        hint = (
+            f"Did you mean: {', '.join(suggestions)}?"
+            if suggestions
+            else "Search manufacturers with GET /api/manufacturers?q=..."
+        )
         raise HTTPException(
             status_code=404,
-            detail=f"No known codes for manufacturer '{request.manufacturer}'. "
-            f"Available manufacturers: {', '.join(m.title() for m, c in ALL_KNOWN_GOOD_CODES.items() if c)}",
+            detail=f"No known codes for manufacturer '{request.manufacturer}'. {hint}",
         )
 
     # Use first available code - prefer OFF as it's usually most reliable
     test_code = codes.get("OFF") or list(codes.values())[0]
 
-    # Decode the Tuya code to raw timings
-    timings = decode_ir(test_code)
-
-    # Use the unified IRrecv::decode() dispatcher to identify protocol
-    results = decode_results()
-    results.rawbuf = timings
-    results.rawlen = len(timings)
-
-    decode(results)
-
-    # Extract state bytes
-    byte_count = results.bits // 8
-    state_bytes = results.state[:byte_count]
-
-    # Generate full command set
-    result = command_generator.identify_protocol_and_generate_commands(
-        results.decode_type, state_bytes
+    # Identical requests (any spelling of the manufacturer picking the same
+    # code) arriving at about the same time share one computation
+    command_set = await request_coalescing.get_coalescer("generate-from-manufacturer").run(
+        test_code, partial(_generate_from_code, test_code)
     )
 
-    # Convert service CommandInfo to API CommandInfo
-    commands = [
-        CommandInfo(
-            name=cmd.name,
-            description=cmd.description,
-            tuya_code=cmd.tuya_code,
-        )
-        for cmd in result["commands"]
-    ]
-
-    return GenerateResponse(
-        protocol=result["protocol"],
-        manufacturer=result["manufacturer"],
-        commands=commands,
-        min_temperature=result["min_temperature"],
-        max_temperature=result["max_temperature"],
-        operation_modes=result["operation_modes"],
-        fan_modes=result["fan_modes"],
-        confidence=result.get("confidence", 1.0),
-        notes=result.get("notes"),
-        detected_state=result.get("detected_state"),
-        model=result.get("model"),
-    )
+    # Build the response around the already encoded commands
+    return await command_set_response(command_set, accept_encoding)
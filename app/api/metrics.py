@@ -0,0 +1,59 @@
+"""
+/api/metrics endpoint - How much work the service is saving.
+
+Identical /api/identify and /api/generate-from-manufacturer requests share one
+computation and, for a short while, its result (see
+app/services/request_coalescing.py). This endpoint reports, per endpoint, how
+many requests were served from those results, how many waited for another
+request's computation, and how many were computed.
+
+1. GET /api/metrics - Request coalescing counters and rates
+"""
+
+from typing import Dict
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from app.services import request_coalescing
+
+router = APIRouter()
+
+
+class CoalescingMetrics(BaseModel):
+    """Request coalescing counters of one endpoint"""
+
+    requests: int
+    hits: int  # Served from a recently computed result
+    coalesced: int  # Waited for an identical request's computation
+    computed: int
+    hit_rate: float  # hits / requests
+    coalesce_rate: float  # coalesced / requests
+    cached: int  # Results currently kept
+    in_flight: int  # Computations currently running
+
+
+class MetricsResponse(BaseModel):
+    """Response model for GET /api/metrics"""
+
+    coalescing: Dict[str, CoalescingMetrics]  # By coalescer name, e.g. "identify"
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_metrics():
+    """
+    Report request coalescing counters since the process started.
+
+    Example:
+        GET /api/metrics
+
+        Response:
+        {
+            "coalescing": {
+                "identify": {"requests": 120, "hits": 80, "coalesced": 30, "computed": 10,
+                             "hit_rate": 0.667, "coalesce_rate": 0.25, "cached": 4,
+                             "in_flight": 0}
+            }
+        }
+    """
+    return MetricsResponse(coalescing=request_coalescing.metrics())
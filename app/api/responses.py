@@ -0,0 +1,213 @@
+"""
+Fast JSON responses for full command sets.
+
+/api/identify and /api/generate-from-manufacturer return a few hundred
+commands. Converting each into a pydantic model, validating the whole
+response_model and encoding it with the stock JSON encoder took most of the
+time of a request whose command set was already generated. Instead, the
+commands are encoded once, straight from the service's CommandInfo
+dataclasses, when the set is generated; the encoded array is kept with the
+set by request coalescing (see app/services/request_coalescing.py), and each
+response splices it into a body holding just the per-request fields.
+
+The endpoints keep their response_model, so the OpenAPI schema is unchanged;
+FastAPI sends the returned Response as is. orjson (installed with
+fastapi[all]) is used when available, the standard library encoder otherwise.
+
+Bodies are mostly base64 codes, and hubs are often on slow cellular links, so
+they are compressed with the best encoding the client accepts (zstd, brotli
+or gzip; zstd and brotli when their modules are installed). The last few
+rendered bodies of a command set, and each encoding of them, are kept with
+the set, so repeated responses cost neither rendering nor compression.
+Responses carry an ETag of their content and "Vary: Accept-Encoding".
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+from app.services.command_generator import CommandInfo
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies are compressed once and kept, so the levels favour size over speed.
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": partial(gzip.compress, compresslevel=9, mtime=0),
+}
+if brotli is not None:
+    ENCODERS["br"] = partial(brotli.compress, quality=11)
+if zstandard is not None:
+    # A ZstdCompressor can't be shared by threads, hence one per body.
+    ENCODERS["zstd"] = lambda body: zstandard.ZstdCompressor(level=19).compress(body)
+
+# Preferred first among encodings the client accepts equally.
+PREFERENCE = ("zstd", "br", "gzip")
+
+# Rendered bodies (e.g. identify's, one per recognised command) kept per set.
+BODY_VARIANTS = 8
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON, as Starlette's JSONResponse renders it."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def negotiate(accept_encoding: Optional[str]) -> str:
+    """The content coding to answer an Accept-Encoding header with."""
+    weights: Dict[str, float] = {}
+    for item in (accept_encoding or "").split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        name, _, value = params.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                weight = float(value)
+            except ValueError:
+                continue
+        weights[coding] = weight
+
+    default = weights.get("*", 0.0)
+    best, best_weight = "identity", 0.0
+    for coding in PREFERENCE:
+        weight = weights.get(coding, default)
+        if coding in ENCODERS and weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class _Body:
+    """A rendered body and its encodings, under an ETag of its content"""
+
+    def __init__(self, content: bytes):
+        self.etag = hashlib.blake2b(content, digest_size=16).hexdigest()
+        self.encoded: Dict[str, bytes] = {"identity": content}
+
+    def etag_of(self, coding: str) -> str:
+        # Each encoding is a different representation, so has its own tag.
+        return f'"{self.etag}"' if coding == "identity" else f'"{self.etag}-{coding}"'
+
+
+@dataclass(frozen=True)
+class CommandSet:
+    """A generated command set with its commands already encoded"""
+
+    result: Dict[str, Any]  # identify_protocol_and_generate_commands() result
+    commands_json: bytes  # result["commands"] as a JSON array
+    # Rendered bodies by their extra fields, least recently used first
+    _bodies: "OrderedDict[Tuple[Tuple[str, Hashable], ...], _Body]" = field(
+        default_factory=OrderedDict, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def _body(self, extra: Dict[str, Any]) -> _Body:
+        key = tuple(extra.items())
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is None:
+                body = _Body(_render(self, extra))
+                self._bodies[key] = body
+                while len(self._bodies) > BODY_VARIANTS:
+                    self._bodies.popitem(last=False)
+            else:
+                self._bodies.move_to_end(key)
+            return body
+
+
+def prepare_command_set(result: Dict[str, Any]) -> CommandSet:
+    """Encode a generated command set's commands for command_set_response()."""
+    commands: Sequence[CommandInfo] = result["commands"]
+    return CommandSet(
+        result=result,
+        commands_json=dumps(
+            [
+                {"name": cmd.name, "description": cmd.description, "tuya_code": cmd.tuya_code}
+                for cmd in commands
+            ]
+        ),
+    )
+
+
+async def command_set_response(
+    command_set: CommandSet, accept_encoding: Optional[str] = None, **extra: Any
+) -> Response:
+    """
+    Render a command set as an IdentifyResponse or GenerateResponse body.
+
+    extra holds the fields following the shared ones (e.g. identify's
+    "command"); pydantic models among them are dumped as they are, and make
+    the body too specific to keep. The body is encoded as negotiated from
+    accept_encoding, compressing in the threadpool when not done before.
+    """
+    if any(isinstance(value, BaseModel) for value in extra.values()):
+        body = _Body(_render(command_set, extra))
+    else:
+        body = command_set._body(extra)
+
+    coding = negotiate(accept_encoding)
+    content = body.encoded.get(coding)
+    if content is None:
+        content = await run_in_threadpool(ENCODERS[coding], body.encoded["identity"])
+        body.encoded[coding] = content
+
+    headers = {"ETag": body.etag_of(coding), "Vary": "Accept-Encoding"}
+    if coding != "identity":
+        headers["Content-Encoding"] = coding
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _render(command_set: CommandSet, extra: Dict[str, Any]) -> bytes:
+    result = command_set.result
+    head = {"protocol": result["protocol"], "manufacturer": result["manufacturer"]}
+    tail = {
+        "min_temperature": int(result["min_temperature"]),
+        "max_temperature": int(result["max_temperature"]),
+        "operation_modes": result["operation_modes"],
+        "fan_modes": result["fan_modes"],
+        "confidence": _optional(result.get("confidence", 1.0), float),
+        "notes": result.get("notes"),
+        "detected_state": result.get("detected_state"),
+        "model": result.get("model"),
+    }
+    for name, value in extra.items():
+        tail[name] = value.model_dump() if isinstance(value, BaseModel) else value
+
+    return b"".join(
+        [
+            dumps(head)[:-1],
+            b',"commands":',
+            command_set.commands_json,
+            b",",
+            dumps(tail)[1:],
+        ]
+    )
+
+
+def _optional(value: Any, kind: type) -> Optional[Any]:
+    return None if value is None else kind(value)
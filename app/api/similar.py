@@ -0,0 +1,137 @@
+"""
+/api/similar endpoints - Nearest known remotes for a learned code.
+
+Many learned codes come from remotes decode() doesn't support. These endpoints
+search the library of learned codes (seeded from the known good codes) for
+the ones whose timings are most alike, through a MinHash/LSH index, so the
+search doesn't slow down with the size of the library.
+
+1. POST /api/similar - Find the library codes closest to a Tuya IR code
+2. POST /api/similar/codes - Add a learned code to the library
+"""
+
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from app.api import code_budget
+from app.services import similarity_index
+
+router = APIRouter()
+
+# Most neighbours returned by one query.
+MAX_LIMIT = 50
+
+
+class SimilarRequest(BaseModel):
+    """Request model for POST /api/similar"""
+
+    tuya_code: str
+    limit: int = 5  # Neighbours to return, 1-50
+
+
+class SimilarMatch(BaseModel):
+    """A library code close to the query"""
+
+    protocol: str
+    name: str
+    source: str  # "catalog" for the known good codes
+    similarity: float  # Estimated fraction of shared timing features, 0-1
+
+
+class SimilarResponse(BaseModel):
+    """Response model for POST /api/similar"""
+
+    matches: List[SimilarMatch]  # Most similar first
+    indexed: int  # Codes in the library
+
+
+class AddCodeRequest(BaseModel):
+    """Request model for POST /api/similar/codes"""
+
+    protocol: str  # Protocol or remote name, e.g. "fujitsu" or "acme_r51"
+    name: str  # Code name, unique per protocol; an existing code is replaced
+    tuya_code: str
+
+
+class AddCodeResponse(BaseModel):
+    """Response model for POST /api/similar/codes"""
+
+    protocol: str
+    name: str
+    indexed: int
+
+
+@router.post("/similar", response_model=SimilarResponse)
+async def similar(request: SimilarRequest):
+    """
+    Find the library codes whose timings are closest to a Tuya IR code.
+
+    Example:
+        POST /api/similar
+        {"tuya_code": "BvQMFwbeAb4gARFdAb4BlQTeAV0B...", "limit": 2}
+
+        Response:
+        {
+            "matches": [
+                {"protocol": "fujitsu", "name": "24C_High", "source": "catalog",
+                 "similarity": 0.891},
+                {"protocol": "mitsubishi", "name": "HEAT_22C_AUTO", "source": "catalog",
+                 "similarity": 0.641}
+            ],
+            "indexed": 9
+        }
+
+    Codes less than about 40% similar are often missed.
+
+    Raises:
+        HTTPException 400: Invalid Tuya code or limit
+        HTTPException 413/422: Code over its decoding budget (see code_budget.py)
+    """
+    if not 1 <= request.limit <= MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_LIMIT}")
+
+    index = similarity_index.get_similarity_index()
+    try:
+        matches = index.query(request.tuya_code, request.limit, code_budget.request_budget())
+    except ValueError as e:
+        raise code_budget.invalid_request(e)
+
+    return SimilarResponse(
+        matches=[
+            SimilarMatch(
+                protocol=match.protocol,
+                name=match.name,
+                source=match.source,
+                similarity=round(match.similarity, 3),
+            )
+            for match in matches
+        ],
+        indexed=len(index),
+    )
+
+
+@router.post("/similar/codes", response_model=AddCodeResponse, status_code=201)
+async def add_code(request: AddCodeRequest):
+    """
+    Add a learned code to the similarity library.
+
+    Raises:
+        HTTPException 400: Invalid Tuya code, or an empty protocol or name
+        HTTPException 413/422: Code over its decoding budget (see code_budget.py)
+    """
+    if not request.protocol.strip() or not request.name.strip():
+        raise HTTPException(status_code=400, detail="protocol and name are required")
+
+    index = similarity_index.get_similarity_index()
+    try:
+        index.add(
+            request.protocol, request.name, request.tuya_code, budget=code_budget.request_budget()
+        )
+    except ValueError as e:
+        raise code_budget.invalid_request(e)
+
+    return AddCodeResponse(
+        protocol=request.protocol.lower(), name=request.name, indexed=len(index)
+    )
@@ -0,0 +1,102 @@
+"""
+Decoding budgets for untrusted Tuya codes.
+
+A Tuya code is base64 over a small LZ-style stream whose back-references
+expand a few input bytes into up to 264 output bytes, and decode() then runs
+every protocol decoder over however many timings result. Without limits, a
+single hostile or corrupted code costs a worker seconds of CPU and megabytes
+of memory. A DecodeBudget bounds each step:
+
+    max_code_length    base64 characters accepted
+    max_payload_bytes  bytes the stream may decompress to; checked while
+                       decompressing, so an oversized code stops early
+    max_timings        durations handed to the decoders
+    time_limit         seconds decode() may take, checked between decoder
+                       families (each bounded by max_timings)
+
+A code that is malformed or over budget raises TuyaCodeError, a ValueError
+carrying the 4xx status and machine-readable reason the API answers with.
+Trusted codes (generated ones, the known codes catalog) are decoded without
+a budget.
+"""
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+
+class TuyaCodeError(ValueError):
+    """A Tuya code that is malformed or exceeds its decoding budget"""
+
+    def __init__(
+        self,
+        message: str,
+        reason: str = "malformed_code",
+        status_code: int = 400,
+        limit: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.reason = reason  # e.g. "malformed_code", "payload_too_large"
+        self.status_code = status_code  # HTTP status to answer with
+        self.limit = limit  # The budget exceeded, if any
+
+    def detail(self) -> Dict[str, Any]:
+        """Structured error detail for an API response."""
+        detail: Dict[str, Any] = {"error": self.reason, "message": str(self)}
+        if self.limit is not None:
+            detail["limit"] = self.limit
+        return detail
+
+
+@dataclass(frozen=True)
+class DecodeBudget:
+    """Limits on the work decoding one code may take; None is unlimited"""
+
+    max_code_length: Optional[int] = None  # Base64 characters
+    max_payload_bytes: Optional[int] = None  # Decompressed bytes
+    max_timings: Optional[int] = None  # Durations passed to the decoders
+    time_limit: Optional[float] = None  # Seconds decode() may take
+    deadline: Optional[float] = None  # time.monotonic() decoding must end by; see start()
+
+    def start(self) -> "DecodeBudget":
+        """This budget with its time limit counting from now."""
+        if self.time_limit is None:
+            return self
+        return replace(self, deadline=time.monotonic() + self.time_limit)
+
+    def check_code(self, code: str) -> None:
+        if self.max_code_length is not None and len(code) > self.max_code_length:
+            raise TuyaCodeError(
+                f"Tuya code is {len(code)} characters, "
+                f"more than the {self.max_code_length} allowed",
+                "code_too_long",
+                413,
+                self.max_code_length,
+            )
+
+    def check_payload(self, size: int) -> None:
+        if self.max_payload_bytes is not None and size > self.max_payload_bytes:
+            raise TuyaCodeError(
+                f"Tuya code decompresses to more than {self.max_payload_bytes} bytes",
+                "payload_too_large",
+                413,
+                self.max_payload_bytes,
+            )
+
+    def check_timings(self, count: int) -> None:
+        if self.max_timings is not None and count > self.max_timings:
+            raise TuyaCodeError(
+                f"Tuya code holds {count} timings, more than the {self.max_timings} allowed",
+                "too_many_timings",
+                413,
+                self.max_timings,
+            )
+
+    def check_deadline(self) -> None:
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise TuyaCodeError(
+                f"Decoding took longer than {self.time_limit}s",
+                "decode_deadline_exceeded",
+                422,
+                self.time_limit,
+            )
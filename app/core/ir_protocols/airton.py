@@ -7,6 +7,8 @@
 ## Direct translation from IRremoteESP8266 ir_Airton.cpp and ir_Airton.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
 
 # Supports:
 #   Brand: Airton,  Model: SMVH09B-2A2A3NH ref. 409730 A/C
@@ -44,173 +46,41 @@ kAirtonMinTemp = 16  # 16C
 kAirtonMaxTemp = 31  # 31C
 
 
-## Helper function for sumBytes
-## EXACT translation from IRremoteESP8266 IRutils.cpp sumBytes
-def sumBytes(data: int, length: int, init: int = 0) -> int:
-    """
-    Sum all the bytes together in an integer.
-    EXACT translation from IRremoteESP8266 IRutils.cpp sumBytes
-    """
-    checksum = init
-    copy = data
-    for i in range(length):
-        checksum += copy & 0xFF
-        copy >>= 8
-    return checksum & 0xFF
-
-
 ## Native representation of an Airton 56-bit A/C message.
 ## This is a direct translation of the C++ union/struct
 ## @see https://docs.google.com/spreadsheets/d/1Kpq7WCkh85heLnTQGlwUfCR6eeu_vfBHvhii8wtP4LU/edit?usp=sharing
-class AirtonProtocol:
+class AirtonProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The raw state as a 64-bit integer
         self.raw = 0
 
     # Byte 1 & 0 (LSB) (from ir_Airton.h lines 30)
-    @property
-    def Header(self) -> int:
-        return self.raw & 0xFFFF
-
-    @Header.setter
-    def Header(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFFFF0000) | (value & 0xFFFF)
+    Header = field(0, 0, 16)
 
     # Byte 2 (from ir_Airton.h lines 32-35)
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 16) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFFF8FFFF) | ((value & 0x07) << 16)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 19) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 19
-        else:
-            self.raw &= ~(1 << 19)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 20) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFF8FFFFF) | ((value & 0x07) << 20)
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw >> 23) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 23
-        else:
-            self.raw &= ~(1 << 23)
+    Mode = field(2, 0, 3)
+    Power = field(2, 3, 1)
+    Fan = field(2, 4, 3)
+    Turbo = field(2, 7, 1)
 
     # Byte 3 (from ir_Airton.h lines 37-38)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 24) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFF0FFFFFF) | ((value & 0x0F) << 24)
+    Temp = field(3, 0, 4)
 
     # Byte 4 (from ir_Airton.h lines 40-41)
-    @property
-    def SwingV(self) -> int:
-        return (self.raw >> 32) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 32
-        else:
-            self.raw &= ~(1 << 32)
+    SwingV = field(4, 0, 1)
 
     # Byte 5 (from ir_Airton.h lines 43-50)
-    @property
-    def Econo(self) -> int:
-        return (self.raw >> 40) & 0x01
-
-    @Econo.setter
-    def Econo(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 40
-        else:
-            self.raw &= ~(1 << 40)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw >> 41) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 41
-        else:
-            self.raw &= ~(1 << 41)
-
-    @property
-    def NotAutoOn(self) -> int:
-        return (self.raw >> 42) & 0x01
-
-    @NotAutoOn.setter
-    def NotAutoOn(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 42
-        else:
-            self.raw &= ~(1 << 42)
-
-    @property
-    def HeatOn(self) -> int:
-        return (self.raw >> 44) & 0x01
-
-    @HeatOn.setter
-    def HeatOn(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 44
-        else:
-            self.raw &= ~(1 << 44)
-
-    @property
-    def Health(self) -> int:
-        return (self.raw >> 46) & 0x01
-
-    @Health.setter
-    def Health(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 46
-        else:
-            self.raw &= ~(1 << 46)
-
-    @property
-    def Light(self) -> int:
-        return (self.raw >> 47) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 47
-        else:
-            self.raw &= ~(1 << 47)
+    Econo = field(5, 0, 1)
+    Sleep = field(5, 1, 1)
+    NotAutoOn = field(5, 2, 1)
+    HeatOn = field(5, 4, 1)
+    Health = field(5, 6, 1)
+    Light = field(5, 7, 1)
 
     # Byte 6 (from ir_Airton.h line 52)
-    @property
-    def Sum(self) -> int:
-        return (self.raw >> 48) & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw = (self.raw & 0xFF00FFFFFFFFFFFF) | ((value & 0xFF) << 48)
+    Sum = field(6)
 
 
 ## Function should be safe up to 64 bits.
@@ -7,6 +7,7 @@
 ## Some other Airwell products use the COOLIX protocol.
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Supports:
 #   Brand: Airwell,  Model: RC08W remote
@@ -47,52 +48,24 @@ kAirwellFan = 5  # 0b101
 
 ## Native representation of a Airwell A/C message.
 ## This is a direct translation of the C++ union/struct (from ir_Airwell.h lines 26-38)
-class AirwellProtocol:
+class AirwellProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # 64-bit raw value
         self.raw = 0
 
     # Temp - bits 19-22 (from ir_Airwell.h line 31)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 19) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        mask = 0x0F << 19
-        self.raw = (self.raw & ~mask) | ((value & 0x0F) << 19)
+    Temp = field(2, 3, 4)
 
     # Fan - bits 28-29 (from ir_Airwell.h line 33)
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 28) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        mask = 0x03 << 28
-        self.raw = (self.raw & ~mask) | ((value & 0x03) << 28)
+    Fan = field(3, 4, 2)
 
     # Mode - bits 30-32 (from ir_Airwell.h line 34)
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 30) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        mask = 0x07 << 30
-        self.raw = (self.raw & ~mask) | ((value & 0x07) << 30)
+    Mode = field(3, 6, 3)
 
     # PowerToggle - bit 33 (from ir_Airwell.h line 35)
-    @property
-    def PowerToggle(self) -> int:
-        return (self.raw >> 33) & 0x01
-
-    @PowerToggle.setter
-    def PowerToggle(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 33
-        else:
-            self.raw &= ~(1 << 33)
+    PowerToggle = field(4, 1, 1)
 
 
 ## Send an Airwell Manchester Code formatted message.
@@ -12,6 +12,14 @@
 ## Direct translation from IRremoteESP8266 ir_Amcor.cpp and ir_Amcor.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Constants - Timing values (ir_Amcor.cpp lines 17-25)
 kAmcorHdrMark = 8200
@@ -29,6 +37,21 @@ kAmcorStateLength = 8
 kAmcorBits = kAmcorStateLength * 8  # 64 bits
 kAmcorDefaultRepeat = 0  # kSingleRepeat
 
+## Header, the state LSB first, footer, gap.
+kAmcorLayout = frame_layout_t(
+    timing=bit_timing_t(kAmcorOneMark, kAmcorOneSpace, kAmcorZeroMark, kAmcorZeroSpace),
+    sections=(
+        frame_section_t(
+            hdrmark=kAmcorHdrMark,
+            hdrspace=kAmcorHdrSpace,
+            footermark=kAmcorFooterMark,
+            gap=kAmcorGap,
+        ),
+    ),
+    tolerance=kAmcorTolerance,
+    excess=0,  # kMarkExcess
+)
+
 # Fan Control (ir_Amcor.h lines 61-64)
 kAmcorFanMin = 0b001
 kAmcorFanMed = 0b010
@@ -59,71 +82,29 @@ kAmcorVentOn = 0b11
 
 ## Native representation of a Amcor A/C message.
 ## This is a direct translation of the C++ union/struct (ir_Amcor.h lines 28-56)
-class AmcorProtocol:
+class AmcorProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (8 bytes for Amcor)
-        self.raw = [0] * kAmcorStateLength
+        self.raw = bytearray(kAmcorStateLength)
 
     # Byte 1 (ir_Amcor.h lines 34-37)
-    @property
-    def Mode(self) -> int:
-        return self.raw[1] & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0xF8) | (value & 0x07)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[1] >> 4) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0x8F) | ((value & 0x07) << 4)
+    Mode = field(1, 0, 3)
+    Fan = field(1, 4, 3)
 
     # Byte 2 (ir_Amcor.h lines 39-41)
-    @property
-    def Temp(self) -> int:
-        return (self.raw[2] >> 1) & 0x3F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x81) | ((value & 0x3F) << 1)
+    Temp = field(2, 1, 6)
 
     # Byte 5 (ir_Amcor.h lines 47-48)
-    @property
-    def Power(self) -> int:
-        return (self.raw[5] >> 4) & 0x0F
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x0F) | ((value & 0x0F) << 4)
+    Power = field(5, 4, 4)
 
     # Byte 6 (ir_Amcor.h lines 50-52)
-    @property
-    def Max(self) -> int:
-        return self.raw[6] & 0x03
-
-    @Max.setter
-    def Max(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xFC) | (value & 0x03)
-
-    @property
-    def Vent(self) -> int:
-        return (self.raw[6] >> 6) & 0x03
-
-    @Vent.setter
-    def Vent(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0x3F) | ((value & 0x03) << 6)
+    Max = field(6, 0, 2)
+    Vent = field(6, 6, 2)
 
     # Byte 7 (ir_Amcor.h line 54)
-    @property
-    def Sum(self) -> int:
-        return self.raw[7]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[7] = value & 0xFF
+    Sum = field(7)
 
 
 ## Calculate the checksum for the supplied state.
@@ -175,28 +156,7 @@ def sendAmcor(
     # Check if we have enough bytes to send a proper message.
     if nbytes < kAmcorStateLength:
         return []
-
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        timings = sendGeneric(
-            headermark=kAmcorHdrMark,
-            headerspace=kAmcorHdrSpace,
-            onemark=kAmcorOneMark,
-            onespace=kAmcorOneSpace,
-            zeromark=kAmcorZeroMark,
-            zerospace=kAmcorZeroSpace,
-            footermark=kAmcorFooterMark,
-            gap=kAmcorGap,
-            dataptr=data,
-            nbytes=nbytes,
-            MSBfirst=False,
-        )
-        all_timings.extend(timings)
-
-    return all_timings
+    return sendFrame(kAmcorLayout, data, nbytes, repeat)
 
 
 ## Decode the supplied Amcor HVAC message.
@@ -212,7 +172,7 @@ def decodeAmcor(results, offset: int = 1, nbits: int = kAmcorBits, strict: bool
     Decode the supplied Amcor HVAC message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeAmcor
     """
-    from app.core.ir_protocols.ir_recv import kHeader, _matchGeneric
+    from app.core.ir_protocols.ir_recv import kHeader
 
     if results.rawlen <= 2 * nbits + kHeader - 1 + offset:
         return False  # Can't possibly be a valid Amcor message.
@@ -220,29 +180,8 @@ def decodeAmcor(results, offset: int = 1, nbits: int = kAmcorBits, strict: bool
         return False  # We expect Amcor to be 64 bits of message.
 
     # Header + Data Block (64 bits) + Footer
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=64,
-        hdrmark=kAmcorHdrMark,
-        hdrspace=kAmcorHdrSpace,
-        onemark=kAmcorOneMark,
-        onespace=kAmcorOneSpace,
-        zeromark=kAmcorZeroMark,
-        zerospace=kAmcorZeroSpace,
-        footermark=kAmcorFooterMark,
-        footerspace=kAmcorGap,
-        atleast=True,
-        tolerance=kAmcorTolerance,
-        excess=0,  # kMarkExcess
-        MSBfirst=False,
-    )
-    if not used:
+    if not matchFrame(results, offset, kAmcorLayout, kAmcorStateLength):
         return False
-    offset += used
 
     if strict:
         if not validChecksumAmcor(results.state):
@@ -288,7 +227,7 @@ class IRAmcorAc:
     ## IRsend object method.
     ## @return A PTR to the internal state.
     ## Direct translation from ir_Amcor.cpp lines 140-146
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()  # Ensure correct bit array before returning
         return self._.raw
 
@@ -11,6 +11,15 @@
 ##       significant additional work to translate properly
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Constants - Timing values
 kArgoHdrMark = 6400
@@ -29,6 +38,25 @@ kArgoStateLength = 12
 kArgoShortStateLength = 4
 kArgoBits = kArgoStateLength * 8  # 96 bits
 
+## Header, the state LSB first. No footer (allegedly), unless asked for one.
+kArgoLayout = frame_layout_t(
+    timing=bit_timing_t(kArgoBitMark, kArgoOneSpace, kArgoBitMark, kArgoZeroSpace),
+    sections=(frame_section_t(hdrmark=kArgoHdrMark, hdrspace=kArgoHdrSpace),),
+    excess=0,
+)
+kArgoFooterLayout = frame_layout_t(
+    timing=kArgoLayout.timing,
+    sections=(
+        frame_section_t(
+            hdrmark=kArgoHdrMark,
+            hdrspace=kArgoHdrSpace,
+            footermark=kArgoBitMark,
+            gap=kArgoGap,
+        ),
+    ),
+    excess=0,
+)
+
 # Preamble constants (WREM-2)
 kArgoPreamble1 = 0b10101100
 kArgoPreamble2 = 0b11110101
@@ -67,37 +95,21 @@ kArgoFlapFull = 7
 
 ## Native representation of an Argo A/C message (WREM-2).
 ## This is a direct translation of the C++ union/struct
-class ArgoProtocol:
+class ArgoProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (12 bytes for Argo WREM-2)
-        self.raw = [0] * kArgoStateLength
+        self.raw = bytearray(kArgoStateLength)
 
     # Byte 0
-    @property
-    def Pre1(self) -> int:
-        return self.raw[0]
-
-    @Pre1.setter
-    def Pre1(self, value: int) -> None:
-        self.raw[0] = value & 0xFF
+    Pre1 = field(0)
 
     # Byte 1
-    @property
-    def Pre2(self) -> int:
-        return self.raw[1]
-
-    @Pre2.setter
-    def Pre2(self, value: int) -> None:
-        self.raw[1] = value & 0xFF
+    Pre2 = field(1)
 
     # Byte 2 (straddles into byte 3)
-    @property
-    def Mode(self) -> int:
-        return (self.raw[2] >> 3) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xC7) | ((value & 0x07) << 3)
+    Mode = field(2, 3, 3)
 
     @property
     def Temp(self) -> int:
@@ -109,13 +121,7 @@ class ArgoProtocol:
         self.raw[3] = (self.raw[3] & 0x3F) | ((value & 0x03) << 6)
 
     # Byte 3 (straddles into byte 4)
-    @property
-    def Fan(self) -> int:
-        return (self.raw[3] >> 4) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xCF) | ((value & 0x03) << 4)
+    Fan = field(3, 4, 2)
 
     @property
     def RoomTemp(self) -> int:
@@ -126,109 +132,23 @@ class ArgoProtocol:
         self.raw[3] = (self.raw[3] & 0xF0) | ((value >> 1) & 0x0F)
         self.raw[4] = (self.raw[4] & 0x7F) | ((value & 0x01) << 7)
 
-    @property
-    def Flap(self) -> int:
-        return (self.raw[4] >> 4) & 0x07
-
-    @Flap.setter
-    def Flap(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0x8F) | ((value & 0x07) << 4)
+    Flap = field(4, 4, 3)
 
     # Byte 9
-    @property
-    def Night(self) -> int:
-        return (self.raw[9] >> 2) & 0x01
-
-    @Night.setter
-    def Night(self, value: bool) -> None:
-        if value:
-            self.raw[9] |= 0x04
-        else:
-            self.raw[9] &= 0xFB
-
-    @property
-    def Max(self) -> int:
-        return (self.raw[9] >> 3) & 0x01
-
-    @Max.setter
-    def Max(self, value: bool) -> None:
-        if value:
-            self.raw[9] |= 0x08
-        else:
-            self.raw[9] &= 0xF7
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[9] >> 5) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[9] |= 0x20
-        else:
-            self.raw[9] &= 0xDF
-
-    @property
-    def iFeel(self) -> int:
-        return (self.raw[9] >> 7) & 0x01
-
-    @iFeel.setter
-    def iFeel(self, value: bool) -> None:
-        if value:
-            self.raw[9] |= 0x80
-        else:
-            self.raw[9] &= 0x7F
+    Night = field(9, 2, 1)
+    Max = field(9, 3, 1)
+    Power = field(9, 5, 1)
+    iFeel = field(9, 7, 1)
 
     # Byte 10 (straddles into byte 11)
-    @property
-    def Post(self) -> int:
-        return self.raw[10] & 0x03
-
-    @Post.setter
-    def Post(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0xFC) | (value & 0x03)
-
-    @property
-    def Sum(self) -> int:
-        return ((self.raw[10] & 0xFC) >> 2) | ((self.raw[11] & 0x3F) << 6)
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0x03) | ((value & 0x3F) << 2)
-        self.raw[11] = (self.raw[11] & 0xC0) | ((value >> 6) & 0x3F)
+    Post = field(10, 0, 2)
+    Sum = field(10, 2, 12)
 
     # Short message (iFeel) format
-    @property
-    def SensorT(self) -> int:
-        return (self.raw[2] >> 3) & 0x1F
-
-    @SensorT.setter
-    def SensorT(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x07) | ((value & 0x1F) << 3)
-
-    @property
-    def CheckHi(self) -> int:
-        return self.raw[2] & 0x07
-
-    @CheckHi.setter
-    def CheckHi(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xF8) | (value & 0x07)
-
-    @property
-    def Fixed(self) -> int:
-        return self.raw[3] & 0x07
-
-    @Fixed.setter
-    def Fixed(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xF8) | (value & 0x07)
-
-    @property
-    def CheckLo(self) -> int:
-        return (self.raw[3] >> 3) & 0x1F
-
-    @CheckLo.setter
-    def CheckLo(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0x07) | ((value & 0x1F) << 3)
+    SensorT = field(2, 3, 5)
+    CheckHi = field(2, 0, 3)
+    Fixed = field(3, 0, 3)
+    CheckLo = field(3, 3, 5)
 
 
 ## Calculate the checksum for a given state (WREM-2).
@@ -242,8 +162,6 @@ def calcChecksum(state: List[int], length: int = kArgoStateLength) -> int:
     # Corresponds to byte 11 being constant 0b01
     # Only add up bytes to 9. byte 10 is 0b01 constant anyway.
     # Assume that argo array is MSB first (left)
-    from app.core.ir_protocols.ir_recv import sumBytes
-
     return sumBytes(state, length - 2, 2)
 
 
@@ -283,26 +201,7 @@ def sendArgo(data: List[int], nbytes: int, repeat: int = 0, sendFooter: bool = F
     min_length = min(kArgoShortStateLength, kArgoStateLength)
     if nbytes < min_length:
         return []  # Not enough bytes to send a proper message.
-
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    footermark = kArgoBitMark if sendFooter else 0
-    gap = kArgoGap if sendFooter else 0
-
-    return sendGeneric(
-        headermark=kArgoHdrMark,
-        headerspace=kArgoHdrSpace,
-        onemark=kArgoBitMark,
-        onespace=kArgoOneSpace,
-        zeromark=kArgoBitMark,
-        zerospace=kArgoZeroSpace,
-        footermark=footermark,
-        gap=gap,
-        dataptr=data,
-        nbytes=nbytes,
-        MSBfirst=False,
-    )
+    return sendFrame(kArgoFooterLayout if sendFooter else kArgoLayout, data, nbytes)
 
 
 ## Class for handling detailed Argo A/C messages (WREM-2).
@@ -339,7 +238,7 @@ class IRArgoAC:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## Direct translation from ir_Argo.cpp lines 553-556
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()  # Ensure correct bit array before returning
         return self._.raw
 
@@ -470,33 +369,11 @@ def decodeArgo(results, offset: int = 1, nbits: int = kArgoBits, strict: bool =
 
     This is the ACTUAL C++ decoder function, not a wrapper.
     """
-    # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import _matchGeneric
-
     if strict and nbits != kArgoBits:
         return False
 
     # Match Header + Data
-    if not _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=kArgoHdrMark,
-        hdrspace=kArgoHdrSpace,
-        onemark=kArgoBitMark,
-        onespace=kArgoOneSpace,
-        zeromark=kArgoBitMark,
-        zerospace=kArgoZeroSpace,
-        footermark=0,
-        footerspace=0,  # Footer (None, allegedly. This seems very wrong.)
-        atleast=False,
-        tolerance=25,
-        excess=0,
-        MSBfirst=False,
-    ):
+    if not matchFrame(results, offset, kArgoLayout, nbits // 8):
         return False
 
     # Compliance
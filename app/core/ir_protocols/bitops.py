@@ -0,0 +1,158 @@
+## @file
+## @brief Shared bit/byte utilities for the protocol modules.
+## Python port of the IRremoteESP8266 IRutils.cpp helpers (reverseBits,
+## sumBytes, xorBytes, sumNibbles, countBits, invertBits, invertBytePairs,
+## checkInvertedBytePairs) and the GETBIT/GETBITS macros from IRutils.h.
+##
+## The C++ versions loop over every bit or byte. These run in the hot decode and
+## checksum paths (matchData reverses every LSB-first value it decodes), so here
+## they are table driven: bit reversal is a lookup into precomputed 8/16-bit
+## tables, and the byte/nibble sums are done by the builtins over a slice or a
+## bytes.translate() of it. Results are identical to the C++ helpers.
+
+from array import array
+from functools import reduce
+from operator import xor
+from typing import MutableSequence, Sequence, Union
+
+# Nibble constants (from IRremoteESP8266 IRutils.h)
+kNibbleSize = 4
+kLowNibble = 0
+kHighNibble = 4
+
+## Every byte value with its bit order reversed.
+_REVERSE8 = bytes(int(f"{i:08b}"[::-1], 2) for i in range(256))
+## Every 16-bit value with its bit order reversed.
+_REVERSE16 = array("H", ((_REVERSE8[i & 0xFF] << 8) | _REVERSE8[i >> 8] for i in range(1 << 16)))
+## The sum of the two nibbles of every byte value.
+_NIBBLE_SUM = bytes((i >> 4) + (i & 0xF) for i in range(256))
+## Every byte value with all its bits flipped.
+_INVERT8 = bytes(i ^ 0xFF for i in range(256))
+
+ByteData = Union[bytes, bytearray, Sequence[int]]
+
+
+## Reverse the order of the requested least significant nr. of bits.
+## @param[in] input Bit pattern/integer to reverse.
+## @param[in] nbits Nr. of bits to reverse. (LSB -> MSB)
+## @return The reversed bit pattern. Any bits above nbits are kept as they are.
+def reverseBits(input: int, nbits: int) -> int:
+    if nbits <= 1:
+        return input  # Reversing <= 1 bits makes no change.
+    if nbits <= 8:
+        output = _REVERSE8[input & 0xFF] >> (8 - nbits)
+    elif nbits <= 16:
+        output = _REVERSE16[input & 0xFFFF] >> (16 - nbits)
+    else:
+        nbytes = (nbits + 7) // 8
+        low = input & ((1 << nbits) - 1)
+        output = int.from_bytes(low.to_bytes(nbytes, "little").translate(_REVERSE8), "big")
+        output >>= nbytes * 8 - nbits
+    # Merge any remaining unreversed bits back to the top of the reversed bits.
+    return (input >> nbits << nbits) | output
+
+
+## Sum all the bytes of an array and return the least significant 8-bits of
+## the result.
+## @param[in] start The array of bytes, or an integer whose bytes (LSB first)
+##   are to be summed.
+## @param[in] length How many bytes to sum.
+## @param[in] init Starting value of the sum.
+## @return The 8-bit sum of the bytes.
+def sumBytes(start: Union[int, ByteData], length: int, init: int = 0) -> int:
+    if isinstance(start, int):
+        start = (start & ((1 << (length * 8)) - 1)).to_bytes(length, "little")
+    return (init + sum(start[:length])) & 0xFF
+
+
+## Calculate a rolling XOR of all the bytes of an array.
+## @param[in] start The array of bytes.
+## @param[in] length How many bytes to XOR.
+## @param[in] init Starting value of the calculation.
+## @return The 8-bit XOR of the bytes.
+def xorBytes(start: ByteData, length: int, init: int = 0) -> int:
+    return reduce(xor, start[:length], init) & 0xFF
+
+
+## Sum all the nibbles together.
+## @param[in] start The array of bytes, or an integer whose nibbles (LSB first)
+##   are to be summed.
+## @param[in] length How many bytes (array) or nibbles (integer) to sum.
+## @param[in] init Starting value of the sum.
+## @param[in] nibbleonly Integer data only: keep only the low nibble of the
+##   result (the C++ default), instead of the low byte.
+## @return The 8-bit (or 4-bit) sum of the nibbles.
+def sumNibbles(
+    start: Union[int, ByteData], length: int, init: int = 0, nibbleonly: bool = True
+) -> int:
+    if isinstance(start, int):
+        total = init
+        for _ in range(min(length, 16)):
+            total += start & 0xF
+            start >>= kNibbleSize
+        return total & (0xF if nibbleonly else 0xFF)
+    return (init + sum(bytes(start[:length]).translate(_NIBBLE_SUM))) & 0xFF
+
+
+## Count the number of bits of a certain type in some data.
+## @param[in] start The array of bytes, or an integer, to count the bits of.
+## @param[in] length Nr. of bytes (array) or bits (integer) to count.
+## @param[in] ones Count the binary 1 bits. False for counting the 0 bits.
+## @param[in] init Starting value of the count.
+## @return The nr. of bits found of the given type.
+def countBits(
+    start: Union[int, ByteData], length: int, ones: bool = True, init: int = 0
+) -> int:
+    if isinstance(start, int):
+        set_bits = (start & ((1 << length) - 1)).bit_count()
+        nbits = length
+    else:
+        set_bits = int.from_bytes(bytes(start[:length]), "little").bit_count()
+        nbits = length * 8
+    return init + (set_bits if ones else nbits - set_bits)
+
+
+## Invert/Flip the bits in an Integer.
+## @param[in] data The integer that will be inverted.
+## @param[in] nbits Nr. of bits to invert.
+## @return The integer with the first nbits inverted.
+def invertBits(data: int, nbits: int) -> int:
+    if nbits == 0:
+        return data  # No change if we are asked to invert no bits.
+    return ~data & ((1 << nbits) - 1)
+
+
+## Invert every second byte of an array, in place.
+## i.e. Byte[1] = ~Byte[0], Byte[3] = ~Byte[2] ...
+## @param[in,out] ptr The array of bytes to modify.
+## @param[in] length The number of bytes to modify.
+def invertBytePairs(ptr: Union[bytearray, MutableSequence[int]], length: int) -> None:
+    pairs = length - length % 2
+    ptr[1:pairs:2] = bytes(ptr[0:pairs:2]).translate(_INVERT8)
+
+
+## Check an array to see if every second byte is inverted to the previous one.
+## @param[in] ptr The array of bytes to check.
+## @param[in] length The number of bytes to check.
+## @return true, if every second byte is inverted. Otherwise false.
+def checkInvertedBytePairs(ptr: ByteData, length: int) -> bool:
+    pairs = length - length % 2
+    data = bytes(ptr[:pairs])
+    # Each odd byte must be the inverse of the even byte before it.
+    return data[1::2] == data[0::2].translate(_INVERT8)
+
+
+## Get the value of a single bit. (GETBIT8 in IRutils.h)
+def GETBIT8(a: int, b: int) -> int:
+    return (a >> b) & 1
+
+
+## Extract a range of bits from an integer. (GETBITS8/16/32/64 in IRutils.h)
+## @param[in] data The integer to extract the bits from.
+## @param[in] offset The bit position of the first (least significant) bit.
+## @param[in] size Nr. of bits to extract.
+def GETBITS64(data: int, offset: int, size: int) -> int:
+    return (data >> offset) & ((1 << size) - 1)
+
+
+GETBITS8 = GETBITS16 = GETBITS32 = GETBITS64
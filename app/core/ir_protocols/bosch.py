@@ -7,6 +7,8 @@
 ## Direct translation from IRremoteESP8266 ir_Bosch.cpp and ir_Bosch.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
 
 # Supports:
 #   Brand: Bosch,  Model: CL3000i-Set 26 E A/C
@@ -96,187 +98,70 @@ kBosch144DefaultState = [
 ]
 
 
-def sumBytes(data: List[int], length: int) -> int:
-    """
-    Sum all bytes in the array up to length.
-    Helper function for checksum calculation.
-    """
-    result = 0
-    for i in range(length):
-        result += data[i]
-    return result & 0xFF
-
-
 ## Native representation of a Bosch 144 A/C message.
 ## This is a direct translation of the C++ union/struct (from ir_Bosch.h lines 100-135)
-class Bosch144Protocol:
+class Bosch144Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (18 bytes for Bosch144)
-        self.raw = [0] * kBosch144StateLength
+        self.raw = bytearray(kBosch144StateLength)
 
     # Section 1 = Section 2 (bytes 0-5)
     # Byte 0 - Fixed value 0b10110010 / 0xB2.
 
     # Byte 1
-    @property
-    def InnvertS1_1(self) -> int:
-        return self.raw[1]
-
-    @InnvertS1_1.setter
-    def InnvertS1_1(self, value: int) -> None:
-        self.raw[1] = value & 0xFF
+    InnvertS1_1 = field(1)
 
     # Byte 2
-    @property
-    def FanS1(self) -> int:
-        return (self.raw[2] >> 5) & 0x07
-
-    @FanS1.setter
-    def FanS1(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x1F) | ((value & 0x07) << 5)
+    FanS1 = field(2, 5, 3)
 
     # Byte 3
-    @property
-    def InnvertS1_2(self) -> int:
-        return self.raw[3]
-
-    @InnvertS1_2.setter
-    def InnvertS1_2(self, value: int) -> None:
-        self.raw[3] = value & 0xFF
+    InnvertS1_2 = field(3)
 
     # Byte 4
-    @property
-    def ModeS1(self) -> int:
-        return (self.raw[4] >> 2) & 0x03
-
-    @ModeS1.setter
-    def ModeS1(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0xF3) | ((value & 0x03) << 2)
-
-    @property
-    def TempS1(self) -> int:
-        return (self.raw[4] >> 4) & 0x0F
-
-    @TempS1.setter
-    def TempS1(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0x0F) | ((value & 0x0F) << 4)
+    ModeS1 = field(4, 2, 2)
+    TempS1 = field(4, 4, 4)
 
     # Byte 5
-    @property
-    def InnvertS1_3(self) -> int:
-        return self.raw[5]
-
-    @InnvertS1_3.setter
-    def InnvertS1_3(self, value: int) -> None:
-        self.raw[5] = value & 0xFF
+    InnvertS1_3 = field(5)
 
     # Section 2 = Section 1 (bytes 6-11)
     # Byte 6 - Fixed value 0b10110010 / 0xB2.
 
     # Byte 7
-    @property
-    def InnvertS2_1(self) -> int:
-        return self.raw[7]
-
-    @InnvertS2_1.setter
-    def InnvertS2_1(self, value: int) -> None:
-        self.raw[7] = value & 0xFF
+    InnvertS2_1 = field(7)
 
     # Byte 8
-    @property
-    def FanS2(self) -> int:
-        return (self.raw[8] >> 5) & 0x07
-
-    @FanS2.setter
-    def FanS2(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0x1F) | ((value & 0x07) << 5)
+    FanS2 = field(8, 5, 3)
 
     # Byte 9
-    @property
-    def InnvertS2_2(self) -> int:
-        return self.raw[9]
-
-    @InnvertS2_2.setter
-    def InnvertS2_2(self, value: int) -> None:
-        self.raw[9] = value & 0xFF
+    InnvertS2_2 = field(9)
 
     # Byte 10
-    @property
-    def ModeS2(self) -> int:
-        return (self.raw[10] >> 2) & 0x03
-
-    @ModeS2.setter
-    def ModeS2(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0xF3) | ((value & 0x03) << 2)
-
-    @property
-    def TempS2(self) -> int:
-        return (self.raw[10] >> 4) & 0x0F
-
-    @TempS2.setter
-    def TempS2(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0x0F) | ((value & 0x0F) << 4)
+    ModeS2 = field(10, 2, 2)
+    TempS2 = field(10, 4, 4)
 
     # Byte 11
-    @property
-    def InnvertS2_3(self) -> int:
-        return self.raw[11]
-
-    @InnvertS2_3.setter
-    def InnvertS2_3(self, value: int) -> None:
-        self.raw[11] = value & 0xFF
+    InnvertS2_3 = field(11)
 
     # Section 3 (bytes 12-17)
     # Byte 12 - Fixed value 0b11010101 / 0xD5
 
     # Byte 13
-    @property
-    def ModeS3(self) -> int:
-        return self.raw[13] & 0x01
-
-    @ModeS3.setter
-    def ModeS3(self, value: int) -> None:
-        self.raw[13] = (self.raw[13] & 0xFE) | (value & 0x01)
-
-    @property
-    def FanS3(self) -> int:
-        return (self.raw[13] >> 1) & 0x3F
-
-    @FanS3.setter
-    def FanS3(self, value: int) -> None:
-        self.raw[13] = (self.raw[13] & 0x81) | ((value & 0x3F) << 1)
+    ModeS3 = field(13, 0, 1)
+    FanS3 = field(13, 1, 6)
 
     # Byte 14
-    @property
-    def Quiet(self) -> int:
-        return (self.raw[14] >> 7) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: bool) -> None:
-        if value:
-            self.raw[14] |= 0x80
-        else:
-            self.raw[14] &= 0x7F
+    Quiet = field(14, 7, 1)
 
     # Byte 15
-    @property
-    def TempS3(self) -> int:
-        return (self.raw[15] >> 4) & 0x01
-
-    @TempS3.setter
-    def TempS3(self, value: int) -> None:
-        self.raw[15] = (self.raw[15] & 0xEF) | ((value & 0x01) << 4)
+    TempS3 = field(15, 4, 1)
 
     # Byte 16 - Unknown
 
     # Byte 17
-    @property
-    def ChecksumS3(self) -> int:
-        return self.raw[17]
-
-    @ChecksumS3.setter
-    def ChecksumS3(self, value: int) -> None:
-        self.raw[17] = value & 0xFF
+    ChecksumS3 = field(17)
 
 
 ## Send a Bosch 144-bit / 18-byte message (96-bit message are also possible)
@@ -345,7 +230,7 @@ class IRBosch144AC:
     ## Get a copy of the internal state as a valid code for this protocol.
     ## @return A valid code for this protocol based on the current internal state.
     ## Direct translation from ir_Bosch.cpp lines 67-73
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.setInvertBytes()
         self.setCheckSumS3()
         return self._.raw
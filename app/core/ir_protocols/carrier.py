@@ -9,6 +9,8 @@
 ## Direct translation from IRremoteESP8266 ir_Carrier.cpp and ir_Carrier.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import invertBits
 
 # Supports:
 #   Brand: Carrier/Surrey,  Model: 42QG5A55970 remote
@@ -106,15 +108,6 @@ def sendCarrierAC(data: int, nbits: int = kCarrierAcBits, repeat: int = 0) -> Li
     """
     from app.core.ir_protocols.ir_send import sendGeneric, sendGenericUint64
 
-    def invertBits(data, nbits):
-        """Invert bits in data"""
-        result = 0
-        for i in range(nbits):
-            result <<= 1
-            result |= (data & 1) ^ 1
-            data >>= 1
-        return result
-
     all_timings = []
 
     for r in range(repeat + 1):
@@ -161,15 +154,6 @@ def decodeCarrierAC(
     """
     from app.core.ir_protocols.ir_recv import _matchGeneric, kHeader, kFooter
 
-    def invertBits(data, nbits):
-        """Invert bits in data"""
-        result = 0
-        for i in range(nbits):
-            result <<= 1
-            result |= (data & 1) ^ 1
-            data >>= 1
-        return result
-
     if results.rawlen < ((2 * nbits + kHeader + kFooter) * 3) - 1 + offset:
         return False  # Can't possibly be a valid Carrier message.
     if strict and nbits != kCarrierAcBits:
@@ -417,117 +401,32 @@ def decodeCarrierAC64(
 
 ## Native representation of a Carrier A/C message.
 ## EXACT translation from IRremoteESP8266 ir_Carrier.h:35-66
-class CarrierProtocol:
+class CarrierProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         self.raw = 0  # The state of the IR remote (64-bit).
 
     # Byte 2
-    @property
-    def Sum(self) -> int:
-        return (self.raw >> 16) & 0x0F
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFFF0FFFF) | ((value & 0x0F) << 16)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 20) & 0x03
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFFCFFFFF) | ((value & 0x03) << 20)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 22) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFF3FFFFF) | ((value & 0x03) << 22)
+    Sum = field(2, 0, 4)
+    Mode = field(2, 4, 2)
+    Fan = field(2, 6, 2)
 
     # Byte 3
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 24) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFF0FFFFFF) | ((value & 0x0F) << 24)
-
-    @property
-    def SwingV(self) -> int:
-        return (self.raw >> 29) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 29
-        else:
-            self.raw &= ~(1 << 29)
+    Temp = field(3, 0, 4)
+    SwingV = field(3, 5, 1)
 
     # Byte 4
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 36) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 36
-        else:
-            self.raw &= ~(1 << 36)
-
-    @property
-    def OffTimerEnable(self) -> int:
-        return (self.raw >> 37) & 0x01
-
-    @OffTimerEnable.setter
-    def OffTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 37
-        else:
-            self.raw &= ~(1 << 37)
-
-    @property
-    def OnTimerEnable(self) -> int:
-        return (self.raw >> 38) & 0x01
-
-    @OnTimerEnable.setter
-    def OnTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 38
-        else:
-            self.raw &= ~(1 << 38)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw >> 39) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 39
-        else:
-            self.raw &= ~(1 << 39)
+    Power = field(4, 4, 1)
+    OffTimerEnable = field(4, 5, 1)
+    OnTimerEnable = field(4, 6, 1)
+    Sleep = field(4, 7, 1)
 
     # Byte 6
-    @property
-    def OnTimer(self) -> int:
-        return (self.raw >> 52) & 0x0F
-
-    @OnTimer.setter
-    def OnTimer(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFF0FFFFFFFF) | ((value & 0x0F) << 52)
+    OnTimer = field(6, 4, 4)
 
     # Byte 7
-    @property
-    def OffTimer(self) -> int:
-        return (self.raw >> 60) & 0x0F
-
-    @OffTimer.setter
-    def OffTimer(self, value: int) -> None:
-        self.raw = (self.raw & 0xF0FFFFFFFFFFFFFF) | ((value & 0x0F) << 60)
+    OffTimer = field(7, 4, 4)
 
 
 ## Class for handling detailed Carrier 64 bit A/C messages.
@@ -8,6 +8,14 @@
 
 from typing import List
 import copy
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Constants - Timing values (from ir_Coolix.cpp lines 22-35)
 kCoolixTick = 276  # Approximately 10.5 cycles at 38kHz
@@ -25,6 +33,23 @@ kCoolixMinGapTicks = kCoolixHdrMarkTicks + kCoolixZeroSpaceTicks
 kCoolixMinGap = kCoolixMinGapTicks * kCoolixTick  # 5244us
 kCoolixExtraTolerance = 5  # Percent
 
+## Header, each byte (Most Significant Byte first) sent normal then inverted,
+## footer, gap.
+kCoolixLayout = frame_layout_t(
+    timing=bit_timing_t(kCoolixBitMark, kCoolixOneSpace, kCoolixBitMark, kCoolixZeroSpace, True),
+    sections=(
+        frame_section_t(
+            hdrmark=kCoolixHdrMark,
+            hdrspace=kCoolixHdrSpace,
+            inverted=True,
+            footermark=kCoolixBitMark,
+            gap=kCoolixMinGap,
+        ),
+    ),
+    tolerance=25 + kCoolixExtraTolerance,
+    excess=0,
+)
+
 # State length constants
 kCoolixBits = 24
 kCoolix48Bits = 48
@@ -87,70 +112,30 @@ kCoolixDefaultState = 0xB21FC8
 
 ## Native representation of a Coolix A/C message.
 ## Direct translation of the C++ union/struct (ir_Coolix.h lines 99-115)
-class CoolixProtocol:
+class CoolixProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state in IR code form (32-bit, only 24 bits used)
         self.raw = 0
 
     # Byte 0 - ZoneFollow1 (bit 1)
-    @property
-    def ZoneFollow1(self) -> int:
-        return (self.raw >> 1) & 0x01
-
-    @ZoneFollow1.setter
-    def ZoneFollow1(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 1
-        else:
-            self.raw &= ~(1 << 1)
+    ZoneFollow1 = field(0, 1, 1)
 
     # Byte 0 - Mode (bits 2-3)
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 2) & 0x03
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 2)) | ((value & 0x03) << 2)
+    Mode = field(0, 2, 2)
 
     # Byte 0 - Temp (bits 4-7)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 4)) | ((value & 0x0F) << 4)
+    Temp = field(0, 4, 4)
 
     # Byte 1 - SensorTemp (bits 8-12)
-    @property
-    def SensorTemp(self) -> int:
-        return (self.raw >> 8) & 0x1F
-
-    @SensorTemp.setter
-    def SensorTemp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 8)) | ((value & 0x1F) << 8)
+    SensorTemp = field(1, 0, 5)
 
     # Byte 1 - Fan (bits 13-15)
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 13) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 13)) | ((value & 0x07) << 13)
+    Fan = field(1, 5, 3)
 
     # Byte 2 - ZoneFollow2 (bit 19)
-    @property
-    def ZoneFollow2(self) -> int:
-        return (self.raw >> 19) & 0x01
-
-    @ZoneFollow2.setter
-    def ZoneFollow2(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 19
-        else:
-            self.raw &= ~(1 << 19)
+    ZoneFollow2 = field(2, 3, 1)
 
 
 ## Send a Coolix 24-bit message
@@ -166,48 +151,9 @@ def sendCOOLIX(data: int, nbits: int = kCoolixBits, repeat: int = 0) -> List[int
     if nbits % 8 != 0:
         return []  # nbits is required to be a multiple of 8
 
-    from app.core.ir_protocols.ir_send import sendData
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # Header
-        all_timings.append(kCoolixHdrMark)
-        all_timings.append(kCoolixHdrSpace)
-
-        # Data - Break data into byte segments, starting at the Most Significant
-        # Byte. Each byte then being sent normal, then followed inverted.
-        for i in range(8, nbits + 1, 8):
-            # Grab a bytes worth of data
-            segment = (data >> (nbits - i)) & 0xFF
-            # Normal
-            normal_timings = sendData(
-                onemark=kCoolixBitMark,
-                onespace=kCoolixOneSpace,
-                zeromark=kCoolixBitMark,
-                zerospace=kCoolixZeroSpace,
-                data=segment,
-                nbits=8,
-                MSBfirst=True,
-            )
-            all_timings.extend(normal_timings)
-            # Inverted
-            inverted_timings = sendData(
-                onemark=kCoolixBitMark,
-                onespace=kCoolixOneSpace,
-                zeromark=kCoolixBitMark,
-                zerospace=kCoolixZeroSpace,
-                data=segment ^ 0xFF,
-                nbits=8,
-                MSBfirst=True,
-            )
-            all_timings.extend(inverted_timings)
-
-        # Footer
-        all_timings.append(kCoolixBitMark)
-        all_timings.append(kCoolixMinGap)
-
-    return all_timings
+    nbytes = nbits // 8
+    data = (data & ((1 << nbits) - 1)).to_bytes(nbytes, "big")
+    return sendFrame(kCoolixLayout, data, nbytes, repeat)
 
 
 ## Class for handling detailed Coolix A/C messages.
@@ -521,12 +467,6 @@ class IRCoolixAC:
         self._.Fan = newspeed
 
 
-def GETBITS64(data: int, offset: int, nbits: int) -> int:
-    """Extract bits from uint64. EXACT translation from IRutils."""
-    mask = (1 << nbits) - 1
-    return (data >> offset) & mask
-
-
 ## Decode the supplied Coolix 24-bit A/C message.
 ## Status: STABLE / Known Working.
 ## Direct translation from IRremoteESP8266 IRrecv::decodeCOOLIX (ir_Coolix.cpp lines 638-704)
@@ -537,15 +477,7 @@ def decodeCOOLIX(
     Decode a Coolix IR message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeCOOLIX
     """
-    from app.core.ir_protocols.ir_recv import (
-        kHeader,
-        kFooter,
-        kMarkExcess,
-        matchMark,
-        matchSpace,
-        matchAtLeast,
-        _matchGeneric,
-    )
+    from app.core.ir_protocols.ir_recv import kHeader, kFooter
 
     # The protocol sends the data normal + inverted, alternating on
     # each byte. Hence twice the number of expected data bits.
@@ -556,74 +488,23 @@ def decodeCOOLIX(
     if nbits % 8 != 0:  # nbits has to be a multiple of nr. of bits in a byte
         return False
 
-    data = 0
-    inverted = 0
-
     if nbits > 64:
         return False  # We can't possibly capture a Coolix packet that big
 
-    # Header
-    if not matchMark(results.rawbuf[offset], kCoolixHdrMark, _tolerance + kCoolixExtraTolerance):
-        return False
-    offset += 1
-    if not matchSpace(results.rawbuf[offset], kCoolixHdrSpace, _tolerance + kCoolixExtraTolerance):
-        return False
-    offset += 1
-
-    # Data - Twice as many bits as there are normal plus inverted bits
-    for i in range(0, nbits * 2, 8):
-        flip = ((i // 8) % 2) != 0
-        result = 0
-        # Read the next byte of data
-        used = _matchGeneric(
-            data_ptr=results.rawbuf[offset:],
-            result_bits_ptr=[result],
-            result_bytes_ptr=None,
-            use_bits=True,
-            remaining=results.rawlen - offset,
-            nbits=8,
-            hdrmark=0,
-            hdrspace=0,  # No Header
-            onemark=kCoolixBitMark,
-            onespace=kCoolixOneSpace,
-            zeromark=kCoolixBitMark,
-            zerospace=kCoolixZeroSpace,
-            footermark=0,
-            footerspace=0,  # No Footer
-            atleast=False,
-            tolerance=_tolerance + kCoolixExtraTolerance,
-            excess=0,
-            MSBfirst=True,
-        )
-        if used == 0:
-            return False  # Didn't match a bytes worth of data
-        offset += used
-        result = result if isinstance(result, int) else 0
-        if flip:  # The inverted byte
-            inverted <<= 8
-            inverted |= result
-        else:
-            data <<= 8
-            data |= result
-
-    # Footer
-    if not matchMark(results.rawbuf[offset], kCoolixBitMark, _tolerance + kCoolixExtraTolerance):
+    # Header + Data (normal + inverted bytes) + Footer
+    # Compliance: when strict, every inverted byte must match its normal one.
+    data = bytearray(nbits // 8)
+    if not matchFrame(
+        results,
+        offset,
+        kCoolixLayout,
+        nbits // 8,
+        state=data,
+        tolerance=_tolerance + kCoolixExtraTolerance,
+        strict=strict,
+    ):
         return False
-    offset += 1
-    if offset < results.rawlen:
-        if not matchAtLeast(
-            results.rawbuf[offset], kCoolixMinGap, _tolerance + kCoolixExtraTolerance
-        ):
-            return False
-
-    # Compliance
-    orig = data  # Save a copy of the data
-    if strict:
-        for i in range(0, nbits, 8):
-            if (data & 0xFF) != ((inverted & 0xFF) ^ 0xFF):
-                return False
-            data >>= 8
-            inverted >>= 8
+    orig = int.from_bytes(data, "big")
 
     # Success
     results.bits = nbits
@@ -17,6 +17,14 @@
 ## Direct translation from IRremoteESP8266 ir_Corona.cpp and ir_Corona.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchSection,
+    sendFrame,
+)
 
 # Constants - Timing values (ir_Corona.cpp lines 26-35)
 kCoronaAcHdrMark = 3500
@@ -37,6 +45,29 @@ kCoronaAcStateLength = kCoronaAcSectionBytes * 3  # 21 bytes
 kCoronaAcBitsShort = kCoronaAcSectionBytes * 8  # 56 bits
 kCoronaAcBits = kCoronaAcStateLength * 8  # 168 bits
 
+## Up to three identical sections of 7 bytes. A short message is just the
+## first one.
+kCoronaAcSection = frame_section_t(
+    nbytes=kCoronaAcSectionBytes,
+    hdrmark=kCoronaAcHdrMark,
+    hdrspace=kCoronaAcHdrSpace,
+    footermark=kCoronaAcBitMark,
+    gap=kCoronaAcSpaceGap,
+    atleast=True,
+)
+kCoronaAcLayout = frame_layout_t(
+    timing=bit_timing_t(kCoronaAcBitMark, kCoronaAcOneSpace, kCoronaAcBitMark, kCoronaAcZeroSpace),
+    sections=(kCoronaAcSection,) * kCoronaAcSections,
+    tolerance=kCoronaTolerance,
+    excess=0,  # kMarkExcess
+)
+kCoronaAcShortLayout = frame_layout_t(
+    timing=kCoronaAcLayout.timing,
+    sections=(kCoronaAcSection,),
+    tolerance=kCoronaTolerance,
+    excess=0,  # kMarkExcess
+)
+
 # Section header constants (ir_Corona.h lines 75-78)
 kCoronaAcSectionHeader0 = 0x28
 kCoronaAcSectionHeader1 = 0x61
@@ -85,80 +116,23 @@ def setBits(data: List[int], idx: int, offset: int, nbits: int, value: int) -> N
 
 ## Native representation of a Corona A/C message.
 ## This is a direct translation of the C++ union/struct (ir_Corona.h lines 29-69)
-class CoronaProtocol:
+class CoronaProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (21 bytes for Corona AC = 3 sections of 7 bytes)
-        self.raw = [0] * kCoronaAcStateLength
+        self.raw = bytearray(kCoronaAcStateLength)
 
     # Byte 3 (ir_Corona.h lines 54-60)
-    @property
-    def Fan(self) -> int:
-        return self.raw[3] & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xFC) | (value & 0x03)
-
-    @property
-    def Econo(self) -> int:
-        return (self.raw[3] >> 3) & 0x01
-
-    @Econo.setter
-    def Econo(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x08
-        else:
-            self.raw[3] &= 0xF7
-
-    @property
-    def SwingVToggle(self) -> int:
-        return (self.raw[3] >> 6) & 0x01
-
-    @SwingVToggle.setter
-    def SwingVToggle(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x40
-        else:
-            self.raw[3] &= 0xBF
+    Fan = field(3, 0, 2)
+    Econo = field(3, 3, 1)
+    SwingVToggle = field(3, 6, 1)
 
     # Byte 5 (ir_Corona.h lines 64-67)
-    @property
-    def Temp(self) -> int:
-        return self.raw[5] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[5] >> 4) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x10
-        else:
-            self.raw[5] &= 0xEF
-
-    @property
-    def PowerButton(self) -> int:
-        return (self.raw[5] >> 5) & 0x01
-
-    @PowerButton.setter
-    def PowerButton(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x20
-        else:
-            self.raw[5] &= 0xDF
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[5] >> 6) & 0x03
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x3F) | ((value & 0x03) << 6)
+    Temp = field(5, 0, 4)
+    Power = field(5, 4, 1)
+    PowerButton = field(5, 5, 1)
+    Mode = field(5, 6, 2)
 
 
 ## Get the byte that identifies the section
@@ -254,39 +228,16 @@ def sendCoronaAc(data: List[int], nbytes: int = kCoronaAcStateLength, repeat: in
     if kCoronaAcSectionBytes < nbytes < kCoronaAcStateLength:
         return []
 
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        pos = 0
-        # Data Section #1 - 3 loop
-        # e.g.
-        #   bits = 56; bytes = 7;
-        # #1  *(data + pos) = {0x28, 0x61, 0x3D, 0x19, 0xE6, 0x37, 0xC8};
-        # #2  *(data + pos) = {0x28, 0x61, 0x6D, 0xFF, 0x00, 0xFF, 0x00};
-        # #3  *(data + pos) = {0x28, 0x61, 0xCD, 0xFF, 0x00, 0xFF, 0x00};
-        for section in range(kCoronaAcSections):
-            section_timings = sendGeneric(
-                headermark=kCoronaAcHdrMark,
-                headerspace=kCoronaAcHdrSpace,
-                onemark=kCoronaAcBitMark,
-                onespace=kCoronaAcOneSpace,
-                zeromark=kCoronaAcBitMark,
-                zerospace=kCoronaAcZeroSpace,
-                footermark=kCoronaAcBitMark,
-                gap=kCoronaAcSpaceGap,
-                dataptr=data[pos:],
-                nbytes=kCoronaAcSectionBytes,
-                MSBfirst=False,
-            )
-            all_timings.extend(section_timings)
-            pos += kCoronaAcSectionBytes  # Adjust by how many bytes was sent
-            # don't send more data then what we have
-            if nbytes <= pos:
-                break
-
-    return all_timings
+    # Data Section #1 - 3
+    # e.g.
+    #   bits = 56; bytes = 7;
+    # #1  *(data + pos) = {0x28, 0x61, 0x3D, 0x19, 0xE6, 0x37, 0xC8};
+    # #2  *(data + pos) = {0x28, 0x61, 0x6D, 0xFF, 0x00, 0xFF, 0x00};
+    # #3  *(data + pos) = {0x28, 0x61, 0xCD, 0xFF, 0x00, 0xFF, 0x00};
+    # don't send more data then what we have
+    if nbytes <= kCoronaAcSectionBytes:
+        return sendFrame(kCoronaAcShortLayout, data, nbytes, repeat)
+    return sendFrame(kCoronaAcLayout, data, nbytes, repeat)
 
 
 ## Decode the supplied CoronaAc message.
@@ -304,8 +255,6 @@ def decodeCoronaAc(
     Decode the supplied Corona AC message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeCoronaAc
     """
-    from app.core.ir_protocols.ir_recv import _matchGeneric
-
     isLong = results.rawlen >= kCoronaAcBits * 2
     if (
         results.rawlen
@@ -325,25 +274,14 @@ def decodeCoronaAc(
     # #2  *(results->state + pos) = {0x28, 0x61, 0x6D, 0xFF, 0x00, 0xFF, 0x00};
     # #3  *(results->state + pos) = {0x28, 0x61, 0xCD, 0xFF, 0x00, 0xFF, 0x00};
     for section in range(kCoronaAcSections):
-        used = _matchGeneric(
-            data_ptr=results.rawbuf[offset:],
-            result_bits_ptr=None,
-            result_bytes_ptr=results.state[pos:],
-            use_bits=False,
-            remaining=results.rawlen - offset,
-            nbits=kCoronaAcBitsShort,
-            hdrmark=kCoronaAcHdrMark,
-            hdrspace=kCoronaAcHdrSpace,
-            onemark=kCoronaAcBitMark,
-            onespace=kCoronaAcOneSpace,
-            zeromark=kCoronaAcBitMark,
-            zerospace=kCoronaAcZeroSpace,
-            footermark=kCoronaAcBitMark,
-            footerspace=kCoronaAcSpaceGap,
-            atleast=True,
-            tolerance=kCoronaTolerance,
-            excess=0,  # kMarkExcess
-            MSBfirst=False,
+        used = matchSection(
+            results.rawbuf[offset:],
+            results.rawlen - offset,
+            kCoronaAcLayout,
+            kCoronaAcSection,
+            results.state,
+            pos,
+            kCoronaAcSectionBytes,
         )
         if used == 0:
             return False  # We failed to find any data.
@@ -403,7 +341,7 @@ class IRCoronaAc:
     ## @note To get stable AC state, if no timers, send once
     ##   without PowerButton set, and once with
     ## Direct translation from ir_Corona.cpp lines 269-277
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         checksumCorona(self._.raw)  # Ensure correct check bits before sending.
         return self._.raw
 
@@ -21,6 +21,14 @@
 ## @see Daikin312 https://github.com/crankyoldgit/IRremoteESP8266/issues/1829
 
 from typing import List, Optional
+from app.core.ir_protocols.bitops import sumBytes, sumNibbles
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # =============================================================================
 # STATE LENGTH CONSTANTS (from IRremoteESP8266.h)
@@ -93,6 +101,65 @@ kDaikinGap = 29000
 # Note bits in each octet swapped so can be sent as a single value
 kDaikinFirstHeader64 = 0b1101011100000000000000001100010100000000001001111101101000010001
 
+## A 5-bit 0b00000 preamble, then three sections: 8 bytes, 8 bytes & the rest.
+## The legacy (short) message sends kDaikinFirstHeader64 as the first section,
+## and its state starts with the second one. The decoder only checks the
+## timings of these two constants.
+kDaikinTiming = bit_timing_t(kDaikinBitMark, kDaikinOneSpace, kDaikinBitMark, kDaikinZeroSpace)
+kDaikinPreamble = frame_section_t(
+    bits=kDaikinHeaderLength,
+    value=0b00000,
+    verify=False,
+    footermark=kDaikinBitMark,
+    gap=kDaikinZeroSpace + kDaikinGap,
+)
+kDaikinLayout = frame_layout_t(
+    timing=kDaikinTiming,
+    sections=(
+        kDaikinPreamble,
+        frame_section_t(
+            nbytes=kDaikinSection1Length,
+            hdrmark=kDaikinHdrMark,
+            hdrspace=kDaikinHdrSpace,
+            footermark=kDaikinBitMark,
+            gap=kDaikinZeroSpace + kDaikinGap,
+        ),
+        frame_section_t(
+            nbytes=kDaikinSection2Length,
+            hdrmark=kDaikinHdrMark,
+            hdrspace=kDaikinHdrSpace,
+            footermark=kDaikinBitMark,
+            gap=kDaikinZeroSpace + kDaikinGap,
+        ),
+        frame_section_t(
+            hdrmark=kDaikinHdrMark,
+            hdrspace=kDaikinHdrSpace,
+            footermark=kDaikinBitMark,
+            gap=kDaikinZeroSpace + kDaikinGap,
+        ),
+    ),
+    tolerance=kDaikinTolerance,
+    excess=kDaikinMarkExcess,
+)
+kDaikinShortLayout = frame_layout_t(
+    timing=kDaikinTiming,
+    sections=(
+        kDaikinPreamble,
+        frame_section_t(
+            bits=64,
+            value=kDaikinFirstHeader64,
+            verify=False,
+            hdrmark=kDaikinHdrMark,
+            hdrspace=kDaikinHdrSpace,
+            footermark=kDaikinBitMark,
+            gap=kDaikinZeroSpace + kDaikinGap,
+        ),
+    )
+    + kDaikinLayout.sections[2:],
+    tolerance=kDaikinTolerance,
+    excess=kDaikinMarkExcess,
+)
+
 # =============================================================================
 # DAIKIN2 (312-bit) CONSTANTS
 # =============================================================================
@@ -156,6 +223,29 @@ kDaikin216Gap = 29650
 kDaikin216Sections = 2
 kDaikin216Section1Length = 8
 kDaikin216Section2Length = kDaikin216StateLength - kDaikin216Section1Length
+## Two sections: 8 bytes, then the rest.
+kDaikin216Layout = frame_layout_t(
+    timing=bit_timing_t(
+        kDaikin216BitMark, kDaikin216OneSpace, kDaikin216BitMark, kDaikin216ZeroSpace
+    ),
+    sections=(
+        frame_section_t(
+            nbytes=kDaikin216Section1Length,
+            hdrmark=kDaikin216HdrMark,
+            hdrspace=kDaikin216HdrSpace,
+            footermark=kDaikin216BitMark,
+            gap=kDaikin216Gap,
+        ),
+        frame_section_t(
+            nbytes=kDaikin216Section2Length,
+            hdrmark=kDaikin216HdrMark,
+            hdrspace=kDaikin216HdrSpace,
+            footermark=kDaikin216BitMark,
+            gap=kDaikin216Gap,
+        ),
+    ),
+    tolerance=kDaikinTolerance,
+)
 kDaikin216SwingOn = 0b1111
 kDaikin216SwingOff = 0b0000
 
@@ -313,32 +403,6 @@ kDaikin312Section2Length = kDaikin312StateLength - kDaikin312Section1Length
 # =============================================================================
 
 
-## Sum bytes in a state array
-## EXACT translation from IRremoteESP8266 sumBytes utility
-def sumBytes(start: List[int], length: int, init: int = 0) -> int:
-    """
-    Sum bytes in a state array.
-    EXACT translation from IRremoteESP8266 irutils::sumBytes
-    """
-    checksum = init
-    for i in range(length):
-        checksum += start[i]
-    return checksum & 0xFF
-
-
-## Calculate nibble checksum
-## EXACT translation from IRremoteESP8266 sumNibbles utility
-def sumNibbles(start: List[int], length: int, init: int = 0) -> int:
-    """
-    Sum nibbles (4-bit values) in a state array.
-    EXACT translation from IRremoteESP8266 irutils::sumNibbles
-    """
-    checksum = init
-    for i in range(length):
-        checksum += (start[i] >> 4) + (start[i] & 0x0F)
-    return checksum & 0xFF
-
-
 ## Set a bit in a byte array
 ## EXACT translation from IRremoteESP8266 setBit utility
 def setBit(data: List[int], position: int, on: bool = True) -> None:
@@ -382,98 +446,9 @@ def sendDaikin(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
     """
     if nbytes < kDaikinStateLengthShort:
         return []  # Not enough bytes to send a proper message.
-
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric, sendGenericUint64
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        offset = 0
-        # Send the header, 0b00000
-        header_timings = sendGenericUint64(
-            headermark=0,
-            headerspace=0,  # No header for the header
-            onemark=kDaikinBitMark,
-            onespace=kDaikinOneSpace,
-            zeromark=kDaikinBitMark,
-            zerospace=kDaikinZeroSpace,
-            footermark=kDaikinBitMark,
-            gap=kDaikinZeroSpace + kDaikinGap,
-            data_uint64=0b00000,
-            nbits=kDaikinHeaderLength,
-            MSBfirst=False,
-        )
-        all_timings.extend(header_timings)
-
-        # Data #1
-        if nbytes < kDaikinStateLength:  # Are we using the legacy size?
-            # Do this as a constant to save RAM and keep in flash memory
-            data1_timings = sendGenericUint64(
-                headermark=kDaikinHdrMark,
-                headerspace=kDaikinHdrSpace,
-                onemark=kDaikinBitMark,
-                onespace=kDaikinOneSpace,
-                zeromark=kDaikinBitMark,
-                zerospace=kDaikinZeroSpace,
-                footermark=kDaikinBitMark,
-                gap=kDaikinZeroSpace + kDaikinGap,
-                data_uint64=kDaikinFirstHeader64,
-                nbits=64,
-                MSBfirst=False,
-            )
-            all_timings.extend(data1_timings)
-        else:  # We are using the newer/more correct size.
-            data1_timings = sendGeneric(
-                headermark=kDaikinHdrMark,
-                headerspace=kDaikinHdrSpace,
-                onemark=kDaikinBitMark,
-                onespace=kDaikinOneSpace,
-                zeromark=kDaikinBitMark,
-                zerospace=kDaikinZeroSpace,
-                footermark=kDaikinBitMark,
-                gap=kDaikinZeroSpace + kDaikinGap,
-                dataptr=data,
-                nbytes=kDaikinSection1Length,
-                MSBfirst=False,
-            )
-            all_timings.extend(data1_timings)
-            offset += kDaikinSection1Length
-
-        # Data #2
-        data2_timings = sendGeneric(
-            headermark=kDaikinHdrMark,
-            headerspace=kDaikinHdrSpace,
-            onemark=kDaikinBitMark,
-            onespace=kDaikinOneSpace,
-            zeromark=kDaikinBitMark,
-            zerospace=kDaikinZeroSpace,
-            footermark=kDaikinBitMark,
-            gap=kDaikinZeroSpace + kDaikinGap,
-            dataptr=data[offset:],
-            nbytes=kDaikinSection2Length,
-            MSBfirst=False,
-        )
-        all_timings.extend(data2_timings)
-        offset += kDaikinSection2Length
-
-        # Data #3
-        data3_timings = sendGeneric(
-            headermark=kDaikinHdrMark,
-            headerspace=kDaikinHdrSpace,
-            onemark=kDaikinBitMark,
-            onespace=kDaikinOneSpace,
-            zeromark=kDaikinBitMark,
-            zerospace=kDaikinZeroSpace,
-            footermark=kDaikinBitMark,
-            gap=kDaikinZeroSpace + kDaikinGap,
-            dataptr=data[offset:],
-            nbytes=nbytes - offset,
-            MSBfirst=False,
-        )
-        all_timings.extend(data3_timings)
-
-    return all_timings
+    if nbytes < kDaikinStateLength:  # Are we using the legacy size?
+        return sendFrame(kDaikinShortLayout, data, nbytes, repeat)
+    return sendFrame(kDaikinLayout, data, nbytes, repeat)
 
 
 ## Send a Daikin2 312-bit A/C formatted message.
@@ -543,45 +518,7 @@ def sendDaikin216(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
     """
     if nbytes < kDaikin216StateLength:
         return []
-
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # Section #1
-        section1_timings = sendGeneric(
-            headermark=kDaikin216HdrMark,
-            headerspace=kDaikin216HdrSpace,
-            onemark=kDaikin216BitMark,
-            onespace=kDaikin216OneSpace,
-            zeromark=kDaikin216BitMark,
-            zerospace=kDaikin216ZeroSpace,
-            footermark=kDaikin216BitMark,
-            gap=kDaikin216Gap,
-            dataptr=data,
-            nbytes=kDaikin216Section1Length,
-            MSBfirst=False,
-        )
-        all_timings.extend(section1_timings)
-
-        # Section #2
-        section2_timings = sendGeneric(
-            headermark=kDaikin216HdrMark,
-            headerspace=kDaikin216HdrSpace,
-            onemark=kDaikin216BitMark,
-            onespace=kDaikin216OneSpace,
-            zeromark=kDaikin216BitMark,
-            zerospace=kDaikin216ZeroSpace,
-            footermark=kDaikin216BitMark,
-            gap=kDaikin216Gap,
-            dataptr=data[kDaikin216Section1Length:],
-            nbytes=kDaikin216Section2Length,
-            MSBfirst=False,
-        )
-        all_timings.extend(section2_timings)
-
-    return all_timings
+    return sendFrame(kDaikin216Layout, data, nbytes, repeat)
 
 
 ## Send a Daikin160 160-bit A/C formatted message.
@@ -954,8 +891,6 @@ def decodeDaikin(results, offset: int = 1, nbits: int = kDaikinBits, strict: boo
     Decode a Daikin 280-bit A/C message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeDaikin
     """
-    from app.core.ir_protocols.ir_recv import kHeader, kFooter, kMarkExcess, _matchGeneric
-
     if nbits % 8 != 0:
         return False  # Not a byte multiple
 
@@ -969,116 +904,9 @@ def decodeDaikin(results, offset: int = 1, nbits: int = kDaikinBits, strict: boo
         if nbits != kDaikinBits and nbits != kDaikinBitsShort:
             return False
 
-    # Header (5 bits, 0b00000)
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=None,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=kDaikinHeaderLength,
-        hdrmark=0,
-        hdrspace=0,
-        onemark=kDaikinBitMark,
-        onespace=kDaikinOneSpace,
-        zeromark=kDaikinBitMark,
-        zerospace=kDaikinZeroSpace,
-        footermark=kDaikinBitMark,
-        footerspace=kDaikinZeroSpace + kDaikinGap,
-        atleast=False,
-        tolerance=kDaikinTolerance,
-        excess=kDaikinMarkExcess,
-        MSBfirst=False,
-    )
-    if used == 0:
-        return False
-    offset += used
-
-    # Data #1
-    if nbytes == kDaikinStateLengthShort:
-        # Legacy size - skip the first header
-        offset_increment = 2 * 64 + (kHeader + kFooter)
-        if offset + offset_increment > results.rawlen:
-            return False
-        offset += offset_increment
-    else:
-        # Newer size - decode section 1
-        used = _matchGeneric(
-            data_ptr=results.rawbuf[offset:],
-            result_bits_ptr=None,
-            result_bytes_ptr=results.state,
-            use_bits=False,
-            remaining=results.rawlen - offset,
-            nbits=kDaikinSection1Length * 8,
-            hdrmark=kDaikinHdrMark,
-            hdrspace=kDaikinHdrSpace,
-            onemark=kDaikinBitMark,
-            onespace=kDaikinOneSpace,
-            zeromark=kDaikinBitMark,
-            zerospace=kDaikinZeroSpace,
-            footermark=kDaikinBitMark,
-            footerspace=kDaikinZeroSpace + kDaikinGap,
-            atleast=False,
-            tolerance=kDaikinTolerance,
-            excess=kDaikinMarkExcess,
-            MSBfirst=False,
-        )
-        if used == 0:
-            return False
-        offset += used
-
-    # Data #2
-    # Python fix: use result_offset instead of slicing (slices create copies, not references)
-    data_offset = 0 if nbytes == kDaikinStateLengthShort else kDaikinSection1Length
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=kDaikinSection2Length * 8,
-        hdrmark=kDaikinHdrMark,
-        hdrspace=kDaikinHdrSpace,
-        onemark=kDaikinBitMark,
-        onespace=kDaikinOneSpace,
-        zeromark=kDaikinBitMark,
-        zerospace=kDaikinZeroSpace,
-        footermark=kDaikinBitMark,
-        footerspace=kDaikinZeroSpace + kDaikinGap,
-        atleast=False,
-        tolerance=kDaikinTolerance,
-        excess=kDaikinMarkExcess,
-        MSBfirst=False,
-        result_offset=data_offset,  # Python fix: write at offset in state array
-    )
-    if used == 0:
-        return False
-    offset += used
-
-    # Data #3
-    data_offset += kDaikinSection2Length
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=(nbytes - data_offset) * 8,
-        hdrmark=kDaikinHdrMark,
-        hdrspace=kDaikinHdrSpace,
-        onemark=kDaikinBitMark,
-        onespace=kDaikinOneSpace,
-        zeromark=kDaikinBitMark,
-        zerospace=kDaikinZeroSpace,
-        footermark=kDaikinBitMark,
-        footerspace=kDaikinZeroSpace + kDaikinGap,
-        atleast=True,
-        tolerance=kDaikinTolerance,
-        excess=kDaikinMarkExcess,
-        MSBfirst=False,
-        result_offset=data_offset,  # Python fix: write at offset in state array
-    )
-    if used == 0:
+    # Header (5 bits, 0b00000), Data #1 (or the legacy constant), #2 & #3
+    layout = kDaikinShortLayout if nbytes == kDaikinStateLengthShort else kDaikinLayout
+    if not matchFrame(results, offset, layout, nbytes):
         return False
 
     # Compliance
@@ -1198,8 +1026,6 @@ def decodeDaikin216(
     Decode a Daikin216 216-bit A/C message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeDaikin216
     """
-    from app.core.ir_protocols.ir_recv import kMarkExcess, _matchGeneric
-
     if nbits % 8 != 0:
         return False
 
@@ -1207,53 +1033,8 @@ def decodeDaikin216(
     if strict and nbits != kDaikin216Bits:
         return False
 
-    # Section #1
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=kDaikin216Section1Length * 8,
-        hdrmark=kDaikin216HdrMark,
-        hdrspace=kDaikin216HdrSpace,
-        onemark=kDaikin216BitMark,
-        onespace=kDaikin216OneSpace,
-        zeromark=kDaikin216BitMark,
-        zerospace=kDaikin216ZeroSpace,
-        footermark=kDaikin216BitMark,
-        footerspace=kDaikin216Gap,
-        atleast=False,
-        tolerance=kDaikinTolerance,
-        excess=kMarkExcess,
-        MSBfirst=False,
-    )
-    if used == 0:
-        return False
-    offset += used
-
-    # Section #2
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state[kDaikin216Section1Length:],
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=kDaikin216Section2Length * 8,
-        hdrmark=kDaikin216HdrMark,
-        hdrspace=kDaikin216HdrSpace,
-        onemark=kDaikin216BitMark,
-        onespace=kDaikin216OneSpace,
-        zeromark=kDaikin216BitMark,
-        zerospace=kDaikin216ZeroSpace,
-        footermark=kDaikin216BitMark,
-        footerspace=kDaikin216Gap,
-        atleast=True,
-        tolerance=kDaikinTolerance,
-        excess=kMarkExcess,
-        MSBfirst=False,
-    )
-    if used == 0:
+    # Section #1 & #2
+    if not matchFrame(results, offset, kDaikin216Layout, nbits // 8):
         return False
 
     # Compliance
@@ -7,6 +7,8 @@
 ## Direct translation from IRremoteESP8266 ir_Delonghi.cpp and ir_Delonghi.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBITS64
 
 # Supports:
 #   Brand: Delonghi,  Model: PAC A95
@@ -49,158 +51,43 @@ kDelonghiAcChecksumOffset = 56
 kDelonghiAcDefaultRepeat = 0
 
 
-def GETBITS64(value: int, offset: int, nbits: int) -> int:
-    """
-    Extract bits from a 64-bit value.
-    Helper function for bit manipulation.
-    """
-    return (value >> offset) & ((1 << nbits) - 1)
-
-
 ## Native representation of a Delonghi A/C message.
 ## This is a direct translation of the C++ union/struct (from ir_Delonghi.h lines 26-50)
-class DelonghiProtocol:
+class DelonghiProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         self.raw = 0  # 64-bit value
 
     # Byte 0 - Header (bits 0-7)
 
     # Byte 1 (bits 8-15)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 8) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 8)) | ((value & 0x1F) << 8)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 13) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 13)) | ((value & 0x03) << 13)
-
-    @property
-    def Fahrenheit(self) -> int:
-        return (self.raw >> 15) & 0x01
-
-    @Fahrenheit.setter
-    def Fahrenheit(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 15
-        else:
-            self.raw &= ~(1 << 15)
+    Temp = field(1, 0, 5)
+    Fan = field(1, 5, 2)
+    Fahrenheit = field(1, 7, 1)
 
     # Byte 2 (bits 16-23)
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 16) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 16
-        else:
-            self.raw &= ~(1 << 16)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 17) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 17)) | ((value & 0x07) << 17)
-
-    @property
-    def Boost(self) -> int:
-        return (self.raw >> 20) & 0x01
-
-    @Boost.setter
-    def Boost(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 20
-        else:
-            self.raw &= ~(1 << 20)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw >> 21) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 21
-        else:
-            self.raw &= ~(1 << 21)
+    Power = field(2, 0, 1)
+    Mode = field(2, 1, 3)
+    Boost = field(2, 4, 1)
+    Sleep = field(2, 5, 1)
 
     # Byte 3 (bits 24-31)
-    @property
-    def OnTimer(self) -> int:
-        return (self.raw >> 24) & 0x01
-
-    @OnTimer.setter
-    def OnTimer(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 24
-        else:
-            self.raw &= ~(1 << 24)
-
-    @property
-    def OnHours(self) -> int:
-        return (self.raw >> 25) & 0x1F
-
-    @OnHours.setter
-    def OnHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 25)) | ((value & 0x1F) << 25)
+    OnTimer = field(3, 0, 1)
+    OnHours = field(3, 1, 5)
 
     # Byte 4 (bits 32-39)
-    @property
-    def OnMins(self) -> int:
-        return (self.raw >> 32) & 0x3F
-
-    @OnMins.setter
-    def OnMins(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x3F << 32)) | ((value & 0x3F) << 32)
+    OnMins = field(4, 0, 6)
 
     # Byte 5 (bits 40-47)
-    @property
-    def OffTimer(self) -> int:
-        return (self.raw >> 40) & 0x01
-
-    @OffTimer.setter
-    def OffTimer(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 40
-        else:
-            self.raw &= ~(1 << 40)
-
-    @property
-    def OffHours(self) -> int:
-        return (self.raw >> 41) & 0x1F
-
-    @OffHours.setter
-    def OffHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 41)) | ((value & 0x1F) << 41)
+    OffTimer = field(5, 0, 1)
+    OffHours = field(5, 1, 5)
 
     # Byte 6 (bits 48-55)
-    @property
-    def OffMins(self) -> int:
-        return (self.raw >> 48) & 0x3F
-
-    @OffMins.setter
-    def OffMins(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x3F << 48)) | ((value & 0x3F) << 48)
+    OffMins = field(6, 0, 6)
 
     # Byte 7 (bits 56-63)
-    @property
-    def Sum(self) -> int:
-        return (self.raw >> 56) & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw = (self.raw & ~(0xFF << 56)) | ((value & 0xFF) << 56)
+    Sum = field(7)
 
 
 ## Send a Delonghi A/C formatted message.
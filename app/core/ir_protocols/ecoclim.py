@@ -7,6 +7,7 @@
 ## Direct translation from IRremoteESP8266 ir_Ecoclim.cpp and ir_Ecoclim.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Supports:
 #   Brand: EcoClim,  Model: HYSFR-P348 remote
@@ -60,121 +61,40 @@ kEcoclimDefaultState = 0x11063000FFFF02
 
 ## Native representation of a Ecoclim A/C message.
 ## Direct translation of C++ union/struct (from ir_Ecoclim.h lines 51-78)
-class EcoclimProtocol:
+class EcoclimProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         self.raw = kEcoclimDefaultState  # uint64_t
 
     # Byte 0
     # :3 bits - Fixed 0b010
     # :1 bit - Unknown
-    @property
-    def DipConfig(self) -> int:
-        return (self.raw >> 4) & 0x0F
-
-    @DipConfig.setter
-    def DipConfig(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 4)) | ((value & 0x0F) << 4)
+    DipConfig = field(0, 4, 4)
 
     # Byte 1
-    @property
-    def OffTenMins(self) -> int:
-        return (self.raw >> 8) & 0x07
-
-    @OffTenMins.setter
-    def OffTenMins(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 8)) | ((value & 0x07) << 8)
-
-    @property
-    def OffHours(self) -> int:
-        return (self.raw >> 11) & 0x1F
-
-    @OffHours.setter
-    def OffHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 11)) | ((value & 0x1F) << 11)
+    OffTenMins = field(1, 0, 3)
+    OffHours = field(1, 3, 5)
 
     # Byte 2
-    @property
-    def OnTenMins(self) -> int:
-        return (self.raw >> 16) & 0x07
-
-    @OnTenMins.setter
-    def OnTenMins(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 16)) | ((value & 0x07) << 16)
-
-    @property
-    def OnHours(self) -> int:
-        return (self.raw >> 19) & 0x1F
-
-    @OnHours.setter
-    def OnHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 19)) | ((value & 0x1F) << 19)
+    OnTenMins = field(2, 0, 3)
+    OnHours = field(2, 3, 5)
 
     # Byte 3+4
-    @property
-    def Clock(self) -> int:
-        return (self.raw >> 24) & 0x7FF
-
-    @Clock.setter
-    def Clock(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x7FF << 24)) | ((value & 0x7FF) << 24)
+    Clock = field(3, 0, 11)
 
     # :1 bit - Unknown (bit 35)
 
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 36) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 36)) | ((value & 0x03) << 36)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 38) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 38
-        else:
-            self.raw &= ~(1 << 38)
-
-    @property
-    def Clear(self) -> int:
-        return (self.raw >> 39) & 0x01
-
-    @Clear.setter
-    def Clear(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 39
-        else:
-            self.raw &= ~(1 << 39)
+    Fan = field(4, 4, 2)
+    Power = field(4, 6, 1)
+    Clear = field(4, 7, 1)
 
     # Byte 5
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 40) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 40)) | ((value & 0x1F) << 40)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 45) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 45)) | ((value & 0x07) << 45)
+    Temp = field(5, 0, 5)
+    Mode = field(5, 5, 3)
 
     # Byte 6
-    @property
-    def SensorTemp(self) -> int:
-        return (self.raw >> 48) & 0x1F
-
-    @SensorTemp.setter
-    def SensorTemp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 48)) | ((value & 0x1F) << 48)
+    SensorTemp = field(6, 0, 5)
 
     # :3 bits - Fixed (bits 53-55)
 
@@ -6,6 +6,15 @@
 ## Direct translation from IRremoteESP8266 ir_Electra.cpp and ir_Electra.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Ref: https://github.com/ToniA/arduino-heatpumpir/blob/master/AUXHeatpumpIR.cpp
 
@@ -21,6 +30,22 @@ kElectraAcMessageGap = 100000  # kDefaultMessageGap - just a guess
 kElectraAcStateLength = 13
 kElectraAcBits = kElectraAcStateLength * 8  # 104 bits
 
+## Header, the state LSB first, footer, gap.
+kElectraAcLayout = frame_layout_t(
+    timing=bit_timing_t(
+        kElectraAcBitMark, kElectraAcOneSpace, kElectraAcBitMark, kElectraAcZeroSpace
+    ),
+    sections=(
+        frame_section_t(
+            hdrmark=kElectraAcHdrMark,
+            hdrspace=kElectraAcHdrSpace,
+            footermark=kElectraAcBitMark,
+            gap=kElectraAcMessageGap,
+        ),
+    ),
+    excess=0,
+)
+
 # Temperature constants (from ir_Electra.h lines 82-84)
 kElectraAcMinTemp = 16  # 16C
 kElectraAcMaxTemp = 32  # 32C
@@ -60,158 +85,48 @@ kElectraAcSensorMinTemp = 0  # 0C
 kElectraAcSensorMaxTemp = 50  # 50C
 
 
-## Helper function for checksum calculation
-def sumBytes(data: List[int], length: int) -> int:
-    """Sum all bytes in the array (used for checksum)"""
-    return sum(data[:length]) & 0xFF
-
-
 ## Native representation of an Electra A/C message.
 ## This is a direct translation of the C++ union/struct (ir_Electra.h lines 35-79)
-class ElectraProtocol:
+class ElectraProtocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (13 bytes for Electra)
-        self.remote_state = [0] * 13
+        self.remote_state = bytearray(13)
 
     # Byte 1
-    @property
-    def SwingV(self) -> int:
-        return self.remote_state[1] & 0x07
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0xF8) | (value & 0x07)
-
-    @property
-    def Temp(self) -> int:
-        return (self.remote_state[1] >> 3) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0x07) | ((value & 0x1F) << 3)
+    SwingV = field(1, 0, 3)
+    Temp = field(1, 3, 5)
 
     # Byte 2
-    @property
-    def SwingH(self) -> int:
-        return (self.remote_state[2] >> 5) & 0x07
-
-    @SwingH.setter
-    def SwingH(self, value: int) -> None:
-        self.remote_state[2] = (self.remote_state[2] & 0x1F) | ((value & 0x07) << 5)
+    SwingH = field(2, 5, 3)
 
     # Byte 3
-    @property
-    def SensorUpdate(self) -> int:
-        return (self.remote_state[3] >> 6) & 0x01
-
-    @SensorUpdate.setter
-    def SensorUpdate(self, value: bool) -> None:
-        if value:
-            self.remote_state[3] |= 0x40
-        else:
-            self.remote_state[3] &= 0xBF
+    SensorUpdate = field(3, 6, 1)
 
     # Byte 4
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state[4] >> 5) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[4] = (self.remote_state[4] & 0x1F) | ((value & 0x07) << 5)
+    Fan = field(4, 5, 3)
 
     # Byte 5
-    @property
-    def Turbo(self) -> int:
-        return (self.remote_state[5] >> 6) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.remote_state[5] |= 0x40
-        else:
-            self.remote_state[5] &= 0xBF
-
-    @property
-    def Quiet(self) -> int:
-        return (self.remote_state[5] >> 7) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: bool) -> None:
-        if value:
-            self.remote_state[5] |= 0x80
-        else:
-            self.remote_state[5] &= 0x7F
+    Turbo = field(5, 6, 1)
+    Quiet = field(5, 7, 1)
 
     # Byte 6
-    @property
-    def IFeel(self) -> int:
-        return (self.remote_state[6] >> 3) & 0x01
-
-    @IFeel.setter
-    def IFeel(self, value: bool) -> None:
-        if value:
-            self.remote_state[6] |= 0x08
-        else:
-            self.remote_state[6] &= 0xF7
-
-    @property
-    def Mode(self) -> int:
-        return (self.remote_state[6] >> 5) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[6] = (self.remote_state[6] & 0x1F) | ((value & 0x07) << 5)
+    IFeel = field(6, 3, 1)
+    Mode = field(6, 5, 3)
 
     # Byte 7
-    @property
-    def SensorTemp(self) -> int:
-        return self.remote_state[7] & 0xFF
-
-    @SensorTemp.setter
-    def SensorTemp(self, value: int) -> None:
-        self.remote_state[7] = value & 0xFF
+    SensorTemp = field(7)
 
     # Byte 9
-    @property
-    def Clean(self) -> int:
-        return (self.remote_state[9] >> 2) & 0x01
-
-    @Clean.setter
-    def Clean(self, value: bool) -> None:
-        if value:
-            self.remote_state[9] |= 0x04
-        else:
-            self.remote_state[9] &= 0xFB
-
-    @property
-    def Power(self) -> int:
-        return (self.remote_state[9] >> 5) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[9] |= 0x20
-        else:
-            self.remote_state[9] &= 0xDF
+    Clean = field(9, 2, 1)
+    Power = field(9, 5, 1)
 
     # Byte 11
-    @property
-    def LightToggle(self) -> int:
-        return self.remote_state[11] & 0xFF
-
-    @LightToggle.setter
-    def LightToggle(self, value: int) -> None:
-        self.remote_state[11] = value & 0xFF
+    LightToggle = field(11)
 
     # Byte 12
-    @property
-    def Sum(self) -> int:
-        return self.remote_state[12] & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.remote_state[12] = value & 0xFF
+    Sum = field(12)
 
 
 ## Send an Electra A/C formatted message.
@@ -227,28 +142,7 @@ def sendElectraAC(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
 
     Returns timing array instead of transmitting via hardware.
     """
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        timings = sendGeneric(
-            headermark=kElectraAcHdrMark,
-            headerspace=kElectraAcHdrSpace,
-            onemark=kElectraAcBitMark,
-            onespace=kElectraAcOneSpace,
-            zeromark=kElectraAcBitMark,
-            zerospace=kElectraAcZeroSpace,
-            footermark=kElectraAcBitMark,
-            gap=kElectraAcMessageGap,
-            dataptr=data,
-            nbytes=nbytes,
-            MSBfirst=False,  # Send data in LSB order per byte
-        )
-        all_timings.extend(timings)
-
-    return all_timings
+    return sendFrame(kElectraAcLayout, data, nbytes, repeat)
 
 
 ## Class for handling detailed Electra A/C messages.
@@ -494,7 +388,7 @@ class IRElectraAc:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## Direct translation from ir_Electra.cpp lines 110-113
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.remote_state
 
@@ -524,32 +418,12 @@ def decodeElectraAC(
 
     This is the ACTUAL C++ decoder function, not a wrapper.
     """
-    # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import matchGeneric
-
     if strict:
         if nbits != kElectraAcBits:
             return False  # Not strictly a ELECTRA_AC message.
 
     # Match Header + Data + Footer
-    if not matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_ptr=results.state,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=kElectraAcHdrMark,
-        hdrspace=kElectraAcHdrSpace,
-        onemark=kElectraAcBitMark,
-        onespace=kElectraAcOneSpace,
-        zeromark=kElectraAcBitMark,
-        zerospace=kElectraAcZeroSpace,
-        footermark=kElectraAcBitMark,
-        footerspace=kElectraAcMessageGap,
-        atleast=True,
-        tolerance=25,
-        excess=0,
-        MSBfirst=False,
-    ):
+    if not matchFrame(results, offset, kElectraAcLayout, nbits // 8):
         return False
 
     # Compliance
@@ -13,6 +13,9 @@
 ## @see https://github.com/crankyoldgit/IRremoteESP8266/issues/1376
 
 from typing import List, Union
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
+from app.core.ir_protocols.ir_layout import bit_timing_t, frame_layout_t, frame_section_t, sendFrame
 
 # Ref:
 # These values are based on averages of measurements
@@ -30,6 +33,21 @@ kFujitsuAcStateLengthShort = 7
 kFujitsuAcMinBits = kFujitsuAcStateLengthShort * 8
 kFujitsuAcBits = kFujitsuAcStateLength * 8
 
+## Header, the state LSB first, footer mark. No trailing gap for a single
+## message (kFujitsuAcMinGap is only needed between repeats).
+kFujitsuAcLayout = frame_layout_t(
+    timing=bit_timing_t(
+        kFujitsuAcBitMark, kFujitsuAcOneSpace, kFujitsuAcBitMark, kFujitsuAcZeroSpace
+    ),
+    sections=(
+        frame_section_t(
+            hdrmark=kFujitsuAcHdrMark,
+            hdrspace=kFujitsuAcHdrSpace,
+            footermark=kFujitsuAcBitMark,
+        ),
+    ),
+)
+
 # Constants
 kFujitsuAcModeAuto = 0x0  # 0b000
 kFujitsuAcModeCool = 0x1  # 0b001
@@ -82,14 +100,6 @@ ARRY4 = 4
 ARREW4E = 5
 
 
-def sumBytes(state: List[int], length: int) -> int:
-    """Sum bytes in a state array"""
-    sum_val = 0
-    for i in range(length):
-        sum_val += state[i]
-    return sum_val & 0xFF
-
-
 def fahrenheitToCelsius(temp: float) -> float:
     """Convert Fahrenheit to Celsius"""
     return (temp - 32.0) / 1.8
@@ -97,146 +107,45 @@ def fahrenheitToCelsius(temp: float) -> float:
 
 ## Native representation of a Fujitsu A/C message.
 ## This is a direct translation of the C++ union/struct
-class FujitsuProtocol:
+class FujitsuProtocol(BitfieldStruct, buffer="longcode"):
+    __slots__ = ("longcode", "shortcode")
+
     def __init__(self):
         # The state arrays
-        self.longcode = [0] * kFujitsuAcStateLength
-        self.shortcode = [0] * kFujitsuAcStateLengthShort
+        self.longcode = bytearray(kFujitsuAcStateLength)
+        self.shortcode = bytearray(kFujitsuAcStateLengthShort)
 
     # Byte 0~1 - Fixed header (handled by longcode[0], longcode[1])
 
     # Byte 2
-    @property
-    def Id(self) -> int:
-        return (self.longcode[2] >> 4) & 0x03
-
-    @Id.setter
-    def Id(self, value: int) -> None:
-        self.longcode[2] = (self.longcode[2] & 0xCF) | ((value & 0x03) << 4)
+    Id = field(2, 4, 2)
 
     # Byte 5
-    @property
-    def Cmd(self) -> int:
-        return self.longcode[5]
-
-    @Cmd.setter
-    def Cmd(self, value: int) -> None:
-        self.longcode[5] = value & 0xFF
+    Cmd = field(5)
 
     # Byte 6
-    @property
-    def RestLength(self) -> int:
-        return self.longcode[6]
-
-    @RestLength.setter
-    def RestLength(self, value: int) -> None:
-        self.longcode[6] = value & 0xFF
+    RestLength = field(6)
 
     # Byte 7
-    @property
-    def Protocol(self) -> int:
-        return self.longcode[7]
-
-    @Protocol.setter
-    def Protocol(self, value: int) -> None:
-        self.longcode[7] = value & 0xFF
+    Protocol = field(7)
 
     # Byte 8
-    @property
-    def Power(self) -> int:
-        return self.longcode[8] & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.longcode[8] |= 0x01
-        else:
-            self.longcode[8] &= 0xFE
-
-    @property
-    def Fahrenheit(self) -> int:
-        return (self.longcode[8] >> 1) & 0x01
-
-    @Fahrenheit.setter
-    def Fahrenheit(self, value: bool) -> None:
-        if value:
-            self.longcode[8] |= 0x02
-        else:
-            self.longcode[8] &= 0xFD
-
-    @property
-    def Temp(self) -> int:
-        return (self.longcode[8] >> 2) & 0x3F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.longcode[8] = (self.longcode[8] & 0x03) | ((value & 0x3F) << 2)
+    Power = field(8, 0, 1)
+    Fahrenheit = field(8, 1, 1)
+    Temp = field(8, 2, 6)
 
     # Byte 9
-    @property
-    def Mode(self) -> int:
-        return self.longcode[9] & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.longcode[9] = (self.longcode[9] & 0xF8) | (value & 0x07)
-
-    @property
-    def Clean(self) -> int:
-        return (self.longcode[9] >> 3) & 0x01
-
-    @Clean.setter
-    def Clean(self, value: bool) -> None:
-        if value:
-            self.longcode[9] |= 0x08
-        else:
-            self.longcode[9] &= 0xF7
-
-    @property
-    def TimerType(self) -> int:
-        return (self.longcode[9] >> 4) & 0x03
-
-    @TimerType.setter
-    def TimerType(self, value: int) -> None:
-        self.longcode[9] = (self.longcode[9] & 0xCF) | ((value & 0x03) << 4)
+    Mode = field(9, 0, 3)
+    Clean = field(9, 3, 1)
+    TimerType = field(9, 4, 2)
 
     # Byte 10
-    @property
-    def Fan(self) -> int:
-        return self.longcode[10] & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.longcode[10] = (self.longcode[10] & 0xF8) | (value & 0x07)
-
-    @property
-    def Swing(self) -> int:
-        return (self.longcode[10] >> 4) & 0x03
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        self.longcode[10] = (self.longcode[10] & 0xCF) | ((value & 0x03) << 4)
+    Fan = field(10, 0, 3)
+    Swing = field(10, 4, 2)
 
     # Byte 11~13 - Timer values (11 bits each)
-    @property
-    def OffTimer(self) -> int:
-        return self.longcode[11] | ((self.longcode[12] & 0x07) << 8)
-
-    @OffTimer.setter
-    def OffTimer(self, value: int) -> None:
-        self.longcode[11] = value & 0xFF
-        self.longcode[12] = (self.longcode[12] & 0xF8) | ((value >> 8) & 0x07)
-
-    @property
-    def OffTimerEnable(self) -> int:
-        return (self.longcode[12] >> 3) & 0x01
-
-    @OffTimerEnable.setter
-    def OffTimerEnable(self, value: bool) -> None:
-        if value:
-            self.longcode[12] |= 0x08
-        else:
-            self.longcode[12] &= 0xF7
+    OffTimer = field(11, 0, 11)
+    OffTimerEnable = field(12, 3, 1)
 
     @property
     def OnTimer(self) -> int:
@@ -247,50 +156,12 @@ class FujitsuProtocol:
         self.longcode[12] = (self.longcode[12] & 0x0F) | ((value & 0x0F) << 4)
         self.longcode[13] = (value >> 4) & 0x7F
 
-    @property
-    def OnTimerEnable(self) -> int:
-        return (self.longcode[13] >> 7) & 0x01
-
-    @OnTimerEnable.setter
-    def OnTimerEnable(self, value: bool) -> None:
-        if value:
-            self.longcode[13] |= 0x80
-        else:
-            self.longcode[13] &= 0x7F
+    OnTimerEnable = field(13, 7, 1)
 
     # Byte 14
-    @property
-    def Filter(self) -> int:
-        return (self.longcode[14] >> 3) & 0x01
-
-    @Filter.setter
-    def Filter(self, value: bool) -> None:
-        if value:
-            self.longcode[14] |= 0x08
-        else:
-            self.longcode[14] &= 0xF7
-
-    @property
-    def unknown(self) -> int:
-        return (self.longcode[14] >> 5) & 0x01
-
-    @unknown.setter
-    def unknown(self, value: Union[bool, int]) -> None:
-        if value:
-            self.longcode[14] |= 0x20
-        else:
-            self.longcode[14] &= 0xDF
-
-    @property
-    def OutsideQuiet(self) -> int:
-        return (self.longcode[14] >> 7) & 0x01
-
-    @OutsideQuiet.setter
-    def OutsideQuiet(self, value: Union[bool, int]) -> None:
-        if value:
-            self.longcode[14] |= 0x80
-        else:
-            self.longcode[14] &= 0x7F
+    Filter = field(14, 3, 1)
+    unknown = field(14, 5, 1)
+    OutsideQuiet = field(14, 7, 1)
 
 
 ## Class for handling detailed Fujitsu A/C messages.
@@ -526,7 +397,7 @@ class IRFujitsuAC:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checkSum()
         if self.isLongCode():
             return self._.longcode
@@ -1062,23 +933,5 @@ def sendFujitsuAC(data: List[int], nbytes: int) -> List[int]:
     """
     Send a Fujitsu A/C formatted message.
     Adapted from IRremoteESP8266 IRsend::sendFujitsuAC (hardware params removed).
-
-    This is a wrapper around sendGeneric() with Fujitsu-specific timing constants.
     """
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    return sendGeneric(
-        headermark=kFujitsuAcHdrMark,
-        headerspace=kFujitsuAcHdrSpace,
-        onemark=kFujitsuAcBitMark,
-        onespace=kFujitsuAcOneSpace,
-        zeromark=kFujitsuAcBitMark,
-        zerospace=kFujitsuAcZeroSpace,
-        footermark=kFujitsuAcBitMark,
-        gap=0,  # No trailing gap for single message (kFujitsuAcMinGap only for repeats)
-        dataptr=data,
-        nbytes=nbytes,
-        MSBfirst=False,  # LSB first
-        repeat=0,  # Single message only
-    )
+    return sendFrame(kFujitsuAcLayout, data, nbytes)
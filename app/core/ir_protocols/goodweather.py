@@ -7,6 +7,7 @@
 ## Direct translation from IRremoteESP8266 ir_Goodweather.cpp and ir_Goodweather.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Ref: https://github.com/crankyoldgit/IRremoteESP8266/issues/697
 
@@ -64,110 +65,31 @@ kGoodweatherStateInit = 0xD50000000000
 
 ## Native representation of a Goodweather A/C message.
 ## This is a direct translation of the C++ union/struct
-class GoodweatherProtocol:
+class GoodweatherProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         self.raw = 0  # 64-bit state
 
     # Byte 0 (bits 0-7) - always 0
 
     # Byte 1 (bits 8-15)
-    @property
-    def Light(self) -> int:
-        return (self.raw >> 8) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.raw |= 0x01 << 8
-        else:
-            self.raw &= ~(0x01 << 8)
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw >> 11) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.raw |= 0x01 << 11
-        else:
-            self.raw &= ~(0x01 << 11)
+    Light = field(1, 0, 1)
+    Turbo = field(1, 3, 1)
 
     # Byte 2 (bits 16-23)
-    @property
-    def Command(self) -> int:
-        return (self.raw >> 16) & 0x0F
-
-    @Command.setter
-    def Command(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 16)) | ((value & 0x0F) << 16)
+    Command = field(2, 0, 4)
 
     # Byte 3 (bits 24-31)
-    @property
-    def Sleep(self) -> int:
-        return (self.raw >> 24) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw |= 0x01 << 24
-        else:
-            self.raw &= ~(0x01 << 24)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 25) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 0x01 << 25
-        else:
-            self.raw &= ~(0x01 << 25)
-
-    @property
-    def Swing(self) -> int:
-        return (self.raw >> 26) & 0x03
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 26)) | ((value & 0x03) << 26)
-
-    @property
-    def AirFlow(self) -> int:
-        return (self.raw >> 28) & 0x01
-
-    @AirFlow.setter
-    def AirFlow(self, value: bool) -> None:
-        if value:
-            self.raw |= 0x01 << 28
-        else:
-            self.raw &= ~(0x01 << 28)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 29) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 29)) | ((value & 0x03) << 29)
+    Sleep = field(3, 0, 1)
+    Power = field(3, 1, 1)
+    Swing = field(3, 2, 2)
+    AirFlow = field(3, 4, 1)
+    Fan = field(3, 5, 2)
 
     # Byte 4 (bits 32-39)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 32) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 32)) | ((value & 0x0F) << 32)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 37) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 37)) | ((value & 0x07) << 37)
+    Temp = field(4, 0, 4)
+    Mode = field(4, 5, 3)
 
 
 ## Send a Goodweather HVAC formatted message.
@@ -7,6 +7,14 @@
 ## Direct translation from IRremoteESP8266 ir_Gree.cpp and ir_Gree.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Ref: https://github.com/ToniA/arduino-heatpumpir/blob/master/GreeHeatpumpIR.h
 
@@ -24,6 +32,22 @@ kGreeBlockFooterBits = 3
 kGreeStateLength = 8
 kGreeBits = kGreeStateLength * 8  # 64 bits
 
+## Two blocks: header + 4 bytes, the 3-bit block footer (B010), then the rest
+## of the bytes after a (bit mark, message space) pair, then a footer.
+kGreeLayout = frame_layout_t(
+    timing=bit_timing_t(kGreeBitMark, kGreeOneSpace, kGreeBitMark, kGreeZeroSpace),
+    sections=(
+        frame_section_t(nbytes=4, hdrmark=kGreeHdrMark, hdrspace=kGreeHdrSpace),
+        frame_section_t(bits=kGreeBlockFooterBits, value=kGreeBlockFooter),
+        frame_section_t(
+            hdrmark=kGreeBitMark,
+            hdrspace=kGreeMsgSpace,
+            footermark=kGreeBitMark,
+            gap=kGreeMsgSpace,
+        ),
+    ),
+)
+
 # Mode constants
 kGreeAuto = 0
 kGreeCool = 1
@@ -112,261 +136,53 @@ def celsiusToFahrenheit(temp: float) -> float:
 
 ## Native representation of a Gree A/C message.
 ## This is a direct translation of the C++ union/struct
-class GreeProtocol:
+class GreeProtocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (8 bytes for Gree)
-        self.remote_state = [0] * 8
+        self.remote_state = bytearray(8)
 
     # Byte 0
-    @property
-    def Mode(self) -> int:
-        return self.remote_state[0] & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[0] = (self.remote_state[0] & 0xF8) | (value & 0x07)
-
-    @property
-    def Power(self) -> int:
-        return (self.remote_state[0] >> 3) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[0] |= 0x08
-        else:
-            self.remote_state[0] &= 0xF7
-
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state[0] >> 4) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[0] = (self.remote_state[0] & 0xCF) | ((value & 0x03) << 4)
-
-    @property
-    def SwingAuto(self) -> int:
-        return (self.remote_state[0] >> 6) & 0x01
-
-    @SwingAuto.setter
-    def SwingAuto(self, value: bool) -> None:
-        if value:
-            self.remote_state[0] |= 0x40
-        else:
-            self.remote_state[0] &= 0xBF
-
-    @property
-    def Sleep(self) -> int:
-        return (self.remote_state[0] >> 7) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.remote_state[0] |= 0x80
-        else:
-            self.remote_state[0] &= 0x7F
+    Mode = field(0, 0, 3)
+    Power = field(0, 3, 1)
+    Fan = field(0, 4, 2)
+    SwingAuto = field(0, 6, 1)
+    Sleep = field(0, 7, 1)
 
     # Byte 1
-    @property
-    def Temp(self) -> int:
-        return self.remote_state[1] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0xF0) | (value & 0x0F)
-
-    @property
-    def TimerHalfHr(self) -> int:
-        return (self.remote_state[1] >> 4) & 0x01
-
-    @TimerHalfHr.setter
-    def TimerHalfHr(self, value: bool) -> None:
-        if value:
-            self.remote_state[1] |= 0x10
-        else:
-            self.remote_state[1] &= 0xEF
-
-    @property
-    def TimerTensHr(self) -> int:
-        return (self.remote_state[1] >> 5) & 0x03
-
-    @TimerTensHr.setter
-    def TimerTensHr(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0x9F) | ((value & 0x03) << 5)
-
-    @property
-    def TimerEnabled(self) -> int:
-        return (self.remote_state[1] >> 7) & 0x01
-
-    @TimerEnabled.setter
-    def TimerEnabled(self, value: bool) -> None:
-        if value:
-            self.remote_state[1] |= 0x80
-        else:
-            self.remote_state[1] &= 0x7F
+    Temp = field(1, 0, 4)
+    TimerHalfHr = field(1, 4, 1)
+    TimerTensHr = field(1, 5, 2)
+    TimerEnabled = field(1, 7, 1)
 
     # Byte 2
-    @property
-    def TimerHours(self) -> int:
-        return self.remote_state[2] & 0x0F
-
-    @TimerHours.setter
-    def TimerHours(self, value: int) -> None:
-        self.remote_state[2] = (self.remote_state[2] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Turbo(self) -> int:
-        return (self.remote_state[2] >> 4) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x10
-        else:
-            self.remote_state[2] &= 0xEF
-
-    @property
-    def Light(self) -> int:
-        return (self.remote_state[2] >> 5) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x20
-        else:
-            self.remote_state[2] &= 0xDF
-
-    @property
-    def ModelA(self) -> int:
-        return (self.remote_state[2] >> 6) & 0x01
-
-    @ModelA.setter
-    def ModelA(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x40
-        else:
-            self.remote_state[2] &= 0xBF
-
-    @property
-    def Xfan(self) -> int:
-        return (self.remote_state[2] >> 7) & 0x01
-
-    @Xfan.setter
-    def Xfan(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x80
-        else:
-            self.remote_state[2] &= 0x7F
+    TimerHours = field(2, 0, 4)
+    Turbo = field(2, 4, 1)
+    Light = field(2, 5, 1)
+    ModelA = field(2, 6, 1)
+    Xfan = field(2, 7, 1)
 
     # Byte 3
-    @property
-    def TempExtraDegreeF(self) -> int:
-        return (self.remote_state[3] >> 2) & 0x01
-
-    @TempExtraDegreeF.setter
-    def TempExtraDegreeF(self, value: bool) -> None:
-        if value:
-            self.remote_state[3] |= 0x04
-        else:
-            self.remote_state[3] &= 0xFB
-
-    @property
-    def UseFahrenheit(self) -> int:
-        return (self.remote_state[3] >> 3) & 0x01
-
-    @UseFahrenheit.setter
-    def UseFahrenheit(self, value: bool) -> None:
-        if value:
-            self.remote_state[3] |= 0x08
-        else:
-            self.remote_state[3] &= 0xF7
-
-    @property
-    def unknown1(self) -> int:
-        return (self.remote_state[3] >> 4) & 0x0F
-
-    @unknown1.setter
-    def unknown1(self, value: int) -> None:
-        self.remote_state[3] = (self.remote_state[3] & 0x0F) | ((value & 0x0F) << 4)
+    TempExtraDegreeF = field(3, 2, 1)
+    UseFahrenheit = field(3, 3, 1)
+    unknown1 = field(3, 4, 4)
 
     # Byte 4
-    @property
-    def SwingV(self) -> int:
-        return self.remote_state[4] & 0x0F
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.remote_state[4] = (self.remote_state[4] & 0xF0) | (value & 0x0F)
-
-    @property
-    def SwingH(self) -> int:
-        return (self.remote_state[4] >> 4) & 0x07
-
-    @SwingH.setter
-    def SwingH(self, value: int) -> None:
-        self.remote_state[4] = (self.remote_state[4] & 0x8F) | ((value & 0x07) << 4)
+    SwingV = field(4, 0, 4)
+    SwingH = field(4, 4, 3)
 
     # Byte 5
-    @property
-    def DisplayTemp(self) -> int:
-        return self.remote_state[5] & 0x03
-
-    @DisplayTemp.setter
-    def DisplayTemp(self, value: int) -> None:
-        self.remote_state[5] = (self.remote_state[5] & 0xFC) | (value & 0x03)
-
-    @property
-    def IFeel(self) -> int:
-        return (self.remote_state[5] >> 2) & 0x01
-
-    @IFeel.setter
-    def IFeel(self, value: bool) -> None:
-        if value:
-            self.remote_state[5] |= 0x04
-        else:
-            self.remote_state[5] &= 0xFB
-
-    @property
-    def unknown2(self) -> int:
-        return (self.remote_state[5] >> 3) & 0x07
-
-    @unknown2.setter
-    def unknown2(self, value: int) -> None:
-        self.remote_state[5] = (self.remote_state[5] & 0xC7) | ((value & 0x07) << 3)
-
-    @property
-    def WiFi(self) -> int:
-        return (self.remote_state[5] >> 6) & 0x01
-
-    @WiFi.setter
-    def WiFi(self, value: bool) -> None:
-        if value:
-            self.remote_state[5] |= 0x40
-        else:
-            self.remote_state[5] &= 0xBF
+    DisplayTemp = field(5, 0, 2)
+    IFeel = field(5, 2, 1)
+    unknown2 = field(5, 3, 3)
+    WiFi = field(5, 6, 1)
 
     # Byte 6 - unused
 
     # Byte 7
-    @property
-    def Econo(self) -> int:
-        return (self.remote_state[7] >> 2) & 0x01
-
-    @Econo.setter
-    def Econo(self, value: bool) -> None:
-        if value:
-            self.remote_state[7] |= 0x04
-        else:
-            self.remote_state[7] &= 0xFB
-
-    @property
-    def Sum(self) -> int:
-        return (self.remote_state[7] >> 4) & 0x0F
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.remote_state[7] = (self.remote_state[7] & 0x0F) | ((value & 0x0F) << 4)
+    Econo = field(7, 2, 1)
+    Sum = field(7, 4, 4)
 
 
 ## Send a Gree Heat Pump formatted message.
@@ -382,62 +198,9 @@ def sendGree(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
 
     Returns timing array instead of transmitting via hardware.
     """
-    if nbytes < 8:  # kGreeStateLength
+    if nbytes < kGreeStateLength:
         return []  # Not enough bytes to send a proper message.
-
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric, sendData
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # Block #1 (4 bytes)
-        block1_timings = sendGeneric(
-            headermark=kGreeHdrMark,
-            headerspace=kGreeHdrSpace,
-            onemark=kGreeBitMark,
-            onespace=kGreeOneSpace,
-            zeromark=kGreeBitMark,
-            zerospace=kGreeZeroSpace,
-            footermark=0,
-            gap=0,  # No Footer yet
-            dataptr=data,
-            nbytes=4,
-            MSBfirst=False,
-        )
-        all_timings.extend(block1_timings)
-
-        # Footer #1 (3 bits, B010)
-        footer1_timings = sendData(
-            onemark=kGreeBitMark,
-            onespace=kGreeOneSpace,
-            zeromark=kGreeBitMark,
-            zerospace=kGreeZeroSpace,
-            data=kGreeBlockFooter,
-            nbits=kGreeBlockFooterBits,
-            MSBfirst=False,
-        )
-        all_timings.extend(footer1_timings)
-        all_timings.append(kGreeBitMark)
-        all_timings.append(kGreeMsgSpace)
-
-        # Block #2 (remaining bytes)
-        block2_timings = sendGeneric(
-            headermark=0,
-            headerspace=0,  # No Header for Block #2
-            onemark=kGreeBitMark,
-            onespace=kGreeOneSpace,
-            zeromark=kGreeBitMark,
-            zerospace=kGreeZeroSpace,
-            footermark=kGreeBitMark,
-            gap=kGreeMsgSpace,
-            dataptr=data[4:],
-            nbytes=nbytes - 4,
-            MSBfirst=False,
-        )
-        all_timings.extend(block2_timings)
-
-    return all_timings
+    return sendFrame(kGreeLayout, data, nbytes, repeat)
 
 
 ## Class for handling detailed Gree A/C messages.
@@ -808,7 +571,7 @@ class IRGreeAC:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## Direct translation from ir_Gree.cpp lines 149-152
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.fixup()  # Ensure correct settings before sending.
         return self._.remote_state
 
@@ -847,88 +610,17 @@ def decodeGree(
     This is the ACTUAL C++ decoder function, not a wrapper.
     """
     # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import (
-        kHeader,
-        kFooter,
-        kMarkExcess,
-        _matchGeneric,
-        matchData,
-        match_result_t,
-    )
+    from app.core.ir_protocols.ir_recv import kHeader, kFooter
 
     if results.rawlen <= 2 * (nbits + kGreeBlockFooterBits) + (kHeader + kFooter + 1) - 1 + offset:
         return False  # Can't possibly be a valid Gree message.
     if strict and nbits != kGreeBits:
         return False  # Not strictly a Gree message.
 
-    # There are two blocks back-to-back in a full Gree IR message sequence.
-
-    # Header + Data Block #1 (32 bits)
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits // 2,  # 32 bits for first block
-        hdrmark=kGreeHdrMark,
-        hdrspace=kGreeHdrSpace,
-        onemark=kGreeBitMark,
-        onespace=kGreeOneSpace,
-        zeromark=kGreeBitMark,
-        zerospace=kGreeZeroSpace,
-        footermark=0,
-        footerspace=0,
-        atleast=False,
-        tolerance=_tolerance,
-        excess=kMarkExcess,
-        MSBfirst=False,
-    )
-    if used == 0:
-        return False
-    offset += used
-
-    # Block #1 footer (3 bits, B010)
-    data_result = matchData(
-        data_ptr=results.rawbuf[offset:],
-        offset=0,
-        nbits=kGreeBlockFooterBits,
-        onemark=kGreeBitMark,
-        onespace=kGreeOneSpace,
-        zeromark=kGreeBitMark,
-        zerospace=kGreeZeroSpace,
-        tolerance=_tolerance,
-        excess=kMarkExcess,
-        MSBfirst=False,
-        expectlastspace=True,
-    )
-    if data_result.success == False:
-        return False
-    if data_result.data != kGreeBlockFooter:
-        return False
-    offset += data_result.used
-
-    # Inter-block gap + Data Block #2 (32 bits) + Footer
-    if not _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state[4:],  # Start at byte 4
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits // 2,  # 32 bits for second block
-        hdrmark=kGreeBitMark,
-        hdrspace=kGreeMsgSpace,
-        onemark=kGreeBitMark,
-        onespace=kGreeOneSpace,
-        zeromark=kGreeBitMark,
-        zerospace=kGreeZeroSpace,
-        footermark=kGreeBitMark,
-        footerspace=kGreeMsgSpace,
-        atleast=True,
-        tolerance=_tolerance,
-        excess=kMarkExcess,
-        MSBfirst=False,
-    ):
+    # There are two blocks back-to-back in a full Gree IR message sequence:
+    # Header + Data Block #1 (32 bits) + Block footer (3 bits, B010),
+    # Inter-block gap + Data Block #2 (32 bits) + Footer.
+    if not matchFrame(results, offset, kGreeLayout, nbits // 8, tolerance=_tolerance):
         return False
 
     # Compliance
@@ -14,6 +14,15 @@
 ## Direct translation from IRremoteESP8266 ir_Haier.cpp and ir_Haier.h
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Supports:
 #   Brand: Haier,  Model: HSU07-HEA03 remote (HAIER_AC)
@@ -44,6 +53,22 @@ kHaierAcOneSpace = 1650
 kHaierAcZeroSpace = 650
 kHaierAcMinGap = 150000  # Completely made up value.
 
+## A (Hdr, Hdr) pre-header, then header, the state MSB first, footer, gap.
+kHaierAcLayout = frame_layout_t(
+    timing=bit_timing_t(
+        kHaierAcBitMark, kHaierAcOneSpace, kHaierAcBitMark, kHaierAcZeroSpace, True
+    ),
+    sections=(
+        frame_section_t(nbytes=0, hdrmark=kHaierAcHdr, hdrspace=kHaierAcHdr, excess=0),
+        frame_section_t(
+            hdrmark=kHaierAcHdr,
+            hdrspace=kHaierAcHdrGap,
+            footermark=kHaierAcBitMark,
+            gap=kHaierAcMinGap,
+        ),
+    ),
+)
+
 # HAIER_AC Constants (EXACT translation from ir_Haier.h:74-110)
 kHaierAcPrefix = 0b10100101
 
@@ -156,697 +181,181 @@ HAIER_AC176_REMOTE_MODEL_A = 0
 HAIER_AC176_REMOTE_MODEL_B = 1
 
 
-## Helper function for sumBytes (used in checksums)
-## EXACT translation from IRremoteESP8266 IRutils::sumBytes
-def sumBytes(data: List[int], length: int) -> int:
-    """Sum all bytes in the array"""
-    return sum(data[:length]) & 0xFF
-
-
 ## Native representation of a Haier HSU07-HEA03 A/C message.
 ## EXACT translation from ir_Haier.h:36-70
-class HaierProtocol:
+class HaierProtocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (9 bytes for Haier)
-        self.remote_state = [0] * kHaierACStateLength
+        self.remote_state = bytearray(kHaierACStateLength)
 
     # Byte 0
-    @property
-    def Prefix(self) -> int:
-        return self.remote_state[0]
-
-    @Prefix.setter
-    def Prefix(self, value: int) -> None:
-        self.remote_state[0] = value & 0xFF
+    Prefix = field(0)
 
     # Byte 1
-    @property
-    def Command(self) -> int:
-        return self.remote_state[1] & 0x0F
-
-    @Command.setter
-    def Command(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Temp(self) -> int:
-        return (self.remote_state[1] >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0x0F) | ((value & 0x0F) << 4)
+    Command = field(1, 0, 4)
+    Temp = field(1, 4, 4)
 
     # Byte 2
-    @property
-    def CurrHours(self) -> int:
-        return self.remote_state[2] & 0x1F
-
-    @CurrHours.setter
-    def CurrHours(self, value: int) -> None:
-        self.remote_state[2] = (self.remote_state[2] & 0xE0) | (value & 0x1F)
-
-    @property
-    def unknown(self) -> int:
-        return (self.remote_state[2] >> 5) & 0x01
-
-    @unknown.setter
-    def unknown(self, value: int) -> None:
-        if value:
-            self.remote_state[2] |= 0x20
-        else:
-            self.remote_state[2] &= 0xDF
-
-    @property
-    def SwingV(self) -> int:
-        return (self.remote_state[2] >> 6) & 0x03
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.remote_state[2] = (self.remote_state[2] & 0x3F) | ((value & 0x03) << 6)
+    CurrHours = field(2, 0, 5)
+    unknown = field(2, 5, 1)
+    SwingV = field(2, 6, 2)
 
     # Byte 3
-    @property
-    def CurrMins(self) -> int:
-        return self.remote_state[3] & 0x3F
-
-    @CurrMins.setter
-    def CurrMins(self, value: int) -> None:
-        self.remote_state[3] = (self.remote_state[3] & 0xC0) | (value & 0x3F)
-
-    @property
-    def OffTimer(self) -> int:
-        return (self.remote_state[3] >> 6) & 0x01
-
-    @OffTimer.setter
-    def OffTimer(self, value: int) -> None:
-        if value:
-            self.remote_state[3] |= 0x40
-        else:
-            self.remote_state[3] &= 0xBF
-
-    @property
-    def OnTimer(self) -> int:
-        return (self.remote_state[3] >> 7) & 0x01
-
-    @OnTimer.setter
-    def OnTimer(self, value: int) -> None:
-        if value:
-            self.remote_state[3] |= 0x80
-        else:
-            self.remote_state[3] &= 0x7F
+    CurrMins = field(3, 0, 6)
+    OffTimer = field(3, 6, 1)
+    OnTimer = field(3, 7, 1)
 
     # Byte 4
-    @property
-    def OffHours(self) -> int:
-        return self.remote_state[4] & 0x1F
-
-    @OffHours.setter
-    def OffHours(self, value: int) -> None:
-        self.remote_state[4] = (self.remote_state[4] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Health(self) -> int:
-        return (self.remote_state[4] >> 5) & 0x01
-
-    @Health.setter
-    def Health(self, value: int) -> None:
-        if value:
-            self.remote_state[4] |= 0x20
-        else:
-            self.remote_state[4] &= 0xDF
+    OffHours = field(4, 0, 5)
+    Health = field(4, 5, 1)
 
     # Byte 5
-    @property
-    def OffMins(self) -> int:
-        return self.remote_state[5] & 0x3F
-
-    @OffMins.setter
-    def OffMins(self, value: int) -> None:
-        self.remote_state[5] = (self.remote_state[5] & 0xC0) | (value & 0x3F)
-
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state[5] >> 6) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[5] = (self.remote_state[5] & 0x3F) | ((value & 0x03) << 6)
+    OffMins = field(5, 0, 6)
+    Fan = field(5, 6, 2)
 
     # Byte 6
-    @property
-    def OnHours(self) -> int:
-        return self.remote_state[6] & 0x1F
-
-    @OnHours.setter
-    def OnHours(self, value: int) -> None:
-        self.remote_state[6] = (self.remote_state[6] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Mode(self) -> int:
-        return (self.remote_state[6] >> 5) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[6] = (self.remote_state[6] & 0x1F) | ((value & 0x07) << 5)
+    OnHours = field(6, 0, 5)
+    Mode = field(6, 5, 3)
 
     # Byte 7
-    @property
-    def OnMins(self) -> int:
-        return self.remote_state[7] & 0x3F
-
-    @OnMins.setter
-    def OnMins(self, value: int) -> None:
-        self.remote_state[7] = (self.remote_state[7] & 0xC0) | (value & 0x3F)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.remote_state[7] >> 6) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: int) -> None:
-        if value:
-            self.remote_state[7] |= 0x40
-        else:
-            self.remote_state[7] &= 0xBF
+    OnMins = field(7, 0, 6)
+    Sleep = field(7, 6, 1)
 
     # Byte 8
-    @property
-    def Sum(self) -> int:
-        return self.remote_state[8]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.remote_state[8] = value & 0xFF
+    Sum = field(8)
 
 
 ## Native representation of a Haier 176 bit A/C message.
 ## EXACT translation from ir_Haier.h:209-276
-class HaierAc176Protocol:
+class HaierAc176Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
-        self.raw = [0] * kHaierAC176StateLength
+        self.raw = bytearray(kHaierAC176StateLength)
 
     # Byte 0
-    @property
-    def Model(self) -> int:
-        return self.raw[0]
-
-    @Model.setter
-    def Model(self, value: int) -> None:
-        self.raw[0] = value & 0xFF
+    Model = field(0)
 
     # Byte 1
-    @property
-    def SwingV(self) -> int:
-        return self.raw[1] & 0x0F
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Temp(self) -> int:
-        return (self.raw[1] >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0x0F) | ((value & 0x0F) << 4)
+    SwingV = field(1, 0, 4)
+    Temp = field(1, 4, 4)
 
     # Byte 2
-    @property
-    def SwingH(self) -> int:
-        return (self.raw[2] >> 5) & 0x07
-
-    @SwingH.setter
-    def SwingH(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x1F) | ((value & 0x07) << 5)
+    SwingH = field(2, 5, 3)
 
     # Byte 3
-    @property
-    def Health(self) -> int:
-        return (self.raw[3] >> 1) & 0x01
-
-    @Health.setter
-    def Health(self, value: int) -> None:
-        if value:
-            self.raw[3] |= 0x02
-        else:
-            self.raw[3] &= 0xFD
-
-    @property
-    def TimerMode(self) -> int:
-        return (self.raw[3] >> 5) & 0x07
-
-    @TimerMode.setter
-    def TimerMode(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0x1F) | ((value & 0x07) << 5)
+    Health = field(3, 1, 1)
+    TimerMode = field(3, 5, 3)
 
     # Byte 4
-    @property
-    def Power(self) -> int:
-        return (self.raw[4] >> 6) & 0x01
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        if value:
-            self.raw[4] |= 0x40
-        else:
-            self.raw[4] &= 0xBF
+    Power = field(4, 6, 1)
 
     # Byte 5
-    @property
-    def OffTimerHrs(self) -> int:
-        return self.raw[5] & 0x1F
-
-    @OffTimerHrs.setter
-    def OffTimerHrs(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[5] >> 5) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x1F) | ((value & 0x07) << 5)
+    OffTimerHrs = field(5, 0, 5)
+    Fan = field(5, 5, 3)
 
     # Byte 6
-    @property
-    def OffTimerMins(self) -> int:
-        return self.raw[6] & 0x3F
-
-    @OffTimerMins.setter
-    def OffTimerMins(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xC0) | (value & 0x3F)
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw[6] >> 6) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: int) -> None:
-        if value:
-            self.raw[6] |= 0x40
-        else:
-            self.raw[6] &= 0xBF
-
-    @property
-    def Quiet(self) -> int:
-        return (self.raw[6] >> 7) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: int) -> None:
-        if value:
-            self.raw[6] |= 0x80
-        else:
-            self.raw[6] &= 0x7F
+    OffTimerMins = field(6, 0, 6)
+    Turbo = field(6, 6, 1)
+    Quiet = field(6, 7, 1)
 
     # Byte 7
-    @property
-    def OnTimerHrs(self) -> int:
-        return self.raw[7] & 0x1F
-
-    @OnTimerHrs.setter
-    def OnTimerHrs(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[7] >> 5) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0x1F) | ((value & 0x07) << 5)
+    OnTimerHrs = field(7, 0, 5)
+    Mode = field(7, 5, 3)
 
     # Byte 8
-    @property
-    def OnTimerMins(self) -> int:
-        return self.raw[8] & 0x3F
-
-    @OnTimerMins.setter
-    def OnTimerMins(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xC0) | (value & 0x3F)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[8] >> 7) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: int) -> None:
-        if value:
-            self.raw[8] |= 0x80
-        else:
-            self.raw[8] &= 0x7F
+    OnTimerMins = field(8, 0, 6)
+    Sleep = field(8, 7, 1)
 
     # Byte 10
-    @property
-    def ExtraDegreeF(self) -> int:
-        return self.raw[10] & 0x01
-
-    @ExtraDegreeF.setter
-    def ExtraDegreeF(self, value: int) -> None:
-        if value:
-            self.raw[10] |= 0x01
-        else:
-            self.raw[10] &= 0xFE
-
-    @property
-    def UseFahrenheit(self) -> int:
-        return (self.raw[10] >> 5) & 0x01
-
-    @UseFahrenheit.setter
-    def UseFahrenheit(self, value: int) -> None:
-        if value:
-            self.raw[10] |= 0x20
-        else:
-            self.raw[10] &= 0xDF
+    ExtraDegreeF = field(10, 0, 1)
+    UseFahrenheit = field(10, 5, 1)
 
     # Byte 12
-    @property
-    def Button(self) -> int:
-        return self.raw[12] & 0x1F
-
-    @Button.setter
-    def Button(self, value: int) -> None:
-        self.raw[12] = (self.raw[12] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Lock(self) -> int:
-        return (self.raw[12] >> 5) & 0x01
-
-    @Lock.setter
-    def Lock(self, value: int) -> None:
-        if value:
-            self.raw[12] |= 0x20
-        else:
-            self.raw[12] &= 0xDF
+    Button = field(12, 0, 5)
+    Lock = field(12, 5, 1)
 
     # Byte 13
-    @property
-    def Sum(self) -> int:
-        return self.raw[13]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[13] = value & 0xFF
+    Sum = field(13)
 
     # Byte 14
-    @property
-    def Prefix2(self) -> int:
-        return self.raw[14]
-
-    @Prefix2.setter
-    def Prefix2(self, value: int) -> None:
-        self.raw[14] = value & 0xFF
+    Prefix2 = field(14)
 
     # Byte 16
-    @property
-    def Fan2(self) -> int:
-        return (self.raw[16] >> 6) & 0x03
-
-    @Fan2.setter
-    def Fan2(self, value: int) -> None:
-        self.raw[16] = (self.raw[16] & 0x3F) | ((value & 0x03) << 6)
+    Fan2 = field(16, 6, 2)
 
     # Byte 21
-    @property
-    def Sum2(self) -> int:
-        return self.raw[21]
-
-    @Sum2.setter
-    def Sum2(self, value: int) -> None:
-        self.raw[21] = value & 0xFF
+    Sum2 = field(21)
 
 
 ## Native representation of a Haier 160 bit A/C message.
 ## EXACT translation from ir_Haier.h:279-345
-class HaierAc160Protocol:
+class HaierAc160Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
-        self.raw = [0] * kHaierAC160StateLength
+        self.raw = bytearray(kHaierAC160StateLength)
 
     # Byte 0
-    @property
-    def Model(self) -> int:
-        return self.raw[0]
-
-    @Model.setter
-    def Model(self, value: int) -> None:
-        self.raw[0] = value & 0xFF
+    Model = field(0)
 
     # Byte 1
-    @property
-    def SwingV(self) -> int:
-        return self.raw[1] & 0x0F
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Temp(self) -> int:
-        return (self.raw[1] >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0x0F) | ((value & 0x0F) << 4)
+    SwingV = field(1, 0, 4)
+    Temp = field(1, 4, 4)
 
     # Byte 2
-    @property
-    def SwingH(self) -> int:
-        return (self.raw[2] >> 5) & 0x07
-
-    @SwingH.setter
-    def SwingH(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x1F) | ((value & 0x07) << 5)
+    SwingH = field(2, 5, 3)
 
     # Byte 3
-    @property
-    def Health(self) -> int:
-        return (self.raw[3] >> 1) & 0x01
-
-    @Health.setter
-    def Health(self, value: int) -> None:
-        if value:
-            self.raw[3] |= 0x02
-        else:
-            self.raw[3] &= 0xFD
-
-    @property
-    def TimerMode(self) -> int:
-        return (self.raw[3] >> 5) & 0x07
-
-    @TimerMode.setter
-    def TimerMode(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0x1F) | ((value & 0x07) << 5)
+    Health = field(3, 1, 1)
+    TimerMode = field(3, 5, 3)
 
     # Byte 4
-    @property
-    def Power(self) -> int:
-        return (self.raw[4] >> 6) & 0x01
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        if value:
-            self.raw[4] |= 0x40
-        else:
-            self.raw[4] &= 0xBF
-
-    @property
-    def AuxHeating(self) -> int:
-        return (self.raw[4] >> 7) & 0x01
-
-    @AuxHeating.setter
-    def AuxHeating(self, value: int) -> None:
-        if value:
-            self.raw[4] |= 0x80
-        else:
-            self.raw[4] &= 0x7F
+    Power = field(4, 6, 1)
+    AuxHeating = field(4, 7, 1)
 
     # Byte 5
-    @property
-    def OffTimerHrs(self) -> int:
-        return self.raw[5] & 0x1F
-
-    @OffTimerHrs.setter
-    def OffTimerHrs(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[5] >> 5) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x1F) | ((value & 0x07) << 5)
+    OffTimerHrs = field(5, 0, 5)
+    Fan = field(5, 5, 3)
 
     # Byte 6
-    @property
-    def OffTimerMins(self) -> int:
-        return self.raw[6] & 0x3F
-
-    @OffTimerMins.setter
-    def OffTimerMins(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xC0) | (value & 0x3F)
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw[6] >> 6) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: int) -> None:
-        if value:
-            self.raw[6] |= 0x40
-        else:
-            self.raw[6] &= 0xBF
-
-    @property
-    def Quiet(self) -> int:
-        return (self.raw[6] >> 7) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: int) -> None:
-        if value:
-            self.raw[6] |= 0x80
-        else:
-            self.raw[6] &= 0x7F
+    OffTimerMins = field(6, 0, 6)
+    Turbo = field(6, 6, 1)
+    Quiet = field(6, 7, 1)
 
     # Byte 7
-    @property
-    def OnTimerHrs(self) -> int:
-        return self.raw[7] & 0x1F
-
-    @OnTimerHrs.setter
-    def OnTimerHrs(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[7] >> 5) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0x1F) | ((value & 0x07) << 5)
+    OnTimerHrs = field(7, 0, 5)
+    Mode = field(7, 5, 3)
 
     # Byte 8
-    @property
-    def OnTimerMins(self) -> int:
-        return self.raw[8] & 0x3F
-
-    @OnTimerMins.setter
-    def OnTimerMins(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xC0) | (value & 0x3F)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[8] >> 7) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: int) -> None:
-        if value:
-            self.raw[8] |= 0x80
-        else:
-            self.raw[8] &= 0x7F
+    OnTimerMins = field(8, 0, 6)
+    Sleep = field(8, 7, 1)
 
     # Byte 10
-    @property
-    def ExtraDegreeF(self) -> int:
-        return self.raw[10] & 0x01
-
-    @ExtraDegreeF.setter
-    def ExtraDegreeF(self, value: int) -> None:
-        if value:
-            self.raw[10] |= 0x01
-        else:
-            self.raw[10] &= 0xFE
-
-    @property
-    def Clean(self) -> int:
-        return (self.raw[10] >> 4) & 0x01
-
-    @Clean.setter
-    def Clean(self, value: int) -> None:
-        if value:
-            self.raw[10] |= 0x10
-        else:
-            self.raw[10] &= 0xEF
-
-    @property
-    def UseFahrenheit(self) -> int:
-        return (self.raw[10] >> 5) & 0x01
-
-    @UseFahrenheit.setter
-    def UseFahrenheit(self, value: int) -> None:
-        if value:
-            self.raw[10] |= 0x20
-        else:
-            self.raw[10] &= 0xDF
+    ExtraDegreeF = field(10, 0, 1)
+    Clean = field(10, 4, 1)
+    UseFahrenheit = field(10, 5, 1)
 
     # Byte 12
-    @property
-    def Button(self) -> int:
-        return self.raw[12] & 0x1F
-
-    @Button.setter
-    def Button(self, value: int) -> None:
-        self.raw[12] = (self.raw[12] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Lock(self) -> int:
-        return (self.raw[12] >> 5) & 0x01
-
-    @Lock.setter
-    def Lock(self, value: int) -> None:
-        if value:
-            self.raw[12] |= 0x20
-        else:
-            self.raw[12] &= 0xDF
+    Button = field(12, 0, 5)
+    Lock = field(12, 5, 1)
 
     # Byte 13
-    @property
-    def Sum(self) -> int:
-        return self.raw[13]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[13] = value & 0xFF
+    Sum = field(13)
 
     # Byte 14
-    @property
-    def Prefix(self) -> int:
-        return self.raw[14]
-
-    @Prefix.setter
-    def Prefix(self, value: int) -> None:
-        self.raw[14] = value & 0xFF
+    Prefix = field(14)
 
     # Byte 15
-    @property
-    def Clean2(self) -> int:
-        return (self.raw[15] >> 6) & 0x01
-
-    @Clean2.setter
-    def Clean2(self, value: int) -> None:
-        if value:
-            self.raw[15] |= 0x40
-        else:
-            self.raw[15] &= 0xBF
+    Clean2 = field(15, 6, 1)
 
     # Byte 16
-    @property
-    def Fan2(self) -> int:
-        return (self.raw[16] >> 5) & 0x07
-
-    @Fan2.setter
-    def Fan2(self, value: int) -> None:
-        self.raw[16] = (self.raw[16] & 0x1F) | ((value & 0x07) << 5)
+    Fan2 = field(16, 5, 3)
 
     # Byte 19
-    @property
-    def Sum2(self) -> int:
-        return self.raw[19]
-
-    @Sum2.setter
-    def Sum2(self, value: int) -> None:
-        self.raw[19] = value & 0xFF
+    Sum2 = field(19)
 
 
 ## Send a Haier A/C formatted message. (HSU07-HEA03 remote)
@@ -861,34 +370,7 @@ def sendHaierAC(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
     """
     if nbytes < kHaierACStateLength:
         return []
-
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # Pre-Header
-        all_timings.append(kHaierAcHdr)
-        all_timings.append(kHaierAcHdr)
-
-        # Header + Data + Footer
-        block_timings = sendGeneric(
-            headermark=kHaierAcHdr,
-            headerspace=kHaierAcHdrGap,
-            onemark=kHaierAcBitMark,
-            onespace=kHaierAcOneSpace,
-            zeromark=kHaierAcBitMark,
-            zerospace=kHaierAcZeroSpace,
-            footermark=kHaierAcBitMark,
-            gap=kHaierAcMinGap,
-            dataptr=data,
-            nbytes=nbytes,
-            MSBfirst=True,
-        )
-        all_timings.extend(block_timings)
-
-    return all_timings
+    return sendFrame(kHaierAcLayout, data, nbytes, repeat)
 
 
 ## Send a Haier YR-W02 remote A/C formatted message.
@@ -970,7 +452,7 @@ class IRHaierAC:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## EXACT translation from ir_Haier.cpp:155-158
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.remote_state
 
@@ -1246,7 +728,7 @@ class IRHaierAC176:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## EXACT translation from ir_Haier.cpp:610-613
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -1717,7 +1199,7 @@ class IRHaierAC160:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## EXACT translation from ir_Haier.cpp:1531-1534
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -2110,14 +1592,7 @@ def decodeHaierAC(results, offset: int = 1, nbits: int = kHaierACBits, strict: b
     EXACT translation from IRremoteESP8266 IRrecv::decodeHaierAC
     """
     # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import (
-        matchMark,
-        matchSpace,
-        _matchGeneric,
-        kHeader,
-        kFooter,
-        kMarkExcess,
-    )
+    from app.core.ir_protocols.ir_recv import kHeader, kFooter
 
     if strict and nbits != kHaierACBits:
         return False  # Not strictly a HAIER_AC message.
@@ -2125,35 +1600,8 @@ def decodeHaierAC(results, offset: int = 1, nbits: int = kHaierACBits, strict: b
     if results.rawlen <= (2 * nbits + kHeader) + kFooter - 1 + offset:
         return False  # Can't possibly be a valid HAIER_AC message.
 
-    # Pre-Header
-    if not matchMark(results.rawbuf[offset], kHaierAcHdr):
-        return False
-    offset += 1
-    if not matchSpace(results.rawbuf[offset], kHaierAcHdr):
-        return False
-    offset += 1
-
-    # Match Header + Data + Footer
-    if not _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=kHaierAcHdr,
-        hdrspace=kHaierAcHdrGap,
-        onemark=kHaierAcBitMark,
-        onespace=kHaierAcOneSpace,
-        zeromark=kHaierAcBitMark,
-        zerospace=kHaierAcZeroSpace,
-        footermark=kHaierAcBitMark,
-        footerspace=kHaierAcMinGap,
-        atleast=True,
-        tolerance=25,
-        excess=kMarkExcess,
-        MSBfirst=True,
-    ):
+    # Pre-Header + Header + Data + Footer
+    if not matchFrame(results, offset, kHaierAcLayout, nbits // 8):
         return False
 
     # Compliance
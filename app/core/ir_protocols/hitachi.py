@@ -29,7 +29,23 @@
 #   Brand: Hitachi,  Model: RAR-3U3 remote (HITACHI_AC296)
 #   Brand: Hitachi,  Model: RAS-70YHA3 A/C (HITACHI_AC296)
 
+from functools import lru_cache
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
+from app.core.ir_protocols.bitops import (
+    GETBITS8,
+    GETBITS16,
+    checkInvertedBytePairs,
+    invertBytePairs,
+    reverseBits,
+)
 
 # Constants - EXACT translation from IRremoteESP8266 ir_Hitachi.h:25-48
 # & ir_Hitachi.cpp:25-48
@@ -79,6 +95,31 @@ kHitachiAc3Bits = kHitachiAc3StateLength * 8  # 216 bits
 kHitachiAc3MinStateLength = 15
 kHitachiAc3MinBits = kHitachiAc3MinStateLength * 8  # 120 bits
 
+
+## The HITACHI_AC family frame: header, the whole state, footer, gap.
+## HITACHI_AC1 uses a different header, and the 264/296/344 variants send
+## the bytes LSB first.
+@lru_cache(maxsize=None)
+def hitachiAcLayout(
+    MSBfirst: bool = True,
+    hdrmark: int = kHitachiAcHdrMark,
+    hdrspace: int = kHitachiAcHdrSpace,
+) -> frame_layout_t:
+    return frame_layout_t(
+        timing=bit_timing_t(
+            kHitachiAcBitMark, kHitachiAcOneSpace, kHitachiAcBitMark, kHitachiAcZeroSpace, MSBfirst
+        ),
+        sections=(
+            frame_section_t(
+                hdrmark=hdrmark,
+                hdrspace=hdrspace,
+                footermark=kHitachiAcBitMark,
+                gap=kHitachiAcMinGap,
+            ),
+        ),
+        tolerance=25 + 5,  # _tolerance + 5
+    )
+
 # HitachiAC constants (EXACT translation from ir_Hitachi.h:76-88)
 kHitachiAcAuto = 2
 kHitachiAcHeat = 3
@@ -226,67 +267,12 @@ kMarkExcess = 50
 kUseDefTol = 0
 
 
-## Bit manipulation helpers (from IRremoteESP8266 IRutils.h)
-def GETBITS8(data: int, offset: int, size: int) -> int:
-    """EXACT translation from IRremoteESP8266 IRutils.h"""
-    mask = (1 << size) - 1
-    return (data >> offset) & mask
-
-
-def GETBITS16(data: int, offset: int, size: int) -> int:
-    """EXACT translation from IRremoteESP8266 IRutils.h"""
-    mask = (1 << size) - 1
-    return (data >> offset) & mask
-
-
 # Nibble constants (from IRremoteESP8266 IRutils.h)
 kNibbleSize = 4
 kLowNibble = 0
 kHighNibble = 4
 
 
-def invertBytePairs(ptr: List[int], length: int) -> None:
-    """
-    Invert every second byte of an array, after the fixed header.
-    EXACT translation from IRremoteESP8266 IRutils.cpp:invertBytePairs
-    """
-    for i in range(0, length - 1, 2):
-        ptr[i + 1] = ptr[i] ^ 0xFF
-
-
-def checkInvertedBytePairs(ptr: List[int], length: int) -> bool:
-    """
-    Check if every second byte of an array is inverted to the previous byte.
-    EXACT translation from IRremoteESP8266 IRutils.cpp:checkInvertedBytePairs
-    """
-    for i in range(0, length - 1, 2):
-        if ptr[i] != (ptr[i + 1] ^ 0xFF):
-            return False
-    return True
-
-
-## Reverse bits in a byte (or any sized value).
-## EXACT translation from IRremoteESP8266 IRutils.cpp reverseBits
-def reverseBits(input_val: int, nbits: int) -> int:
-    """
-    Reverse the order of nbits of the integer value.
-    EXACT translation from IRremoteESP8266 IRutils.cpp:reverseBits
-
-    @param[in] input_val Integer value to be reversed.
-    @param[in] nbits Nr. of bits to reverse.
-    @return The reversed bit integer value.
-    """
-    if nbits <= 1:
-        return input_val  # Reversing <= 1 bits makes no change.
-
-    output = 0
-    for _ in range(nbits):
-        output <<= 1
-        output |= input_val & 1
-        input_val >>= 1
-    return output
-
-
 #####################################################################
 # HitachiAC (224-bit / 28-byte) Protocol
 #####################################################################
@@ -310,103 +296,38 @@ def sendHitachiAC(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
     if nbytes in [kHitachiAc264StateLength, kHitachiAc296StateLength, kHitachiAc344StateLength]:
         MSBfirst = False
 
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    # EXACT translation from ir_Hitachi.cpp:81-84
-    return sendGeneric(
-        headermark=kHitachiAcHdrMark,
-        headerspace=kHitachiAcHdrSpace,
-        onemark=kHitachiAcBitMark,
-        onespace=kHitachiAcOneSpace,
-        zeromark=kHitachiAcBitMark,
-        zerospace=kHitachiAcZeroSpace,
-        footermark=kHitachiAcBitMark,
-        gap=kHitachiAcMinGap,
-        dataptr=data,
-        nbytes=nbytes,
-        MSBfirst=MSBfirst,
-    )
+    return sendFrame(hitachiAcLayout(MSBfirst), data, nbytes)
 
 
 ## Native representation of a Hitachi 224-bit A/C message.
 ## EXACT translation from IRremoteESP8266 HitachiProtocol (ir_Hitachi.h:44-73)
-class HitachiProtocol:
+class HitachiProtocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (28 bytes for HitachiAC)
-        self.remote_state = [0] * kHitachiAcStateLength
+        self.remote_state = bytearray(kHitachiAcStateLength)
 
     # Byte 10
-    @property
-    def Mode(self) -> int:
-        return self.remote_state[10]
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[10] = value & 0xFF
+    Mode = field(10)
 
     # Byte 11
-    @property
-    def Temp(self) -> int:
-        return self.remote_state[11]
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[11] = value & 0xFF
+    Temp = field(11)
 
     # Byte 13
-    @property
-    def Fan(self) -> int:
-        return self.remote_state[13]
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[13] = value & 0xFF
+    Fan = field(13)
 
     # Byte 14 - SwingV
-    @property
-    def SwingV(self) -> int:
-        return (self.remote_state[14] >> 7) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.remote_state[14] |= 0x80
-        else:
-            self.remote_state[14] &= 0x7F
+    SwingV = field(14, 7, 1)
 
     # Byte 15 - SwingH
-    @property
-    def SwingH(self) -> int:
-        return (self.remote_state[15] >> 7) & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.remote_state[15] |= 0x80
-        else:
-            self.remote_state[15] &= 0x7F
+    SwingH = field(15, 7, 1)
 
     # Byte 17 - Power
-    @property
-    def Power(self) -> int:
-        return self.remote_state[17] & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[17] |= 0x01
-        else:
-            self.remote_state[17] &= 0xFE
+    Power = field(17, 0, 1)
 
     # Byte 27 - Sum (checksum)
-    @property
-    def Sum(self) -> int:
-        return self.remote_state[27]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.remote_state[27] = value & 0xFF
+    Sum = field(27)
 
 
 ## Class for handling detailed Hitachi 224-bit A/C messages.
@@ -463,7 +384,7 @@ class IRHitachiAc:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## EXACT translation from ir_Hitachi.cpp:197-200
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.remote_state
 
@@ -620,154 +541,45 @@ def sendHitachiAC1(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
 
 ## Native representation of a Hitachi 104-bit A/C message.
 ## EXACT translation from IRremoteESP8266 Hitachi1Protocol (ir_Hitachi.h:180-215)
-class Hitachi1Protocol:
+class Hitachi1Protocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (13 bytes for HitachiAC1)
-        self.remote_state = [0] * kHitachiAc1StateLength
+        self.remote_state = bytearray(kHitachiAc1StateLength)
 
     # Byte 3 - Model
-    @property
-    def Model(self) -> int:
-        return (self.remote_state[3] >> 6) & 0x03
-
-    @Model.setter
-    def Model(self, value: int) -> None:
-        self.remote_state[3] = (self.remote_state[3] & 0x3F) | ((value & 0x03) << 6)
+    Model = field(3, 6, 2)
 
     # Byte 5 - Mode & Fan
-    @property
-    def Mode(self) -> int:
-        return (self.remote_state[5] >> 4) & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[5] = (self.remote_state[5] & 0x0F) | ((value & 0x0F) << 4)
-
-    @property
-    def Fan(self) -> int:
-        return self.remote_state[5] & 0x0F
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[5] = (self.remote_state[5] & 0xF0) | (value & 0x0F)
+    Mode = field(5, 4, 4)
+    Fan = field(5, 0, 4)
 
     # Byte 6 - Temp (stored in LSB order)
-    @property
-    def Temp(self) -> int:
-        return (self.remote_state[6] >> 2) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[6] = (self.remote_state[6] & 0x83) | ((value & 0x1F) << 2)
+    Temp = field(6, 2, 5)
 
     # Byte 7 - OffTimerLow
-    @property
-    def OffTimerLow(self) -> int:
-        return self.remote_state[7]
-
-    @OffTimerLow.setter
-    def OffTimerLow(self, value: int) -> None:
-        self.remote_state[7] = value & 0xFF
+    OffTimerLow = field(7)
 
     # Byte 8 - OffTimerHigh
-    @property
-    def OffTimerHigh(self) -> int:
-        return self.remote_state[8]
-
-    @OffTimerHigh.setter
-    def OffTimerHigh(self, value: int) -> None:
-        self.remote_state[8] = value & 0xFF
+    OffTimerHigh = field(8)
 
     # Byte 9 - OnTimerLow
-    @property
-    def OnTimerLow(self) -> int:
-        return self.remote_state[9]
-
-    @OnTimerLow.setter
-    def OnTimerLow(self, value: int) -> None:
-        self.remote_state[9] = value & 0xFF
+    OnTimerLow = field(9)
 
     # Byte 10 - OnTimerHigh
-    @property
-    def OnTimerHigh(self) -> int:
-        return self.remote_state[10]
-
-    @OnTimerHigh.setter
-    def OnTimerHigh(self, value: int) -> None:
-        self.remote_state[10] = value & 0xFF
+    OnTimerHigh = field(10)
 
     # Byte 11 - SwingToggle, Sleep, PowerToggle, Power, SwingV, SwingH
-    @property
-    def SwingToggle(self) -> int:
-        return self.remote_state[11] & 0x01
-
-    @SwingToggle.setter
-    def SwingToggle(self, value: bool) -> None:
-        if value:
-            self.remote_state[11] |= 0x01
-        else:
-            self.remote_state[11] &= 0xFE
-
-    @property
-    def Sleep(self) -> int:
-        return (self.remote_state[11] >> 1) & 0x07
-
-    @Sleep.setter
-    def Sleep(self, value: int) -> None:
-        self.remote_state[11] = (self.remote_state[11] & 0xF1) | ((value & 0x07) << 1)
-
-    @property
-    def PowerToggle(self) -> int:
-        return (self.remote_state[11] >> 4) & 0x01
-
-    @PowerToggle.setter
-    def PowerToggle(self, value: bool) -> None:
-        if value:
-            self.remote_state[11] |= 0x10
-        else:
-            self.remote_state[11] &= 0xEF
-
-    @property
-    def Power(self) -> int:
-        return (self.remote_state[11] >> 5) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[11] |= 0x20
-        else:
-            self.remote_state[11] &= 0xDF
-
-    @property
-    def SwingV(self) -> int:
-        return (self.remote_state[11] >> 6) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.remote_state[11] |= 0x40
-        else:
-            self.remote_state[11] &= 0xBF
-
-    @property
-    def SwingH(self) -> int:
-        return (self.remote_state[11] >> 7) & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.remote_state[11] |= 0x80
-        else:
-            self.remote_state[11] &= 0x7F
+    SwingToggle = field(11, 0, 1)
+    Sleep = field(11, 1, 3)
+    PowerToggle = field(11, 4, 1)
+    Power = field(11, 5, 1)
+    SwingV = field(11, 6, 1)
+    SwingH = field(11, 7, 1)
 
     # Byte 12 - Sum (checksum)
-    @property
-    def Sum(self) -> int:
-        return self.remote_state[12]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.remote_state[12] = value & 0xFF
+    Sum = field(12)
 
 
 ## Class for handling detailed Hitachi 104-bit A/C messages.
@@ -820,7 +632,7 @@ class IRHitachiAc1:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## EXACT translation from ir_Hitachi.cpp:485-488
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.remote_state
 
@@ -1022,78 +834,31 @@ class IRHitachiAc1:
 
 ## Native representation of a Hitachi 53-byte/424-bit A/C message.
 ## EXACT translation from IRremoteESP8266 Hitachi424Protocol (ir_Hitachi.h:91-126)
-class Hitachi424Protocol:
+class Hitachi424Protocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (53 bytes for HitachiAC424)
-        self.remote_state = [0] * kHitachiAc424StateLength
+        self.remote_state = bytearray(kHitachiAc424StateLength)
 
     # Byte 11 - Button
-    @property
-    def Button(self) -> int:
-        return self.remote_state[11]
-
-    @Button.setter
-    def Button(self, value: int) -> None:
-        self.remote_state[11] = value & 0xFF
+    Button = field(11)
 
     # Byte 13 - Temp (6 bits starting at bit 2)
-    @property
-    def Temp(self) -> int:
-        return (self.remote_state[13] >> 2) & 0x3F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[13] = (self.remote_state[13] & 0x03) | ((value & 0x3F) << 2)
+    Temp = field(13, 2, 6)
 
     # Byte 25 - Mode (4 bits) & Fan (4 bits)
-    @property
-    def Mode(self) -> int:
-        return self.remote_state[25] & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[25] = (self.remote_state[25] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state[25] >> 4) & 0x0F
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[25] = (self.remote_state[25] & 0x0F) | ((value & 0x0F) << 4)
+    Mode = field(25, 0, 4)
+    Fan = field(25, 4, 4)
 
     # Byte 27 - Power (bit 4)
-    @property
-    def Power(self) -> int:
-        return (self.remote_state[27] >> 4) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[27] |= 0x10
-        else:
-            self.remote_state[27] &= 0xEF
+    Power = field(27, 4, 1)
 
     # Byte 35 - SwingH (3 bits)
-    @property
-    def SwingH(self) -> int:
-        return self.remote_state[35] & 0x07
-
-    @SwingH.setter
-    def SwingH(self, value: int) -> None:
-        self.remote_state[35] = (self.remote_state[35] & 0xF8) | (value & 0x07)
+    SwingH = field(35, 0, 3)
 
     # Byte 37 - SwingV (bit 5)
-    @property
-    def SwingV(self) -> int:
-        return (self.remote_state[37] >> 5) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.remote_state[37] |= 0x20
-        else:
-            self.remote_state[37] &= 0xDF
+    SwingV = field(37, 5, 1)
 
 
 ## Send a Hitachi 53 byte/424-bit A/C formatted message. (HITACHI_AC424)
@@ -1178,7 +943,7 @@ class IRHitachiAc424:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## EXACT translation from ir_Hitachi.cpp:1056-1059
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.setInvertedStates()
         return self._.remote_state
 
@@ -1539,48 +1304,22 @@ class IRHitachiAc264(IRHitachiAc424):
 
 ## Native representation of a HitachiAC296 37-byte/296-bit A/C message.
 ## EXACT translation from IRremoteESP8266 HitachiAC296Protocol (ir_Hitachi.h:300-343)
-class HitachiAC296Protocol:
+class HitachiAC296Protocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (37 bytes for HitachiAC296)
-        self.remote_state = [0] * kHitachiAc296StateLength
+        self.remote_state = bytearray(kHitachiAc296StateLength)
 
     # Byte 13 - Temp (5 bits starting at bit 2, LSB)
-    @property
-    def Temp(self) -> int:
-        return (self.remote_state[13] >> 2) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[13] = (self.remote_state[13] & 0x83) | ((value & 0x1F) << 2)
+    Temp = field(13, 2, 5)
 
     # Byte 25 - Mode (4 bits) & Fan (3 bits)
-    @property
-    def Mode(self) -> int:
-        return self.remote_state[25] & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[25] = (self.remote_state[25] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state[25] >> 4) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[25] = (self.remote_state[25] & 0x8F) | ((value & 0x07) << 4)
+    Mode = field(25, 0, 4)
+    Fan = field(25, 4, 3)
 
     # Byte 27 - Power (bit 4)
-    @property
-    def Power(self) -> int:
-        return (self.remote_state[27] >> 4) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[27] |= 0x10
-        else:
-            self.remote_state[27] &= 0xEF
+    Power = field(27, 4, 1)
 
 
 ## Send a HitachiAc 37-byte/296-bit A/C message (HITACHI_AC296)
@@ -1721,7 +1460,7 @@ class IRHitachiAc296:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## EXACT translation from ir_Hitachi.cpp:1911-1914
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.setInvertedStates()
         return self._.remote_state
 
@@ -1751,11 +1490,6 @@ def decodeHitachiAC(
     Decode the supplied Hitachi A/C message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeHitachiAC
     """
-    # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import _matchGeneric
-
-    k_tolerance = 25 + 5  # _tolerance + 5
-
     # EXACT translation from ir_Hitachi.cpp:862-873
     if strict:
         if nbits not in [
@@ -1776,27 +1510,7 @@ def decodeHitachiAC(
         hspace = kHitachiAcHdrSpace
 
     # Match Header + Data + Footer (EXACT translation from ir_Hitachi.cpp:884-890)
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=hmark,
-        hdrspace=hspace,
-        onemark=kHitachiAcBitMark,
-        onespace=kHitachiAcOneSpace,
-        zeromark=kHitachiAcBitMark,
-        zerospace=kHitachiAcZeroSpace,
-        footermark=kHitachiAcBitMark,
-        footerspace=kHitachiAcMinGap,
-        atleast=True,
-        tolerance=k_tolerance,
-        excess=kMarkExcess,
-        MSBfirst=MSBfirst,
-    )
-    if used == 0:
+    if not matchFrame(results, offset, hitachiAcLayout(MSBfirst, hmark, hspace), nbits // 8):
         return False
 
     # Compliance (EXACT translation from ir_Hitachi.cpp:893-908)
@@ -0,0 +1,115 @@
+## @file
+## @brief Batch decoding of many captures at once, for corpus analytics.
+## Python-only extension (no IRremoteESP8266 equivalent).
+##
+## decodeBatch() gives every capture the same result decode() would, but
+## matches the frame layouts of the pulse-distance A/C protocols (the
+## _matchGeneric()-shaped part of decoding, see ir_layout.py) across the whole
+## batch at once. The captures are padded into one (N x width) matrix. The
+## first time decode() asks any capture for a given frame, matchFrames()
+## matches that frame in every capture with a few array operations, and each
+## capture that asks for it afterwards gets its answer from that pass instead
+## of the bit-by-bit matchData() loop.
+##
+## decode() itself still runs per capture: its protocol order, the decoders'
+## checksum & signature checks, and the decoders not described by a frame
+## layout are unchanged, so the results agree with decode() by construction.
+## A capture whose timings decode() rewrites to retry it (see ir_skew.py) no
+## longer matches its row of the matrix. Its frames are then matched one at a
+## time, the scalar way, and its result is flagged `fallback`; so is every
+## result when NumPy isn't installed.
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.ir_protocols.ir_dispatcher import decode
+from app.core.ir_protocols.ir_layout import frame_layout_t, matchFrames
+from app.core.ir_protocols.ir_recv import decode_results
+
+try:
+    import numpy as np
+except ImportError:  # Optional; decodeBatch() then calls decode() alone.
+    np = None
+
+kBatchSize = 1024  # Captures padded into one matrix at a time.
+
+
+## The decode results of one capture of a batch.
+class batch_results_t(decode_results):
+    def __init__(self, batch: Optional["frame_batch_t"], row: int, rawbuf: Sequence[int]):
+        super().__init__()
+        self.rawbuf = rawbuf
+        self.rawlen = len(rawbuf)
+        self.batch = batch  # Answers matchFrame() for this capture; see ir_layout.py.
+        self.row = row  # The capture's row in the batch.
+        self.fallback = False  # Were its frames matched one at a time?
+
+
+## Captures padded into a matrix, and the frames matched in all of them.
+class frame_batch_t:
+    def __init__(self, captures: Sequence[Sequence[int]]):
+        self.captures = captures
+        self.lengths = np.array([len(capture) for capture in captures], dtype=np.int64)
+        # One column more than the longest capture, so no read runs off the end.
+        width = int(self.lengths.max(initial=0)) + 1
+        self.raw = np.zeros((len(captures), width), dtype=np.int64)
+        for row, capture in enumerate(captures):
+            self.raw[row, : len(capture)] = capture
+        self.frames: Dict[Tuple, Tuple] = {}
+
+    ## matchFrame() for a capture of the batch, from the batch-wide match.
+    ## @return How many buffer entries were used (0 if it doesn't match), or
+    ##   None if its timings are no longer those of the batch.
+    def matchFrame(
+        self,
+        results: batch_results_t,
+        offset: int,
+        layout: frame_layout_t,
+        nbytes: int,
+        state: List[int],
+        tolerance: int,
+        atleast: Optional[bool],
+        strict: bool,
+    ) -> Optional[int]:
+        row = results.row
+        if results.rawbuf is not self.captures[row] or results.rawlen != self.lengths[row]:
+            return None
+        # Layouts are module constants or cached, so keyed by identity; each
+        # entry keeps its layout alive, so the id can't be reused meanwhile.
+        key = (id(layout), offset, nbytes, tolerance, atleast, strict)
+        frames = self.frames.get(key)
+        if frames is None:
+            frames = (layout,) + matchFrames(
+                self.raw, self.lengths, offset, layout, nbytes, tolerance, atleast, strict
+            )
+            self.frames[key] = frames
+        _, used, states = frames
+        used = int(used[row])
+        if used:
+            state[: states.shape[1]] = states[row].tolist()
+        return used
+
+
+## Decode many captures, as decode() would each of them.
+## @param[in] captures The raw timings of each capture.
+## @param[in] max_skip Maximum number of leading timing pairs to skip.
+## @param[in] noise_floor Passed on to decode().
+## @param[in] normalize Retry each unrecognised capture without its timing skew; see decode().
+## @return The results of each capture, in order. A capture was decoded if
+##   its decode_type isn't UNKNOWN; `fallback` flags those whose frames were
+##   matched one at a time rather than as part of the batch.
+def decodeBatch(
+    captures: Sequence[Sequence[int]],
+    max_skip: int = 0,
+    noise_floor: int = 0,
+    normalize: bool = True,
+) -> List[batch_results_t]:
+    results = []
+    for start in range(0, len(captures), kBatchSize):
+        chunk = captures[start : start + kBatchSize]
+        batch = frame_batch_t(chunk) if np is not None else None
+        for row, capture in enumerate(chunk):
+            result = batch_results_t(batch, row, capture)
+            decode(result, max_skip, noise_floor, normalize)
+            result.fallback = batch is None or result.rawbuf is not capture
+            results.append(result)
+    return results
@@ -0,0 +1,178 @@
+## @file
+## @brief Declarative bitfields for the native *Protocol message classes.
+## Python-only extension (no IRremoteESP8266 equivalent).
+##
+## The C++ library describes each A/C message as a union of a byte array and a
+## struct of bitfields. The Python translations used to spell every one of those
+## bitfields out as a hand-written @property pair doing its own mask/shift
+## arithmetic. Here a bitfield is declared once as field(byte, offset, width)
+## and compiled, when the class is created, into a property whose getter and
+## setter have the masks and shifts baked in as constants.
+##
+## Example:
+##   class FooProtocol(BitfieldStruct, buffer="raw"):
+##       __slots__ = ("raw",)
+##
+##       def __init__(self):
+##           self.raw = bytearray(8)
+##
+##       Temp = field(1, 2, 6)  # byte 1, bits 2-7
+##       Power = field(2, 0, 1)  # byte 2, bit 0
+##
+## Byte-buffer fields wider than what's left of their byte continue LSB first
+## into the following bytes, as GCC lays out the C++ bitfields. Classes whose
+## state is a single integer (e.g. a 64-bit message) pass integer=True, and
+## field(byte, offset, width) then addresses bit (byte * 8 + offset) of it.
+##
+## Over the same buffer, a compiled property costs what a hand-written one
+## did. Setters on a bytearray are slower than on a list (CPython has no
+## specialised opcode for bytearray subscripts), but copying, hashing and
+## loading whole states is faster; see benchmarks/bench_bitfields.py.
+
+from typing import Dict, List, Optional, Tuple
+
+
+## A bitfield declaration. Replaced by a compiled property on class creation.
+class BitField:
+    __slots__ = ("byte", "offset", "width", "buffer")
+
+    def __init__(self, byte: int, offset: int = 0, width: int = 8, buffer: Optional[str] = None):
+        if not 0 <= offset < 8 or width < 1:
+            raise ValueError(f"Invalid bitfield offset {offset} / width {width}")
+        self.byte = byte
+        self.offset = offset
+        self.width = width
+        self.buffer = buffer
+
+    def __repr__(self) -> str:
+        extra = f", buffer={self.buffer!r}" if self.buffer else ""
+        return f"field({self.byte}, {self.offset}, {self.width}{extra})"
+
+    ## The (byte index, bit offset, bit count, value shift) pieces of the field.
+    def chunks(self) -> List[Tuple[int, int, int, int]]:
+        result = []
+        index, offset, remaining, shift = self.byte, self.offset, self.width, 0
+        while remaining:
+            n = min(8 - offset, remaining)
+            result.append((index, offset, n, shift))
+            remaining -= n
+            shift += n
+            index += 1
+            offset = 0
+        return result
+
+
+## Declare a bitfield.
+## @param[in] byte Index of the (first) byte holding the field.
+## @param[in] offset Bit offset of the field's LSB within that byte.
+## @param[in] width Number of bits in the field.
+## @param[in] buffer Attribute holding the field, if not the class's default.
+def field(byte: int, offset: int = 0, width: int = 8, buffer: Optional[str] = None) -> BitField:
+    return BitField(byte, offset, width, buffer)
+
+
+def _compile_bytes(name: str, buffer: str, spec: BitField) -> Tuple[str, str]:
+    mask = (1 << spec.width) - 1
+    chunks = spec.chunks()
+
+    terms = []
+    for index, offset, n, shift in chunks:
+        term = f"b[{index}]"
+        if offset:
+            term = f"({term} >> {offset})"
+        if offset + n < 8:
+            term = f"({term} & {(1 << n) - 1:#x})"
+        if shift:
+            term = f"({term} << {shift})"
+        terms.append(term)
+    if len(terms) == 1:
+        fget = f"def {name}(self):\n    return {terms[0].replace('b[', f'self.{buffer}[')}\n"
+    else:
+        fget = f"def {name}(self):\n    b = self.{buffer}\n    return {' | '.join(terms)}\n"
+
+    if spec.width == 1:
+        index, offset = spec.byte, spec.offset
+        bit = 1 << offset
+        fset = (
+            f"def {name}(self, value):\n"
+            f"    if value:\n"
+            f"        self.{buffer}[{index}] |= {bit:#x}\n"
+            f"    else:\n"
+            f"        self.{buffer}[{index}] &= {0xFF ^ bit:#x}\n"
+        )
+        return fget, fset
+
+    lines = [f"def {name}(self, value):", f"    b = self.{buffer}"]
+    if len(chunks) > 1:
+        lines.append(f"    value &= {mask:#x}")
+    for index, offset, n, shift in chunks:
+        part = f"(value >> {shift})" if shift else "value"
+        if len(chunks) == 1:
+            part = f"({part} & {mask:#x})"
+        elif index != chunks[-1][0]:
+            # Only the last chunk is already narrowed by the mask above.
+            part = f"({part} & {(1 << n) - 1:#x})"
+        if n == 8:
+            lines.append(f"    b[{index}] = {part}")
+            continue
+        if offset:
+            part = f"({part} << {offset})"
+        keep = 0xFF ^ (((1 << n) - 1) << offset)
+        lines.append(f"    b[{index}] = (b[{index}] & {keep:#x}) | {part}")
+    return fget, "\n".join(lines) + "\n"
+
+
+def _compile_integer(name: str, buffer: str, spec: BitField) -> Tuple[str, str]:
+    mask = (1 << spec.width) - 1
+    shift = spec.byte * 8 + spec.offset
+    value = f"(self.{buffer} >> {shift})" if shift else f"self.{buffer}"
+    fget = f"def {name}(self):\n    return {value} & {mask:#x}\n"
+    if spec.width == 1:
+        fset = (
+            f"def {name}(self, value):\n"
+            f"    if value:\n"
+            f"        self.{buffer} |= {1 << shift:#x}\n"
+            f"    else:\n"
+            f"        self.{buffer} &= ~{1 << shift:#x}\n"
+        )
+    else:
+        part = f"((value & {mask:#x}) << {shift})" if shift else f"(value & {mask:#x})"
+        fset = (
+            f"def {name}(self, value):\n"
+            f"    self.{buffer} = (self.{buffer} & ~{mask << shift:#x}) | {part}\n"
+        )
+    return fget, fset
+
+
+def _compile(name: str, buffer: str, integer: bool, spec: BitField) -> property:
+    if integer:
+        fget_src, fset_src = _compile_integer(name, buffer, spec)
+    else:
+        fget_src, fset_src = _compile_bytes(name, buffer, spec)
+    namespace: Dict[str, object] = {}
+    exec(compile(fget_src, f"<bitfield {name} getter>", "exec"), namespace)
+    fget = namespace.pop(name)
+    exec(compile(fset_src, f"<bitfield {name} setter>", "exec"), namespace)
+    fset = namespace.pop(name)
+    return property(fget, fset, doc=f"{name}: {spec!r}")
+
+
+## Base class for native message classes declared with field().
+## @note Subclasses should declare __slots__ for their state buffer(s).
+class BitfieldStruct:
+    __slots__ = ()
+
+    ## name -> BitField of every declared field, including inherited ones.
+    _fields_: Dict[str, BitField] = {}
+    ## Attribute holding fields that don't name their own buffer.
+    _buffer_: str = "raw"
+
+    def __init_subclass__(cls, buffer: str = "raw", integer: bool = False, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = dict(cls._fields_)
+        for name, spec in list(vars(cls).items()):
+            if isinstance(spec, BitField):
+                fields[name] = spec
+                setattr(cls, name, _compile(name, spec.buffer or buffer, integer, spec))
+        cls._fields_ = fields
+        cls._buffer_ = buffer
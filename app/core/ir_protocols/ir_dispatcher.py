@@ -9,6 +9,7 @@ Source files:
 
 from enum import IntEnum
 from typing import List, Optional
+from app.core.decode_budget import DecodeBudget
 from app.core.ir_protocols.ir_recv import decode_results
 
 
@@ -403,8 +404,19 @@ def send(
     return None
 
 
+def _check_deadline(budget: Optional[DecodeBudget]) -> None:
+    if budget is not None:
+        budget.check_deadline()
+
+
 # EXACT translation from IRrecv.cpp line 554
-def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) -> bool:
+def decode(
+    results: decode_results,
+    max_skip: int = 0,
+    noise_floor: int = 0,
+    normalize: bool = True,
+    budget: Optional[DecodeBudget] = None,
+) -> bool:
     """
     EXACT translation of IRrecv::decode() from IRrecv.cpp
 
@@ -418,10 +430,20 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
         results: decode_results object with rawbuf containing IR timings
         max_skip: Maximum number of leading timing pairs to skip
         noise_floor: Noise threshold (not implemented in Python version yet)
+        normalize: Python extension. If no decoder recognises the capture as
+            it is, estimate its clock skew and mark excess and, if significant,
+            rewrite results.rawbuf to nominal timings and try every decoder
+            again (see ir_skew.py).
+        budget: Python extension. A started budget (see decode_budget.py) whose
+            deadline is checked between protocol families; each decoder's
+            work is bounded by the number of timings.
 
     Returns:
         True if any protocol successfully decoded the signal, False otherwise
 
+    Raises:
+        TuyaCodeError: If the budget's deadline passes before decoding ends
+
     Source: IRremoteESP8266/src/IRrecv.cpp line 554
 
     Note: In C++, this function tries 100+ protocols. Currently we only have
@@ -435,7 +457,30 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
     results.address = 0
     results.command = 0
     results.repeat = False
+    results.timing_skew = None
+
+    if _decodeProtocols(results, max_skip, budget):
+        return True
+
+    # Python extension: a capture no decoder recognised may have a capture-wide
+    # clock skew / mark excess. Undo it once and try again, so each decoder
+    # matches against nominal timings instead of needing its tolerance widened
+    # for every blaster. Nominal captures never pay for the estimate.
+    if normalize:
+        from app.core.ir_protocols.ir_skew import estimateTimingSkew, normalizeTimings
+
+        skew = estimateTimingSkew(results.rawbuf[: results.rawlen])
+        if skew is not None and skew.is_significant():
+            results.rawbuf = normalizeTimings(results.rawbuf[: results.rawlen], skew)
+            results.timing_skew = skew
+            return _decodeProtocols(results, max_skip, budget)
+    return False
 
+
+def _decodeProtocols(
+    results: decode_results, max_skip: int, budget: Optional[DecodeBudget]
+) -> bool:
+    """Try every decoder, in IRrecv::decode()'s order, at each offset up to max_skip."""
     # Keep looking for protocols until we've run out of entries to skip or we
     # find a valid protocol message.
     # NOTE: C++ uses kStartOffset=1 for hardware captures with leading noise.
@@ -443,6 +488,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
     kStartOffset = 0
 
     for offset in range(kStartOffset, (max_skip * 2) + kStartOffset + 1, 2):
+        _check_deadline(budget)
+
         # The C++ version tries protocols in a specific order to avoid false positives
         # Order is CRITICAL - some protocols must be tried before others
 
@@ -455,6 +502,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             results.decode_type = decode_type_t.FUJITSU_AC
             return True
 
+        _check_deadline(budget)
+
         # DECODE_CARRIER_AC (all variants)
         from app.core.ir_protocols.carrier import (
             decodeCarrierAC,
@@ -480,6 +529,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             results.decode_type = decode_type_t.CARRIER_AC
             return True
 
+        _check_deadline(budget)
+
         # DECODE_HITACHI_AC (all variants - order matters!)
         from app.core.ir_protocols.hitachi import (
             decodeHitachiAC,
@@ -522,6 +573,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
                 # Could be HITACHI_AC, HITACHI_AC1, HITACHI_AC264, or HITACHI_AC344
                 return True
 
+        _check_deadline(budget)
+
         # DECODE_SAMSUNG_AC
         from app.core.ir_protocols.samsung import decodeSamsungAC, decodeSamsung36, decodeSAMSUNG
 
@@ -535,6 +588,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             results.decode_type = decode_type_t.SAMSUNG
             return True
 
+        _check_deadline(budget)
+
         # DECODE_DAIKIN (all variants - order matters!)
         from app.core.ir_protocols.daikin import (
             decodeDaikin312,
@@ -580,6 +635,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             results.decode_type = decode_type_t.DAIKIN
             return True
 
+        _check_deadline(budget)
+
         # DECODE_PANASONIC_AC (must come before PANASONIC to avoid conflicts)
         from app.core.ir_protocols.panasonic import (
             decodePanasonicAC,
@@ -597,6 +654,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             results.decode_type = decode_type_t.PANASONIC
             return True
 
+        _check_deadline(budget)
+
         # DECODE_LG (handles both LG and LG2)
         from app.core.ir_protocols.lg import decodeLG
 
@@ -604,6 +663,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             # decodeLG sets decode_type to either LG or LG2
             return True
 
+        _check_deadline(budget)
+
         # DECODE_MITSUBISHI (all variants)
         from app.core.ir_protocols.mitsubishi import (
             decodeMitsubishiHeavy,
@@ -628,6 +689,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             # decode_type is set by decoder (MITSUBISHI112 or TCL112AC)
             return True
 
+        _check_deadline(budget)
+
         # Gree based-devices use a similar code to Kelvinator ones, to avoid false
         # matches this needs to happen after decodeKelvinator() (not yet imported).
         # DECODE_GREE
@@ -637,6 +700,8 @@ def decode(results: decode_results, max_skip: int = 0, noise_floor: int = 0) ->
             results.decode_type = decode_type_t.GREE
             return True
 
+        _check_deadline(budget)
+
         # DECODE_HAIER (all variants - order matters, try larger protocols first)
         from app.core.ir_protocols.haier import (
             decodeHaierAC176,
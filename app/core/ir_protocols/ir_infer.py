@@ -0,0 +1,415 @@
+## @file
+## @brief Layout inference for unknown pulse-distance/pulse-width protocols.
+## Python-only extension (no IRremoteESP8266 equivalent).
+##
+## When decode() gives up on a capture, most A/C remotes are still sending
+## the same kind of message the known protocols do: a header, some bytes with
+## each bit a mark followed by a short or a long space (or a short or a long
+## mark followed by a fixed space), a footer mark and a gap, per section.
+## inferProtocol() works that shape out from the capture alone:
+##   1. Marks and spaces are binned into a histogram, split into clusters at
+##      its gaps, whose weighted means are the nominal durations.
+##   2. The two most common (mark, space) cluster pairs are the data bits.
+##   3. One pass over the capture splits it into sections on anything that
+##      isn't a data bit: headers, footer marks and gaps.
+##   4. The bits are packed LSB and MSB first, and the order with more
+##      checksum-looking bytes is kept (LSB first if neither has any).
+## Everything is linear in the capture's length, bar sorting the histogram's
+## distinct bins.
+##
+## The result is an inferred_protocol_t: a frame_layout_t (see ir_layout.py)
+## plus the captured state bytes and any checksums found. sendInferred() sends
+## it again with any bytes changed, recomputing the checksums, and
+## matchInferred() reads the state back out of a new capture of the same
+## remote.
+
+from dataclasses import dataclass, field
+from collections import Counter
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.core.ir_protocols.bitops import (
+    checkInvertedBytePairs,
+    reverseBits,
+    sumBytes,
+    sumNibbles,
+    xorBytes,
+)
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
+
+## Width of a histogram bin, in uSeconds.
+kInferBinWidth = 50
+## A gap in the histogram wider than this fraction of the durations before it
+## (and than a bin) separates two clusters. Jitter fills a cluster's bins in;
+## distinct nominal durations leave empty bins between them.
+kInferClusterGap = 0.1
+## Minimum nr. of data bits for a capture to be worth inferring.
+kInferMinBits = 16
+## Minimum fraction of the capture's mark/space pairs that must be data bits.
+kInferMinDataRatio = 0.6
+## A checksum not starting at its section's first byte must cover at least
+## this many bytes, so that short runs don't match by chance.
+kInferMinChecksumSpan = 4
+
+## Checksum kinds, in order of preference.
+kInferChecksumKinds = ("sum8", "neg_sum8", "xor8", "nibble_sum8")
+
+
+## A checksum found in an inferred state.
+## state[index] is the checksum of state[start:index].
+@dataclass(frozen=True)
+class checksum_t:
+    kind: str
+    start: int
+    index: int
+
+
+## A protocol inferred from a single capture.
+@dataclass(frozen=True)
+class inferred_protocol_t:
+    layout: frame_layout_t
+    state: Tuple[int, ...]
+    checksums: Tuple[checksum_t, ...] = ()
+    ## "pulse_distance", "pulse_width" or "pulse_distance_width".
+    encoding: str = "pulse_distance"
+
+    ## Nr. of state bytes the protocol carries.
+    @property
+    def nbytes(self) -> int:
+        return len(self.state)
+
+
+## A group of histogram bins: the durations in [low, high) and their mean.
+@dataclass
+class _cluster_t:
+    low: int
+    high: int
+    count: int = 0
+    total: int = 0
+
+    @property
+    def mean(self) -> int:
+        return int(round(self.total / self.count)) if self.count else self.low
+
+
+## Join the pieces of durations split to fit 16 bits (e.g. 65535, 0, 34465)
+## back together.
+def joinSplitDurations(rawbuf: Sequence[int]) -> List[int]:
+    if 0 not in rawbuf:
+        return list(rawbuf)
+    joined: List[int] = []
+    pending = 0
+    for i, duration in enumerate(rawbuf):
+        if not duration and joined and i + 1 < len(rawbuf):
+            pending = joined.pop()  # Fold the next piece into this one.
+            continue
+        joined.append(duration + pending)
+        pending = 0
+    return joined
+
+
+## Cluster durations from a histogram of kInferBinWidth wide bins.
+## The histogram is built from the distinct durations, of which a capture has
+## far fewer than it has durations.
+## @param[in] durations The marks (or spaces) of a capture.
+## @return The clusters, shortest first, and a duration -> cluster index map.
+def clusterDurations(durations: Sequence[int]) -> Tuple[List[_cluster_t], Dict[int, int]]:
+    distinct = Counter(durations)
+    bins: Dict[int, List[int]] = {}
+    for duration in distinct:
+        bins.setdefault(duration // kInferBinWidth, []).append(duration)
+    clusters: List[_cluster_t] = []
+    lookup: Dict[int, int] = {}
+    for key in sorted(bins):
+        low = key * kInferBinWidth
+        last = clusters[-1].high if clusters else None
+        if last is None or low - last > max(kInferBinWidth, last * kInferClusterGap):
+            clusters.append(_cluster_t(low, low))
+        cluster = clusters[-1]
+        cluster.high = low + kInferBinWidth
+        for duration in bins[key]:
+            cluster.count += distinct[duration]
+            cluster.total += duration * distinct[duration]
+            lookup[duration] = len(clusters) - 1
+    return clusters, lookup
+
+
+## Every 8 bits, LSB first, and the byte they make.
+_BYTE_OF_BITS = {tuple((byte >> i) & 1 for i in range(8)): byte for byte in range(256)}
+
+
+## Pack bits into bytes, 8 at a time.
+def _packBits(bits: Sequence[int], MSBfirst: bool) -> List[int]:
+    result = [_BYTE_OF_BITS[tuple(bits[i : i + 8])] for i in range(0, len(bits) - 7, 8)]
+    if MSBfirst:
+        return [reverseBits(byte, 8) for byte in result]
+    return result
+
+
+## The value of a constant of len(bits) bits, as sendData() would send it.
+def _bitsValue(bits: Sequence[int], MSBfirst: bool) -> int:
+    value = 0
+    for i, bit in enumerate(bits):
+        value |= bit << ((len(bits) - 1 - i) if MSBfirst else i)
+    return value
+
+
+## Compute a checksum over some bytes.
+def calcChecksum(kind: str, data: Sequence[int]) -> int:
+    if kind == "sum8":
+        return sumBytes(data, len(data))
+    if kind == "neg_sum8":
+        return -sumBytes(data, len(data)) & 0xFF
+    if kind == "xor8":
+        return xorBytes(data, len(data))
+    if kind == "nibble_sum8":
+        return sumNibbles(data, len(data))
+    raise ValueError(f"Unknown checksum kind: {kind}")
+
+
+## Look for a checksum in the last byte of a section's bytes.
+## Every start is tried in one backwards pass, and the widest match of the
+## most preferred kind is kept.
+## @param[in] data All the state bytes.
+## @param[in] first Index of the section's first byte in data.
+## @param[in] end Index just past the section's last byte in data.
+## @return The checksum, or None if the last byte doesn't look like one.
+def _findChecksum(data: Sequence[int], first: int, end: int) -> Optional[checksum_t]:
+    index = end - 1
+    if index - first < 2:
+        return None
+    target = data[index]
+    found: Dict[str, int] = {}
+    total = xored = nibbles = 0
+    for start in range(index - 1, first - 1, -1):
+        byte = data[start]
+        total += byte
+        xored ^= byte
+        nibbles += (byte >> 4) + (byte & 0xF)
+        if not total:
+            continue  # Any checksum of zeros is zero; that proves nothing.
+        if start != first and index - start < kInferMinChecksumSpan:
+            continue
+        sums = {
+            "sum8": total & 0xFF,
+            "neg_sum8": -total & 0xFF,
+            "xor8": xored,
+            "nibble_sum8": nibbles & 0xFF,
+        }
+        for kind, value in sums.items():
+            if value == target:
+                found[kind] = start  # Keep going: wider is better.
+    for kind in kInferChecksumKinds:
+        if kind in found:
+            return checksum_t(kind, found[kind], index)
+    return None
+
+
+## A section of a capture, as it's being scanned.
+@dataclass
+class _scan_t:
+    hdrmark: int = 0
+    hdrspace: int = 0
+    footermark: int = 0
+    gap: int = 0
+    bits: List[int] = field(default_factory=list)
+
+
+## Split a capture into sections on anything that isn't a data bit.
+## Runs of data bits are copied over whole; only the pairs between them are
+## looked at one by one.
+## @param[in] marks The capture's marks.
+## @param[in] spaces The capture's spaces, one per mark bar maybe the last.
+## @param[in] symbols The bit each mark/space pair encodes, or None.
+## @param[in] bitmarks Whether each mark is a data bit's mark.
+## @param[in] nominal_mark Maps a mark to its nominal duration.
+## @param[in] nominal_space Maps a space to its nominal duration.
+## @return The scanned sections.
+def _scanSections(marks, spaces, symbols, bitmarks, nominal_mark, nominal_space) -> List[_scan_t]:
+    sections: List[_scan_t] = []
+    current = _scan_t()
+    start = 0
+    for i in [i for i, value in enumerate(symbols) if value is None]:
+        current.bits.extend(symbols[start:i])
+        start = i + 1
+        mark = nominal_mark(marks[i])
+        space = nominal_space(spaces[i])
+        if not current.bits and not current.hdrmark:
+            current.hdrmark, current.hdrspace = mark, space
+        elif bitmarks[i]:  # After a header or data: the footer and gap.
+            current.footermark, current.gap = mark, space
+            sections.append(current)
+            current = _scan_t()
+        else:  # A new header, straight after the last one or the data.
+            sections.append(current)
+            current = _scan_t(hdrmark=mark, hdrspace=space)
+    current.bits.extend(symbols[start:])
+    if len(marks) > len(spaces):  # A trailing mark is the footer.
+        current.footermark = nominal_mark(marks[-1])
+    if current.bits or current.hdrmark or current.footermark:
+        sections.append(current)
+    return sections
+
+
+## Infer a protocol from a capture decode() couldn't make sense of.
+## @param[in] rawbuf Timings, alternating mark/space, starting with a mark.
+## @param[in] offset Index of the first mark to consider.
+## @return The inferred protocol, or None if the capture isn't a pulse-distance
+##   or pulse-width message.
+def inferProtocol(rawbuf: Sequence[int], offset: int = 0) -> Optional[inferred_protocol_t]:
+    timings = joinSplitDurations(rawbuf[offset:])
+    marks = timings[0::2]
+    spaces = timings[1::2]
+    if len(spaces) < kInferMinBits:
+        return None
+    mark_clusters, mark_lookup = clusterDurations(marks)
+    space_clusters, space_lookup = clusterDurations(spaces)
+    mark_labels = list(map(mark_lookup.__getitem__, marks))
+    space_labels = list(map(space_lookup.__getitem__, spaces))
+
+    # The data bits are the two most common (mark, space) pairs. A bit mark
+    # followed by a short or long space is pulse-distance; a short or long mark
+    # followed by a bit space is pulse-width. Some protocols vary both.
+    pairs = Counter(zip(mark_labels, space_labels))
+    if len(pairs) < 2:
+        return None
+    (zero, zero_count), (one, one_count) = pairs.most_common(2)
+    score = zero_count + one_count
+    if score < kInferMinBits or score < kInferMinDataRatio * len(spaces):
+        return None
+
+    # The '1' has the longer mark or, if they share one, the longer space.
+    # Clusters are numbered shortest first, so the pairs compare as they are.
+    (zeromark, zerospace), (onemark, onespace) = sorted((zero, one))
+    if zeromark == onemark:
+        encoding = "pulse_distance"
+    elif zerospace == onespace:
+        encoding = "pulse_width"
+    else:
+        encoding = "pulse_distance_width"
+
+    symbol = {(zeromark, zerospace): 0, (onemark, onespace): 1}.get
+    symbols = list(map(symbol, zip(mark_labels, space_labels)))
+    bitmark = {zeromark, onemark}.__contains__
+    mark_means = [cluster.mean for cluster in mark_clusters]
+    space_means = [cluster.mean for cluster in space_clusters]
+    scanned = _scanSections(
+        marks,
+        spaces,
+        symbols,
+        list(map(bitmark, mark_labels)),
+        lambda mark: mark_means[mark_lookup[mark]],
+        lambda space: space_means[space_lookup[space]],
+    )
+
+    # Pick the bit order with more checksums over whole sections, LSB first if
+    # it's a draw. Narrower ones are kept, but are too easily chance to vote.
+    best = None
+    votes = -1
+    for MSBfirst in (False, True):
+        sections, state, checksums = _buildSections(scanned, MSBfirst)
+        firsts = set(accumulate((s.size(0) for s in sections), initial=0))
+        count = sum(1 for checksum in checksums if checksum.start in firsts)
+        if count > votes:
+            best, votes = (sections, state, checksums, MSBfirst), count
+    sections, state, checksums, MSBfirst = best
+    timing = bit_timing_t(
+        mark_clusters[onemark].mean,
+        space_clusters[onespace].mean,
+        mark_clusters[zeromark].mean,
+        space_clusters[zerospace].mean,
+        MSBfirst,
+    )
+    return inferred_protocol_t(
+        layout=frame_layout_t(timing=timing, sections=tuple(sections)),
+        state=tuple(state),
+        checksums=tuple(checksums),
+        encoding=encoding,
+    )
+
+
+## Turn scanned sections into frame sections, state bytes and checksums.
+## Bits past the last whole byte of a section become a constant section, and
+## a section whose bytes are all followed by their inverse becomes an
+## inverted one, carrying only the first byte of each pair in the state.
+def _buildSections(
+    scanned: List[_scan_t], MSBfirst: bool
+) -> Tuple[List[frame_section_t], List[int], List[checksum_t]]:
+    sections: List[frame_section_t] = []
+    state: List[int] = []
+    checksums: List[checksum_t] = []
+    for scan in scanned:
+        data = _packBits(scan.bits, MSBfirst)
+        inverted = len(data) >= 4 and not len(data) % 2 and checkInvertedBytePairs(data, len(data))
+        if inverted:
+            data = data[0::2]
+        first = len(state)
+        state.extend(data)
+        if not inverted:
+            checksum = _findChecksum(state, first, len(state))
+            if checksum is not None:
+                checksums.append(checksum)
+        tail = len(scan.bits) % 8
+        header = dict(nbytes=len(data), hdrmark=scan.hdrmark, hdrspace=scan.hdrspace)
+        footer = dict(footermark=scan.footermark, gap=scan.gap)
+        if not tail:
+            sections.append(frame_section_t(inverted=inverted, **header, **footer))
+            continue
+        if data:
+            sections.append(frame_section_t(inverted=inverted, **header))
+            header = {}
+        else:  # Nothing but the odd bits, e.g. a leader: the header is theirs.
+            del header["nbytes"]
+        value = _bitsValue(scan.bits[-tail:], MSBfirst)
+        sections.append(frame_section_t(bits=tail, value=value, **header, **footer))
+    return sections, state, checksums
+
+
+## Recompute the checksums of an inferred protocol over some state bytes.
+## @param[in] inferred The inferred protocol.
+## @param[in] state The state bytes.
+## @return A copy of the state with its checksum bytes updated.
+def applyChecksums(inferred: inferred_protocol_t, state: Sequence[int]) -> List[int]:
+    result = list(state)
+    for checksum in inferred.checksums:
+        result[checksum.index] = calcChecksum(
+            checksum.kind, result[checksum.start : checksum.index]
+        )
+    return result
+
+
+## Send an inferred protocol's message.
+## @param[in] inferred The inferred protocol.
+## @param[in] state The state bytes to send. Default: the captured ones.
+##   Its checksums are recomputed, so changing a byte is all it takes.
+## @param[in] repeat Nr. of extra times to send the whole frame.
+## @return The mark/space timings of the message.
+def sendInferred(
+    inferred: inferred_protocol_t, state: Optional[Sequence[int]] = None, repeat: int = 0
+) -> List[int]:
+    if state is None:
+        state = inferred.state
+    if len(state) != inferred.nbytes:
+        raise ValueError(f"Expected {inferred.nbytes} state bytes, got {len(state)}")
+    return sendFrame(inferred.layout, applyChecksums(inferred, state), inferred.nbytes, repeat)
+
+
+## Read the state bytes out of a new capture of an inferred protocol.
+## @param[in] results Ptr to the data to decode.
+## @param[in] inferred The inferred protocol.
+## @param[in] offset The starting index to use when attempting to decode.
+## @param[in] tolerance Percentage error margin to allow, if not the layout's.
+## @return The state bytes, or None if the capture doesn't match.
+def matchInferred(
+    results, inferred: inferred_protocol_t, offset: int = 0, tolerance: Optional[int] = None
+) -> Optional[List[int]]:
+    state = [0] * inferred.nbytes
+    if not matchFrame(results, offset, inferred.layout, inferred.nbytes, state, tolerance):
+        return None
+    return state
@@ -0,0 +1,783 @@
+## @file
+## @brief Declarative frame layouts for the pulse-distance A/C protocols.
+## Python-only extension (no IRremoteESP8266 equivalent).
+##
+## Most A/C send*() functions are a handful of sendGeneric()/sendData() calls
+## strung together: a header, some bytes of the state, a footer mark, a gap,
+## maybe a constant block or a second section, repeated. Their decode*()
+## counterparts spell the same shape out again as _matchGeneric() calls.
+## Here that shape is written down once per protocol as a frame_layout_t, and
+## one interpreter sends it (sendFrame) and another matches it (matchFrame).
+##
+## Example:
+##   kFooLayout = frame_layout_t(
+##       timing=bit_timing_t(kFooBitMark, kFooOneSpace, kFooBitMark, kFooZeroSpace),
+##       sections=(
+##           frame_section_t(nbytes=8, hdrmark=kFooHdrMark, hdrspace=kFooHdrSpace,
+##                           footermark=kFooBitMark, gap=kFooSectionGap),
+##           frame_section_t(hdrmark=kFooHdrMark, hdrspace=kFooHdrSpace,
+##                           footermark=kFooBitMark, gap=kFooGap),  # The rest.
+##       ),
+##   )
+##   timings = sendFrame(kFooLayout, state, nbytes, repeat)
+##   used = matchFrame(results, offset, kFooLayout, nbits // 8)
+##
+## sendFrame() produces exactly what the equivalent sendGeneric() calls did;
+## the data bits come from a per-timing table of the 16 entries of every byte
+## value rather than a bit-by-bit loop.
+##
+## packFrame() writes the same timings into a single preallocated
+## array('H'), sized up front by frameLength(), for encode_ir() to take as
+## is. Nothing else is built between the state bytes and the buffer.
+## A duration too long for 16 bits is written as kFrameMaxDuration long
+## pieces joined by zero length marks/spaces, e.g. a 100000us gap becomes
+## 65535, 0, 34465. packTimings() does the same for a list of timings.
+##
+## packFrames() packs many states of the same length at once, as a command
+## set needs: with NumPy, the states become an (N x nbytes) uint8 matrix,
+## np.unpackbits() turns each data section into bits in the layout's bit
+## order, and the bits pick their mark & space durations in one step. The
+## headers, footers, gaps and constant sections are the same in every row,
+## so they are written once and copied. States of different lengths are
+## packed a length at a time. Without NumPy, it calls packFrame().
+
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.ir_protocols.bitops import checkInvertedBytePairs
+from app.core.ir_protocols.ir_send import sendData
+
+try:
+    import numpy as np
+except ImportError:  # Optional; packFrames() falls back to packFrame().
+    np = None
+
+kLayoutDefaultTolerance = 25  # kUseDefTol
+kLayoutDefaultExcess = 50  # kMarkExcess
+kFrameMaxDuration = 0xFFFF  # The longest duration an array('H') can hold.
+
+
+## How a single data bit is encoded.
+@dataclass(frozen=True)
+class bit_timing_t:
+    onemark: int
+    onespace: int
+    zeromark: int
+    zerospace: int
+    MSBfirst: bool = False
+
+
+## One section of a frame: [header] data [footer mark] [gap].
+## The data is either the next nbytes of the state (None meaning the rest of
+## it), or a constant of `bits` bits when bits is non-zero.
+@dataclass(frozen=True)
+class frame_section_t:
+    nbytes: Optional[int] = None
+    hdrmark: int = 0
+    hdrspace: int = 0
+    footermark: int = 0
+    gap: int = 0
+    ## Constant data, sent in place of any state bytes.
+    bits: int = 0
+    value: int = 0
+    ## Decode: check the constant matches `value`, not only its timings.
+    verify: bool = True
+    ## Each state byte is sent followed by its bitwise inverse.
+    inverted: bool = False
+    ## Decode: match the gap as a minimum rather than exactly.
+    ## None means only the last section's gap is a minimum.
+    atleast: Optional[bool] = None
+    ## Decode: the gap to expect, when the decoder expects a different one
+    ## from what we send.
+    matchgap: Optional[int] = None
+    ## Decode: mark excess override for this section.
+    excess: Optional[int] = None
+
+    ## Nr. of state bytes this section carries, given `remaining` are left.
+    def size(self, remaining: int) -> int:
+        if self.bits:
+            return 0
+        if self.nbytes is None:
+            return max(remaining, 0)
+        return self.nbytes
+
+
+## A complete message: its bit encoding and sections, the tolerance the
+## decoder allows, and the gap sent between repeats of the whole frame.
+@dataclass(frozen=True)
+class frame_layout_t:
+    timing: bit_timing_t
+    sections: Tuple[frame_section_t, ...]
+    tolerance: int = kLayoutDefaultTolerance
+    excess: int = kLayoutDefaultExcess
+    repeatgap: int = 0
+
+
+## The 16 timings of every byte value, for the given bit encoding.
+@lru_cache(maxsize=None)
+def _byteTimings(timing: bit_timing_t) -> Tuple[Tuple[int, ...], ...]:
+    return tuple(
+        tuple(
+            sendData(
+                timing.onemark,
+                timing.onespace,
+                timing.zeromark,
+                timing.zerospace,
+                byte,
+                8,
+                timing.MSBfirst,
+            )
+        )
+        for byte in range(256)
+    )
+
+
+## The timings of _byteTimings() as native array('H') bytes, ready to copy
+## into a frame buffer. Inverted sections look up a byte and its inverse at
+## once.
+@lru_cache(maxsize=None)
+def _bytePacked(timing: bit_timing_t, inverted: bool = False) -> Tuple[bytes, ...]:
+    table = [array("H", entry).tobytes() for entry in _byteTimings(timing)]
+    if inverted:
+        return tuple(table[byte] + table[byte ^ 0xFF] for byte in range(256))
+    return tuple(table)
+
+
+## The timings of a constant section's data as native array('H') bytes.
+@lru_cache(maxsize=None)
+def _constantPacked(timing: bit_timing_t, value: int, bits: int) -> bytes:
+    return array(
+        "H",
+        sendData(
+            timing.onemark,
+            timing.onespace,
+            timing.zeromark,
+            timing.zerospace,
+            value,
+            bits,
+            timing.MSBfirst,
+        ),
+    ).tobytes()
+
+
+## Nr. of frame buffer entries a duration takes once split to fit.
+def _durationLength(duration: int) -> int:
+    if not duration:
+        return 0
+    return 2 * (-(-duration // kFrameMaxDuration)) - 1
+
+
+## Write a duration into a frame buffer, split to fit if need be.
+## @return The index in buf just past it.
+def _writeDuration(buf: array, index: int, duration: int) -> int:
+    while duration > kFrameMaxDuration:
+        buf[index] = kFrameMaxDuration
+        buf[index + 1] = 0
+        index += 2
+        duration -= kFrameMaxDuration
+    buf[index] = duration
+    return index + 1
+
+
+## Nr. of state bytes each section sends, given `available` bytes of data.
+## Like sendFrame(), a fixed size section takes its bytes from the data even
+## past nbytes, as long as the data has them.
+def _sectionSizes(
+    layout: frame_layout_t, nbytes: int, available: Optional[int] = None
+) -> List[int]:
+    sizes = []
+    pos = 0
+    for section in layout.sections:
+        size = section.size(nbytes - pos)
+        if available is not None:
+            size = max(min(pos + size, available) - pos, 0)
+        sizes.append(size)
+        pos += section.size(nbytes - pos)
+    return sizes
+
+
+## Nr. of timings sendFrame()/packFrame() produce for a message.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] nbytes Nr. of bytes of the state to send.
+## @param[in] repeat Nr. of extra times to send the whole frame.
+## @param[in] available Nr. of bytes of data there are. Default: as many as
+##   the sections ask for.
+## @return The length of the message, in entries.
+def frameLength(
+    layout: frame_layout_t, nbytes: int, repeat: int = 0, available: Optional[int] = None
+) -> int:
+    length = 0
+    for section, size in zip(layout.sections, _sectionSizes(layout, nbytes, available)):
+        length += (
+            _durationLength(section.hdrmark)
+            + _durationLength(section.hdrspace)
+            + _durationLength(section.footermark)
+            + _durationLength(section.gap)
+        )
+        if section.bits:
+            length += 2 * section.bits
+        else:
+            length += 16 * size * (2 if section.inverted else 1)
+    repeatgap = _durationLength(layout.repeatgap)
+    return (length + repeatgap) * (repeat + 1) - repeatgap
+
+
+## Write a message described by a frame layout into a frame buffer.
+## Durations too long for the buffer are split (see _writeDuration()).
+## @param[out] buf The array('H') to write to. It must be long enough; see
+##   frameLength().
+## @param[in] index Where in buf to start writing.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] data The state bytes to send.
+## @param[in] nbytes Nr. of bytes of the state to send.
+## @param[in] repeat Nr. of extra times to send the whole frame.
+## @return The index in buf just past the message.
+def writeFrame(
+    buf: array,
+    index: int,
+    layout: frame_layout_t,
+    data: Sequence[int],
+    nbytes: int,
+    repeat: int = 0,
+) -> int:
+    timing = layout.timing
+    sizes = _sectionSizes(layout, nbytes, len(data))
+    view = memoryview(buf).cast("B")
+    for r in range(repeat + 1):
+        pos = 0
+        for section, size in zip(layout.sections, sizes):
+            if section.hdrmark:
+                index = _writeDuration(buf, index, section.hdrmark)
+            if section.hdrspace:
+                index = _writeDuration(buf, index, section.hdrspace)
+            if section.bits:
+                packed = _constantPacked(timing, section.value, section.bits)
+            else:
+                table = _bytePacked(timing, section.inverted)
+                packed = b"".join(map(table.__getitem__, data[pos : pos + size]))
+                pos += section.size(nbytes - pos)
+            view[2 * index : 2 * index + len(packed)] = packed
+            index += len(packed) // 2
+            if section.footermark:
+                index = _writeDuration(buf, index, section.footermark)
+            if section.gap:
+                index = _writeDuration(buf, index, section.gap)
+        if layout.repeatgap and r < repeat:
+            index = _writeDuration(buf, index, layout.repeatgap)
+    view.release()
+    return index
+
+
+## Send a message described by a frame layout into a new array('H').
+## The same timings as sendFrame(), with any duration over
+## kFrameMaxDuration split to fit.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] data The state bytes to send.
+## @param[in] nbytes Nr. of bytes of the state to send.
+## @param[in] repeat Nr. of extra times to send the whole frame.
+## @return The frame buffer.
+def packFrame(
+    layout: frame_layout_t, data: Sequence[int], nbytes: int, repeat: int = 0
+) -> array:
+    buf = array("H", bytes(2 * frameLength(layout, nbytes, repeat, len(data))))
+    writeFrame(buf, 0, layout, data, nbytes, repeat)
+    return buf
+
+
+## The mark/space timings of the bits of each row of a uint8 matrix.
+## @param[in] timing How each bit is encoded.
+## @param[in] data An (N x k) uint8 matrix of state bytes.
+## @return An (N x 16k) uint16 matrix.
+def _bitTimings(timing: bit_timing_t, data):
+    order = "big" if timing.MSBfirst else "little"
+    bits = np.unpackbits(data, axis=1, bitorder=order).view(bool)
+    timings = np.empty((data.shape[0], 2 * bits.shape[1]), dtype=np.uint16)
+    timings[:, 0::2] = np.where(bits, timing.onemark, timing.zeromark)
+    timings[:, 1::2] = np.where(bits, timing.onespace, timing.zerospace)
+    return timings
+
+
+## Send many messages described by the same frame layout.
+## Each frame buffer is identical to what packFrame() returns for its state.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] states The state bytes of each message.
+## @param[in] nbytes Nr. of bytes of each state to send. Default: all of them.
+## @param[in] repeat Nr. of extra times to send each whole frame.
+## @return A frame buffer per state, in order.
+def packFrames(
+    layout: frame_layout_t,
+    states: Sequence[Sequence[int]],
+    nbytes: Optional[int] = None,
+    repeat: int = 0,
+) -> List[array]:
+    states = [bytes(state) for state in states]
+    lengths = {len(state) for state in states}
+    if np is None or len(states) < 2:
+        return [
+            packFrame(layout, state, len(state) if nbytes is None else nbytes, repeat)
+            for state in states
+        ]
+    if len(lengths) > 1:  # Pack the states of each length together.
+        frames: List[array] = [array("H")] * len(states)
+        for length in lengths:
+            indices = [i for i, state in enumerate(states) if len(state) == length]
+            packed = packFrames(layout, [states[i] for i in indices], nbytes, repeat)
+            for i, frame in zip(indices, packed):
+                frames[i] = frame
+        return frames
+    (available,) = lengths
+    if nbytes is None:
+        nbytes = available
+    matrix = np.frombuffer(b"".join(states), dtype=np.uint8).reshape(len(states), available)
+    timing = layout.timing
+    # Every row shares the first row's headers, footers, gaps and constant
+    # sections; only the data sections are then rewritten, per row.
+    template = packFrame(layout, states[0], nbytes, repeat)
+    frames = np.tile(np.frombuffer(template, dtype=np.uint16), (len(states), 1))
+    sections = []  # (offset in a frame, data timings) of each data section
+    index = 0
+    pos = 0
+    for section, size in zip(layout.sections, _sectionSizes(layout, nbytes, available)):
+        index += _durationLength(section.hdrmark) + _durationLength(section.hdrspace)
+        if section.bits:
+            index += 2 * section.bits
+        else:
+            data = matrix[:, pos : pos + size]
+            if section.inverted:  # Each byte followed by its inverse.
+                data = np.stack((data, ~data), axis=2).reshape(len(states), 2 * size)
+            sections.append((index, _bitTimings(timing, data)))
+            index += 16 * data.shape[1]
+            pos += section.size(nbytes - pos)
+        index += _durationLength(section.footermark) + _durationLength(section.gap)
+    period = index + _durationLength(layout.repeatgap)
+    for r in range(repeat + 1):
+        for offset, timings in sections:
+            start = r * period + offset
+            frames[:, start : start + timings.shape[1]] = timings
+    return [array("H", frame.tobytes()) for frame in frames]
+
+
+## Store a list of timings in a frame buffer, splitting any duration over
+## kFrameMaxDuration the way packFrame() does.
+## @param[in] timings The mark/space timings, e.g. from a send*() function.
+## @return The frame buffer.
+def packTimings(timings: Sequence[int]) -> array:
+    try:
+        return array("H", timings)  # Nothing to split, usually.
+    except OverflowError:
+        pass
+    buf = array("H")
+    append = buf.append
+    for duration in timings:
+        while duration > kFrameMaxDuration:
+            append(kFrameMaxDuration)
+            append(0)
+            duration -= kFrameMaxDuration
+        append(duration)
+    return buf
+
+
+## Send a message described by a frame layout.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] data The state bytes to send.
+## @param[in] nbytes Nr. of bytes of the state to send.
+## @param[in] repeat Nr. of extra times to send the whole frame.
+## @return The mark/space timings of the message.
+def sendFrame(
+    layout: frame_layout_t, data: Sequence[int], nbytes: int, repeat: int = 0
+) -> List[int]:
+    timing = layout.timing
+    table = _byteTimings(timing)
+    lookup = table.__getitem__
+    timings: List[int] = []
+    extend = timings.extend
+    for r in range(repeat + 1):
+        pos = 0
+        for section in layout.sections:
+            if section.hdrmark:
+                timings.append(section.hdrmark)
+            if section.hdrspace:
+                timings.append(section.hdrspace)
+            if section.bits:
+                extend(
+                    sendData(
+                        timing.onemark,
+                        timing.onespace,
+                        timing.zeromark,
+                        timing.zerospace,
+                        section.value,
+                        section.bits,
+                        timing.MSBfirst,
+                    )
+                )
+            else:
+                size = section.size(nbytes - pos)
+                chunk = data[pos : pos + size]
+                if section.inverted:
+                    for byte in chunk:
+                        extend(table[byte])
+                        extend(table[byte ^ 0xFF])
+                else:
+                    extend(chain.from_iterable(map(lookup, chunk)))
+                pos += size
+            if section.footermark:
+                timings.append(section.footermark)
+            if section.gap:
+                timings.append(section.gap)
+        if layout.repeatgap and r < repeat:
+            timings.append(layout.repeatgap)
+    return timings
+
+
+## Match & decode one section of a frame layout.
+## @param[in] rawbuf The capture buffer, starting where the section should be.
+## @param[in] remaining The size of the capture buffer remaining.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] section The section (one of layout.sections) to match.
+## @param[out] state Where to store the decoded bytes.
+## @param[in] pos Index into state for the section's first byte.
+## @param[in] size Nr. of state bytes the section carries.
+## @param[in] atleast Is the gap a matchAtLeast or matchSpace?
+##   Defaults to the section's choice, else matchSpace.
+## @param[in] tolerance Percentage error margin to allow, if not the layout's.
+## @param[in] strict Check the inverted bytes of an inverted section.
+## @return If successful, how many buffer entries were used. Otherwise 0.
+def matchSection(
+    rawbuf: Sequence[int],
+    remaining: int,
+    layout: frame_layout_t,
+    section: frame_section_t,
+    state: Optional[List[int]],
+    pos: int,
+    size: int,
+    atleast: Optional[bool] = None,
+    tolerance: Optional[int] = None,
+    strict: bool = True,
+) -> int:
+    # Import here to avoid circular imports
+    from app.core.ir_protocols.ir_recv import _matchGeneric
+
+    if atleast is None:
+        atleast = bool(section.atleast)
+    if tolerance is None:
+        tolerance = layout.tolerance
+    timing = layout.timing
+    excess = layout.excess if section.excess is None else section.excess
+    footerspace = section.gap if section.matchgap is None else section.matchgap
+    if section.bits:
+        value = [0]
+        used = _matchGeneric(
+            rawbuf,
+            value,
+            None,
+            True,
+            remaining,
+            section.bits,
+            section.hdrmark,
+            section.hdrspace,
+            timing.onemark,
+            timing.onespace,
+            timing.zeromark,
+            timing.zerospace,
+            section.footermark,
+            footerspace,
+            atleast,
+            tolerance,
+            excess,
+            timing.MSBfirst,
+        )
+        if used and section.verify and value[0] != section.value:
+            return 0
+        return used
+    if section.inverted:
+        pairs = bytearray(size * 2)
+        used = _matchGeneric(
+            rawbuf,
+            None,
+            pairs,
+            False,
+            remaining,
+            size * 16,
+            section.hdrmark,
+            section.hdrspace,
+            timing.onemark,
+            timing.onespace,
+            timing.zeromark,
+            timing.zerospace,
+            section.footermark,
+            footerspace,
+            atleast,
+            tolerance,
+            excess,
+            timing.MSBfirst,
+        )
+        if not used:
+            return 0
+        if strict and not checkInvertedBytePairs(pairs, len(pairs)):
+            return 0
+        if state is not None:
+            state[pos : pos + size] = pairs[0::2]
+        return used
+    return _matchGeneric(
+        rawbuf,
+        None,
+        state if size else None,  # Nothing to store; only match the timings.
+        False,
+        remaining,
+        size * 8,
+        section.hdrmark,
+        section.hdrspace,
+        timing.onemark,
+        timing.onespace,
+        timing.zeromark,
+        timing.zerospace,
+        section.footermark,
+        footerspace,
+        atleast,
+        tolerance,
+        excess,
+        timing.MSBfirst,
+        pos,
+    )
+
+
+## Is a section's gap matched as a minimum? The section's own choice, else
+## the caller's for the last section, else only the last section's is.
+def _sectionAtLeast(layout: frame_layout_t, index: int, atleast: Optional[bool]) -> bool:
+    section = layout.sections[index]
+    last = index == len(layout.sections) - 1
+    if section.atleast is not None:
+        return section.atleast
+    if last and atleast is not None:
+        return atleast
+    return last
+
+
+## Match & decode a message described by a frame layout.
+## The decoded bytes are stored in results.state (or `state`), in order.
+## @param[in] results Ptr to the data to decode & where to store the result.
+## @param[in] offset The starting index to use when attempting to decode.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] nbytes Nr. of state bytes we expect.
+## @param[out] state Where to store the bytes instead of results.state.
+## @param[in] tolerance Percentage error margin to allow, if not the layout's.
+## @param[in] atleast Match the last gap as a minimum, if not the layout's
+##   choice.
+## @param[in] strict Check the inverted bytes of inverted sections.
+## @return If successful, how many buffer entries were used. Otherwise 0.
+def matchFrame(
+    results,
+    offset: int,
+    layout: frame_layout_t,
+    nbytes: int,
+    state: Optional[List[int]] = None,
+    tolerance: Optional[int] = None,
+    atleast: Optional[bool] = None,
+    strict: bool = True,
+) -> int:
+    if state is None:
+        state = results.state
+    if tolerance is None:
+        tolerance = layout.tolerance
+    # Python extension: a capture decoded as part of a batch (see ir_batch.py)
+    # has its frames matched for the whole batch at once.
+    batch = getattr(results, "batch", None)
+    if batch is not None:
+        used = batch.matchFrame(results, offset, layout, nbytes, state, tolerance, atleast, strict)
+        if used is not None:
+            return used
+    rawbuf = results.rawbuf
+    rawlen = results.rawlen
+    start = offset
+    pos = 0
+    for index, section in enumerate(layout.sections):
+        size = section.size(nbytes - pos)
+        section_atleast = _sectionAtLeast(layout, index, atleast)
+        used = matchSection(
+            rawbuf[offset:],
+            rawlen - offset,
+            layout,
+            section,
+            state,
+            pos,
+            size,
+            section_atleast,
+            tolerance,
+            strict,
+        )
+        if not used:
+            return 0
+        offset += used
+        pos += size
+    return offset - start
+
+
+## Where a duration must fall to match `desired`, as matchMark()/matchSpace()
+## see it.
+## @return The lowest and highest matching durations.
+def _band(desired: int, tolerance: int, excess: int) -> Tuple[int, int]:
+    adjusted = desired + excess
+    return adjusted * (100 - tolerance) // 100, adjusted * (100 + tolerance) // 100
+
+
+## Match & decode a generic section in many captures at once: the
+## vectorized form of _matchGeneric() (and the matchData()/matchBytes() it
+## calls), with the same checks in the same places.
+## @param[in] raw The captures, an (N x width) int matrix padded with zeros.
+## @param[in] lengths The length of each capture.
+## @param[in] offset Where each capture's section starts; updated.
+## @param[in,out] alive Which captures still match; updated.
+## @param[in] nbits Nr. of data bits.
+## @param[in] stored Are the bits stored as bytes (via matchBytes())?
+## @return The data bits of each capture, an (N x nbits) bool matrix.
+def _matchSections(
+    raw,
+    lengths,
+    offset,
+    alive,
+    nbits: int,
+    stored: bool,
+    hdrmark: int,
+    hdrspace: int,
+    timing: bit_timing_t,
+    footermark: int,
+    footerspace: int,
+    atleast: bool,
+    tolerance: int,
+    excess: int,
+):
+    width = raw.shape[1]
+    rows = np.arange(raw.shape[0])
+
+    def at(start, count=1):  # `count` durations of each capture from `start`
+        if len(start) and start.min() == start.max() and start[0] + count <= width:
+            return raw[:, start[0] : start[0] + count]  # Usually all in step.
+        return raw[rows[:, None], np.minimum(start[:, None] + np.arange(count), width - 1)]
+
+    def matches(durations, desired):
+        low, high = _band(desired, tolerance, excess)
+        return (durations >= low) & (durations <= high)
+
+    expectspace = bool(footermark) or timing.onespace != timing.zerospace
+    headers = bool(hdrmark) + bool(hdrspace)
+    remaining = lengths - offset
+    alive &= remaining >= nbits * 2 - (0 if expectspace else 1) + headers + bool(footermark)
+    if stored:  # matchBytes()' own check, stricter without a final space.
+        alive &= remaining - headers + expectspace >= nbits * 2 + 1
+    if hdrmark:
+        alive &= matches(at(offset)[:, 0], hdrmark)
+        offset += 1
+    if hdrspace:
+        alive &= matches(at(offset)[:, 0], hdrspace)
+        offset += 1
+    # Data: every bit a mark & space matching a one or else a zero, except
+    # the last when no space is expected: then only its mark (even for 0 bits).
+    full = nbits if expectspace else max(nbits - 1, 0)
+    durations = at(offset, 2 * full)
+    marks = durations[:, 0::2]
+    spaces = durations[:, 1::2]
+    ones = matches(marks, timing.onemark) & matches(spaces, timing.onespace)
+    zeros = matches(marks, timing.zeromark) & matches(spaces, timing.zerospace)
+    alive &= (ones | zeros).all(axis=1)
+    offset += 2 * full
+    if not expectspace:
+        mark = at(offset)
+        one = matches(mark, timing.onemark)
+        alive &= (one | matches(mark, timing.zeromark))[:, 0]
+        ones = np.concatenate((ones, one), axis=1)[:, :nbits]
+        offset += 1
+    if footermark:
+        alive &= matches(at(offset)[:, 0], footermark)
+        offset += 1
+    if footerspace:
+        gap = offset < lengths
+        durations = at(offset)[:, 0]
+        if atleast:
+            matched = durations >= _band(footerspace, tolerance, excess)[0]
+        else:
+            matched = matches(durations, footerspace)
+        alive &= ~gap | matched
+        offset += gap
+    return ones
+
+
+## Match & decode a message described by a frame layout in many captures at
+## once. Row for row, the same as matchFrame(), as a few array operations per
+## section: every mark & space is checked against its tolerance band, the
+## header, footer & gap positions with masks, and the bits are packed into
+## bytes with np.packbits(). Needs NumPy.
+## @param[in] raw The captures, an (N x width) int matrix padded with zeros.
+## @param[in] lengths The length (rawlen) of each capture.
+## @param[in] offset The starting index to use in every capture.
+## @param[in] layout The frame layout of the protocol.
+## @param[in] nbytes Nr. of state bytes we expect.
+## @param[in] tolerance Percentage error margin to allow, if not the layout's.
+## @param[in] atleast Match the last gap as a minimum, if not the layout's
+##   choice.
+## @param[in] strict Check the inverted bytes of inverted sections.
+## @return How many buffer entries each capture used (0 if it doesn't
+##   match), and the (N x nbytes) uint8 matrix of their decoded state bytes.
+def matchFrames(
+    raw,
+    lengths,
+    offset: int,
+    layout: frame_layout_t,
+    nbytes: int,
+    tolerance: Optional[int] = None,
+    atleast: Optional[bool] = None,
+    strict: bool = True,
+):
+    if tolerance is None:
+        tolerance = layout.tolerance
+    raw = np.asarray(raw, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    timing = layout.timing
+    order = "big" if timing.MSBfirst else "little"
+    positions = np.full(len(lengths), offset, dtype=np.int64)
+    alive = np.ones(len(lengths), dtype=bool)
+    states = []
+    pos = 0
+    for index, section in enumerate(layout.sections):
+        size = section.size(nbytes - pos)
+        if section.bits:
+            nbits = section.bits
+        else:
+            nbits = size * (16 if section.inverted else 8)
+        bits = _matchSections(
+            raw,
+            lengths,
+            positions,
+            alive,
+            nbits,
+            not section.bits and size > 0,
+            section.hdrmark,
+            section.hdrspace,
+            timing,
+            section.footermark,
+            section.gap if section.matchgap is None else section.matchgap,
+            _sectionAtLeast(layout, index, atleast),
+            tolerance,
+            layout.excess if section.excess is None else section.excess,
+        )
+        if section.bits:
+            if section.verify:
+                shifts = np.arange(section.bits)
+                if timing.MSBfirst:
+                    shifts = shifts[::-1]
+                expected = (section.value >> shifts) & 1 == 1
+                alive &= (bits == expected).all(axis=1)
+        elif size:
+            data = np.packbits(bits, axis=1, bitorder=order)
+            if section.inverted:
+                if strict:
+                    alive &= (data[:, 1::2] == ~data[:, 0::2]).all(axis=1)
+                data = data[:, 0::2]
+            states.append(data)
+        pos += size
+    used = np.where(alive, positions - offset, 0)
+    if states:
+        return used, np.concatenate(states, axis=1)
+    return used, np.zeros((len(lengths), 0), dtype=np.uint8)
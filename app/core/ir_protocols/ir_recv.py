@@ -7,7 +7,7 @@
 ## @brief Generic IR protocol decoder functions
 ## Direct translation of IRrecv class methods from IRrecv.cpp
 
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, MutableSequence, Optional, Sequence, Union
 from app.core.ir_protocols.fujitsu import (
     kFujitsuAcHdrMark,
     kFujitsuAcHdrSpace,
@@ -17,6 +17,18 @@ from app.core.ir_protocols.fujitsu import (
     kFujitsuAcExtraTolerance,
     kFujitsuAcMinGap,
 )
+from app.core.ir_protocols.bitops import reverseBits
+
+if TYPE_CHECKING:
+    from app.core.ir_protocols.ir_skew import timing_skew_t
+
+try:
+    from mypy_extensions import mypyc_attr
+except ImportError:  # Only needed by the compiled build; see scripts/build_extensions.py.
+
+    def mypyc_attr(*attrs, **kwattrs):  # type: ignore[misc]
+        return lambda cls: cls
+
 
 ## Constants from IRremoteESP8266.h and IRrecv.h
 kHeader = 2  # Usual nr. of header entries
@@ -94,29 +106,12 @@ def matchAtLeast(measured: int, desired: int, tolerance: int = 25, excess: int =
 
 ## Match result structure - direct translation from C++
 class match_result_t:
-    def __init__(self):
+    def __init__(self) -> None:
         self.success = False
         self.data = 0
         self.used = 0
 
 
-def reverseBits(data: int, nbits: int) -> int:
-    """
-    Reverse the order of bits.
-    Direct translation from IRremoteESP8266 reverseBits
-
-    @param data The data to reverse
-    @param nbits Number of bits to reverse
-    @return Reversed data
-    """
-    result = 0
-    for i in range(nbits):
-        result <<= 1
-        result |= data & 1
-        data >>= 1
-    return result
-
-
 ## Match & decode data bits from IR timings.
 ## @param[in] data_ptr A pointer to where we are at in the capture buffer.
 ## @param[in] nbits Number of data bits we expect.
@@ -133,7 +128,7 @@ def reverseBits(data: int, nbits: int) -> int:
 ##   buffer entries were used.
 ## Direct translation from IRremoteESP8266 IRrecv::matchData (lines 1457-1499)
 def matchData(
-    data_ptr: List[int],
+    data_ptr: Sequence[int],
     offset: int,
     nbits: int,
     onemark: int,
@@ -220,9 +215,9 @@ def matchData(
 ## @return If successful, how many buffer entries were used. Otherwise 0.
 ## Direct translation from IRremoteESP8266 IRrecv::matchBytes (lines 1518-1538)
 def matchBytes(
-    data_ptr: List[int],
+    data_ptr: Sequence[int],
     offset: int,
-    result_ptr: List[int],
+    result_ptr: MutableSequence[int],
     remaining: int,
     nbytes: int,
     onemark: int,
@@ -304,9 +299,9 @@ def matchBytes(
 ## @return If successful, how many buffer entries were used. Otherwise 0.
 ## Direct translation from IRremoteESP8266 IRrecv::_matchGeneric (lines 1570-1645)
 def _matchGeneric(
-    data_ptr: List[int],
-    result_bits_ptr: Optional[List[int]],
-    result_bytes_ptr: Optional[List[int]],
+    data_ptr: Sequence[int],
+    result_bits_ptr: Optional[MutableSequence[int]],
+    result_bytes_ptr: Optional[MutableSequence[int]],
     use_bits: bool,
     remaining: int,
     nbits: int,
@@ -335,7 +330,7 @@ def _matchGeneric(
     if not use_bits and result_bytes_ptr is not None and nbits % 8 != 0:
         return 0
     # Calculate if we expect a trailing space in the data section.
-    kexpectspace = footermark or (onespace != zerospace)
+    kexpectspace = bool(footermark) or (onespace != zerospace)
     # Calculate how much remaining buffer is required.
     min_remaining = nbits * 2 - (0 if kexpectspace else 1)
 
@@ -442,23 +437,26 @@ def _matchGeneric(
 
 ## Results returned from the decoder
 ## Direct translation from IRrecv.h decode_results class (lines 99-118)
+@mypyc_attr(allow_interpreted_subclasses=True)  # e.g. ir_batch.batch_results_t
 class decode_results:
     """
     Results returned from the decoder.
     EXACT translation from IRremoteESP8266 decode_results class
     """
 
-    def __init__(self):
-        self.decode_type = 0  # Protocol type
-        self.value = 0  # Decoded value (for simple protocols)
+    def __init__(self) -> None:
+        self.decode_type: Union[int, str] = 0  # Protocol type (or name)
+        self.value: Union[int, List[int]] = 0  # Decoded value (for simple protocols)
         self.address = 0  # Decoded address
         self.command = 0  # Decoded command
         self.state = [0] * kStateSizeMax  # Multi-byte results
         self.bits = 0  # Number of bits in decoded value
-        self.rawbuf = []  # Raw intervals (timings)
+        self.rawbuf: Sequence[int] = []  # Raw intervals (timings)
         self.rawlen = 0  # Number of records in rawbuf
         self.overflow = False
         self.repeat = False  # Is the result a repeat code?
+        # Python extension: skew undone by decode(), if any
+        self.timing_skew: Optional["timing_skew_t"] = None
 
 
 ## Decode the supplied Fujitsu AC IR message if possible.
@@ -685,8 +683,8 @@ def validate_fujitsu_timings(timings: List[int]) -> bool:
 ## @return If successful, how many buffer entries were used. Otherwise 0.
 ## Direct translation from IRremoteESP8266 IRrecv::matchGenericConstBitTime (lines 1766-1830)
 def matchGenericConstBitTime(
-    data_ptr: List[int],
-    result_ptr: List[int],
+    data_ptr: Sequence[int],
+    result_ptr: MutableSequence[int],
     remaining: int,
     nbits: int,
     hdrmark: int,
@@ -823,8 +821,8 @@ def matchGenericConstBitTime(
 ## @return If successful, how many buffer entries were used. Otherwise 0.
 ## Direct translation from IRremoteESP8266 IRrecv::matchGeneric (uint64_t variant)
 def matchGeneric(
-    data_ptr: List[int],
-    result_ptr: List[int],
+    data_ptr: Sequence[int],
+    result_ptr: MutableSequence[int],
     remaining: int,
     nbits: int,
     hdrmark: int,
@@ -7,7 +7,7 @@
 ## @brief Generic IR protocol encoder functions
 ## Direct translation of IRsend class methods from IRsend.cpp
 
-from typing import List
+from typing import List, Optional, Sequence
 
 
 ## Generic method for sending data that is common to most protocols.
@@ -35,7 +35,7 @@ def sendData(
     Encode data bits into IR timings.
     EXACT translation from IRremoteESP8266 IRsend::sendData
     """
-    timings = []
+    timings: List[int] = []
     if nbits == 0:  # If we are asked to send nothing, just return.
         return timings
     if MSBfirst:  # Send the MSB first.
@@ -90,7 +90,7 @@ def sendGeneric(
     zerospace: int,
     footermark: int,
     gap: int = 0,
-    dataptr: List[int] = None,
+    dataptr: Optional[Sequence[int]] = None,
     nbytes: int = 0,
     MSBfirst: bool = True,
     repeat: int = 0,
@@ -109,7 +109,7 @@ def sendGeneric(
     if dataptr is None:
         return []
 
-    all_timings = []
+    all_timings: List[int] = []
 
     # Send message (repeat + 1) times
     for r in range(repeat + 1):
@@ -188,7 +188,7 @@ def sendGenericUint64(
     Returns:
         List of timing values in microseconds (mark/space pairs).
     """
-    all_timings = []
+    all_timings: List[int] = []
 
     # Send message (repeat + 1) times
     for r in range(repeat + 1):
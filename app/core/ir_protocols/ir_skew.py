@@ -0,0 +1,328 @@
+## @file
+## @brief Capture-wide timing skew estimation and normalisation.
+## Python-only extension (no IRremoteESP8266 equivalent).
+##
+## Some blasters capture with a systematic clock skew (every duration scaled by
+## the same factor) and/or a constant mark excess (marks stretched and spaces
+## shortened by the same number of uSeconds, from the receiver's slow rise/fall).
+## Rather than widening every protocol's tolerance to absorb that, we estimate
+## the skew once from the capture's timing histogram, fit it against the nominal
+## timings of the pulse-distance protocols we decode, and rescale the buffer
+## back to nominal for the decoders. decode() only does so for a capture no
+## decoder recognised as it was, so nominal captures never pay for it.
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+## Skew must be at least this large before we touch the capture. Anything
+## smaller is well inside every decoder's tolerance already.
+kSkewMinScaleError = 0.08  # 8%
+kSkewMinMarkExcess = 60  # uSeconds
+## Max relative RMS error of the template fit for the estimate to be trusted.
+kSkewMaxResidual = 0.06
+## A template that fits this well without any correction means the capture is
+## already nominal, even if another template happens to fit a skewed version.
+kSkewNominalScaleError = 0.03
+## Durations longer than this multiple of the bit mark are headers or gaps.
+kSkewBitSpaceLimit = 6
+## Minimum number of mark/space pairs needed for a meaningful histogram.
+kSkewMinPairs = 16
+
+
+## Nominal timings of a pulse-distance protocol family.
+## @note short_space/long_space are the two data-bit spaces irrespective of
+##   which one encodes a '1' (e.g. Mitsubishi Heavy inverts them).
+@dataclass(frozen=True)
+class timing_template_t:
+    name: str
+    hdrmark: int
+    hdrspace: int
+    bitmark: int
+    short_space: int
+    long_space: int
+
+
+## Result of a skew estimate.
+## A measured mark m relates to its nominal M as m = scale * M + mark_excess,
+## and a measured space s to its nominal S as s = scale * S - mark_excess.
+@dataclass
+class timing_skew_t:
+    scale: float = 1.0
+    mark_excess: float = 0.0
+    template: str = ""
+    residual: float = 0.0
+
+    def is_significant(self) -> bool:
+        """True if the skew is large enough to be worth normalising."""
+        return (
+            abs(self.scale - 1.0) >= kSkewMinScaleError
+            or abs(self.mark_excess) >= kSkewMinMarkExcess
+        )
+
+
+_templates: Optional[List[timing_template_t]] = None
+
+
+def getTimingTemplates() -> List[timing_template_t]:
+    """
+    Nominal header/bit timings for the pulse-distance protocols in decode().
+
+    Built lazily from the protocol modules' own constants so the two can
+    never drift apart.
+    """
+    global _templates
+    if _templates is not None:
+        return _templates
+
+    from app.core.ir_protocols import carrier, daikin, fujitsu, gree, haier, hitachi
+    from app.core.ir_protocols import lg, mitsubishi, panasonic, samsung
+
+    def t(name, hdrmark, hdrspace, bitmark, one, zero):
+        return timing_template_t(name, hdrmark, hdrspace, bitmark, min(one, zero), max(one, zero))
+
+    _templates = [
+        t("FUJITSU_AC", fujitsu.kFujitsuAcHdrMark, fujitsu.kFujitsuAcHdrSpace,
+          fujitsu.kFujitsuAcBitMark, fujitsu.kFujitsuAcOneSpace, fujitsu.kFujitsuAcZeroSpace),
+        t("CARRIER_AC", carrier.kCarrierAcHdrMark, carrier.kCarrierAcHdrSpace,
+          carrier.kCarrierAcBitMark, carrier.kCarrierAcOneSpace, carrier.kCarrierAcZeroSpace),
+        t("CARRIER_AC40", carrier.kCarrierAc40HdrMark, carrier.kCarrierAc40HdrSpace,
+          carrier.kCarrierAc40BitMark, carrier.kCarrierAc40OneSpace,
+          carrier.kCarrierAc40ZeroSpace),
+        t("CARRIER_AC64", carrier.kCarrierAc64HdrMark, carrier.kCarrierAc64HdrSpace,
+          carrier.kCarrierAc64BitMark, carrier.kCarrierAc64OneSpace,
+          carrier.kCarrierAc64ZeroSpace),
+        t("CARRIER_AC128", carrier.kCarrierAc128HdrMark, carrier.kCarrierAc128HdrSpace,
+          carrier.kCarrierAc128BitMark, carrier.kCarrierAc128OneSpace,
+          carrier.kCarrierAc128ZeroSpace),
+        t("HITACHI_AC", hitachi.kHitachiAcHdrMark, hitachi.kHitachiAcHdrSpace,
+          hitachi.kHitachiAcBitMark, hitachi.kHitachiAcOneSpace, hitachi.kHitachiAcZeroSpace),
+        t("HITACHI_AC424", hitachi.kHitachiAc424HdrMark, hitachi.kHitachiAc424HdrSpace,
+          hitachi.kHitachiAc424BitMark, hitachi.kHitachiAc424OneSpace,
+          hitachi.kHitachiAc424ZeroSpace),
+        t("HITACHI_AC3", hitachi.kHitachiAc3HdrMark, hitachi.kHitachiAc3HdrSpace,
+          hitachi.kHitachiAc3BitMark, hitachi.kHitachiAc3OneSpace,
+          hitachi.kHitachiAc3ZeroSpace),
+        # Samsung A/C's per-section header is the longest mark in the capture.
+        t("SAMSUNG_AC", samsung.kSamsungAcSectionMark, samsung.kSamsungAcSectionSpace,
+          samsung.kSamsungAcBitMark, samsung.kSamsungAcOneSpace, samsung.kSamsungAcZeroSpace),
+        t("SAMSUNG36", samsung.kSamsung36HdrMark, samsung.kSamsung36HdrSpace,
+          samsung.kSamsung36BitMark, samsung.kSamsung36OneSpace, samsung.kSamsung36ZeroSpace),
+        t("DAIKIN", daikin.kDaikinHdrMark, daikin.kDaikinHdrSpace,
+          daikin.kDaikinBitMark, daikin.kDaikinOneSpace, daikin.kDaikinZeroSpace),
+        t("DAIKIN2", daikin.kDaikin2HdrMark, daikin.kDaikin2HdrSpace,
+          daikin.kDaikin2BitMark, daikin.kDaikin2OneSpace, daikin.kDaikin2ZeroSpace),
+        t("DAIKIN216", daikin.kDaikin216HdrMark, daikin.kDaikin216HdrSpace,
+          daikin.kDaikin216BitMark, daikin.kDaikin216OneSpace, daikin.kDaikin216ZeroSpace),
+        t("DAIKIN160", daikin.kDaikin160HdrMark, daikin.kDaikin160HdrSpace,
+          daikin.kDaikin160BitMark, daikin.kDaikin160OneSpace, daikin.kDaikin160ZeroSpace),
+        t("DAIKIN176", daikin.kDaikin176HdrMark, daikin.kDaikin176HdrSpace,
+          daikin.kDaikin176BitMark, daikin.kDaikin176OneSpace, daikin.kDaikin176ZeroSpace),
+        t("DAIKIN128", daikin.kDaikin128HdrMark, daikin.kDaikin128HdrSpace,
+          daikin.kDaikin128BitMark, daikin.kDaikin128OneSpace, daikin.kDaikin128ZeroSpace),
+        t("PANASONIC_AC", panasonic.kPanasonicHdrMark, panasonic.kPanasonicHdrSpace,
+          panasonic.kPanasonicBitMark, panasonic.kPanasonicOneSpace,
+          panasonic.kPanasonicZeroSpace),
+        t("PANASONIC_AC32", panasonic.kPanasonicAc32HdrMark, panasonic.kPanasonicAc32HdrSpace,
+          panasonic.kPanasonicAc32BitMark, panasonic.kPanasonicAc32OneSpace,
+          panasonic.kPanasonicAc32ZeroSpace),
+        t("LG", lg.kLgHdrMark, lg.kLgHdrSpace, lg.kLgBitMark, lg.kLgOneSpace, lg.kLgZeroSpace),
+        t("LG2", lg.kLg2HdrMark, lg.kLg2HdrSpace, lg.kLg2BitMark, lg.kLgOneSpace,
+          lg.kLgZeroSpace),
+        t("MITSUBISHI_AC", mitsubishi.kMitsubishiAcHdrMark, mitsubishi.kMitsubishiAcHdrSpace,
+          mitsubishi.kMitsubishiAcBitMark, mitsubishi.kMitsubishiAcOneSpace,
+          mitsubishi.kMitsubishiAcZeroSpace),
+        t("MITSUBISHI136", mitsubishi.kMitsubishi136HdrMark,
+          mitsubishi.kMitsubishi136HdrSpace, mitsubishi.kMitsubishi136BitMark,
+          mitsubishi.kMitsubishi136OneSpace, mitsubishi.kMitsubishi136ZeroSpace),
+        t("MITSUBISHI112", mitsubishi.kMitsubishi112HdrMark,
+          mitsubishi.kMitsubishi112HdrSpace, mitsubishi.kMitsubishi112BitMark,
+          mitsubishi.kMitsubishi112OneSpace, mitsubishi.kMitsubishi112ZeroSpace),
+        t("MITSUBISHI_HEAVY", mitsubishi.kMitsubishiHeavyHdrMark,
+          mitsubishi.kMitsubishiHeavyHdrSpace, mitsubishi.kMitsubishiHeavyBitMark,
+          mitsubishi.kMitsubishiHeavyOneSpace, mitsubishi.kMitsubishiHeavyZeroSpace),
+        t("GREE", gree.kGreeHdrMark, gree.kGreeHdrSpace, gree.kGreeBitMark,
+          gree.kGreeOneSpace, gree.kGreeZeroSpace),
+        t("HAIER_AC", haier.kHaierAcHdr, haier.kHaierAcHdr, haier.kHaierAcBitMark,
+          haier.kHaierAcOneSpace, haier.kHaierAcZeroSpace),
+    ]
+    return _templates
+
+
+def _median(values: Sequence[int]) -> float:
+    ordered = sorted(values)
+    n = len(ordered)
+    if not n:
+        return 0.0
+    mid = n // 2
+    return float(ordered[mid]) if n % 2 else (ordered[mid - 1] + ordered[mid]) / 2.0
+
+
+def _split_two_clusters(values: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """1-D two-means split of the data-bit spaces into short and long."""
+    lo, hi = min(values), max(values)
+    threshold = (lo + hi) / 2.0
+    for _ in range(8):  # Converges in two or three rounds in practice.
+        short = [v for v in values if v <= threshold]
+        long = [v for v in values if v > threshold]
+        if not short or not long:
+            break
+        new_threshold = (sum(short) / len(short) + sum(long) / len(long)) / 2.0
+        if new_threshold == threshold:
+            break
+        threshold = new_threshold
+    return [v for v in values if v <= threshold], [v for v in values if v > threshold]
+
+
+def measureTimingFeatures(rawbuf: Sequence[int], offset: int = 0) -> Optional[Tuple[int, ...]]:
+    """
+    Measure the capture's header mark/space, bit mark and short/long bit spaces.
+
+    @param rawbuf Timings, alternating mark/space, starting with a mark.
+    @param offset Index of the first mark to consider.
+    @return (hdrmark, hdrspace, bitmark, short_space, long_space) or None if
+        the capture doesn't look like a pulse-distance message, or any of them
+        is not positive.
+    """
+    marks = rawbuf[offset::2]
+    spaces = rawbuf[offset + 1 :: 2]
+    if len(spaces) < kSkewMinPairs:
+        return None
+
+    bitmark = _median(marks)
+    if bitmark <= 0:
+        return None
+
+    # The header is the longest mark. Jitter can make a later header (or a
+    # Haier-style double header) the longest, so anchor on the first one close
+    # to it, and take the space that follows.
+    longest = max(marks[: len(spaces)])
+    hdr_index = next(i for i in range(len(spaces)) if marks[i] >= 0.85 * longest)
+    hdrmark = marks[hdr_index]
+    hdrspace = spaces[hdr_index]
+    if hdrmark < 2 * bitmark:
+        return None  # No header to anchor the fit on.
+
+    # Data-bit spaces sit between two bit marks; header spaces follow a header
+    # mark, and the gaps between sections (e.g. Samsung A/C's) precede one.
+    limit = bitmark * kSkewBitSpaceLimit
+    bit_spaces = [
+        s
+        for m, s, following in zip(marks, spaces, marks[1:])
+        if m < 2 * bitmark and following < 2 * bitmark and 0 < s <= limit
+    ]
+    if len(bit_spaces) < kSkewMinPairs:
+        return None
+    short, long = _split_two_clusters(bit_spaces)
+    if not short or not long:
+        return None
+    measured = (hdrmark, hdrspace, int(bitmark), int(_median(short)), int(_median(long)))
+    if min(measured) <= 0:
+        return None  # e.g. a 0us header space: nothing to fit relative errors against.
+    return measured
+
+
+def _fitResidualAt(
+    measured: Tuple[int, ...], template: timing_template_t, scale: float, excess: float
+) -> float:
+    """Relative RMS residual of a template at a fixed scale and excess."""
+    hdrmark, hdrspace, bitmark, short_space, long_space = measured
+    rows = (
+        (template.hdrmark, 1.0, hdrmark),
+        (template.bitmark, 1.0, bitmark),
+        (template.hdrspace, -1.0, hdrspace),
+        (template.short_space, -1.0, short_space),
+        (template.long_space, -1.0, long_space),
+    )
+    err = 0.0
+    for nominal, sign, value in rows:
+        err += ((scale * nominal + sign * excess - value) / value) ** 2
+    return (err / len(rows)) ** 0.5
+
+
+def _fitTemplate(
+    measured: Tuple[int, ...], template: timing_template_t
+) -> Tuple[float, float, float]:
+    """
+    Least-squares fit of (scale, mark_excess) mapping a template onto a capture.
+
+    Each observation is weighted by 1/measured so the fit minimises relative
+    error, which is what the decoders' percentage tolerances care about.
+
+    @return (scale, mark_excess, relative RMS residual)
+    """
+    hdrmark, hdrspace, bitmark, short_space, long_space = measured
+    # (nominal, sign of excess, measured): marks gain the excess, spaces lose it.
+    rows = (
+        (template.hdrmark, 1.0, hdrmark),
+        (template.bitmark, 1.0, bitmark),
+        (template.hdrspace, -1.0, hdrspace),
+        (template.short_space, -1.0, short_space),
+        (template.long_space, -1.0, long_space),
+    )
+    # Normal equations for the 2x2 weighted system.
+    saa = sab = sbb = say = sby = 0.0
+    for nominal, sign, value in rows:
+        w = 1.0 / (value * value)
+        saa += w * nominal * nominal
+        sab += w * nominal * sign
+        sbb += w * sign * sign
+        say += w * nominal * value
+        sby += w * sign * value
+    det = saa * sbb - sab * sab
+    if not det:
+        return 1.0, 0.0, float("inf")
+    scale = (say * sbb - sab * sby) / det
+    excess = (saa * sby - sab * say) / det
+    return scale, excess, _fitResidualAt(measured, template, scale, excess)
+
+
+def estimateTimingSkew(rawbuf: Sequence[int], offset: int = 0) -> Optional[timing_skew_t]:
+    """
+    Estimate a capture's global time scale and mark excess.
+
+    Runs in linear time over the capture plus a constant-size fit against each
+    known timing template.
+
+    @param rawbuf Timings, alternating mark/space, starting with a mark.
+    @param offset Index of the first mark to consider.
+    @return The best-fitting skew, or None if the capture can't be fitted with
+        confidence. A capture that already matches a template at nominal
+        timing is reported with scale 1.0 and no excess.
+    """
+    measured = measureTimingFeatures(rawbuf, offset)
+    if measured is None:
+        return None
+
+    best: Optional[timing_skew_t] = None
+    for template in getTimingTemplates():
+        scale, excess, residual = _fitTemplate(measured, template)
+        if scale <= 0 or residual > kSkewMaxResidual:
+            continue
+        # Already nominal for this protocol: nothing to correct.
+        identity = _fitResidualAt(measured, template, 1.0, 0.0)
+        if identity <= kSkewNominalScaleError:
+            return timing_skew_t(1.0, 0.0, template.name, identity)
+        if best is None or residual < best.residual:
+            best = timing_skew_t(scale, excess, template.name, residual)
+    return best
+
+
+def normalizeTimings(rawbuf: Sequence[int], skew: timing_skew_t, offset: int = 0) -> List[int]:
+    """
+    Map a skewed capture back onto nominal timings.
+
+    @param rawbuf Timings, alternating mark/space, starting with a mark at `offset`.
+    @param skew The estimate from estimateTimingSkew().
+    @param offset Index of the first mark. Entries before it are copied as-is.
+    @return A new timing list; the input is left untouched.
+    """
+    scale = skew.scale
+    excess = skew.mark_excess
+    result = list(rawbuf)
+    for i in range(offset, len(result)):
+        if (i - offset) % 2 == 0:  # Mark
+            value = (result[i] - excess) / scale
+        else:  # Space
+            value = (result[i] + excess) / scale
+        result[i] = max(1, int(round(value)))
+    return result
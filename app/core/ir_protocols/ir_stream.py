@@ -0,0 +1,190 @@
+## @file
+## @brief Incremental decoding of a capture streamed as it arrives.
+## Python-only extension (no IRremoteESP8266 equivalent).
+##
+## decode() needs a whole capture. A blaster that streams its raw capture
+## while the remote is still sending can instead push the timings to a
+## stream_decoder_t in chunks of any size, and hear back as soon as there is
+## something to tell:
+##
+##  - While a frame arrives, its header and bit timings are matched against
+##    the nominal timings of every pulse-distance family (see ir_skew.py).
+##    Each family the frame stops fitting is dropped, and every change to the
+##    candidates is reported, so most families are ruled out within the first
+##    two timings of a frame.
+##  - A space of at least kStreamFrameGap ends a frame. If any family still
+##    fits it, decode() runs on the capture so far, and a capture that
+##    decodes is reported then and there; the rest of it is skipped.
+##  - A space of at least kStreamCaptureGap (or end()) ends the capture. If
+##    it hasn't decoded yet, decode() runs on all of it, whatever the
+##    candidates, and its result is reported either way.
+##
+## A capture therefore decodes to what decode() makes of its timings up to
+## the frame it is reported at. The candidates only decide when to try
+## early; the final attempt doesn't depend on them, so protocols without a
+## template are still decoded once the capture is complete.
+##
+## With a budget (see decode_budget.py), a capture holding more timings than
+## it allows, or a decode() attempt running out of time, is reported as an
+## error; so is a capture decode() raises on. The rest of that capture is
+## skipped, and the next one decoded.
+
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+
+from app.core.decode_budget import DecodeBudget, TuyaCodeError
+from app.core.ir_protocols.ir_dispatcher import decode
+from app.core.ir_protocols.ir_recv import decode_results, matchAtLeast, matchMark, matchSpace
+from app.core.ir_protocols.ir_skew import getTimingTemplates, timing_template_t
+
+# decode()'s widest matching tolerance: Fujitsu's 25% plus its 25% extra.
+kStreamTolerance = 50  # Percent.
+# Longer than any header space (LG2's 9900us, Samsung A/C's 8864us); as long
+# as the shortest gaps between the sections of a message (e.g. Panasonic A/C).
+kStreamFrameGap = 10000  # uSeconds.
+# The gap IRremoteESP8266 assumes between messages (kDefaultMessageGap).
+kStreamCaptureGap = 100000  # uSeconds.
+
+
+## Something the stream decoder has learned.
+@dataclass
+class stream_event_t:
+    kind: str  # "candidates", "decoded", "unknown" or "error"
+    capture: int  # The capture's position in the stream, from 0.
+    frame: int  # The frame's position in the capture, from 0.
+    # "candidates": the families the frame's timings still fit.
+    protocols: List[str] = field(default_factory=list)
+    results: Optional[decode_results] = None  # "decoded": what decode() made of it.
+    # "decoded" & "unknown": the capture's timings, up to the end of the frame.
+    timings: List[int] = field(default_factory=list)
+    # "error": the budget the capture exceeded, or why decode() failed on it.
+    error: Optional[TuyaCodeError] = None
+
+
+## Does a frame's timing at position j (from its header mark) fit a family?
+def _fitsTemplate(template: timing_template_t, j: int, duration: int) -> bool:
+    tolerance = kStreamTolerance
+    if j == 0:
+        return matchMark(duration, template.hdrmark, tolerance)
+    if j == 1:
+        return matchSpace(duration, template.hdrspace, tolerance)
+    if j % 2 == 0:  # A bit mark, or a section's header mark.
+        return matchMark(duration, template.bitmark, tolerance) or matchMark(
+            duration, template.hdrmark, tolerance
+        )
+    # A bit space, or a longer one: a section's header space, or the gap before it.
+    return matchSpace(duration, template.short_space, tolerance) or matchAtLeast(
+        duration, template.long_space, tolerance
+    )
+
+
+## Decodes the captures in a stream of timings as they arrive.
+class stream_decoder_t:
+    ## @param[in] budget A budget (see decode_budget.py) bounding each capture's
+    ##   timings and each decode() attempt's time, or None for no limit.
+    def __init__(self, budget: Optional[DecodeBudget] = None):
+        self.budget = budget
+        self.capture = 0  # Captures ended so far.
+        self._reset()
+
+    def _reset(self) -> None:
+        self.timings: List[int] = []  # The current capture's timings.
+        self.count = 0  # Its timings, including those skipped.
+        self.frame = 0  # The current frame's position in the capture.
+        self.frame_start = 0  # Its header mark's position in timings.
+        self.candidates = list(getTimingTemplates())  # Families it still fits.
+        self.done = False  # Decoded, or over budget: the rest is skipped.
+
+    ## Decode the next timings of the stream.
+    ## @param[in] chunk Durations in uSeconds, alternately marks and spaces,
+    ##   continuing from the previous chunk; a stream starts with a mark.
+    ## @return What was learned from them, in order. A capture that exceeds the
+    ##   budget, or that decode() raises on, is reported as an error and skipped
+    ##   up to its end.
+    def feed(self, chunk: Iterable[int]) -> List[stream_event_t]:
+        events: List[stream_event_t] = []
+        for duration in chunk:
+            self._push(int(duration), events)
+        return events
+
+    ## End the current capture, as a long enough space would.
+    ## @return What was learned from it: its result, if it hadn't decoded yet.
+    def end(self) -> List[stream_event_t]:
+        events: List[stream_event_t] = []
+        self._endCapture(events)
+        return events
+
+    def _push(self, duration: int, events: List[stream_event_t]) -> None:
+        space = self.count % 2 == 1
+        if space and duration >= kStreamCaptureGap:
+            self._endCapture(events)
+            return
+        self.count += 1
+        if self.done:
+            return
+        if self.budget is not None:
+            try:
+                self.budget.check_timings(len(self.timings) + 1)
+            except TuyaCodeError as e:
+                self._fail(e, events)
+                return
+        self.timings.append(duration)
+        if space and duration >= kStreamFrameGap:
+            # The frame is complete; try the capture so far if it still fits a family.
+            if self.candidates and self._tryDecode(len(self.timings) - 1, events):
+                return
+            self.frame += 1
+            self.frame_start = len(self.timings)
+            self.candidates = list(getTimingTemplates())
+            return
+        j = len(self.timings) - 1 - self.frame_start
+        kept = [t for t in self.candidates if _fitsTemplate(t, j, duration)]
+        if len(kept) != len(self.candidates):
+            self.candidates = kept
+            events.append(
+                stream_event_t("candidates", self.capture, self.frame, [t.name for t in kept])
+            )
+
+    ## Run decode() on the first length timings of the capture.
+    ## @return True if they decoded, and an event reported it.
+    def _tryDecode(self, length: int, events: List[stream_event_t]) -> bool:
+        results = decode_results()
+        results.rawbuf = self.timings[:length]
+        results.rawlen = length
+        try:
+            decoded = decode(results, budget=self.budget.start() if self.budget else None)
+        except IndexError:  # A decoder read past the end: the frame isn't all there yet.
+            return False
+        except TuyaCodeError as e:
+            self._fail(e, events)
+            return False
+        except Exception as e:  # A decoder bug must not end the stream.
+            error = TuyaCodeError(f"Decoding failed: {type(e).__name__}: {e}", "decode_failed", 422)
+            self._fail(error, events)
+            return False
+        if decoded:
+            self.done = True
+            events.append(
+                stream_event_t(
+                    "decoded",
+                    self.capture,
+                    self.frame,
+                    results=results,
+                    timings=self.timings[:length],
+                )
+            )
+        return decoded
+
+    def _fail(self, error: TuyaCodeError, events: List[stream_event_t]) -> None:
+        self.done = True
+        events.append(stream_event_t("error", self.capture, self.frame, error=error))
+
+    def _endCapture(self, events: List[stream_event_t]) -> None:
+        if self.timings and not self.done and not self._tryDecode(len(self.timings), events):
+            if not self.done:  # It didn't fail either.
+                events.append(
+                    stream_event_t("unknown", self.capture, self.frame, timings=self.timings)
+                )
+        if self.count:
+            self.capture += 1
+        self._reset()
@@ -18,6 +18,7 @@
 ## @see https://github.com/crankyoldgit/IRremoteESP8266/issues/1745
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Supports:
 #   Brand: Kelon,  Model: ON/OFF 9000-12000 (KELON)
@@ -72,194 +73,39 @@ kKelonMaxTemp = 32
 
 ## Native representation of a Kelon A/C message.
 ## This is a direct translation of the C++ union/struct (from ir_Kelon.h lines 34-55)
-class KelonProtocol:
+class KelonProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # 64-bit raw value
         self.raw = 0
 
-    # Helper to get/set bytes in raw
-    def _get_byte(self, idx: int) -> int:
-        return (self.raw >> (idx * 8)) & 0xFF
-
-    def _set_byte(self, idx: int, value: int) -> None:
-        mask = 0xFF << (idx * 8)
-        self.raw = (self.raw & ~mask) | ((value & 0xFF) << (idx * 8))
-
     # preamble[0] - byte 0 (from ir_Kelon.h line 38)
-    @property
-    def preamble0(self) -> int:
-        return self._get_byte(0)
-
-    @preamble0.setter
-    def preamble0(self, value: int) -> None:
-        self._set_byte(0, value)
+    preamble0 = field(0)
 
     # preamble[1] - byte 1 (from ir_Kelon.h line 38)
-    @property
-    def preamble1(self) -> int:
-        return self._get_byte(1)
-
-    @preamble1.setter
-    def preamble1(self, value: int) -> None:
-        self._set_byte(1, value)
+    preamble1 = field(1)
 
     # byte 2 (from ir_Kelon.h lines 39-44)
-    @property
-    def Fan(self) -> int:
-        return (self._get_byte(2) >> 0) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        byte = self._get_byte(2)
-        byte = (byte & 0xFC) | ((value & 0x03) << 0)
-        self._set_byte(2, byte)
-
-    @property
-    def PowerToggle(self) -> int:
-        return (self._get_byte(2) >> 2) & 0x01
-
-    @PowerToggle.setter
-    def PowerToggle(self, value: bool) -> None:
-        byte = self._get_byte(2)
-        if value:
-            byte |= 1 << 2
-        else:
-            byte &= ~(1 << 2)
-        self._set_byte(2, byte)
-
-    @property
-    def SleepEnabled(self) -> int:
-        return (self._get_byte(2) >> 3) & 0x01
-
-    @SleepEnabled.setter
-    def SleepEnabled(self, value: bool) -> None:
-        byte = self._get_byte(2)
-        if value:
-            byte |= 1 << 3
-        else:
-            byte &= ~(1 << 3)
-        self._set_byte(2, byte)
-
-    @property
-    def DehumidifierGrade(self) -> int:
-        return (self._get_byte(2) >> 4) & 0x07
-
-    @DehumidifierGrade.setter
-    def DehumidifierGrade(self, value: int) -> None:
-        byte = self._get_byte(2)
-        byte = (byte & 0x8F) | ((value & 0x07) << 4)
-        self._set_byte(2, byte)
-
-    @property
-    def SwingVToggle(self) -> int:
-        return (self._get_byte(2) >> 7) & 0x01
-
-    @SwingVToggle.setter
-    def SwingVToggle(self, value: bool) -> None:
-        byte = self._get_byte(2)
-        if value:
-            byte |= 1 << 7
-        else:
-            byte &= ~(1 << 7)
-        self._set_byte(2, byte)
+    Fan = field(2, 0, 2)
+    PowerToggle = field(2, 2, 1)
+    SleepEnabled = field(2, 3, 1)
+    DehumidifierGrade = field(2, 4, 3)
+    SwingVToggle = field(2, 7, 1)
 
     # byte 3 (from ir_Kelon.h lines 45-47)
-    @property
-    def Mode(self) -> int:
-        return (self._get_byte(3) >> 0) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        byte = self._get_byte(3)
-        byte = (byte & 0xF8) | ((value & 0x07) << 0)
-        self._set_byte(3, byte)
-
-    @property
-    def TimerEnabled(self) -> int:
-        return (self._get_byte(3) >> 3) & 0x01
-
-    @TimerEnabled.setter
-    def TimerEnabled(self, value: bool) -> None:
-        byte = self._get_byte(3)
-        if value:
-            byte |= 1 << 3
-        else:
-            byte &= ~(1 << 3)
-        self._set_byte(3, byte)
-
-    @property
-    def Temperature(self) -> int:
-        return (self._get_byte(3) >> 4) & 0x0F
-
-    @Temperature.setter
-    def Temperature(self, value: int) -> None:
-        byte = self._get_byte(3)
-        byte = (byte & 0x0F) | ((value & 0x0F) << 4)
-        self._set_byte(3, byte)
+    Mode = field(3, 0, 3)
+    TimerEnabled = field(3, 3, 1)
+    Temperature = field(3, 4, 4)
 
     # byte 4 (from ir_Kelon.h lines 48-50)
-    @property
-    def TimerHalfHour(self) -> int:
-        return (self._get_byte(4) >> 0) & 0x01
-
-    @TimerHalfHour.setter
-    def TimerHalfHour(self, value: bool) -> None:
-        byte = self._get_byte(4)
-        if value:
-            byte |= 1 << 0
-        else:
-            byte &= ~(1 << 0)
-        self._set_byte(4, byte)
-
-    @property
-    def TimerHours(self) -> int:
-        return (self._get_byte(4) >> 1) & 0x3F
-
-    @TimerHours.setter
-    def TimerHours(self, value: int) -> None:
-        byte = self._get_byte(4)
-        byte = (byte & 0x81) | ((value & 0x3F) << 1)
-        self._set_byte(4, byte)
-
-    @property
-    def SmartModeEnabled(self) -> int:
-        return (self._get_byte(4) >> 7) & 0x01
-
-    @SmartModeEnabled.setter
-    def SmartModeEnabled(self, value: bool) -> None:
-        byte = self._get_byte(4)
-        if value:
-            byte |= 1 << 7
-        else:
-            byte &= ~(1 << 7)
-        self._set_byte(4, byte)
+    TimerHalfHour = field(4, 0, 1)
+    TimerHours = field(4, 1, 6)
+    SmartModeEnabled = field(4, 7, 1)
 
     # byte 5 (from ir_Kelon.h lines 51-54)
-    @property
-    def SuperCoolEnabled1(self) -> int:
-        return (self._get_byte(5) >> 4) & 0x01
-
-    @SuperCoolEnabled1.setter
-    def SuperCoolEnabled1(self, value: bool) -> None:
-        byte = self._get_byte(5)
-        if value:
-            byte |= 1 << 4
-        else:
-            byte &= ~(1 << 4)
-        self._set_byte(5, byte)
-
-    @property
-    def SuperCoolEnabled2(self) -> int:
-        return (self._get_byte(5) >> 7) & 0x01
-
-    @SuperCoolEnabled2.setter
-    def SuperCoolEnabled2(self, value: bool) -> None:
-        byte = self._get_byte(5)
-        if value:
-            byte |= 1 << 7
-        else:
-            byte &= ~(1 << 7)
-        self._set_byte(5, byte)
+    SuperCoolEnabled1 = field(5, 4, 1)
+    SuperCoolEnabled2 = field(5, 7, 1)
 
 
 ## Send a Kelon 48-bit message.
@@ -6,6 +6,7 @@
 ## Direct translation from IRremoteESP8266 ir_Kelvinator.cpp and ir_Kelvinator.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Ref: ir_Kelvinator.cpp lines 29-48
 
@@ -85,162 +86,43 @@ def calcBlockChecksum(block: List[int], length: int = 8) -> int:
 
 ## Native representation of a Kelvinator A/C message.
 ## This is a direct translation of the C++ union/struct (ir_Kelvinator.h lines 36-90)
-class KelvinatorProtocol:
+class KelvinatorProtocol(BitfieldStruct, buffer="remote_state"):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state array (16 bytes for Kelvinator)
-        self.remote_state = [0] * 16
+        self.remote_state = bytearray(16)
 
     # Byte 0
-    @property
-    def Mode(self) -> int:
-        return self.remote_state[0] & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state[0] = (self.remote_state[0] & 0xF8) | (value & 0x07)
-
-    @property
-    def Power(self) -> int:
-        return (self.remote_state[0] >> 3) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state[0] |= 0x08
-        else:
-            self.remote_state[0] &= 0xF7
-
-    @property
-    def BasicFan(self) -> int:
-        return (self.remote_state[0] >> 4) & 0x03
-
-    @BasicFan.setter
-    def BasicFan(self, value: int) -> None:
-        self.remote_state[0] = (self.remote_state[0] & 0xCF) | ((value & 0x03) << 4)
-
-    @property
-    def SwingAuto(self) -> int:
-        return (self.remote_state[0] >> 6) & 0x01
-
-    @SwingAuto.setter
-    def SwingAuto(self, value: bool) -> None:
-        if value:
-            self.remote_state[0] |= 0x40
-        else:
-            self.remote_state[0] &= 0xBF
+    Mode = field(0, 0, 3)
+    Power = field(0, 3, 1)
+    BasicFan = field(0, 4, 2)
+    SwingAuto = field(0, 6, 1)
 
     # Byte 1
-    @property
-    def Temp(self) -> int:
-        return self.remote_state[1] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state[1] = (self.remote_state[1] & 0xF0) | (value & 0x0F)
+    Temp = field(1, 0, 4)
 
     # Byte 2
-    @property
-    def Turbo(self) -> int:
-        return (self.remote_state[2] >> 4) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x10
-        else:
-            self.remote_state[2] &= 0xEF
-
-    @property
-    def Light(self) -> int:
-        return (self.remote_state[2] >> 5) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x20
-        else:
-            self.remote_state[2] &= 0xDF
-
-    @property
-    def IonFilter(self) -> int:
-        return (self.remote_state[2] >> 6) & 0x01
-
-    @IonFilter.setter
-    def IonFilter(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x40
-        else:
-            self.remote_state[2] &= 0xBF
-
-    @property
-    def XFan(self) -> int:
-        return (self.remote_state[2] >> 7) & 0x01
-
-    @XFan.setter
-    def XFan(self, value: bool) -> None:
-        if value:
-            self.remote_state[2] |= 0x80
-        else:
-            self.remote_state[2] &= 0x7F
+    Turbo = field(2, 4, 1)
+    Light = field(2, 5, 1)
+    IonFilter = field(2, 6, 1)
+    XFan = field(2, 7, 1)
 
     # Byte 4
-    @property
-    def SwingV(self) -> int:
-        return self.remote_state[4] & 0x0F
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.remote_state[4] = (self.remote_state[4] & 0xF0) | (value & 0x0F)
-
-    @property
-    def SwingH(self) -> int:
-        return (self.remote_state[4] >> 4) & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.remote_state[4] |= 0x10
-        else:
-            self.remote_state[4] &= 0xEF
+    SwingV = field(4, 0, 4)
+    SwingH = field(4, 4, 1)
 
     # Byte 7
-    @property
-    def Sum1(self) -> int:
-        return (self.remote_state[7] >> 4) & 0x0F
-
-    @Sum1.setter
-    def Sum1(self, value: int) -> None:
-        self.remote_state[7] = (self.remote_state[7] & 0x0F) | ((value & 0x0F) << 4)
+    Sum1 = field(7, 4, 4)
 
     # Byte 12
-    @property
-    def Quiet(self) -> int:
-        return (self.remote_state[12] >> 7) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: bool) -> None:
-        if value:
-            self.remote_state[12] |= 0x80
-        else:
-            self.remote_state[12] &= 0x7F
+    Quiet = field(12, 7, 1)
 
     # Byte 14
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state[14] >> 4) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state[14] = (self.remote_state[14] & 0x8F) | ((value & 0x07) << 4)
+    Fan = field(14, 4, 3)
 
     # Byte 15
-    @property
-    def Sum2(self) -> int:
-        return (self.remote_state[15] >> 4) & 0x0F
-
-    @Sum2.setter
-    def Sum2(self, value: int) -> None:
-        self.remote_state[15] = (self.remote_state[15] & 0x0F) | ((value & 0x0F) << 4)
+    Sum2 = field(15, 4, 4)
 
 
 ## Send a Kelvinator A/C message.
@@ -615,7 +497,7 @@ class IRKelvinatorAC:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## Direct translation from ir_Kelvinator.cpp lines 147-150
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.fixup()  # Ensure correct settings before sending.
         return self._.remote_state
 
@@ -12,6 +12,8 @@
 ## Direct translation from IRremoteESP8266 ir_LG.cpp and ir_LG.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumNibbles
 
 # Supports:
 #   Brand: LG,  Model: 6711A20083V remote (LG - LG6711A20083V)
@@ -270,14 +272,6 @@ def encodeLG(address: int, command: int) -> int:
     EXACT translation from IRremoteESP8266 IRsend::encodeLG (ir_LG.cpp:132-135)
     """
 
-    def sumNibbles(data, nibbles):
-        """Sum nibbles (4-bit chunks)"""
-        total = 0
-        for _ in range(nibbles):
-            total += data & 0xF
-            data >>= 4
-        return total & 0xF
-
     return (address << 20) | (command << kLgAcChecksumSize) | sumNibbles(command, 4)
 
 
@@ -306,14 +300,6 @@ def decodeLG(results, offset: int = 1, nbits: int = kLgBits, strict: bool = True
     """
     from app.core.ir_protocols.ir_recv import _matchGeneric, matchMark, kHeader, kFooter
 
-    def sumNibbles(data, nibbles):
-        """Sum nibbles (4-bit chunks)"""
-        total = 0
-        for _ in range(nibbles):
-            total += data & 0xF
-            data >>= 4
-        return total & 0xF
-
     if nbits >= kLg32Bits:
         if results.rawlen <= 2 * nbits + 2 * (kHeader + kFooter) - 1 + offset:
             return False  # Can't possibly be a valid LG32 message.
@@ -431,58 +417,19 @@ def decodeLG(results, offset: int = 1, nbits: int = kLgBits, strict: bool = True
 
 ## Native representation of a LG A/C message.
 ## EXACT translation from IRremoteESP8266 ir_LG.h:40-51
-class LGProtocol:
+class LGProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         self.raw = 0  # The state of the IR remote in IR code form (32-bit).
 
     # Bit fields
-    @property
-    def Sum(self) -> int:
-        return self.raw & 0x0F
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFF0) | (value & 0x0F)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 4) & 0x0F
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFF0F) | ((value & 0x0F) << 4)
-
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 8) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFF0FF) | ((value & 0x0F) << 8)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 12) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFF8FFF) | ((value & 0x07) << 12)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 18) & 0x03
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFF3FFFF) | ((value & 0x03) << 18)
-
-    @property
-    def Sign(self) -> int:
-        return (self.raw >> 20) & 0xFF
-
-    @Sign.setter
-    def Sign(self, value: int) -> None:
-        self.raw = (self.raw & 0xF00FFFFF) | ((value & 0xFF) << 20)
+    Sum = field(0, 0, 4)
+    Fan = field(0, 4, 4)
+    Temp = field(1, 0, 4)
+    Mode = field(1, 4, 3)
+    Power = field(2, 2, 2)
+    Sign = field(2, 4)
 
 
 ## Class for handling detailed LG A/C messages.
@@ -616,14 +563,6 @@ class IRLgAc:
     ## EXACT translation from IRremoteESP8266 ir_LG.cpp:395-400
     @staticmethod
     def calcChecksum(state: int) -> int:
-        def sumNibbles(data, nibbles):
-            """Sum nibbles (4-bit chunks)"""
-            total = 0
-            for _ in range(nibbles):
-                total += data & 0xF
-                data >>= 4
-            return total & 0xF
-
         return sumNibbles(state >> kLgAcChecksumSize, 4)
 
     ## Verify the checksum is valid for a given state.
@@ -6,6 +6,8 @@
 ## Direct translation from IRremoteESP8266 ir_Midea.cpp and ir_Midea.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBITS64, reverseBits
 
 # Constants - Timing values for MIDEA protocol (from ir_Midea.cpp lines 22-36)
 kMideaTick = 80
@@ -69,22 +71,6 @@ kMideaACTypeSpecial = 0b010
 kMideaACTypeFollow = 0b100
 
 
-def reverseBits(data: int, nbits: int) -> int:
-    """Reverse bits in a value. EXACT translation from IRutils."""
-    result = 0
-    for i in range(nbits):
-        result <<= 1
-        result |= data & 1
-        data >>= 1
-    return result & ((1 << nbits) - 1)
-
-
-def GETBITS64(data: int, offset: int, nbits: int) -> int:
-    """Extract bits from uint64. EXACT translation from IRutils."""
-    mask = (1 << nbits) - 1
-    return (data >> offset) & mask
-
-
 def fahrenheitToCelsius(temp: float) -> float:
     """Convert Fahrenheit to Celsius"""
     return (temp - 32.0) / 1.8
@@ -97,142 +83,51 @@ def celsiusToFahrenheit(temp: float) -> float:
 
 ## Native representation of a Midea A/C message.
 ## Direct translation of the C++ union/struct (ir_Midea.h lines 71-107)
-class MideaProtocol:
+class MideaProtocol(BitfieldStruct, buffer="remote_state", integer=True):
+    __slots__ = ("remote_state",)
+
     def __init__(self):
         # The state in native IR code form (64-bit, only 48 bits used)
         self.remote_state = 0
 
     # Byte 0 - Sum (checksum)
-    @property
-    def Sum(self) -> int:
-        return self.remote_state & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~0xFF) | (value & 0xFF)
+    Sum = field(0)
 
     # Byte 1 - SensorTemp / OnTimer (bits 0-6)
-    @property
-    def SensorTemp(self) -> int:
-        return (self.remote_state >> 8) & 0x7F
-
-    @SensorTemp.setter
-    def SensorTemp(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x7F << 8)) | ((value & 0x7F) << 8)
+    SensorTemp = field(1, 0, 7)
 
     # Byte 1 - disableSensor (bit 7)
-    @property
-    def disableSensor(self) -> int:
-        return (self.remote_state >> 15) & 0x01
-
-    @disableSensor.setter
-    def disableSensor(self, value: bool) -> None:
-        if value:
-            self.remote_state |= 1 << 15
-        else:
-            self.remote_state &= ~(1 << 15)
+    disableSensor = field(1, 7, 1)
 
     # Byte 2 - OffTimer (bits 1-6)
-    @property
-    def OffTimer(self) -> int:
-        return (self.remote_state >> 17) & 0x3F
-
-    @OffTimer.setter
-    def OffTimer(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x3F << 17)) | ((value & 0x3F) << 17)
+    OffTimer = field(2, 1, 6)
 
     # Byte 2 - BeepDisable (bit 7)
-    @property
-    def BeepDisable(self) -> int:
-        return (self.remote_state >> 23) & 0x01
-
-    @BeepDisable.setter
-    def BeepDisable(self, value: bool) -> None:
-        if value:
-            self.remote_state |= 1 << 23
-        else:
-            self.remote_state &= ~(1 << 23)
+    BeepDisable = field(2, 7, 1)
 
     # Byte 3 - Temp (bits 0-4)
-    @property
-    def Temp(self) -> int:
-        return (self.remote_state >> 24) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x1F << 24)) | ((value & 0x1F) << 24)
+    Temp = field(3, 0, 5)
 
     # Byte 3 - useFahrenheit (bit 5)
-    @property
-    def useFahrenheit(self) -> int:
-        return (self.remote_state >> 29) & 0x01
-
-    @useFahrenheit.setter
-    def useFahrenheit(self, value: bool) -> None:
-        if value:
-            self.remote_state |= 1 << 29
-        else:
-            self.remote_state &= ~(1 << 29)
+    useFahrenheit = field(3, 5, 1)
 
     # Byte 4 - Mode (bits 0-2)
-    @property
-    def Mode(self) -> int:
-        return (self.remote_state >> 32) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x07 << 32)) | ((value & 0x07) << 32)
+    Mode = field(4, 0, 3)
 
     # Byte 4 - Fan (bits 3-4)
-    @property
-    def Fan(self) -> int:
-        return (self.remote_state >> 35) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x03 << 35)) | ((value & 0x03) << 35)
+    Fan = field(4, 3, 2)
 
     # Byte 4 - Sleep (bit 6)
-    @property
-    def Sleep(self) -> int:
-        return (self.remote_state >> 38) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.remote_state |= 1 << 38
-        else:
-            self.remote_state &= ~(1 << 38)
+    Sleep = field(4, 6, 1)
 
     # Byte 4 - Power (bit 7)
-    @property
-    def Power(self) -> int:
-        return (self.remote_state >> 39) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.remote_state |= 1 << 39
-        else:
-            self.remote_state &= ~(1 << 39)
+    Power = field(4, 7, 1)
 
     # Byte 5 - Type (bits 0-2)
-    @property
-    def Type(self) -> int:
-        return (self.remote_state >> 40) & 0x07
-
-    @Type.setter
-    def Type(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x07 << 40)) | ((value & 0x07) << 40)
+    Type = field(5, 0, 3)
 
     # Byte 5 - Header (bits 3-7)
-    @property
-    def Header(self) -> int:
-        return (self.remote_state >> 43) & 0x1F
-
-    @Header.setter
-    def Header(self, value: int) -> None:
-        self.remote_state = (self.remote_state & ~(0x1F << 43)) | ((value & 0x1F) << 43)
+    Header = field(5, 3, 5)
 
 
 ## Send a Midea message
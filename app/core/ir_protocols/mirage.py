@@ -8,6 +8,15 @@
 ## Direct translation from IRremoteESP8266 ir_Mirage.cpp and ir_Mirage.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumNibbles
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Supports:
 #   Brand: Mirage,  Model: VLU series A/C
@@ -28,6 +37,19 @@ kMirageFreq = 38000  # Hz. (Just a guess)
 # State length constants (from IRremoteESP8266.h)
 kMirageStateLength = 15
 kMirageBits = kMirageStateLength * 8  # 120 bits
+
+## Header, the state LSB first, footer, gap.
+kMirageLayout = frame_layout_t(
+    timing=bit_timing_t(kMirageBitMark, kMirageOneSpace, kMirageBitMark, kMirageZeroSpace),
+    sections=(
+        frame_section_t(
+            hdrmark=kMirageHdrMark,
+            hdrspace=kMirageHdrSpace,
+            footermark=kMirageBitMark,
+            gap=kMirageGap,
+        ),
+    ),
+)
 kMirageMinRepeat = 0  # kNoRepeat
 
 # Power constants (from ir_Mirage.cpp lines 43-44)
@@ -76,19 +98,6 @@ MIRAGE_KKG29AC1 = 1
 kNoTempValue = 255
 
 
-## Helper function for sumNibbles (array version)
-## EXACT translation from IRremoteESP8266 IRutils.cpp sumNibbles
-def sumNibbles_array(data: List[int], length: int, init: int = 0) -> int:
-    """
-    Sum all the nibbles together in an array.
-    EXACT translation from IRremoteESP8266 IRutils.cpp sumNibbles
-    """
-    sum_val = init
-    for i in range(length):
-        sum_val += (data[i] >> 4) + (data[i] & 0xF)
-    return sum_val & 0xFF
-
-
 ## Helper function for bcdToUint8
 ## EXACT translation from IRremoteESP8266 IRutils.cpp bcdToUint8
 def bcdToUint8(bcd: int) -> int:
@@ -122,318 +131,85 @@ def fahrenheitToCelsius(temp: float) -> float:
 ## Native representation of a Mirage 120-bit A/C message.
 ## This is a direct translation of the C++ union/struct
 ## @see https://docs.google.com/spreadsheets/d/1Ucu9mOOIIJoWQjUJq_VCvwgV3EwKaRk8K2AuZgccYEk/edit#gid=0
-class Mirage120Protocol:
+class Mirage120Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (15 bytes for Mirage)
-        self.raw = [0] * kMirageStateLength
+        self.raw = bytearray(kMirageStateLength)
 
     # Common fields (from ir_Mirage.h lines 34-65)
     # Byte 0
-    @property
-    def Header(self) -> int:
-        return self.raw[0]
-
-    @Header.setter
-    def Header(self, value: int) -> None:
-        self.raw[0] = value & 0xFF
+    Header = field(0)
 
     # Byte 1
-    @property
-    def Temp(self) -> int:
-        return self.raw[1]
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[1] = value & 0xFF
+    Temp = field(1)
 
     # Byte 4
-    @property
-    def Fan(self) -> int:
-        return self.raw[4] & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0xFC) | (value & 0x03)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[4] >> 4) & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0x0F) | ((value & 0x0F) << 4)
+    Fan = field(4, 0, 2)
+    Mode = field(4, 4, 4)
 
     # Byte 14
-    @property
-    def Sum(self) -> int:
-        return self.raw[14]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[14] = value & 0xFF
+    Sum = field(14)
 
     # KKG9AC1 remote fields (from ir_Mirage.h lines 67-103)
     # Byte 3
-    @property
-    def Light_Kkg9ac1(self) -> int:
-        return (self.raw[3] >> 3) & 0x01
-
-    @Light_Kkg9ac1.setter
-    def Light_Kkg9ac1(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x08
-        else:
-            self.raw[3] &= 0xF7
+    Light_Kkg9ac1 = field(3, 3, 1)
 
     # Byte 5
-    @property
-    def SwingAndPower(self) -> int:
-        return (self.raw[5] >> 1) & 0x7F
-
-    @SwingAndPower.setter
-    def SwingAndPower(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x01) | ((value & 0x7F) << 1)
+    SwingAndPower = field(5, 1, 7)
 
     # Byte 6
-    @property
-    def Sleep_Kkg9ac1(self) -> int:
-        return (self.raw[6] >> 7) & 0x01
-
-    @Sleep_Kkg9ac1.setter
-    def Sleep_Kkg9ac1(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x80
-        else:
-            self.raw[6] &= 0x7F
+    Sleep_Kkg9ac1 = field(6, 7, 1)
 
     # Byte 7
-    @property
-    def Turbo_Kkg9ac1(self) -> int:
-        return (self.raw[7] >> 3) & 0x01
-
-    @Turbo_Kkg9ac1.setter
-    def Turbo_Kkg9ac1(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x08
-        else:
-            self.raw[7] &= 0xF7
+    Turbo_Kkg9ac1 = field(7, 3, 1)
 
     # Byte 11
-    @property
-    def Seconds(self) -> int:
-        return self.raw[11]
-
-    @Seconds.setter
-    def Seconds(self, value: int) -> None:
-        self.raw[11] = value & 0xFF
+    Seconds = field(11)
 
     # Byte 12
-    @property
-    def Minutes(self) -> int:
-        return self.raw[12]
-
-    @Minutes.setter
-    def Minutes(self, value: int) -> None:
-        self.raw[12] = value & 0xFF
+    Minutes = field(12)
 
     # Byte 13
-    @property
-    def Hours(self) -> int:
-        return self.raw[13]
-
-    @Hours.setter
-    def Hours(self, value: int) -> None:
-        self.raw[13] = value & 0xFF
+    Hours = field(13)
 
     # KKG29A-C1 remote fields (from ir_Mirage.h lines 105-158)
     # Byte 3
-    @property
-    def Quiet(self) -> int:
-        return self.raw[3] & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x01
-        else:
-            self.raw[3] &= 0xFE
+    Quiet = field(3, 0, 1)
 
     # Byte 4
-    @property
-    def OffTimerEnable(self) -> int:
-        return (self.raw[4] >> 2) & 0x01
-
-    @OffTimerEnable.setter
-    def OffTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw[4] |= 0x04
-        else:
-            self.raw[4] &= 0xFB
-
-    @property
-    def OnTimerEnable(self) -> int:
-        return (self.raw[4] >> 3) & 0x01
-
-    @OnTimerEnable.setter
-    def OnTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw[4] |= 0x08
-        else:
-            self.raw[4] &= 0xF7
+    OffTimerEnable = field(4, 2, 1)
+    OnTimerEnable = field(4, 3, 1)
 
     # Byte 5
-    @property
-    def SwingH(self) -> int:
-        return self.raw[5] & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x01
-        else:
-            self.raw[5] &= 0xFE
-
-    @property
-    def SwingV(self) -> int:
-        return (self.raw[5] >> 1) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x02
-        else:
-            self.raw[5] &= 0xFD
-
-    @property
-    def LightToggle_Kkg29ac1(self) -> int:
-        return (self.raw[5] >> 2) & 0x01
-
-    @LightToggle_Kkg29ac1.setter
-    def LightToggle_Kkg29ac1(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x04
-        else:
-            self.raw[5] &= 0xFB
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[5] >> 6) & 0x03
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x3F) | ((value & 0x03) << 6)
+    SwingH = field(5, 0, 1)
+    SwingV = field(5, 1, 1)
+    LightToggle_Kkg29ac1 = field(5, 2, 1)
+    Power = field(5, 6, 2)
 
     # Byte 6
-    @property
-    def Filter(self) -> int:
-        return (self.raw[6] >> 1) & 0x01
-
-    @Filter.setter
-    def Filter(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x02
-        else:
-            self.raw[6] &= 0xFD
-
-    @property
-    def Sleep_Kkg29ac1(self) -> int:
-        return (self.raw[6] >> 3) & 0x01
-
-    @Sleep_Kkg29ac1.setter
-    def Sleep_Kkg29ac1(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x08
-        else:
-            self.raw[6] &= 0xF7
-
-    @property
-    def RecycleHeat(self) -> int:
-        return (self.raw[6] >> 6) & 0x01
-
-    @RecycleHeat.setter
-    def RecycleHeat(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x40
-        else:
-            self.raw[6] &= 0xBF
+    Filter = field(6, 1, 1)
+    Sleep_Kkg29ac1 = field(6, 3, 1)
+    RecycleHeat = field(6, 6, 1)
 
     # Byte 7
-    @property
-    def SensorTemp(self) -> int:
-        return self.raw[7] & 0x3F
-
-    @SensorTemp.setter
-    def SensorTemp(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xC0) | (value & 0x3F)
-
-    @property
-    def CleanToggle(self) -> int:
-        return (self.raw[7] >> 6) & 0x01
-
-    @CleanToggle.setter
-    def CleanToggle(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x40
-        else:
-            self.raw[7] &= 0xBF
-
-    @property
-    def IFeel(self) -> int:
-        return (self.raw[7] >> 7) & 0x01
-
-    @IFeel.setter
-    def IFeel(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x80
-        else:
-            self.raw[7] &= 0x7F
+    SensorTemp = field(7, 0, 6)
+    CleanToggle = field(7, 6, 1)
+    IFeel = field(7, 7, 1)
 
     # Byte 8
-    @property
-    def OnTimerHours(self) -> int:
-        return self.raw[8] & 0x1F
-
-    @OnTimerHours.setter
-    def OnTimerHours(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Turbo_Kkg29ac1(self) -> int:
-        return (self.raw[8] >> 7) & 0x01
-
-    @Turbo_Kkg29ac1.setter
-    def Turbo_Kkg29ac1(self, value: bool) -> None:
-        if value:
-            self.raw[8] |= 0x80
-        else:
-            self.raw[8] &= 0x7F
+    OnTimerHours = field(8, 0, 5)
+    Turbo_Kkg29ac1 = field(8, 7, 1)
 
     # Byte 9
-    @property
-    def OnTimerMins(self) -> int:
-        return self.raw[9] & 0x3F
-
-    @OnTimerMins.setter
-    def OnTimerMins(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0xC0) | (value & 0x3F)
+    OnTimerMins = field(9, 0, 6)
 
     # Byte 10
-    @property
-    def OffTimerHours(self) -> int:
-        return self.raw[10] & 0x1F
-
-    @OffTimerHours.setter
-    def OffTimerHours(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0xE0) | (value & 0x1F)
+    OffTimerHours = field(10, 0, 5)
 
     # Byte 11
-    @property
-    def OffTimerMins(self) -> int:
-        return self.raw[11] & 0x3F
-
-    @OffTimerMins.setter
-    def OffTimerMins(self, value: int) -> None:
-        self.raw[11] = (self.raw[11] & 0xC0) | (value & 0x3F)
+    OffTimerMins = field(11, 0, 6)
 
 
 ## Send a Mirage formatted message.
@@ -451,22 +227,7 @@ def sendMirage(
 
     Returns timing array instead of transmitting via hardware.
     """
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    return sendGeneric(
-        headermark=kMirageHdrMark,
-        headerspace=kMirageHdrSpace,
-        onemark=kMirageBitMark,
-        onespace=kMirageOneSpace,
-        zeromark=kMirageBitMark,
-        zerospace=kMirageZeroSpace,
-        footermark=kMirageBitMark,
-        gap=kMirageGap,
-        dataptr=data,
-        nbytes=nbytes,
-        MSBfirst=False,
-    )
+    return sendFrame(kMirageLayout, data, nbytes)
 
 
 ## Decode the supplied Mirage message.
@@ -485,30 +246,10 @@ def decodeMirage(results, offset: int = 1, nbits: int = kMirageBits, strict: boo
 
     This is the ACTUAL C++ decoder function, not a wrapper.
     """
-    # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import matchGeneric
-
     if strict and nbits != kMirageBits:
         return False  # Compliance.
 
-    if not matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_ptr=results.state,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=kMirageHdrMark,
-        hdrspace=kMirageHdrSpace,
-        onemark=kMirageBitMark,
-        onespace=kMirageOneSpace,
-        zeromark=kMirageBitMark,
-        zerospace=kMirageZeroSpace,
-        footermark=kMirageBitMark,
-        footerspace=kMirageGap,
-        atleast=True,
-        tolerance=25,  # kUseDefTol
-        excess=50,  # kMarkExcess
-        MSBfirst=False,
-    ):
+    if not matchFrame(results, offset, kMirageLayout, nbits // 8):
         return False
 
     # Compliance
@@ -566,7 +307,7 @@ class IRMirageAc:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## Direct translation from ir_Mirage.cpp lines 136-141
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -658,7 +399,7 @@ class IRMirageAc:
     ## Direct translation from ir_Mirage.cpp lines 212-217
     @staticmethod
     def calculateChecksum(data: List[int]) -> int:
-        return sumNibbles_array(data, kMirageStateLength - 1)
+        return sumNibbles(data, kMirageStateLength - 1)
 
     ## Set the requested power state of the A/C to on.
     ## Direct translation from ir_Mirage.cpp line 220
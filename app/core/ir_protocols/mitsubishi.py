@@ -10,6 +10,14 @@
 ## Also includes MitsubishiHeavy protocols from ir_MitsubishiHeavy.cpp and ir_MitsubishiHeavy.h
 
 from typing import List
+from app.core.ir_protocols.bitops import checkInvertedBytePairs
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # EXACT translation from IRremoteESP8266 ir_Mitsubishi.h:1-456
 # EXACT translation from IRremoteESP8266 ir_MitsubishiHeavy.h:1-347
@@ -31,6 +39,22 @@ kMitsubishiAcExtraTolerance = 5
 # State length constants (EXACT translation from ir_Mitsubishi.h:55-111)
 kMitsubishiACStateLength = 18
 
+## Header, the state LSB first, then the repeat mark & space.
+kMitsubishiAcLayout = frame_layout_t(
+    timing=bit_timing_t(
+        kMitsubishiAcBitMark, kMitsubishiAcOneSpace, kMitsubishiAcBitMark, kMitsubishiAcZeroSpace
+    ),
+    sections=(
+        frame_section_t(
+            hdrmark=kMitsubishiAcHdrMark,
+            hdrspace=kMitsubishiAcHdrSpace,
+            footermark=kMitsubishiAcRptMark,
+            gap=kMitsubishiAcRptSpace,
+        ),
+    ),
+    tolerance=25 + kMitsubishiAcExtraTolerance,
+)
+
 # Mode constants (EXACT translation from ir_Mitsubishi.h:114-118)
 kMitsubishiAcAuto = 0b100
 kMitsubishiAcCool = 0b011
@@ -338,30 +362,6 @@ def checkZjsSig(state: List[int]) -> bool:
     return True
 
 
-## Helper function to invert byte pairs
-## EXACT translation from IRremoteESP8266 IRutils::invertBytePairs
-def invertBytePairs(data: List[int], length: int) -> None:
-    """
-    Invert byte pairs in a data array.
-    EXACT translation from IRremoteESP8266 irutils::invertBytePairs
-    """
-    for i in range(0, length - 1, 2):
-        data[i + 1] = (~data[i]) & 0xFF
-
-
-## Helper function to check inverted byte pairs
-## EXACT translation from IRremoteESP8266 IRutils::checkInvertedBytePairs
-def checkInvertedBytePairs(data: List[int], length: int) -> bool:
-    """
-    Check if byte pairs are correctly inverted in a data array.
-    EXACT translation from IRremoteESP8266 irutils::checkInvertedBytePairs
-    """
-    for i in range(0, length - 1, 2):
-        if data[i] != ((~data[i + 1]) & 0xFF):
-            return False
-    return True
-
-
 ## Verify checksum for Mitsubishi Heavy 152-bit
 ## EXACT translation from IRremoteESP8266 ir_MitsubishiHeavy.cpp:331-337
 def validChecksumMitsubishiHeavy152(
@@ -585,22 +585,7 @@ def sendMitsubishiAC(data: List[int], nbytes: int, repeat: int = 0) -> List[int]
     """
     if nbytes < kMitsubishiACStateLength:
         return []  # Not enough bytes to send a proper message.
-
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    return sendGeneric(
-        headermark=kMitsubishiAcHdrMark,
-        headerspace=kMitsubishiAcHdrSpace,
-        onemark=kMitsubishiAcBitMark,
-        onespace=kMitsubishiAcOneSpace,
-        zeromark=kMitsubishiAcBitMark,
-        zerospace=kMitsubishiAcZeroSpace,
-        footermark=kMitsubishiAcRptMark,
-        gap=kMitsubishiAcRptSpace,
-        dataptr=data,
-        nbytes=nbytes,
-        MSBfirst=False,
-    )
+    return sendFrame(kMitsubishiAcLayout, data, nbytes)
 
 
 ## Send a Mitsubishi 136-bit A/C message.
@@ -723,7 +708,7 @@ def decodeMitsubishiAC(
     Status: BETA / Probably works
     EXACT translation from IRremoteESP8266 IRrecv::decodeMitsubishiAC
     """
-    from app.core.ir_protocols.ir_recv import kHeader, kFooter, kMarkExcess, _matchGeneric
+    from app.core.ir_protocols.ir_recv import kHeader, kFooter
 
     # Compliance
     if strict and nbits != 144:  # kMitsubishiACBits
@@ -738,25 +723,14 @@ def decodeMitsubishiAC(
     # Handle repeats if we need to.
     for r in range(expected_repeats + 1):
         # Header + Data + Footer
-        used = _matchGeneric(
-            data_ptr=results.rawbuf[offset:],
-            result_bits_ptr=None,
-            result_bytes_ptr=results.state if r == 0 else save,
-            use_bits=False,
-            remaining=results.rawlen - offset,
-            nbits=nbits,
-            hdrmark=kMitsubishiAcHdrMark,
-            hdrspace=kMitsubishiAcHdrSpace,
-            onemark=kMitsubishiAcBitMark,
-            onespace=kMitsubishiAcOneSpace,
-            zeromark=kMitsubishiAcBitMark,
-            zerospace=kMitsubishiAcZeroSpace,
-            footermark=kMitsubishiAcRptMark,
-            footerspace=kMitsubishiAcRptSpace,
-            atleast=r < expected_repeats,  # At least?
+        used = matchFrame(
+            results,
+            offset,
+            kMitsubishiAcLayout,
+            nbits // 8,
+            state=results.state if r == 0 else save,
             tolerance=_tolerance + kMitsubishiAcExtraTolerance,
-            excess=kMarkExcess,
-            MSBfirst=False,
+            atleast=r < expected_repeats,  # At least?
         )
         if used == 0:
             return False  # No match.
@@ -8,6 +8,15 @@
 ## Direct translation from IRremoteESP8266 ir_Neoclima.cpp and ir_Neoclima.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Constants - Timing values
 kNeoclimaHdrMark = 6112
@@ -21,6 +30,27 @@ kNeoclimaMinGap = 100000  # kDefaultMessageGap
 kNeoclimaStateLength = 12
 kNeoclimaBits = kNeoclimaStateLength * 8  # 96 bits
 
+## Header, the state LSB first, footer, a header-space gap, then an extra
+## footer. The decoder accepts a header-space gap after the extra footer too.
+kNeoclimaLayout = frame_layout_t(
+    timing=bit_timing_t(kNeoclimaBitMark, kNeoclimaOneSpace, kNeoclimaBitMark, kNeoclimaZeroSpace),
+    sections=(
+        frame_section_t(
+            hdrmark=kNeoclimaHdrMark,
+            hdrspace=kNeoclimaHdrSpace,
+            footermark=kNeoclimaBitMark,
+            gap=kNeoclimaHdrSpace,
+        ),
+        frame_section_t(
+            nbytes=0,
+            footermark=kNeoclimaBitMark,
+            gap=kNeoclimaMinGap,
+            matchgap=kNeoclimaHdrSpace,
+        ),
+    ),
+    excess=0,
+)
+
 # Button/Command constants
 kNeoclimaButtonPower = 0x00
 kNeoclimaButtonMode = 0x01
@@ -70,205 +100,45 @@ kNeoclimaHeat = 0b100
 
 ## Native representation of a Neoclima A/C message.
 ## This is a direct translation of the C++ union/struct
-class NeoclimaProtocol:
+class NeoclimaProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (12 bytes for Neoclima)
-        self.raw = [0] * kNeoclimaStateLength
+        self.raw = bytearray(kNeoclimaStateLength)
 
     # Byte 1
-    @property
-    def CHeat(self) -> int:
-        return (self.raw[1] >> 1) & 0x01
-
-    @CHeat.setter
-    def CHeat(self, value: bool) -> None:
-        if value:
-            self.raw[1] |= 0x02
-        else:
-            self.raw[1] &= 0xFD
-
-    @property
-    def Ion(self) -> int:
-        return (self.raw[1] >> 2) & 0x01
-
-    @Ion.setter
-    def Ion(self, value: bool) -> None:
-        if value:
-            self.raw[1] |= 0x04
-        else:
-            self.raw[1] &= 0xFB
+    CHeat = field(1, 1, 1)
+    Ion = field(1, 2, 1)
 
     # Byte 3
-    @property
-    def Light(self) -> int:
-        return self.raw[3] & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x01
-        else:
-            self.raw[3] &= 0xFE
-
-    @property
-    def Hold(self) -> int:
-        return (self.raw[3] >> 2) & 0x01
-
-    @Hold.setter
-    def Hold(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x04
-        else:
-            self.raw[3] &= 0xFB
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw[3] >> 3) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x08
-        else:
-            self.raw[3] &= 0xF7
-
-    @property
-    def Econo(self) -> int:
-        return (self.raw[3] >> 4) & 0x01
-
-    @Econo.setter
-    def Econo(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x10
-        else:
-            self.raw[3] &= 0xEF
-
-    @property
-    def Eye(self) -> int:
-        return (self.raw[3] >> 6) & 0x01
-
-    @Eye.setter
-    def Eye(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x40
-        else:
-            self.raw[3] &= 0xBF
+    Light = field(3, 0, 1)
+    Hold = field(3, 2, 1)
+    Turbo = field(3, 3, 1)
+    Econo = field(3, 4, 1)
+    Eye = field(3, 6, 1)
 
     # Byte 5
-    @property
-    def Button(self) -> int:
-        return self.raw[5] & 0x1F
-
-    @Button.setter
-    def Button(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Fresh(self) -> int:
-        return (self.raw[5] >> 7) & 0x01
-
-    @Fresh.setter
-    def Fresh(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x80
-        else:
-            self.raw[5] &= 0x7F
+    Button = field(5, 0, 5)
+    Fresh = field(5, 7, 1)
 
     # Byte 7
-    @property
-    def Sleep(self) -> int:
-        return self.raw[7] & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x01
-        else:
-            self.raw[7] &= 0xFE
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[7] >> 1) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x02
-        else:
-            self.raw[7] &= 0xFD
-
-    @property
-    def SwingV(self) -> int:
-        return (self.raw[7] >> 2) & 0x03
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xF3) | ((value & 0x03) << 2)
-
-    @property
-    def SwingH(self) -> int:
-        return (self.raw[7] >> 4) & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x10
-        else:
-            self.raw[7] &= 0xEF
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[7] >> 5) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0x9F) | ((value & 0x03) << 5)
-
-    @property
-    def UseFah(self) -> int:
-        return (self.raw[7] >> 7) & 0x01
-
-    @UseFah.setter
-    def UseFah(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x80
-        else:
-            self.raw[7] &= 0x7F
+    Sleep = field(7, 0, 1)
+    Power = field(7, 1, 1)
+    SwingV = field(7, 2, 2)
+    SwingH = field(7, 4, 1)
+    Fan = field(7, 5, 2)
+    UseFah = field(7, 7, 1)
 
     # Byte 8
-    @property
-    def Follow(self) -> int:
-        return self.raw[8]
-
-    @Follow.setter
-    def Follow(self, value: int) -> None:
-        self.raw[8] = value & 0xFF
+    Follow = field(8)
 
     # Byte 9
-    @property
-    def Temp(self) -> int:
-        return self.raw[9] & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[9] >> 5) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0x1F) | ((value & 0x07) << 5)
+    Temp = field(9, 0, 5)
+    Mode = field(9, 5, 3)
 
     # Byte 11
-    @property
-    def Sum(self) -> int:
-        return self.raw[11]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[11] = value & 0xFF
+    Sum = field(11)
 
 
 ## Calculate the checksum for a given state.
@@ -280,9 +150,6 @@ def calcChecksum(state: List[int], length: int = kNeoclimaStateLength) -> int:
     """
     if length == 0:
         return state[0]
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_recv import sumBytes
-
     return sumBytes(state, length - 1)
 
 
@@ -308,33 +175,7 @@ def sendNeoclima(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
 
     Returns timing array instead of transmitting via hardware.
     """
-    # Import here to avoid circular import
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # Main message
-        msg_timings = sendGeneric(
-            headermark=kNeoclimaHdrMark,
-            headerspace=kNeoclimaHdrSpace,
-            onemark=kNeoclimaBitMark,
-            onespace=kNeoclimaOneSpace,
-            zeromark=kNeoclimaBitMark,
-            zerospace=kNeoclimaZeroSpace,
-            footermark=kNeoclimaBitMark,
-            gap=kNeoclimaHdrSpace,
-            dataptr=data,
-            nbytes=nbytes,
-            MSBfirst=False,
-        )
-        all_timings.extend(msg_timings)
-
-        # Extra footer
-        all_timings.append(kNeoclimaBitMark)
-        all_timings.append(kNeoclimaMinGap)
-
-    return all_timings
+    return sendFrame(kNeoclimaLayout, data, nbytes, repeat)
 
 
 ## Class for handling detailed Neoclima A/C messages.
@@ -360,7 +201,7 @@ class IRNeoclimaAc:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## Direct translation from ir_Neoclima.cpp lines 116-119
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -627,61 +468,12 @@ def decodeNeoclima(
 
     This is the ACTUAL C++ decoder function, not a wrapper.
     """
-    # Import here to avoid circular imports
-    from app.core.ir_protocols.ir_recv import kHeader, kFooter, _matchGeneric
-
     # Compliance
     if strict and nbits != kNeoclimaBits:
         return False  # Incorrect nr. of bits per spec.
 
-    # Match Main Header + Data + Footer
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=kNeoclimaHdrMark,
-        hdrspace=kNeoclimaHdrSpace,
-        onemark=kNeoclimaBitMark,
-        onespace=kNeoclimaOneSpace,
-        zeromark=kNeoclimaBitMark,
-        zerospace=kNeoclimaZeroSpace,
-        footermark=kNeoclimaBitMark,
-        footerspace=kNeoclimaHdrSpace,
-        atleast=False,
-        tolerance=25,
-        excess=0,
-        MSBfirst=False,
-    )
-    if not used:
-        return False
-    offset += used
-
-    # Extra footer
-    from app.core.ir_protocols.ir_recv import matchGeneric
-
-    if not matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=None,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=0,
-        hdrmark=0,
-        hdrspace=0,
-        onemark=0,
-        onespace=0,
-        zeromark=0,
-        zerospace=0,
-        footermark=kNeoclimaBitMark,
-        footerspace=kNeoclimaHdrSpace,
-        atleast=True,
-        tolerance=25,
-        excess=0,
-        MSBfirst=False,
-    ):
+    # Match Main Header + Data + Footer, then the extra footer
+    if not matchFrame(results, offset, kNeoclimaLayout, nbits // 8):
         return False
 
     # Compliance
@@ -16,6 +16,15 @@
 
 from typing import List, Optional
 import copy
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBIT8, GETBITS8, GETBITS64, sumBytes
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Supports:
 #   Brand: Panasonic,  Model: TV (PANASONIC)
@@ -82,6 +91,32 @@ kPanasonicAcExcess = 0
 # Much higher than usual. See issue #540.
 kPanasonicAcTolerance = 40
 
+## Two sections: the first 8 bytes, then the rest. kPanasonicAcMessageGap is
+## only sent between repeats, and is what the decoder expects after section 2.
+kPanasonicAcLayout = frame_layout_t(
+    timing=bit_timing_t(
+        kPanasonicBitMark, kPanasonicOneSpace, kPanasonicBitMark, kPanasonicZeroSpace
+    ),
+    sections=(
+        frame_section_t(
+            nbytes=kPanasonicAcSection1Length,
+            hdrmark=kPanasonicHdrMark,
+            hdrspace=kPanasonicHdrSpace,
+            footermark=kPanasonicBitMark,
+            gap=kPanasonicAcSectionGap,
+        ),
+        frame_section_t(
+            hdrmark=kPanasonicHdrMark,
+            hdrspace=kPanasonicHdrSpace,
+            footermark=kPanasonicBitMark,
+            matchgap=kPanasonicAcMessageGap,
+        ),
+    ),
+    tolerance=kPanasonicAcTolerance,
+    excess=kPanasonicAcExcess,
+    repeatgap=kPanasonicAcMessageGap,
+)
+
 # Mode constants
 # EXACT translation from IRremoteESP8266 ir_Panasonic.h lines 53-57
 kPanasonicAcAuto = 0  # 0b000
@@ -223,23 +258,6 @@ kModeBitsSize = 3
 kNibbleSize = 4
 
 
-def GETBIT8(byte: int, bit: int) -> int:
-    """Get a bit from a byte"""
-    return (byte >> bit) & 0x01
-
-
-def GETBITS8(byte: int, offset: int, size: int) -> int:
-    """Get multiple bits from a byte"""
-    mask = (1 << size) - 1
-    return (byte >> offset) & mask
-
-
-def GETBITS64(value: int, offset: int, size: int) -> int:
-    """Get multiple bits from a 64-bit value"""
-    mask = (1 << size) - 1
-    return (value >> offset) & mask
-
-
 def setBit(byte_ref: List[int], bit: int, on: bool) -> None:
     """Set a bit in a mutable byte reference (list with one element)"""
     if on:
@@ -254,15 +272,6 @@ def setBits(byte_ref: List[int], offset: int, nbits: int, data: int) -> None:
     byte_ref[0] = (byte_ref[0] & ~mask) | ((data << offset) & mask)
 
 
-def sumBytes(state: List[int], length: int, init: int = 0) -> int:
-    """Sum bytes for checksum calculation"""
-    # EXACT translation from IRremoteESP8266 IRutils.cpp sumBytes
-    checksum = init
-    for i in range(length):
-        checksum += state[i]
-    return checksum & 0xFF
-
-
 ## Send a Panasonic formatted message.
 ## Status: STABLE / Should be working.
 ## @param[in] data The message to be sent.
@@ -434,51 +443,7 @@ def sendPanasonicAC(
     """
     if nbytes < kPanasonicAcSection1Length:
         return []
-
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # First section. (8 bytes)
-        section1_timings = sendGeneric(
-            headermark=kPanasonicHdrMark,
-            headerspace=kPanasonicHdrSpace,
-            onemark=kPanasonicBitMark,
-            onespace=kPanasonicOneSpace,
-            zeromark=kPanasonicBitMark,
-            zerospace=kPanasonicZeroSpace,
-            footermark=kPanasonicBitMark,
-            gap=kPanasonicAcSectionGap,  # 10,000µs gap before section 2
-            dataptr=data,
-            nbytes=kPanasonicAcSection1Length,
-            MSBfirst=False,
-            repeat=0,  # Don't use repeat inside sendGeneric, handle it here
-        )
-        all_timings.extend(section1_timings)
-
-        # Second section. (The rest of the data bytes)
-        section2_timings = sendGeneric(
-            headermark=kPanasonicHdrMark,
-            headerspace=kPanasonicHdrSpace,
-            onemark=kPanasonicBitMark,
-            onespace=kPanasonicOneSpace,
-            zeromark=kPanasonicBitMark,
-            zerospace=kPanasonicZeroSpace,
-            footermark=kPanasonicBitMark,
-            gap=0,  # No gap after final section
-            dataptr=data[kPanasonicAcSection1Length:],
-            nbytes=nbytes - kPanasonicAcSection1Length,
-            MSBfirst=False,
-            repeat=0,
-        )
-        all_timings.extend(section2_timings)
-
-        # Add inter-message gap only between repeated messages
-        if r < repeat:
-            all_timings.append(kPanasonicAcMessageGap)
-
-    return all_timings
+    return sendFrame(kPanasonicAcLayout, data, nbytes, repeat)
 
 
 ## Class for handling detailed Panasonic A/C messages.
@@ -995,7 +960,7 @@ def decodePanasonicAC(
     Decode a Panasonic A/C IR message.
     EXACT translation from IRremoteESP8266 IRrecv::decodePanasonicAC
     """
-    from app.core.ir_protocols.ir_recv import _matchGeneric, kHeader, kFooter
+    from app.core.ir_protocols.ir_recv import kHeader, kFooter
 
     min_nr_of_messages = 1
     if strict:
@@ -1005,52 +970,8 @@ def decodePanasonicAC(
     if results.rawlen <= min_nr_of_messages * (2 * nbits + kHeader + kFooter) - 1 + offset:
         return False  # Can't possibly be a valid PANASONIC_AC message.
 
-    # Match Header + Data #1 + Footer
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=kPanasonicAcSection1Length * 8,
-        hdrmark=kPanasonicHdrMark,
-        hdrspace=kPanasonicHdrSpace,
-        onemark=kPanasonicBitMark,
-        onespace=kPanasonicOneSpace,
-        zeromark=kPanasonicBitMark,
-        zerospace=kPanasonicZeroSpace,
-        footermark=kPanasonicBitMark,
-        footerspace=kPanasonicAcSectionGap,
-        atleast=False,
-        tolerance=kPanasonicAcTolerance,
-        excess=kPanasonicAcExcess,
-        MSBfirst=False,
-    )
-    if used == 0:
-        return False
-    offset += used
-
-    # Match Header + Data #2 + Footer
-    if not _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state[kPanasonicAcSection1Length:],
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits - kPanasonicAcSection1Length * 8,
-        hdrmark=kPanasonicHdrMark,
-        hdrspace=kPanasonicHdrSpace,
-        onemark=kPanasonicBitMark,
-        onespace=kPanasonicOneSpace,
-        zeromark=kPanasonicBitMark,
-        zerospace=kPanasonicZeroSpace,
-        footermark=kPanasonicBitMark,
-        footerspace=kPanasonicAcMessageGap,
-        atleast=True,
-        tolerance=kPanasonicAcTolerance,
-        excess=kPanasonicAcExcess,
-        MSBfirst=False,
-    ):
+    # Match Header + Data #1 + Footer, Header + Data #2 + Footer
+    if not matchFrame(results, offset, kPanasonicAcLayout, nbits // 8):
         return False
 
     # Compliance
@@ -1146,7 +1067,9 @@ def sendPanasonicAC32(data: int, nbits: int = kPanasonicAc32Bits, repeat: int =
 
 ## Native representation of a Panasonic 32-bit A/C message.
 ## EXACT translation from IRremoteESP8266 ir_Panasonic.h lines 189-207
-class PanasonicAc32Protocol:
+class PanasonicAc32Protocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     """
     Native representation of a Panasonic 32-bit A/C message.
     EXACT translation from C++ union/struct
@@ -1156,61 +1079,16 @@ class PanasonicAc32Protocol:
         self.raw = 0
 
     # Byte 0
-    @property
-    def SwingH(self) -> int:
-        return (self.raw >> 3) & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 3
-        else:
-            self.raw &= ~(1 << 3)
-
-    @property
-    def SwingV(self) -> int:
-        return (self.raw >> 4) & 0x07
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 4)) | ((value & 0x07) << 4)
+    SwingH = field(0, 3, 1)
+    SwingV = field(0, 4, 3)
 
     # Byte 2 (at bit offset 16)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 16) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 16)) | ((value & 0x0F) << 16)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 20) & 0x0F
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 20)) | ((value & 0x0F) << 20)
+    Temp = field(2, 0, 4)
+    Fan = field(2, 4, 4)
 
     # Byte 3 (at bit offset 24)
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 24) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 24)) | ((value & 0x07) << 24)
-
-    @property
-    def PowerToggle(self) -> int:
-        return (self.raw >> 27) & 0x01
-
-    @PowerToggle.setter
-    def PowerToggle(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 27
-        else:
-            self.raw &= ~(1 << 27)
+    Mode = field(3, 0, 3)
+    PowerToggle = field(3, 3, 1)
 
 
 ## Class for handling detailed Panasonic 32bit A/C messages.
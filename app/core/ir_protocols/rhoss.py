@@ -9,6 +9,7 @@
 #   Brand: Rhoss, Model: Idrowall MPCV 20-30-35-40
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Constants - Timing values (from ir_Rhoss.cpp lines 14-20)
 kRhossHdrMark = 3042
@@ -59,65 +60,26 @@ kRhossDefaultSwing = False
 
 ## Native representation of a Rhoss A/C message.
 ## Direct translation of the C++ union/struct (from ir_Rhoss.h lines 24-57)
-class RhossProtocol:
+class RhossProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (12 bytes for Rhoss)
-        self.raw = [0] * kRhossStateLength
+        self.raw = bytearray(kRhossStateLength)
 
     # Byte 1 (from ir_Rhoss.h lines 30-31)
-    @property
-    def Temp(self) -> int:
-        return self.raw[1] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0xF0) | (value & 0x0F)
+    Temp = field(1, 0, 4)
 
     # Byte 4 (from ir_Rhoss.h lines 37-39)
-    @property
-    def Fan(self) -> int:
-        return self.raw[4] & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0xFC) | (value & 0x03)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[4] >> 4) & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0x0F) | ((value & 0x0F) << 4)
+    Fan = field(4, 0, 2)
+    Mode = field(4, 4, 4)
 
     # Byte 5 (from ir_Rhoss.h lines 41-43)
-    @property
-    def Swing(self) -> int:
-        return self.raw[5] & 0x01
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        if value:
-            self.raw[5] |= 0x01
-        else:
-            self.raw[5] &= 0xFE
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[5] >> 6) & 0x03
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x3F) | ((value & 0x03) << 6)
+    Swing = field(5, 0, 1)
+    Power = field(5, 6, 2)
 
     # Byte 11 (from ir_Rhoss.h line 55)
-    @property
-    def Sum(self) -> int:
-        return self.raw[11]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[11] = value & 0xFF
+    Sum = field(11)
 
 
 ## Send a Rhoss HVAC formatted message.
@@ -314,7 +276,7 @@ class IRRhossAc:
     ## IRsend object method.
     ## @return A PTR to the internal state.
     ## Direct translation from ir_Rhoss.cpp lines 160-163
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()  # Ensure correct bit array before returning
         return self._.raw
 
@@ -12,7 +12,17 @@
 ## @see https://github.com/crankyoldgit/IRremoteESP8266/issues/1538 (Checksum)
 ## Direct translation from IRremoteESP8266 ir_Samsung.cpp and ir_Samsung.h
 
+from functools import lru_cache
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchSection,
+    sendFrame,
+)
+from app.core.ir_protocols.bitops import countBits, reverseBits
 
 # Supports:
 #   Brand: Samsung,  Model: UA55H6300 TV (SAMSUNG)
@@ -114,6 +124,34 @@ kSamsungAcExtendedStateLength = 21
 kSamsungBits = 32
 kSamsung36Bits = 36
 
+## A Samsung A/C section: 7 bytes of the state with their own header & footer.
+kSamsungAcSection = frame_section_t(
+    nbytes=kSamsungAcSectionLength,
+    hdrmark=kSamsungAcSectionMark,
+    hdrspace=kSamsungAcSectionSpace,
+    footermark=kSamsungAcBitMark,
+    gap=kSamsungAcSectionGap,
+)
+
+
+## The SAMSUNG_AC frame: a message header, then as many 7 byte sections as
+## the state needs (2 or 3), then the rest of the inter-message gap.
+@lru_cache(maxsize=None)
+def samsungAcLayout(sections: int = kSamsungAcSections) -> frame_layout_t:
+    return frame_layout_t(
+        timing=bit_timing_t(
+            kSamsungAcBitMark, kSamsungAcOneSpace, kSamsungAcBitMark, kSamsungAcZeroSpace
+        ),
+        sections=(
+            frame_section_t(nbytes=0, hdrmark=kSamsungAcHdrMark, hdrspace=kSamsungAcHdrSpace),
+            *(kSamsungAcSection,) * sections,
+            # Complete made up guess at inter-message gap.
+            # kDefaultMessageGap - kSamsungAcSectionGap
+            frame_section_t(nbytes=0, gap=100000 - kSamsungAcSectionGap),
+        ),
+        excess=0,  # kMarkExcess
+    )
+
 
 ## This sending protocol is used by some other protocols. e.g. LG.
 ## Send a 32-bit Samsung formatted message.
@@ -159,8 +197,6 @@ def encodeSAMSUNG(customer: int, command: int) -> int:
     Construct a raw Samsung message from the supplied customer(address) & command.
     EXACT translation from IRremoteESP8266 IRsend::encodeSAMSUNG (ir_Samsung.cpp:110-115)
     """
-    from app.core.ir_protocols.ir_recv import reverseBits
-
     revcustomer = reverseBits(customer, 8)
     revcommand = reverseBits(command, 8)
     return (revcommand ^ 0xFF) | (revcommand << 8) | (revcustomer << 16) | (revcustomer << 24)
@@ -186,7 +222,7 @@ def decodeSAMSUNG(results, offset: int = 1, nbits: int = kSamsungBits, strict: b
     Decode the supplied Samsung 32-bit message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeSAMSUNG (ir_Samsung.cpp:133-165)
     """
-    from app.core.ir_protocols.ir_recv import _matchGeneric, reverseBits
+    from app.core.ir_protocols.ir_recv import _matchGeneric
 
     if strict and nbits != kSamsungBits:
         return False  # We expect Samsung to be 32 bits of message.
@@ -421,356 +457,89 @@ def sendSamsungAC(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
 
     Returns timing array instead of transmitting via hardware.
     """
-    from app.core.ir_protocols.ir_send import sendGeneric, sendGenericUint64
-
     if nbytes < kSamsungAcStateLength and nbytes % kSamsungAcSectionLength:
         return []  # Not an appropriate number of bytes to send a proper message.
 
-    all_timings = []
-
-    for r in range(repeat + 1):
-        # Header
-        all_timings.append(kSamsungAcHdrMark)
-        all_timings.append(kSamsungAcHdrSpace)
-        # Send in 7 byte sections.
-        for offset in range(0, nbytes, kSamsungAcSectionLength):
-            section_timings = sendGeneric(
-                headermark=kSamsungAcSectionMark,
-                headerspace=kSamsungAcSectionSpace,
-                onemark=kSamsungAcBitMark,
-                onespace=kSamsungAcOneSpace,
-                zeromark=kSamsungAcBitMark,
-                zerospace=kSamsungAcZeroSpace,
-                footermark=kSamsungAcBitMark,
-                gap=kSamsungAcSectionGap,
-                dataptr=data[offset:],
-                nbytes=kSamsungAcSectionLength,  # 7 bytes == 56 bits
-                MSBfirst=False,
-            )
-            all_timings.extend(section_timings)
-        # Complete made up guess at inter-message gap.
-        # kDefaultMessageGap - kSamsungAcSectionGap
-        all_timings.append(100000 - kSamsungAcSectionGap)
-
-    return all_timings
+    # Send in 7 byte sections.
+    sections = -(-nbytes // kSamsungAcSectionLength)
+    return sendFrame(samsungAcLayout(sections), data, nbytes, repeat)
 
 
 ## Native representation of a Samsung A/C message.
 ## EXACT translation from IRremoteESP8266 ir_Samsung.h:46-164
-class SamsungProtocol:
+class SamsungProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (14 or 21 bytes for Samsung AC)
-        self.raw = [0] * kSamsungAcExtendedStateLength
+        self.raw = bytearray(kSamsungAcExtendedStateLength)
 
     # Standard message map (first 14 bytes)
     # Byte 0 - no bitfields
 
     # Byte 1
-    @property
-    def Sum1Lower(self) -> int:
-        return (self.raw[1] >> 4) & 0x0F
-
-    @Sum1Lower.setter
-    def Sum1Lower(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0x0F) | ((value & 0x0F) << 4)
+    Sum1Lower = field(1, 4, 4)
 
     # Byte 2
-    @property
-    def Sum1Upper(self) -> int:
-        return self.raw[2] & 0x0F
-
-    @Sum1Upper.setter
-    def Sum1Upper(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xF0) | (value & 0x0F)
+    Sum1Upper = field(2, 0, 4)
 
     # Byte 5
-    @property
-    def Sleep5(self) -> int:
-        return (self.raw[5] >> 4) & 0x01
-
-    @Sleep5.setter
-    def Sleep5(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x10
-        else:
-            self.raw[5] &= 0xEF
-
-    @property
-    def Quiet(self) -> int:
-        return (self.raw[5] >> 5) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x20
-        else:
-            self.raw[5] &= 0xDF
+    Sleep5 = field(5, 4, 1)
+    Quiet = field(5, 5, 1)
 
     # Byte 6
-    @property
-    def Power1(self) -> int:
-        return (self.raw[6] >> 4) & 0x03
-
-    @Power1.setter
-    def Power1(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xCF) | ((value & 0x03) << 4)
+    Power1 = field(6, 4, 2)
 
     # Byte 8
-    @property
-    def Sum2Lower(self) -> int:
-        return (self.raw[8] >> 4) & 0x0F
-
-    @Sum2Lower.setter
-    def Sum2Lower(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0x0F) | ((value & 0x0F) << 4)
+    Sum2Lower = field(8, 4, 4)
 
     # Byte 9
-    @property
-    def Sum2Upper(self) -> int:
-        return self.raw[9] & 0x0F
-
-    @Sum2Upper.setter
-    def Sum2Upper(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Swing(self) -> int:
-        return (self.raw[9] >> 4) & 0x07
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0x8F) | ((value & 0x07) << 4)
+    Sum2Upper = field(9, 0, 4)
+    Swing = field(9, 4, 3)
 
     # Byte 10
-    @property
-    def FanSpecial(self) -> int:
-        return (self.raw[10] >> 1) & 0x07
-
-    @FanSpecial.setter
-    def FanSpecial(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0xF1) | ((value & 0x07) << 1)
-
-    @property
-    def Display(self) -> int:
-        return (self.raw[10] >> 4) & 0x01
-
-    @Display.setter
-    def Display(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x10
-        else:
-            self.raw[10] &= 0xEF
-
-    @property
-    def CleanToggle10(self) -> int:
-        return (self.raw[10] >> 7) & 0x01
-
-    @CleanToggle10.setter
-    def CleanToggle10(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x80
-        else:
-            self.raw[10] &= 0x7F
+    FanSpecial = field(10, 1, 3)
+    Display = field(10, 4, 1)
+    CleanToggle10 = field(10, 7, 1)
 
     # Byte 11
-    @property
-    def Ion(self) -> int:
-        return self.raw[11] & 0x01
-
-    @Ion.setter
-    def Ion(self, value: bool) -> None:
-        if value:
-            self.raw[11] |= 0x01
-        else:
-            self.raw[11] &= 0xFE
-
-    @property
-    def CleanToggle11(self) -> int:
-        return (self.raw[11] >> 1) & 0x01
-
-    @CleanToggle11.setter
-    def CleanToggle11(self, value: bool) -> None:
-        if value:
-            self.raw[11] |= 0x02
-        else:
-            self.raw[11] &= 0xFD
-
-    @property
-    def Temp(self) -> int:
-        return (self.raw[11] >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[11] = (self.raw[11] & 0x0F) | ((value & 0x0F) << 4)
+    Ion = field(11, 0, 1)
+    CleanToggle11 = field(11, 1, 1)
+    Temp = field(11, 4, 4)
 
     # Byte 12
-    @property
-    def Fan(self) -> int:
-        return (self.raw[12] >> 1) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[12] = (self.raw[12] & 0xF1) | ((value & 0x07) << 1)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[12] >> 4) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[12] = (self.raw[12] & 0x8F) | ((value & 0x07) << 4)
+    Fan = field(12, 1, 3)
+    Mode = field(12, 4, 3)
 
     # Byte 13
-    @property
-    def BeepToggle(self) -> int:
-        return (self.raw[13] >> 2) & 0x01
-
-    @BeepToggle.setter
-    def BeepToggle(self, value: bool) -> None:
-        if value:
-            self.raw[13] |= 0x04
-        else:
-            self.raw[13] &= 0xFB
-
-    @property
-    def Power2(self) -> int:
-        return (self.raw[13] >> 4) & 0x03
-
-    @Power2.setter
-    def Power2(self, value: int) -> None:
-        self.raw[13] = (self.raw[13] & 0xCF) | ((value & 0x03) << 4)
+    BeepToggle = field(13, 2, 1)
+    Power2 = field(13, 4, 2)
 
     # Extended message map (bytes 7-20)
     # Byte 9 (extended)
-    @property
-    def OffTimeMins(self) -> int:
-        return (self.raw[9] >> 4) & 0x07
-
-    @OffTimeMins.setter
-    def OffTimeMins(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0x8F) | ((value & 0x07) << 4)
-
-    @property
-    def OffTimeHrs1(self) -> int:
-        return (self.raw[9] >> 7) & 0x01
-
-    @OffTimeHrs1.setter
-    def OffTimeHrs1(self, value: bool) -> None:
-        if value:
-            self.raw[9] |= 0x80
-        else:
-            self.raw[9] &= 0x7F
+    OffTimeMins = field(9, 4, 3)
+    OffTimeHrs1 = field(9, 7, 1)
 
     # Byte 10 (extended)
-    @property
-    def OffTimeHrs2(self) -> int:
-        return self.raw[10] & 0x0F
-
-    @OffTimeHrs2.setter
-    def OffTimeHrs2(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0xF0) | (value & 0x0F)
-
-    @property
-    def OnTimeMins(self) -> int:
-        return (self.raw[10] >> 4) & 0x07
-
-    @OnTimeMins.setter
-    def OnTimeMins(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0x8F) | ((value & 0x07) << 4)
-
-    @property
-    def OnTimeHrs1(self) -> int:
-        return (self.raw[10] >> 7) & 0x01
-
-    @OnTimeHrs1.setter
-    def OnTimeHrs1(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x80
-        else:
-            self.raw[10] &= 0x7F
+    OffTimeHrs2 = field(10, 0, 4)
+    OnTimeMins = field(10, 4, 3)
+    OnTimeHrs1 = field(10, 7, 1)
 
     # Byte 11 (extended)
-    @property
-    def OnTimeHrs2(self) -> int:
-        return self.raw[11] & 0x0F
-
-    @OnTimeHrs2.setter
-    def OnTimeHrs2(self, value: int) -> None:
-        self.raw[11] = (self.raw[11] & 0xF0) | (value & 0x0F)
+    OnTimeHrs2 = field(11, 0, 4)
 
     # Byte 12 (extended)
-    @property
-    def OffTimeDay(self) -> int:
-        return self.raw[12] & 0x01
-
-    @OffTimeDay.setter
-    def OffTimeDay(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x01
-        else:
-            self.raw[12] &= 0xFE
-
-    @property
-    def OnTimerEnable(self) -> int:
-        return (self.raw[12] >> 1) & 0x01
-
-    @OnTimerEnable.setter
-    def OnTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x02
-        else:
-            self.raw[12] &= 0xFD
-
-    @property
-    def OffTimerEnable(self) -> int:
-        return (self.raw[12] >> 2) & 0x01
-
-    @OffTimerEnable.setter
-    def OffTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x04
-        else:
-            self.raw[12] &= 0xFB
-
-    @property
-    def Sleep12(self) -> int:
-        return (self.raw[12] >> 3) & 0x01
-
-    @Sleep12.setter
-    def Sleep12(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x08
-        else:
-            self.raw[12] &= 0xF7
-
-    @property
-    def OnTimeDay(self) -> int:
-        return (self.raw[12] >> 4) & 0x01
-
-    @OnTimeDay.setter
-    def OnTimeDay(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x10
-        else:
-            self.raw[12] &= 0xEF
+    OffTimeDay = field(12, 0, 1)
+    OnTimerEnable = field(12, 1, 1)
+    OffTimerEnable = field(12, 2, 1)
+    Sleep12 = field(12, 3, 1)
+    OnTimeDay = field(12, 4, 1)
 
     # Byte 15 (extended)
-    @property
-    def Sum3Lower(self) -> int:
-        return (self.raw[15] >> 4) & 0x0F
-
-    @Sum3Lower.setter
-    def Sum3Lower(self, value: int) -> None:
-        self.raw[15] = (self.raw[15] & 0x0F) | ((value & 0x0F) << 4)
+    Sum3Lower = field(15, 4, 4)
 
     # Byte 16 (extended)
-    @property
-    def Sum3Upper(self) -> int:
-        return self.raw[16] & 0x0F
-
-    @Sum3Upper.setter
-    def Sum3Upper(self, value: int) -> None:
-        self.raw[16] = (self.raw[16] & 0xF0) | (value & 0x0F)
+    Sum3Upper = field(16, 0, 4)
 
 
 ## Class for handling detailed Samsung A/C messages.
@@ -849,14 +618,6 @@ class IRSamsungAc:
     ## EXACT translation from IRremoteESP8266 ir_Samsung.cpp:322-338
     @staticmethod
     def calcSectionChecksum(section: List[int]) -> int:
-        def countBits(data, bits):
-            """Count the number of bits set"""
-            count = 0
-            for i in range(bits):
-                if data & (1 << i):
-                    count += 1
-            return count
-
         kLowNibble = 0
         kNibbleSize = 4
         kHighNibble = 4
@@ -913,7 +674,7 @@ class IRSamsungAc:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## EXACT translation from IRremoteESP8266 ir_Samsung.cpp:442-447
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -1310,7 +1071,7 @@ def decodeSamsungAC(
     Decode the supplied Samsung A/C message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeSamsungAC (ir_Samsung.cpp:955-995)
     """
-    from app.core.ir_protocols.ir_recv import _matchGeneric, matchMark, matchSpace, kHeader, kFooter
+    from app.core.ir_protocols.ir_recv import matchMark, matchSpace, kHeader, kFooter
 
     if results.rawlen < 2 * nbits + kHeader * 3 + kFooter * 2 - 1 + offset:
         return False  # Can't possibly be a valid Samsung A/C message.
@@ -1329,25 +1090,15 @@ def decodeSamsungAC(
     pos = 0
     while pos <= (nbits // 8) - kSamsungAcSectionLength:
         # Section Header + Section Data (7 bytes) + Section Footer
-        used = _matchGeneric(
-            data_ptr=results.rawbuf[offset:],
-            result_bits_ptr=None,
-            result_bytes_ptr=results.state[pos:],
-            use_bits=False,
-            remaining=results.rawlen - offset,
-            nbits=kSamsungAcSectionLength * 8,
-            hdrmark=kSamsungAcSectionMark,
-            hdrspace=kSamsungAcSectionSpace,
-            onemark=kSamsungAcBitMark,
-            onespace=kSamsungAcOneSpace,
-            zeromark=kSamsungAcBitMark,
-            zerospace=kSamsungAcZeroSpace,
-            footermark=kSamsungAcBitMark,
-            footerspace=kSamsungAcSectionGap,
+        used = matchSection(
+            results.rawbuf[offset:],
+            results.rawlen - offset,
+            samsungAcLayout(),
+            kSamsungAcSection,
+            results.state,
+            pos,
+            kSamsungAcSectionLength,
             atleast=pos + kSamsungAcSectionLength >= nbits // 8,
-            tolerance=25,
-            excess=0,
-            MSBfirst=False,
         )
         if used == 0:
             return False
@@ -19,6 +19,8 @@
 ## @see https://github.com/crankyoldgit/IRremoteESP8266/issues/1826
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumNibbles
 
 # Supports:
 #   Brand: Sanyo,  Model: SA 8650B - disabled
@@ -326,131 +328,44 @@ def decodeSanyoAc(results, offset: int = 1, nbits: int = kSanyoAcBits, strict: b
 ## Native representation of a Sanyo A/C message.
 ## Direct translation from C++ union SanyoProtocol
 ## ir_Sanyo.h:43-79
-class SanyoProtocol:
+class SanyoProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (9 bytes for Sanyo AC)
-        self.raw = [0] * kSanyoAcStateLength
+        self.raw = bytearray(kSanyoAcStateLength)
 
     # Byte 0
     # Fixed value 0x6A
 
     # Byte 1
-    @property
-    def Temp(self) -> int:
-        return self.raw[1] & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0xE0) | (value & 0x1F)
+    Temp = field(1, 0, 5)
 
     # Byte 2
-    @property
-    def SensorTemp(self) -> int:
-        return self.raw[2] & 0x1F
-
-    @SensorTemp.setter
-    def SensorTemp(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Sensor(self) -> int:
-        return (self.raw[2] >> 5) & 0x01
-
-    @Sensor.setter
-    def Sensor(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x20
-        else:
-            self.raw[2] &= 0xDF
-
-    @property
-    def Beep(self) -> int:
-        return (self.raw[2] >> 6) & 0x01
-
-    @Beep.setter
-    def Beep(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x40
-        else:
-            self.raw[2] &= 0xBF
+    SensorTemp = field(2, 0, 5)
+    Sensor = field(2, 5, 1)
+    Beep = field(2, 6, 1)
 
     # Byte 3
-    @property
-    def OffHour(self) -> int:
-        return self.raw[3] & 0x0F
-
-    @OffHour.setter
-    def OffHour(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xF0) | (value & 0x0F)
+    OffHour = field(3, 0, 4)
 
     # Byte 4
-    @property
-    def Fan(self) -> int:
-        return self.raw[4] & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0xFC) | (value & 0x03)
-
-    @property
-    def OffTimer(self) -> int:
-        return (self.raw[4] >> 2) & 0x01
-
-    @OffTimer.setter
-    def OffTimer(self, value: bool) -> None:
-        if value:
-            self.raw[4] |= 0x04
-        else:
-            self.raw[4] &= 0xFB
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[4] >> 4) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0x8F) | ((value & 0x07) << 4)
+    Fan = field(4, 0, 2)
+    OffTimer = field(4, 2, 1)
+    Mode = field(4, 4, 3)
 
     # Byte 5
-    @property
-    def SwingV(self) -> int:
-        return self.raw[5] & 0x07
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xF8) | (value & 0x07)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[5] >> 6) & 0x03
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x3F) | ((value & 0x03) << 6)
+    SwingV = field(5, 0, 3)
+    Power = field(5, 6, 2)
 
     # Byte 6
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[6] >> 3) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x08
-        else:
-            self.raw[6] &= 0xF7
+    Sleep = field(6, 3, 1)
 
     # Byte 7
     # Unused
 
     # Byte 8
-    @property
-    def Sum(self) -> int:
-        return self.raw[8]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[8] = value & 0xFF
+    Sum = field(8)
 
 
 ## Class for handling detailed Sanyo A/C messages.
@@ -467,7 +382,7 @@ class IRSanyoAc:
     ## ir_Sanyo.cpp:327-331
     def stateReset(self) -> None:
         kReset = [0x6A, 0x6D, 0x51, 0x00, 0x10, 0x45, 0x00, 0x00, 0x33]
-        self._.raw = kReset.copy()
+        self._.raw = bytearray(kReset)
 
     ## Calculate the checksum for a given state.
     ## @param[in] state The array to calc the checksum of.
@@ -476,8 +391,6 @@ class IRSanyoAc:
     ## ir_Sanyo.cpp:362-365
     @staticmethod
     def calcChecksum(state: List[int], length: int = kSanyoAcStateLength) -> int:
-        from app.core.ir_protocols.ir_utils import sumNibbles
-
         return sumNibbles(state, length - 1) if length else 0
 
     ## Verify the checksum is valid for a given state.
@@ -751,7 +664,7 @@ class IRSanyoAc:
     ##   checks passing.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## ir_Sanyo.cpp:347-350
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -759,7 +672,7 @@ class IRSanyoAc:
     ## @param[in] newState A valid code for this protocol.
     ## ir_Sanyo.cpp:354-356
     def setRaw(self, newState: List[int]) -> None:
-        self._.raw = newState[:kSanyoAcStateLength].copy()
+        self._.raw = bytearray(newState[:kSanyoAcStateLength])
 
     ## Convert the current internal state into its stdAc::state_t equivalent.
     ## @return The stdAc equivalent of the native settings.
@@ -811,147 +724,43 @@ class IRSanyoAc:
 ## Native representation of a Sanyo 88-bit A/C message.
 ## Direct translation from C++ union SanyoAc88Protocol
 ## ir_Sanyo.h:190-225
-class SanyoAc88Protocol:
+class SanyoAc88Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (11 bytes for Sanyo AC88)
-        self.raw = [0] * kSanyoAc88StateLength
+        self.raw = bytearray(kSanyoAc88StateLength)
 
     # Byte 0-1
     # Fixed values 0xAA, 0x55
 
     # Byte 2
-    @property
-    def Fan(self) -> int:
-        return self.raw[2] & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xFC) | (value & 0x03)
-
-    @property
-    def Mode(self) -> int:
-        return (self.raw[2] >> 4) & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x8F) | ((value & 0x07) << 4)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[2] >> 7) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x80
-        else:
-            self.raw[2] &= 0x7F
+    Fan = field(2, 0, 2)
+    Mode = field(2, 4, 3)
+    Power = field(2, 7, 1)
 
     # Byte 3
-    @property
-    def Temp(self) -> int:
-        return self.raw[3] & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Filter(self) -> int:
-        return (self.raw[3] >> 5) & 0x01
-
-    @Filter.setter
-    def Filter(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x20
-        else:
-            self.raw[3] &= 0xDF
-
-    @property
-    def SwingV(self) -> int:
-        return (self.raw[3] >> 6) & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x40
-        else:
-            self.raw[3] &= 0xBF
+    Temp = field(3, 0, 5)
+    Filter = field(3, 5, 1)
+    SwingV = field(3, 6, 1)
 
     # Byte 4
-    @property
-    def ClockSecs(self) -> int:
-        return self.raw[4]
-
-    @ClockSecs.setter
-    def ClockSecs(self, value: int) -> None:
-        self.raw[4] = value & 0xFF
+    ClockSecs = field(4)
 
     # Byte 5
-    @property
-    def ClockMins(self) -> int:
-        return self.raw[5]
-
-    @ClockMins.setter
-    def ClockMins(self, value: int) -> None:
-        self.raw[5] = value & 0xFF
+    ClockMins = field(5)
 
     # Byte 6
-    @property
-    def ClockHrs(self) -> int:
-        return self.raw[6]
-
-    @ClockHrs.setter
-    def ClockHrs(self, value: int) -> None:
-        self.raw[6] = value & 0xFF
+    ClockHrs = field(6)
 
     # Byte 7-9  (Timer times?)
     # Unused
 
     # Byte 10
-    @property
-    def Turbo(self) -> int:
-        return (self.raw[10] >> 3) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x08
-        else:
-            self.raw[10] &= 0xF7
-
-    @property
-    def EnableStartTimer(self) -> int:
-        return (self.raw[10] >> 4) & 0x01
-
-    @EnableStartTimer.setter
-    def EnableStartTimer(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x10
-        else:
-            self.raw[10] &= 0xEF
-
-    @property
-    def EnableStopTimer(self) -> int:
-        return (self.raw[10] >> 5) & 0x01
-
-    @EnableStopTimer.setter
-    def EnableStopTimer(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x20
-        else:
-            self.raw[10] &= 0xDF
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[10] >> 6) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw[10] |= 0x40
-        else:
-            self.raw[10] &= 0xBF
+    Turbo = field(10, 3, 1)
+    EnableStartTimer = field(10, 4, 1)
+    EnableStopTimer = field(10, 5, 1)
+    Sleep = field(10, 6, 1)
 
 
 ## Send a SanyoAc88 formatted message.
@@ -1064,20 +873,20 @@ class IRSanyoAc88:
     ## ir_Sanyo.cpp:758-762
     def stateReset(self) -> None:
         kReset = [0xAA, 0x55, 0xA0, 0x16, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00, 0x10]
-        self._.raw = kReset.copy()
+        self._.raw = bytearray(kReset)
 
     ## Get a PTR to the internal state/code for this protocol with all integrity
     ##   checks passing.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## ir_Sanyo.cpp:778-780
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         return self._.raw
 
     ## Set the internal state from a valid code for this protocol.
     ## @param[in] newState A valid code for this protocol.
     ## ir_Sanyo.cpp:784-786
     def setRaw(self, newState: List[int]) -> None:
-        self._.raw = newState[:kSanyoAc88StateLength].copy()
+        self._.raw = bytearray(newState[:kSanyoAc88StateLength])
 
     ## Set the requested power state of the A/C to on.
     ## ir_Sanyo.cpp:789
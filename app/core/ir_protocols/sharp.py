@@ -7,6 +7,8 @@
 ## Direct translation from IRremoteESP8266 ir_Sharp.cpp and ir_Sharp.h
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBITS8, GETBITS16, reverseBits, xorBytes
 
 # Ref: http://www.sbprojects.net/knowledge/ir/sharp.htm
 # Ref: http://lirc.sourceforge.net/remotes/sharp/GA538WJSA
@@ -111,180 +113,44 @@ SHARP_A705 = 1
 SHARP_A903 = 2
 
 
-# Bit manipulation helpers
-def GETBITS8(data: int, offset: int, size: int) -> int:
-    """Extract bits from uint8"""
-    mask = (1 << size) - 1
-    return (data >> offset) & mask
-
-
-def GETBITS16(data: int, offset: int, size: int) -> int:
-    """Extract bits from uint16"""
-    mask = (1 << size) - 1
-    return (data >> offset) & mask
-
-
-def reverseBits(data: int, nbits: int) -> int:
-    """Reverse the order of bits in an integer"""
-    result = 0
-    for i in range(nbits):
-        result = (result << 1) | (data & 1)
-        data >>= 1
-    return result
-
-
-def xorBytes(data: List[int], length: int) -> int:
-    """XOR all bytes in data array"""
-    result = 0
-    for i in range(length):
-        result ^= data[i]
-    return result
-
-
 ## Native representation of a Sharp A/C message.
 ## This is a direct translation of the C++ union/struct
-class SharpProtocol:
+class SharpProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (13 bytes for Sharp AC)
-        self.raw = [0] * kSharpAcStateLength
+        self.raw = bytearray(kSharpAcStateLength)
 
     # Byte 4
-    @property
-    def Temp(self) -> int:
-        return self.raw[4] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Model(self) -> int:
-        return (self.raw[4] >> 4) & 0x01
-
-    @Model.setter
-    def Model(self, value: bool) -> None:
-        if value:
-            self.raw[4] |= 0x10
-        else:
-            self.raw[4] &= 0xEF
+    Temp = field(4, 0, 4)
+    Model = field(4, 4, 1)
 
     # Byte 5
-    @property
-    def PowerSpecial(self) -> int:
-        return (self.raw[5] >> 4) & 0x0F
-
-    @PowerSpecial.setter
-    def PowerSpecial(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x0F) | ((value & 0x0F) << 4)
+    PowerSpecial = field(5, 4, 4)
 
     # Byte 6
-    @property
-    def Mode(self) -> int:
-        return self.raw[6] & 0x03
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xFC) | (value & 0x03)
-
-    @property
-    def Clean(self) -> int:
-        return (self.raw[6] >> 3) & 0x01
-
-    @Clean.setter
-    def Clean(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x08
-        else:
-            self.raw[6] &= 0xF7
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[6] >> 4) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0x8F) | ((value & 0x07) << 4)
+    Mode = field(6, 0, 2)
+    Clean = field(6, 3, 1)
+    Fan = field(6, 4, 3)
 
     # Byte 7
-    @property
-    def TimerHours(self) -> int:
-        return self.raw[7] & 0x0F
-
-    @TimerHours.setter
-    def TimerHours(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xF0) | (value & 0x0F)
-
-    @property
-    def TimerType(self) -> int:
-        return (self.raw[7] >> 6) & 0x01
-
-    @TimerType.setter
-    def TimerType(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x40
-        else:
-            self.raw[7] &= 0xBF
-
-    @property
-    def TimerEnabled(self) -> int:
-        return (self.raw[7] >> 7) & 0x01
-
-    @TimerEnabled.setter
-    def TimerEnabled(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x80
-        else:
-            self.raw[7] &= 0x7F
+    TimerHours = field(7, 0, 4)
+    TimerType = field(7, 6, 1)
+    TimerEnabled = field(7, 7, 1)
 
     # Byte 8
-    @property
-    def Swing(self) -> int:
-        return self.raw[8] & 0x07
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xF8) | (value & 0x07)
+    Swing = field(8, 0, 3)
 
     # Byte 10
-    @property
-    def Special(self) -> int:
-        return self.raw[10]
-
-    @Special.setter
-    def Special(self, value: int) -> None:
-        self.raw[10] = value & 0xFF
+    Special = field(10)
 
     # Byte 11
-    @property
-    def Ion(self) -> int:
-        return (self.raw[11] >> 2) & 0x01
-
-    @Ion.setter
-    def Ion(self, value: bool) -> None:
-        if value:
-            self.raw[11] |= 0x04
-        else:
-            self.raw[11] &= 0xFB
-
-    @property
-    def Model2(self) -> int:
-        return (self.raw[11] >> 4) & 0x01
-
-    @Model2.setter
-    def Model2(self, value: bool) -> None:
-        if value:
-            self.raw[11] |= 0x10
-        else:
-            self.raw[11] &= 0xEF
+    Ion = field(11, 2, 1)
+    Model2 = field(11, 4, 1)
 
     # Byte 12
-    @property
-    def Sum(self) -> int:
-        return (self.raw[12] >> 4) & 0x0F
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[12] = (self.raw[12] & 0x0F) | ((value & 0x0F) << 4)
+    Sum = field(12, 4, 4)
 
 
 ## Send a (raw) Sharp message
@@ -519,7 +385,7 @@ class IRSharpAc:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## EXACT translation from ir_Sharp.cpp lines 301-304
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()  # Ensure correct settings before sending.
         return self._.raw
 
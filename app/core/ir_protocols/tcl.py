@@ -16,6 +16,8 @@
 #   Brand: Electrolux,  Model: EACM CL/N3 series remote
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBITS8, sumBytes
 
 # Constants for TCL112AC (from ir_Tcl.h lines 86-123)
 kTcl112AcHdrMark = 3000
@@ -81,232 +83,52 @@ kTcl96AcStateLength = 12
 kTcl96AcBits = kTcl96AcStateLength * 8  # 96 bits
 
 
-## Helper function for summing bytes (used for checksum calculation)
-## Direct translation from IRutils.cpp sumBytes
-def sumBytes(start: List[int], length: int, init: int = 0) -> int:
-    """Sum all bytes in the array (used for checksum). EXACT translation from IRremoteESP8266."""
-    return (init + sum(start[:length])) & 0xFF
-
-
-## Helper function to extract bits from uint8
-## Direct translation from IRremoteESP8266 GETBITS8 macro
-def GETBITS8(data: int, offset: int, size: int) -> int:
-    """Extract bits from uint8. EXACT translation from IRremoteESP8266."""
-    mask = (1 << size) - 1
-    return (data >> offset) & mask
-
-
 ## Native representation of a TCL 112 A/C message.
 ## Direct translation of the C++ union/struct (ir_Tcl.h lines 30-83)
-class Tcl112Protocol:
+class Tcl112Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (14 bytes for TCL112AC)
-        self.raw = [0] * 14
+        self.raw = bytearray(14)
 
     # Byte 3 (from ir_Tcl.h lines 38-39)
-    @property
-    def MsgType(self) -> int:
-        return self.raw[3] & 0x03
-
-    @MsgType.setter
-    def MsgType(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xFC) | (value & 0x03)
+    MsgType = field(3, 0, 2)
 
     # Byte 5 (from ir_Tcl.h lines 42-49)
-    @property
-    def Power(self) -> int:
-        return (self.raw[5] >> 2) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x04
-        else:
-            self.raw[5] &= 0xFB
-
-    @property
-    def OffTimerEnabled(self) -> int:
-        return (self.raw[5] >> 3) & 0x01
-
-    @OffTimerEnabled.setter
-    def OffTimerEnabled(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x08
-        else:
-            self.raw[5] &= 0xF7
-
-    @property
-    def OnTimerEnabled(self) -> int:
-        return (self.raw[5] >> 4) & 0x01
-
-    @OnTimerEnabled.setter
-    def OnTimerEnabled(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x10
-        else:
-            self.raw[5] &= 0xEF
-
-    @property
-    def Quiet(self) -> int:
-        return (self.raw[5] >> 5) & 0x01
-
-    @Quiet.setter
-    def Quiet(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x20
-        else:
-            self.raw[5] &= 0xDF
-
-    @property
-    def Light(self) -> int:
-        return (self.raw[5] >> 6) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x40
-        else:
-            self.raw[5] &= 0xBF
-
-    @property
-    def Econo(self) -> int:
-        return (self.raw[5] >> 7) & 0x01
-
-    @Econo.setter
-    def Econo(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x80
-        else:
-            self.raw[5] &= 0x7F
+    Power = field(5, 2, 1)
+    OffTimerEnabled = field(5, 3, 1)
+    OnTimerEnabled = field(5, 4, 1)
+    Quiet = field(5, 5, 1)
+    Light = field(5, 6, 1)
+    Econo = field(5, 7, 1)
 
     # Byte 6 (from ir_Tcl.h lines 51-54)
-    @property
-    def Mode(self) -> int:
-        return self.raw[6] & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Health(self) -> int:
-        return (self.raw[6] >> 4) & 0x01
-
-    @Health.setter
-    def Health(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x10
-        else:
-            self.raw[6] &= 0xEF
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw[6] >> 5) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x20
-        else:
-            self.raw[6] &= 0xDF
+    Mode = field(6, 0, 4)
+    Health = field(6, 4, 1)
+    Turbo = field(6, 5, 1)
 
     # Byte 7 (from ir_Tcl.h lines 56-57)
-    @property
-    def Temp(self) -> int:
-        return self.raw[7] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xF0) | (value & 0x0F)
+    Temp = field(7, 0, 4)
 
     # Byte 8 (from ir_Tcl.h lines 59-62)
-    @property
-    def Fan(self) -> int:
-        return self.raw[8] & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xF8) | (value & 0x07)
-
-    @property
-    def SwingV(self) -> int:
-        return (self.raw[8] >> 3) & 0x07
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xC7) | ((value & 0x07) << 3)
-
-    @property
-    def TimerIndicator(self) -> int:
-        return (self.raw[8] >> 6) & 0x01
-
-    @TimerIndicator.setter
-    def TimerIndicator(self, value: bool) -> None:
-        if value:
-            self.raw[8] |= 0x40
-        else:
-            self.raw[8] &= 0xBF
+    Fan = field(8, 0, 3)
+    SwingV = field(8, 3, 3)
+    TimerIndicator = field(8, 6, 1)
 
     # Byte 9 (from ir_Tcl.h lines 64-66)
-    @property
-    def OffTimer(self) -> int:
-        return (self.raw[9] >> 1) & 0x3F
-
-    @OffTimer.setter
-    def OffTimer(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0x81) | ((value & 0x3F) << 1)
+    OffTimer = field(9, 1, 6)
 
     # Byte 10 (from ir_Tcl.h lines 68-70)
-    @property
-    def OnTimer(self) -> int:
-        return (self.raw[10] >> 1) & 0x3F
-
-    @OnTimer.setter
-    def OnTimer(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0x81) | ((value & 0x3F) << 1)
+    OnTimer = field(10, 1, 6)
 
     # Byte 12 (from ir_Tcl.h lines 74-79)
-    @property
-    def SwingH(self) -> int:
-        return (self.raw[12] >> 3) & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x08
-        else:
-            self.raw[12] &= 0xF7
-
-    @property
-    def HalfDegree(self) -> int:
-        return (self.raw[12] >> 5) & 0x01
-
-    @HalfDegree.setter
-    def HalfDegree(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x20
-        else:
-            self.raw[12] &= 0xDF
-
-    @property
-    def isTcl(self) -> int:
-        return (self.raw[12] >> 7) & 0x01
-
-    @isTcl.setter
-    def isTcl(self, value: bool) -> None:
-        if value:
-            self.raw[12] |= 0x80
-        else:
-            self.raw[12] &= 0x7F
+    SwingH = field(12, 3, 1)
+    HalfDegree = field(12, 5, 1)
+    isTcl = field(12, 7, 1)
 
     # Byte 13 (from ir_Tcl.h line 81)
-    @property
-    def Sum(self) -> int:
-        return self.raw[13] & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[13] = value & 0xFF
+    Sum = field(13)
 
 
 ## Send a TCL 112-bit A/C message.
@@ -424,7 +246,7 @@ class IRTcl112Ac:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## Direct translation from ir_Tcl.cpp lines 165-170
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
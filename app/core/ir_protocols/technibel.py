@@ -6,6 +6,8 @@
 ## Direct translation from IRremoteESP8266 ir_Technibel.cpp and ir_Technibel.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBITS64
 
 # Supports:
 #   Brand: Technibel,  Model: IRO PLUS
@@ -51,166 +53,47 @@ kTechnibelAcResetState = 0x180101140000EA
 
 ## Native representation of a Technibel A/C message.
 ## Direct translation of C++ union/struct (from ir_Technibel.h lines 24-46)
-class TechnibelProtocol:
+class TechnibelProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         self.raw = kTechnibelAcResetState  # uint64_t
 
     # Byte 0
-    @property
-    def Sum(self) -> int:
-        return self.raw & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw = (self.raw & ~0xFF) | (value & 0xFF)
+    Sum = field(0)
 
     # Byte 1
-    @property
-    def Footer(self) -> int:
-        return (self.raw >> 8) & 0xFF
-
-    @Footer.setter
-    def Footer(self, value: int) -> None:
-        self.raw = (self.raw & ~(0xFF << 8)) | ((value & 0xFF) << 8)
+    Footer = field(1)
 
     # Byte 2
-    @property
-    def TimerHours(self) -> int:
-        return (self.raw >> 16) & 0x1F
-
-    @TimerHours.setter
-    def TimerHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x1F << 16)) | ((value & 0x1F) << 16)
+    TimerHours = field(2, 0, 5)
 
     # :3 bits (21-23)
 
     # Byte 3
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 24) & 0x7F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x7F << 24)) | ((value & 0x7F) << 24)
+    Temp = field(3, 0, 7)
 
     # :1 bit (31)
 
     # Byte 4
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 32) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x07 << 32)) | ((value & 0x07) << 32)
+    Fan = field(4, 0, 3)
 
     # :1 bit (35)
 
-    @property
-    def Sleep(self) -> int:
-        return (self.raw >> 36) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 36
-        else:
-            self.raw &= ~(1 << 36)
-
-    @property
-    def Swing(self) -> int:
-        return (self.raw >> 37) & 0x01
-
-    @Swing.setter
-    def Swing(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 37
-        else:
-            self.raw &= ~(1 << 37)
-
-    @property
-    def UseFah(self) -> int:
-        return (self.raw >> 38) & 0x01
-
-    @UseFah.setter
-    def UseFah(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 38
-        else:
-            self.raw &= ~(1 << 38)
-
-    @property
-    def TimerEnable(self) -> int:
-        return (self.raw >> 39) & 0x01
-
-    @TimerEnable.setter
-    def TimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 39
-        else:
-            self.raw &= ~(1 << 39)
+    Sleep = field(4, 4, 1)
+    Swing = field(4, 5, 1)
+    UseFah = field(4, 6, 1)
+    TimerEnable = field(4, 7, 1)
 
     # Byte 5
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 40) & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 40)) | ((value & 0x0F) << 40)
-
-    @property
-    def FanChange(self) -> int:
-        return (self.raw >> 44) & 0x01
-
-    @FanChange.setter
-    def FanChange(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 44
-        else:
-            self.raw &= ~(1 << 44)
-
-    @property
-    def TempChange(self) -> int:
-        return (self.raw >> 45) & 0x01
-
-    @TempChange.setter
-    def TempChange(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 45
-        else:
-            self.raw &= ~(1 << 45)
-
-    @property
-    def TimerChange(self) -> int:
-        return (self.raw >> 46) & 0x01
-
-    @TimerChange.setter
-    def TimerChange(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 46
-        else:
-            self.raw &= ~(1 << 46)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 47) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 47
-        else:
-            self.raw &= ~(1 << 47)
+    Mode = field(5, 0, 4)
+    FanChange = field(5, 4, 1)
+    TempChange = field(5, 5, 1)
+    TimerChange = field(5, 6, 1)
+    Power = field(5, 7, 1)
 
     # Byte 6
-    @property
-    def Header(self) -> int:
-        return (self.raw >> 48) & 0xFF
-
-    @Header.setter
-    def Header(self, value: int) -> None:
-        self.raw = (self.raw & ~(0xFF << 48)) | ((value & 0xFF) << 48)
+    Header = field(6)
 
 
 ## Send an Technibel AC formatted message.
@@ -245,13 +128,6 @@ def sendTechnibelAc(data: int, nbits: int, repeat: int = kTechnibelAcDefaultRepe
     )
 
 
-## Helper function to get bits from uint64
-## EXACT translation from C++ GETBITS64 macro
-def GETBITS64(value: int, offset: int, nbits: int) -> int:
-    """Extract nbits from value starting at offset"""
-    return (value >> offset) & ((1 << nbits) - 1)
-
-
 ## Decode the supplied Technibel A/C message.
 ## Status: STABLE / Reported as working on a real device
 ## @param[in,out] results Ptr to data to decode & where to store the decode
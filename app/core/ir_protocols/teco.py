@@ -6,6 +6,7 @@
 ## Direct translation from IRremoteESP8266 ir_Teco.cpp and ir_Teco.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Constants - Timing values (from ir_Teco.cpp lines 15-22)
 # using SPACE modulation.
@@ -44,151 +45,51 @@ kTecoReset = 0b01001010000000000000010000000000000
 ## Native representation of a Teco A/C message.
 ## This is a direct translation of the C++ union/struct (ir_Teco.h lines 23-43)
 ## Note: In C++, this is stored as a uint64_t, but we use properties to access bitfields
-class TecoProtocol:
+class TecoProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state as a single 64-bit value (35 bits used)
         self.raw = 0
 
     # Bits 0-2: Mode
-    @property
-    def Mode(self) -> int:
-        return self.raw & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & ~0x07) | (value & 0x07)
+    Mode = field(0, 0, 3)
 
     # Bit 3: Power
-    @property
-    def Power(self) -> int:
-        return (self.raw >> 3) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 3
-        else:
-            self.raw &= ~(1 << 3)
+    Power = field(0, 3, 1)
 
     # Bits 4-5: Fan
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 4) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 4)) | ((value & 0x03) << 4)
+    Fan = field(0, 4, 2)
 
     # Bit 6: Swing
-    @property
-    def Swing(self) -> int:
-        return (self.raw >> 6) & 0x01
-
-    @Swing.setter
-    def Swing(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 6
-        else:
-            self.raw &= ~(1 << 6)
+    Swing = field(0, 6, 1)
 
     # Bit 7: Sleep
-    @property
-    def Sleep(self) -> int:
-        return (self.raw >> 7) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 7
-        else:
-            self.raw &= ~(1 << 7)
+    Sleep = field(0, 7, 1)
 
     # Bits 8-11: Temp
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 8) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 8)) | ((value & 0x0F) << 8)
+    Temp = field(1, 0, 4)
 
     # Bit 12: HalfHour
-    @property
-    def HalfHour(self) -> int:
-        return (self.raw >> 12) & 0x01
-
-    @HalfHour.setter
-    def HalfHour(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 12
-        else:
-            self.raw &= ~(1 << 12)
+    HalfHour = field(1, 4, 1)
 
     # Bits 13-14: TensHours
-    @property
-    def TensHours(self) -> int:
-        return (self.raw >> 13) & 0x03
-
-    @TensHours.setter
-    def TensHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x03 << 13)) | ((value & 0x03) << 13)
+    TensHours = field(1, 5, 2)
 
     # Bit 15: TimerOn
-    @property
-    def TimerOn(self) -> int:
-        return (self.raw >> 15) & 0x01
-
-    @TimerOn.setter
-    def TimerOn(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 15
-        else:
-            self.raw &= ~(1 << 15)
+    TimerOn = field(1, 7, 1)
 
     # Bits 16-19: UnitHours
-    @property
-    def UnitHours(self) -> int:
-        return (self.raw >> 16) & 0x0F
-
-    @UnitHours.setter
-    def UnitHours(self, value: int) -> None:
-        self.raw = (self.raw & ~(0x0F << 16)) | ((value & 0x0F) << 16)
+    UnitHours = field(2, 0, 4)
 
     # Bit 20: Humid
-    @property
-    def Humid(self) -> int:
-        return (self.raw >> 20) & 0x01
-
-    @Humid.setter
-    def Humid(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 20
-        else:
-            self.raw &= ~(1 << 20)
+    Humid = field(2, 4, 1)
 
     # Bit 21: Light
-    @property
-    def Light(self) -> int:
-        return (self.raw >> 21) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 21
-        else:
-            self.raw &= ~(1 << 21)
+    Light = field(2, 5, 1)
 
     # Bit 23: Save
-    @property
-    def Save(self) -> int:
-        return (self.raw >> 23) & 0x01
-
-    @Save.setter
-    def Save(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 23
-        else:
-            self.raw &= ~(1 << 23)
+    Save = field(2, 7, 1)
 
 
 ## Send a Teco A/C message.
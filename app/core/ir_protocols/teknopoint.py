@@ -7,6 +7,7 @@
 ## Direct translation from IRremoteESP8266 ir_Teknopoint.cpp
 
 from typing import List
+from app.core.ir_protocols.bitops import sumBytes
 
 # Supports:
 #   Brand: Teknopoint,  Model: Allegro SSA-09H A/C
@@ -30,16 +31,6 @@ kTeknopointBits = kTeknopointStateLength * 8  # 112 bits
 kDefaultMessageGap = 100000
 
 
-## Helper function to sum bytes
-## EXACT translation from C++ sumBytes utility function
-def sumBytes(data: List[int], length: int) -> int:
-    """Sum up all the bytes in an array"""
-    sum_val = 0
-    for i in range(length):
-        sum_val += data[i]
-    return sum_val & 0xFF
-
-
 ## Send a Teknopoint formatted message.
 ## Status: BETA / Probably works.
 ## @param[in] data An array of bytes containing the IR command.
@@ -128,34 +128,44 @@ def get_test_codes(protocol: str) -> dict:
     """
     Get known good test codes for a specific protocol.
 
+    The codes are served from the indexed catalog (app/services/code_catalog.py),
+    which the dicts above seed.
+
     Args:
-        protocol: Protocol name (e.g., "fujitsu", "samsung")
+        protocol: Protocol name (e.g., "fujitsu", "samsung"), case-insensitive
 
     Returns:
         Dictionary of test codes for the protocol
     """
-    return ALL_KNOWN_GOOD_CODES.get(protocol.lower(), {})
+    from app.services.code_catalog import get_code_catalog
+
+    return get_code_catalog().get_codes(protocol)
 
 
 def add_test_code(protocol: str, name: str, code: str) -> None:
     """
-    Add a new test code to the collection.
+    Add a new test code to the collection and the catalog.
 
     Args:
         protocol: Protocol name
         name: Test code name (e.g., "COOL_24C")
         code: Base64 encoded Tuya IR code
     """
+    from app.services.code_catalog import get_code_catalog
+
     protocol_key = protocol.lower()
     if protocol_key in ALL_KNOWN_GOOD_CODES:
         ALL_KNOWN_GOOD_CODES[protocol_key][name] = code
     else:
         ALL_KNOWN_GOOD_CODES[protocol_key] = {name: code}
+    get_code_catalog().add_code(protocol_key.title(), name, code)
 
 
 def list_protocols() -> list:
     """Get list of protocols with available test codes."""
-    return [protocol for protocol, codes in ALL_KNOWN_GOOD_CODES.items() if codes]
+    from app.services.code_catalog import get_code_catalog, manufacturer_key
+
+    return [manufacturer_key(name) for name in get_code_catalog().manufacturers()]
 
 
 def list_test_codes(protocol: str) -> list:
@@ -7,6 +7,15 @@
 
 from typing import List
 import copy
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import checkInvertedBytePairs, invertBytePairs, xorBytes
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    matchFrame,
+    sendFrame,
+)
 
 # Constants - Timing values (from ir_Toshiba.cpp lines 25-33)
 kToshibaAcHdrMark = 4400
@@ -17,6 +26,23 @@ kToshibaAcZeroSpace = 490
 kToshibaAcMinGap = 4600  # WH-UB03NJ remote
 kToshibaAcUsualGap = 7400  # Others
 
+## Header, the state MSB first, footer, gap. We send the usual gap, but the
+## decoder accepts anything from the WH-UB03NJ's shorter one up.
+kToshibaAcLayout = frame_layout_t(
+    timing=bit_timing_t(
+        kToshibaAcBitMark, kToshibaAcOneSpace, kToshibaAcBitMark, kToshibaAcZeroSpace, True
+    ),
+    sections=(
+        frame_section_t(
+            hdrmark=kToshibaAcHdrMark,
+            hdrspace=kToshibaAcHdrSpace,
+            footermark=kToshibaAcBitMark,
+            gap=kToshibaAcUsualGap,
+            matchgap=kToshibaAcMinGap,
+        ),
+    ),
+)
+
 # State length constants (from ir_Toshiba.h)
 kToshibaACStateLengthShort = 6  # Short message (56 bits)
 kToshibaACStateLength = 9  # Normal message (72 bits)
@@ -58,139 +84,44 @@ kToshibaAcRemoteA = 0  # 0b0000
 kToshibaAcRemoteB = 1  # 0b0001
 
 
-def xorBytes(data: List[int], length: int) -> int:
-    """XOR all bytes in array. EXACT translation from IRutils."""
-    result = 0
-    for i in range(length):
-        result ^= data[i]
-    return result & 0xFF
-
-
-def invertBytePairs(data: List[int], length: int) -> None:
-    """
-    Invert byte pairs in-place.
-    EXACT translation from IRutils::invertBytePairs
-    """
-    for i in range(1, length, 2):
-        data[i] = data[i - 1] ^ 0xFF
-
-
-def checkInvertedBytePairs(data: List[int], length: int) -> bool:
-    """
-    Check if byte pairs are inverted.
-    EXACT translation from IRutils::checkInvertedBytePairs
-    """
-    for i in range(1, length, 2):
-        if data[i] != (data[i - 1] ^ 0xFF):
-            return False
-    return True
-
-
 ## Native representation of a Toshiba A/C message.
 ## Direct translation of the C++ union/struct (ir_Toshiba.h lines 44-86)
-class ToshibaProtocol:
+class ToshibaProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array
-        self.raw = [0] * kToshibaACStateLengthLong
+        self.raw = bytearray(kToshibaACStateLengthLong)
 
     # Byte 2 - Length field (bits 0-3)
-    @property
-    def Length(self) -> int:
-        return self.raw[2] & 0x0F
-
-    @Length.setter
-    def Length(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xF0) | (value & 0x0F)
+    Length = field(2, 0, 4)
 
     # Byte 2 - Model field (bits 4-7)
-    @property
-    def Model(self) -> int:
-        return (self.raw[2] >> 4) & 0x0F
-
-    @Model.setter
-    def Model(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0x0F) | ((value & 0x0F) << 4)
+    Model = field(2, 4, 4)
 
     # Byte 4 - LongMsg bit (bit 3)
-    @property
-    def LongMsg(self) -> int:
-        return (self.raw[4] >> 3) & 0x01
-
-    @LongMsg.setter
-    def LongMsg(self, value: bool) -> None:
-        if value:
-            self.raw[4] |= 0x08
-        else:
-            self.raw[4] &= 0xF7
+    LongMsg = field(4, 3, 1)
 
     # Byte 4 - ShortMsg bit (bit 5)
-    @property
-    def ShortMsg(self) -> int:
-        return (self.raw[4] >> 5) & 0x01
-
-    @ShortMsg.setter
-    def ShortMsg(self, value: bool) -> None:
-        if value:
-            self.raw[4] |= 0x20
-        else:
-            self.raw[4] &= 0xDF
+    ShortMsg = field(4, 5, 1)
 
     # Byte 5 - Swing field (bits 0-2)
-    @property
-    def Swing(self) -> int:
-        return self.raw[5] & 0x07
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xF8) | (value & 0x07)
+    Swing = field(5, 0, 3)
 
     # Byte 5 - Temp field (bits 4-7)
-    @property
-    def Temp(self) -> int:
-        return (self.raw[5] >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0x0F) | ((value & 0x0F) << 4)
+    Temp = field(5, 4, 4)
 
     # Byte 6 - Mode field (bits 0-2)
-    @property
-    def Mode(self) -> int:
-        return self.raw[6] & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xF8) | (value & 0x07)
+    Mode = field(6, 0, 3)
 
     # Byte 6 - Fan field (bits 5-7)
-    @property
-    def Fan(self) -> int:
-        return (self.raw[6] >> 5) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0x1F) | ((value & 0x07) << 5)
+    Fan = field(6, 5, 3)
 
     # Byte 7 - Filter bit (bit 4)
-    @property
-    def Filter(self) -> int:
-        return (self.raw[7] >> 4) & 0x01
-
-    @Filter.setter
-    def Filter(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x10
-        else:
-            self.raw[7] &= 0xEF
+    Filter = field(7, 4, 1)
 
     # Byte 8 - EcoTurbo field (all 8 bits)
-    @property
-    def EcoTurbo(self) -> int:
-        return self.raw[8] & 0xFF
-
-    @EcoTurbo.setter
-    def EcoTurbo(self, value: int) -> None:
-        self.raw[8] = value & 0xFF
+    EcoTurbo = field(8)
 
 
 ## Send a Toshiba A/C message.
@@ -203,21 +134,7 @@ def sendToshibaAC(data: List[int], nbytes: int, repeat: int = 0) -> List[int]:
 
     Returns timing array instead of transmitting via hardware.
     """
-    from app.core.ir_protocols.ir_send import sendGeneric
-
-    return sendGeneric(
-        headermark=kToshibaAcHdrMark,
-        headerspace=kToshibaAcHdrSpace,
-        onemark=kToshibaAcBitMark,
-        onespace=kToshibaAcOneSpace,
-        zeromark=kToshibaAcBitMark,
-        zerospace=kToshibaAcZeroSpace,
-        footermark=kToshibaAcBitMark,
-        gap=kToshibaAcUsualGap,
-        dataptr=data,
-        nbytes=nbytes,
-        MSBfirst=True,
-    )
+    return sendFrame(kToshibaAcLayout, data, nbytes)
 
 
 ## Class for handling detailed Toshiba A/C messages.
@@ -226,7 +143,7 @@ class IRToshibaAC:
     ## Class Constructor
     def __init__(self) -> None:
         self._: ToshibaProtocol = ToshibaProtocol()
-        self.backup = [0] * kToshibaACStateLengthLong
+        self.backup = bytearray(kToshibaACStateLengthLong)
         self._prev_mode = kToshibaAcAuto
         self._send_swing = False
         self._swing_mode = kToshibaAcSwingOff
@@ -458,7 +375,7 @@ class IRToshibaAC:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## Direct translation from ir_Toshiba.cpp lines 139-142
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum(self.getStateLength())
         return self._.raw
 
@@ -501,8 +418,6 @@ def decodeToshibaAC(
     Decode a Toshiba A/C IR message.
     EXACT translation from IRremoteESP8266 IRrecv::decodeToshibaAC
     """
-    from app.core.ir_protocols.ir_recv import kHeader, kFooter, kMarkExcess, _matchGeneric
-
     # Compliance
     if strict:
         # Must be called with the correct nr. of bits (ir_Toshiba.cpp lines 536-543)
@@ -513,27 +428,7 @@ def decodeToshibaAC(
             return False
 
     # Match Header + Data + Footer (ir_Toshiba.cpp lines 546-553)
-    used = _matchGeneric(
-        data_ptr=results.rawbuf[offset:],
-        result_bits_ptr=None,
-        result_bytes_ptr=results.state,
-        use_bits=False,
-        remaining=results.rawlen - offset,
-        nbits=nbits,
-        hdrmark=kToshibaAcHdrMark,
-        hdrspace=kToshibaAcHdrSpace,
-        onemark=kToshibaAcBitMark,
-        onespace=kToshibaAcOneSpace,
-        zeromark=kToshibaAcBitMark,
-        zerospace=kToshibaAcZeroSpace,
-        footermark=kToshibaAcBitMark,
-        footerspace=kToshibaAcMinGap,
-        atleast=True,
-        tolerance=_tolerance,
-        excess=kMarkExcess,
-        MSBfirst=True,
-    )
-    if used == 0:
+    if not matchFrame(results, offset, kToshibaAcLayout, nbits // 8, tolerance=_tolerance):
         return False
 
     # Compliance
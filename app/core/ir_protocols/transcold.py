@@ -10,6 +10,8 @@
 ## Direct translation from IRremoteESP8266 ir_Transcold.cpp and ir_Transcold.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import invertBits, reverseBits
 
 # Supports:
 #   Brand: Transcold,  Model: M1-F-NO-6 A/C
@@ -57,37 +59,21 @@ kTranscoldKnownGoodState = 0xE96554
 
 ## Native representation of a Transcold A/C message.
 ## Direct translation from C++ union/struct (ir_Transcold.h lines 73-83)
-class TranscoldProtocol:
+class TranscoldProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state as raw 32-bit value
         self.raw = 0
 
     # Byte 1 - Temp (4 bits at bit position 8-11)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 8) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFF0FF) | ((value & 0x0F) << 8)
+    Temp = field(1, 0, 4)
 
     # Byte 1 - Mode (4 bits at bit position 12-15)
-    @property
-    def Mode(self) -> int:
-        return (self.raw >> 12) & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFF0FFF) | ((value & 0x0F) << 12)
+    Mode = field(1, 4, 4)
 
     # Byte 2 - Fan (4 bits at bit position 16-19)
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 16) & 0x0F
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFF0FFFF) | ((value & 0x0F) << 16)
+    Fan = field(2, 0, 4)
 
 
 ## Send a Transcold message
@@ -229,18 +215,12 @@ class IRTranscoldAc:
         # Range check.
         temp = min(desired, kTranscoldTempMax)
         temp = max(temp, kTranscoldTempMin) - kTranscoldTempMin + 1
-        # Import here to avoid circular dependency
-        from app.core.ir_protocols.ir_recv import reverseBits, invertBits
-
         self._.Temp = reverseBits(invertBits(temp, kTranscoldTempSize), kTranscoldTempSize)
 
     ## Get the current temperature setting.
     ## @return The current setting for temp. in degrees celsius.
     ## Direct translation from ir_Transcold.cpp lines 171-174
     def getTemp(self) -> int:
-        # Import here to avoid circular dependency
-        from app.core.ir_protocols.ir_recv import reverseBits, invertBits
-
         return (
             reverseBits(invertBits(self._.Temp, kTranscoldTempSize), kTranscoldTempSize)
             + kTranscoldTempMin
@@ -376,7 +356,6 @@ def decodeTranscold(results, offset: int = 1, nbits: int = 24, strict: bool = Tr
         matchMark,
         matchSpace,
         matchAtLeast,
-        invertBits,
     )
 
     # The protocol sends the data normal + inverted, alternating on
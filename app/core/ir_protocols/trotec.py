@@ -8,6 +8,8 @@
 ## Includes both Trotec and Trotec3550 variants
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
 
 # Constants - Trotec Timing values
 kTrotecHdrMark = 5952
@@ -71,221 +73,71 @@ def fahrenheitToCelsius(temp: float) -> int:
 
 ## Native representation of a Trotec A/C message.
 ## This is a direct translation of the C++ union/struct
-class TrotecProtocol:
+class TrotecProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (9 bytes for Trotec)
-        self.raw = [0] * kTrotecStateLength
+        self.raw = bytearray(kTrotecStateLength)
 
     # Byte 0
-    @property
-    def Intro1(self) -> int:
-        return self.raw[0]
-
-    @Intro1.setter
-    def Intro1(self, value: int) -> None:
-        self.raw[0] = value & 0xFF
+    Intro1 = field(0)
 
     # Byte 1
-    @property
-    def Intro2(self) -> int:
-        return self.raw[1]
-
-    @Intro2.setter
-    def Intro2(self, value: int) -> None:
-        self.raw[1] = value & 0xFF
+    Intro2 = field(1)
 
     # Byte 2
-    @property
-    def Mode(self) -> int:
-        return self.raw[2] & 0x03
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xFC) | (value & 0x03)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[2] >> 3) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x08
-        else:
-            self.raw[2] &= 0xF7
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[2] >> 4) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xCF) | ((value & 0x03) << 4)
+    Mode = field(2, 0, 2)
+    Power = field(2, 3, 1)
+    Fan = field(2, 4, 2)
 
     # Byte 3
-    @property
-    def Temp(self) -> int:
-        return self.raw[3] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[3] >> 7) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x80
-        else:
-            self.raw[3] &= 0x7F
+    Temp = field(3, 0, 4)
+    Sleep = field(3, 7, 1)
 
     # Byte 5
-    @property
-    def Timer(self) -> int:
-        return (self.raw[5] >> 6) & 0x01
-
-    @Timer.setter
-    def Timer(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x40
-        else:
-            self.raw[5] &= 0xBF
+    Timer = field(5, 6, 1)
 
     # Byte 6
-    @property
-    def Hours(self) -> int:
-        return self.raw[6]
-
-    @Hours.setter
-    def Hours(self, value: int) -> None:
-        self.raw[6] = value & 0xFF
+    Hours = field(6)
 
     # Byte 8
-    @property
-    def Sum(self) -> int:
-        return self.raw[8]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[8] = value & 0xFF
+    Sum = field(8)
 
 
 ## Native representation of a Trotec 3550 A/C message.
 ## This is a direct translation of the C++ union/struct
-class Trotec3550Protocol:
+class Trotec3550Protocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (9 bytes for Trotec3550)
-        self.raw = [0] * kTrotecStateLength
+        self.raw = bytearray(kTrotecStateLength)
 
     # Byte 0
-    @property
-    def Intro(self) -> int:
-        return self.raw[0]
-
-    @Intro.setter
-    def Intro(self, value: int) -> None:
-        self.raw[0] = value & 0xFF
+    Intro = field(0)
 
     # Byte 1
-    @property
-    def SwingV(self) -> int:
-        return self.raw[1] & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.raw[1] |= 0x01
-        else:
-            self.raw[1] &= 0xFE
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[1] >> 1) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[1] |= 0x02
-        else:
-            self.raw[1] &= 0xFD
-
-    @property
-    def TimerSet(self) -> int:
-        return (self.raw[1] >> 3) & 0x01
-
-    @TimerSet.setter
-    def TimerSet(self, value: bool) -> None:
-        if value:
-            self.raw[1] |= 0x08
-        else:
-            self.raw[1] &= 0xF7
-
-    @property
-    def TempC(self) -> int:
-        return (self.raw[1] >> 4) & 0x0F
-
-    @TempC.setter
-    def TempC(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0x0F) | ((value & 0x0F) << 4)
+    SwingV = field(1, 0, 1)
+    Power = field(1, 1, 1)
+    TimerSet = field(1, 3, 1)
+    TempC = field(1, 4, 4)
 
     # Byte 2
-    @property
-    def TimerHrs(self) -> int:
-        return self.raw[2] & 0x0F
-
-    @TimerHrs.setter
-    def TimerHrs(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xF0) | (value & 0x0F)
+    TimerHrs = field(2, 0, 4)
 
     # Byte 3
-    @property
-    def TempF(self) -> int:
-        return self.raw[3] & 0x1F
-
-    @TempF.setter
-    def TempF(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xE0) | (value & 0x1F)
+    TempF = field(3, 0, 5)
 
     # Byte 6
-    @property
-    def Mode(self) -> int:
-        return self.raw[6] & 0x03
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xFC) | (value & 0x03)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw[6] >> 4) & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xCF) | ((value & 0x03) << 4)
+    Mode = field(6, 0, 2)
+    Fan = field(6, 4, 2)
 
     # Byte 7
-    @property
-    def Celsius(self) -> int:
-        return (self.raw[7] >> 7) & 0x01
-
-    @Celsius.setter
-    def Celsius(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x80
-        else:
-            self.raw[7] &= 0x7F
+    Celsius = field(7, 7, 1)
 
     # Byte 8
-    @property
-    def Sum(self) -> int:
-        return self.raw[8]
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw[8] = value & 0xFF
+    Sum = field(8)
 
 
 ## Calculate the checksum for a given state (Trotec).
@@ -295,9 +147,7 @@ def calcChecksumTrotec(state: List[int], length: int = kTrotecStateLength) -> in
     Calculate checksum for Trotec protocol.
     EXACT translation from IRremoteESP8266 IRTrotecESP::calcChecksum
     """
-    from app.core.ir_protocols.ir_recv import sumBytes
-
-    return sumBytes(state, 2, length - 3)
+    return sumBytes(state[2:], length - 3)
 
 
 ## Verify the checksum is valid for a given state (Trotec).
@@ -319,9 +169,7 @@ def calcChecksumTrotec3550(state: List[int], length: int = kTrotecStateLength) -
     """
     if length == 0:
         return 0
-    from app.core.ir_protocols.ir_recv import sumBytes
-
-    return sumBytes(state, 0, length - 1)
+    return sumBytes(state, length - 1)
 
 
 ## Verify the checksum is valid for a given state (Trotec3550).
@@ -433,7 +281,7 @@ class IRTrotecESP:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## Direct translation from ir_Trotec.cpp lines 124-127
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
@@ -540,7 +388,7 @@ class IRTrotec3550:
 
     ## Get a PTR to the internal state/code for this protocol.
     ## Direct translation from ir_Trotec.cpp lines 448-451
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()
         return self._.raw
 
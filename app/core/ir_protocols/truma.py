@@ -8,6 +8,7 @@
 ## Direct translation from IRremoteESP8266 ir_Truma.cpp and ir_Truma.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Supports:
 #   Brand: Truma,  Model: Aventa A/C
@@ -47,7 +48,9 @@ kTrumaMaxTemp = 31
 
 ## Native representation of a Truma A/C message.
 ## Direct translation from C++ union/struct (ir_Truma.h lines 25-47)
-class TrumaProtocol:
+class TrumaProtocol(BitfieldStruct, integer=True):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state as raw 64-bit value
         self.raw = 0
@@ -61,42 +64,14 @@ class TrumaProtocol:
     def Mode(self, value: int) -> None:
         self.raw = (self.raw & 0xFFFFFFFFFFFFF8FF) | ((value & 0x03) << 8)
 
-    @property
-    def PowerOff(self) -> int:
-        return (self.raw >> 10) & 0x01
-
-    @PowerOff.setter
-    def PowerOff(self, value: bool) -> None:
-        if value:
-            self.raw |= 1 << 10
-        else:
-            self.raw &= ~(1 << 10)
-
-    @property
-    def Fan(self) -> int:
-        return (self.raw >> 11) & 0x07
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFFFFC7FF) | ((value & 0x07) << 11)
+    PowerOff = field(1, 2, 1)
+    Fan = field(1, 3, 3)
 
     # Byte 2 (bits 16-23) - Temp (from ir_Truma.h lines 36-37)
-    @property
-    def Temp(self) -> int:
-        return (self.raw >> 16) & 0x1F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw = (self.raw & 0xFFFFFFFFFFE0FFFF) | ((value & 0x1F) << 16)
+    Temp = field(2, 0, 5)
 
     # Byte 6 (bits 48-55) - Sum (from ir_Truma.h line 45)
-    @property
-    def Sum(self) -> int:
-        return (self.raw >> 48) & 0xFF
-
-    @Sum.setter
-    def Sum(self, value: int) -> None:
-        self.raw = (self.raw & 0xFF00FFFFFFFFFFFF) | ((value & 0xFF) << 48)
+    Sum = field(6)
 
 
 ## Send a Truma formatted message.
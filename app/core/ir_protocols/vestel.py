@@ -11,6 +11,8 @@
 #   Brand: Vestel,  Model: BIOX CXP-9 A/C (9K BTU)
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import GETBITS64, countBits
 
 # Ref: None. Totally reverse engineered.
 
@@ -57,44 +59,11 @@ kVestelAcStateDefault = 0x0F00D9001FEF201
 kVestelAcTimeStateDefault = 0x201
 
 
-## Helper function to extract bits from uint64
-## Direct translation from IRremoteESP8266 GETBITS64 macro
-def GETBITS64(data: int, offset: int, nbits: int) -> int:
-    """Extract bits from uint64. EXACT translation from IRremoteESP8266."""
-    mask = (1 << nbits) - 1
-    return (data >> offset) & mask
-
-
-## Helper function for counting bits
-## Direct translation from IRutils.cpp countBits (lines 497-506)
-def countBits(data: int, length: int, ones: bool = True, init: int = 0) -> int:
-    """
-    Count the number of bits of a given type (1s or 0s) in an integer.
-    EXACT translation from IRremoteESP8266 countBits
-    """
-    count = init
-    bitsSoFar = length
-    remainder = data
-
-    while remainder and bitsSoFar:
-        if ones:
-            if remainder & 1:
-                count += 1
-        else:
-            if not (remainder & 1):
-                count += 1
-        remainder >>= 1
-        bitsSoFar -= 1
-
-    if not ones:
-        count += bitsSoFar
-
-    return count
-
-
 ## Native representation of a Vestel A/C message.
 ## Direct translation of the C++ union/struct (ir_Vestel.h lines 26-61)
-class VestelProtocol:
+class VestelProtocol(BitfieldStruct, buffer="cmdState", integer=True):
+    __slots__ = ("cmdState", "timeState")
+
     def __init__(self):
         # The state in IR code form (64-bit value)
         self.cmdState = 0
@@ -102,200 +71,65 @@ class VestelProtocol:
 
     # Command state properties
     # Signature (bits 0-11) - from ir_Vestel.h line 33
-    @property
-    def Signature(self) -> int:
-        return GETBITS64(self.cmdState, 0, 12)
-
-    @Signature.setter
-    def Signature(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~0xFFF) | (value & 0xFFF)
+    Signature = field(0, 0, 12)
 
     # CmdSum (bits 12-19) - from ir_Vestel.h line 34
-    @property
-    def CmdSum(self) -> int:
-        return GETBITS64(self.cmdState, 12, 8)
-
-    @CmdSum.setter
-    def CmdSum(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0xFF << 12)) | ((value & 0xFF) << 12)
+    CmdSum = field(1, 4)
 
     # Swing (bits 20-23) - from ir_Vestel.h line 35
-    @property
-    def Swing(self) -> int:
-        return GETBITS64(self.cmdState, 20, 4)
-
-    @Swing.setter
-    def Swing(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0xF << 20)) | ((value & 0xF) << 20)
+    Swing = field(2, 4, 4)
 
     # TurboSleep (bits 24-27) - from ir_Vestel.h line 36
-    @property
-    def TurboSleep(self) -> int:
-        return GETBITS64(self.cmdState, 24, 4)
-
-    @TurboSleep.setter
-    def TurboSleep(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0xF << 24)) | ((value & 0xF) << 24)
+    TurboSleep = field(3, 0, 4)
 
     # Temp (bits 36-39) - from ir_Vestel.h line 38
-    @property
-    def Temp(self) -> int:
-        return GETBITS64(self.cmdState, 36, 4)
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0xF << 36)) | ((value & 0xF) << 36)
+    Temp = field(4, 4, 4)
 
     # Fan (bits 40-43) - from ir_Vestel.h line 39
-    @property
-    def Fan(self) -> int:
-        return GETBITS64(self.cmdState, 40, 4)
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0xF << 40)) | ((value & 0xF) << 40)
+    Fan = field(5, 0, 4)
 
     # Mode (bits 44-46) - from ir_Vestel.h line 40
-    @property
-    def Mode(self) -> int:
-        return GETBITS64(self.cmdState, 44, 3)
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0x7 << 44)) | ((value & 0x7) << 44)
+    Mode = field(5, 4, 3)
 
     # Ion (bit 50) - from ir_Vestel.h line 42
-    @property
-    def Ion(self) -> int:
-        return GETBITS64(self.cmdState, 50, 1)
-
-    @Ion.setter
-    def Ion(self, value: bool) -> None:
-        if value:
-            self.cmdState |= 1 << 50
-        else:
-            self.cmdState &= ~(1 << 50)
+    Ion = field(6, 2, 1)
 
     # Power (bits 52-53) - from ir_Vestel.h line 44
-    @property
-    def Power(self) -> int:
-        return GETBITS64(self.cmdState, 52, 2)
-
-    @Power.setter
-    def Power(self, value: int) -> None:
-        self.cmdState = (self.cmdState & ~(0x3 << 52)) | ((value & 0x3) << 52)
+    Power = field(6, 4, 2)
 
     # UseCmd (bit 54) - from ir_Vestel.h line 45
-    @property
-    def UseCmd(self) -> int:
-        return GETBITS64(self.cmdState, 54, 1)
-
-    @UseCmd.setter
-    def UseCmd(self, value: bool) -> None:
-        if value:
-            self.cmdState |= 1 << 54
-        else:
-            self.cmdState &= ~(1 << 54)
+    UseCmd = field(6, 6, 1)
 
     # Time state properties
     # TimeSum (bits 12-19) - from ir_Vestel.h line 49
-    @property
-    def TimeSum(self) -> int:
-        return GETBITS64(self.timeState, 12, 8)
-
-    @TimeSum.setter
-    def TimeSum(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0xFF << 12)) | ((value & 0xFF) << 12)
+    TimeSum = field(1, 4, buffer="timeState")
 
     # OffTenMins (bits 20-22) - from ir_Vestel.h line 50
-    @property
-    def OffTenMins(self) -> int:
-        return GETBITS64(self.timeState, 20, 3)
-
-    @OffTenMins.setter
-    def OffTenMins(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0x7 << 20)) | ((value & 0x7) << 20)
+    OffTenMins = field(2, 4, 3, buffer="timeState")
 
     # OffHours (bits 23-27) - from ir_Vestel.h line 51
-    @property
-    def OffHours(self) -> int:
-        return GETBITS64(self.timeState, 23, 5)
-
-    @OffHours.setter
-    def OffHours(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0x1F << 23)) | ((value & 0x1F) << 23)
+    OffHours = field(2, 7, 5, buffer="timeState")
 
     # OnTenMins (bits 28-30) - from ir_Vestel.h line 52
-    @property
-    def OnTenMins(self) -> int:
-        return GETBITS64(self.timeState, 28, 3)
-
-    @OnTenMins.setter
-    def OnTenMins(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0x7 << 28)) | ((value & 0x7) << 28)
+    OnTenMins = field(3, 4, 3, buffer="timeState")
 
     # OnHours (bits 31-35) - from ir_Vestel.h line 53
-    @property
-    def OnHours(self) -> int:
-        return GETBITS64(self.timeState, 31, 5)
-
-    @OnHours.setter
-    def OnHours(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0x1F << 31)) | ((value & 0x1F) << 31)
+    OnHours = field(3, 7, 5, buffer="timeState")
 
     # Hours (bits 36-40) - from ir_Vestel.h line 54
-    @property
-    def Hours(self) -> int:
-        return GETBITS64(self.timeState, 36, 5)
-
-    @Hours.setter
-    def Hours(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0x1F << 36)) | ((value & 0x1F) << 36)
+    Hours = field(4, 4, 5, buffer="timeState")
 
     # OnTimer (bit 41) - from ir_Vestel.h line 55
-    @property
-    def OnTimer(self) -> int:
-        return GETBITS64(self.timeState, 41, 1)
-
-    @OnTimer.setter
-    def OnTimer(self, value: bool) -> None:
-        if value:
-            self.timeState |= 1 << 41
-        else:
-            self.timeState &= ~(1 << 41)
+    OnTimer = field(5, 1, 1, buffer="timeState")
 
     # OffTimer (bit 42) - from ir_Vestel.h line 56
-    @property
-    def OffTimer(self) -> int:
-        return GETBITS64(self.timeState, 42, 1)
-
-    @OffTimer.setter
-    def OffTimer(self, value: bool) -> None:
-        if value:
-            self.timeState |= 1 << 42
-        else:
-            self.timeState &= ~(1 << 42)
+    OffTimer = field(5, 2, 1, buffer="timeState")
 
     # Timer (bit 43) - from ir_Vestel.h line 57
-    @property
-    def Timer(self) -> int:
-        return GETBITS64(self.timeState, 43, 1)
-
-    @Timer.setter
-    def Timer(self, value: bool) -> None:
-        if value:
-            self.timeState |= 1 << 43
-        else:
-            self.timeState &= ~(1 << 43)
+    Timer = field(5, 3, 1, buffer="timeState")
 
     # Minutes (bits 44-51) - from ir_Vestel.h line 58
-    @property
-    def Minutes(self) -> int:
-        return GETBITS64(self.timeState, 44, 8)
-
-    @Minutes.setter
-    def Minutes(self, value: int) -> None:
-        self.timeState = (self.timeState & ~(0xFF << 44)) | ((value & 0xFF) << 44)
+    Minutes = field(5, 4, buffer="timeState")
 
 
 ## Send a Vestel message
@@ -7,6 +7,8 @@
 ## Direct translation from IRremoteESP8266 ir_Voltas.cpp and ir_Voltas.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import sumBytes
 
 # Supports:
 #   Brand: Voltas,  Model: 122LZF 4011252 Window A/C
@@ -49,246 +51,56 @@ kNoRepeat = 0
 kDefaultMessageGap = 100000
 
 
-def sumBytes(data: List[int], length: int) -> int:
-    """
-    Sum all bytes in the array up to length.
-    Helper function for checksum calculation.
-    """
-    result = 0
-    for i in range(length):
-        result += data[i]
-    return result & 0xFF
-
-
 ## Native representation of a Voltas A/C message.
 ## This is a direct translation of the C++ union/struct (from ir_Voltas.h lines 29-72)
-class VoltasProtocol:
+class VoltasProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (10 bytes for Voltas)
-        self.raw = [0] * kVoltasStateLength
+        self.raw = bytearray(kVoltasStateLength)
 
     # Byte 0
-    @property
-    def SwingH(self) -> int:
-        return self.raw[0] & 0x01
-
-    @SwingH.setter
-    def SwingH(self, value: bool) -> None:
-        if value:
-            self.raw[0] |= 0x01
-        else:
-            self.raw[0] &= 0xFE
-
-    @property
-    def SwingHChange(self) -> int:
-        return (self.raw[0] >> 1) & 0x7F
-
-    @SwingHChange.setter
-    def SwingHChange(self, value: int) -> None:
-        self.raw[0] = (self.raw[0] & 0x01) | ((value & 0x7F) << 1)
+    SwingH = field(0, 0, 1)
+    SwingHChange = field(0, 1, 7)
 
     # Byte 1
-    @property
-    def Mode(self) -> int:
-        return self.raw[1] & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0xF0) | (value & 0x0F)
-
-    @property
-    def FanSpeed(self) -> int:
-        return (self.raw[1] >> 5) & 0x07
-
-    @FanSpeed.setter
-    def FanSpeed(self, value: int) -> None:
-        self.raw[1] = (self.raw[1] & 0x1F) | ((value & 0x07) << 5)
+    Mode = field(1, 0, 4)
+    FanSpeed = field(1, 5, 3)
 
     # Byte 2
-    @property
-    def SwingV(self) -> int:
-        return self.raw[2] & 0x07
-
-    @SwingV.setter
-    def SwingV(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xF8) | (value & 0x07)
-
-    @property
-    def Wifi(self) -> int:
-        return (self.raw[2] >> 3) & 0x01
-
-    @Wifi.setter
-    def Wifi(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x08
-        else:
-            self.raw[2] &= 0xF7
-
-    @property
-    def Turbo(self) -> int:
-        return (self.raw[2] >> 5) & 0x01
-
-    @Turbo.setter
-    def Turbo(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x20
-        else:
-            self.raw[2] &= 0xDF
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[2] >> 6) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x40
-        else:
-            self.raw[2] &= 0xBF
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[2] >> 7) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x80
-        else:
-            self.raw[2] &= 0x7F
+    SwingV = field(2, 0, 3)
+    Wifi = field(2, 3, 1)
+    Turbo = field(2, 5, 1)
+    Sleep = field(2, 6, 1)
+    Power = field(2, 7, 1)
 
     # Byte 3
-    @property
-    def Temp(self) -> int:
-        return self.raw[3] & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Econo(self) -> int:
-        return (self.raw[3] >> 6) & 0x01
-
-    @Econo.setter
-    def Econo(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x40
-        else:
-            self.raw[3] &= 0xBF
-
-    @property
-    def TempSet(self) -> int:
-        return (self.raw[3] >> 7) & 0x01
-
-    @TempSet.setter
-    def TempSet(self, value: bool) -> None:
-        if value:
-            self.raw[3] |= 0x80
-        else:
-            self.raw[3] &= 0x7F
+    Temp = field(3, 0, 4)
+    Econo = field(3, 6, 1)
+    TempSet = field(3, 7, 1)
 
     # Byte 4
-    @property
-    def OnTimerMins(self) -> int:
-        return self.raw[4] & 0x3F
-
-    @OnTimerMins.setter
-    def OnTimerMins(self, value: int) -> None:
-        self.raw[4] = (self.raw[4] & 0xC0) | (value & 0x3F)
-
-    @property
-    def OnTimer12Hr(self) -> int:
-        return (self.raw[4] >> 7) & 0x01
-
-    @OnTimer12Hr.setter
-    def OnTimer12Hr(self, value: int) -> None:
-        if value:
-            self.raw[4] |= 0x80
-        else:
-            self.raw[4] &= 0x7F
+    OnTimerMins = field(4, 0, 6)
+    OnTimer12Hr = field(4, 7, 1)
 
     # Byte 5
-    @property
-    def OffTimerMins(self) -> int:
-        return self.raw[5] & 0x3F
-
-    @OffTimerMins.setter
-    def OffTimerMins(self, value: int) -> None:
-        self.raw[5] = (self.raw[5] & 0xC0) | (value & 0x3F)
-
-    @property
-    def OffTimer12Hr(self) -> int:
-        return (self.raw[5] >> 7) & 0x01
-
-    @OffTimer12Hr.setter
-    def OffTimer12Hr(self, value: int) -> None:
-        if value:
-            self.raw[5] |= 0x80
-        else:
-            self.raw[5] &= 0x7F
+    OffTimerMins = field(5, 0, 6)
+    OffTimer12Hr = field(5, 7, 1)
 
     # Byte 6 - Typically 0b00111011(0x3B)
 
     # Byte 7
-    @property
-    def OnTimerHrs(self) -> int:
-        return self.raw[7] & 0x0F
-
-    @OnTimerHrs.setter
-    def OnTimerHrs(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xF0) | (value & 0x0F)
-
-    @property
-    def OffTimerHrs(self) -> int:
-        return (self.raw[7] >> 4) & 0x0F
-
-    @OffTimerHrs.setter
-    def OffTimerHrs(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0x0F) | ((value & 0x0F) << 4)
+    OnTimerHrs = field(7, 0, 4)
+    OffTimerHrs = field(7, 4, 4)
 
     # Byte 8
-    @property
-    def Light(self) -> int:
-        return (self.raw[8] >> 5) & 0x01
-
-    @Light.setter
-    def Light(self, value: bool) -> None:
-        if value:
-            self.raw[8] |= 0x20
-        else:
-            self.raw[8] &= 0xDF
-
-    @property
-    def OffTimerEnable(self) -> int:
-        return (self.raw[8] >> 6) & 0x01
-
-    @OffTimerEnable.setter
-    def OffTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw[8] |= 0x40
-        else:
-            self.raw[8] &= 0xBF
-
-    @property
-    def OnTimerEnable(self) -> int:
-        return (self.raw[8] >> 7) & 0x01
-
-    @OnTimerEnable.setter
-    def OnTimerEnable(self, value: bool) -> None:
-        if value:
-            self.raw[8] |= 0x80
-        else:
-            self.raw[8] &= 0x7F
+    Light = field(8, 5, 1)
+    OffTimerEnable = field(8, 6, 1)
+    OnTimerEnable = field(8, 7, 1)
 
     # Byte 9
-    @property
-    def Checksum(self) -> int:
-        return self.raw[9]
-
-    @Checksum.setter
-    def Checksum(self, value: int) -> None:
-        self.raw[9] = value & 0xFF
+    Checksum = field(9)
 
 
 ## Send a Voltas formatted message.
@@ -370,7 +182,7 @@ class IRVoltas:
     ## Get a PTR to the internal state/code for this protocol.
     ## @return PTR to a code for this protocol based on the current internal state.
     ## Direct translation from ir_Voltas.cpp lines 141-146
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.checksum()  # Ensure correct settings before sending.
         return self._.raw
 
@@ -6,6 +6,8 @@
 ## Direct translation from IRremoteESP8266 ir_Whirlpool.cpp and ir_Whirlpool.h
 
 from typing import List
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
+from app.core.ir_protocols.bitops import xorBytes
 
 # Ref: https://github.com/crankyoldgit/IRremoteESP8266/issues/509
 # Note: Smart, iFeel, AroundU, PowerSave, & Silent modes are unsupported.
@@ -118,239 +120,62 @@ def SETTIME(state: List[int], prefix: str, mins: int) -> None:
     SETTIME_MINS(state, prefix, mins % 60)
 
 
-def xorBytes(data: List[int], length: int) -> int:
-    """XOR bytes in data array starting from index 0"""
-    result = 0
-    for i in range(length):
-        result ^= data[i]
-    return result
-
-
 ## Native representation of a Whirlpool A/C message.
 ## This is a direct translation of the C++ union/struct
-class WhirlpoolProtocol:
+class WhirlpoolProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (21 bytes for Whirlpool AC)
-        self.raw = [0] * kWhirlpoolAcStateLength
+        self.raw = bytearray(kWhirlpoolAcStateLength)
 
     # Byte 2
-    @property
-    def Fan(self) -> int:
-        return self.raw[2] & 0x03
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[2] = (self.raw[2] & 0xFC) | (value & 0x03)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[2] >> 2) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x04
-        else:
-            self.raw[2] &= 0xFB
-
-    @property
-    def Sleep(self) -> int:
-        return (self.raw[2] >> 3) & 0x01
-
-    @Sleep.setter
-    def Sleep(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x08
-        else:
-            self.raw[2] &= 0xF7
-
-    @property
-    def Swing1(self) -> int:
-        return (self.raw[2] >> 7) & 0x01
-
-    @Swing1.setter
-    def Swing1(self, value: bool) -> None:
-        if value:
-            self.raw[2] |= 0x80
-        else:
-            self.raw[2] &= 0x7F
+    Fan = field(2, 0, 2)
+    Power = field(2, 2, 1)
+    Sleep = field(2, 3, 1)
+    Swing1 = field(2, 7, 1)
 
     # Byte 3
-    @property
-    def Mode(self) -> int:
-        return self.raw[3] & 0x07
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0xF8) | (value & 0x07)
-
-    @property
-    def Temp(self) -> int:
-        return (self.raw[3] >> 4) & 0x0F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[3] = (self.raw[3] & 0x0F) | ((value & 0x0F) << 4)
+    Mode = field(3, 0, 3)
+    Temp = field(3, 4, 4)
 
     # Byte 5
-    @property
-    def Super1(self) -> int:
-        return (self.raw[5] >> 4) & 0x01
-
-    @Super1.setter
-    def Super1(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x10
-        else:
-            self.raw[5] &= 0xEF
-
-    @property
-    def Super2(self) -> int:
-        return (self.raw[5] >> 7) & 0x01
-
-    @Super2.setter
-    def Super2(self, value: bool) -> None:
-        if value:
-            self.raw[5] |= 0x80
-        else:
-            self.raw[5] &= 0x7F
+    Super1 = field(5, 4, 1)
+    Super2 = field(5, 7, 1)
 
     # Byte 6
-    @property
-    def ClockHours(self) -> int:
-        return self.raw[6] & 0x1F
-
-    @ClockHours.setter
-    def ClockHours(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xE0) | (value & 0x1F)
-
-    @property
-    def LightOff(self) -> int:
-        return (self.raw[6] >> 5) & 0x01
-
-    @LightOff.setter
-    def LightOff(self, value: bool) -> None:
-        if value:
-            self.raw[6] |= 0x20
-        else:
-            self.raw[6] &= 0xDF
+    ClockHours = field(6, 0, 5)
+    LightOff = field(6, 5, 1)
 
     # Byte 7
-    @property
-    def ClockMins(self) -> int:
-        return self.raw[7] & 0x3F
-
-    @ClockMins.setter
-    def ClockMins(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xC0) | (value & 0x3F)
-
-    @property
-    def OffTimerEnabled(self) -> int:
-        return (self.raw[7] >> 7) & 0x01
-
-    @OffTimerEnabled.setter
-    def OffTimerEnabled(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x80
-        else:
-            self.raw[7] &= 0x7F
+    ClockMins = field(7, 0, 6)
+    OffTimerEnabled = field(7, 7, 1)
 
     # Byte 8
-    @property
-    def OffHours(self) -> int:
-        return self.raw[8] & 0x1F
-
-    @OffHours.setter
-    def OffHours(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xE0) | (value & 0x1F)
-
-    @property
-    def Swing2(self) -> int:
-        return (self.raw[8] >> 6) & 0x01
-
-    @Swing2.setter
-    def Swing2(self, value: bool) -> None:
-        if value:
-            self.raw[8] |= 0x40
-        else:
-            self.raw[8] &= 0xBF
+    OffHours = field(8, 0, 5)
+    Swing2 = field(8, 6, 1)
 
     # Byte 9
-    @property
-    def OffMins(self) -> int:
-        return self.raw[9] & 0x3F
-
-    @OffMins.setter
-    def OffMins(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0xC0) | (value & 0x3F)
-
-    @property
-    def OnTimerEnabled(self) -> int:
-        return (self.raw[9] >> 7) & 0x01
-
-    @OnTimerEnabled.setter
-    def OnTimerEnabled(self, value: bool) -> None:
-        if value:
-            self.raw[9] |= 0x80
-        else:
-            self.raw[9] &= 0x7F
+    OffMins = field(9, 0, 6)
+    OnTimerEnabled = field(9, 7, 1)
 
     # Byte 10
-    @property
-    def OnHours(self) -> int:
-        return self.raw[10] & 0x1F
-
-    @OnHours.setter
-    def OnHours(self, value: int) -> None:
-        self.raw[10] = (self.raw[10] & 0xE0) | (value & 0x1F)
+    OnHours = field(10, 0, 5)
 
     # Byte 11
-    @property
-    def OnMins(self) -> int:
-        return self.raw[11] & 0x3F
-
-    @OnMins.setter
-    def OnMins(self, value: int) -> None:
-        self.raw[11] = (self.raw[11] & 0xC0) | (value & 0x3F)
+    OnMins = field(11, 0, 6)
 
     # Byte 13
-    @property
-    def Sum1(self) -> int:
-        return self.raw[13]
-
-    @Sum1.setter
-    def Sum1(self, value: int) -> None:
-        self.raw[13] = value & 0xFF
+    Sum1 = field(13)
 
     # Byte 15
-    @property
-    def Cmd(self) -> int:
-        return self.raw[15]
-
-    @Cmd.setter
-    def Cmd(self, value: int) -> None:
-        self.raw[15] = value & 0xFF
+    Cmd = field(15)
 
     # Byte 18
-    @property
-    def J191(self) -> int:
-        return (self.raw[18] >> 3) & 0x01
-
-    @J191.setter
-    def J191(self, value: bool) -> None:
-        if value:
-            self.raw[18] |= 0x08
-        else:
-            self.raw[18] &= 0xF7
+    J191 = field(18, 3, 1)
 
     # Byte 20
-    @property
-    def Sum2(self) -> int:
-        return self.raw[20]
-
-    @Sum2.setter
-    def Sum2(self, value: int) -> None:
-        self.raw[20] = value & 0xFF
+    Sum2 = field(20)
 
 
 ## Send a Whirlpool A/C message.
@@ -483,7 +308,7 @@ class IRWhirlpoolAc:
 
     ## Get a copy of the internal state/code for this protocol.
     ## EXACT translation from ir_Whirlpool.cpp lines 151-154
-    def getRaw(self, calcchecksum: bool = True) -> List[int]:
+    def getRaw(self, calcchecksum: bool = True) -> bytearray:
         if calcchecksum:
             self.checksum()
         return self._.raw
@@ -6,6 +6,7 @@
 ## Direct translation from IRremoteESP8266 ir_York.cpp and ir_York.h
 
 from typing import List, Optional
+from app.core.ir_protocols.ir_bitfield import BitfieldStruct, field
 
 # Supports:
 #   Brand: York,  Model: MHH07P17 A/C
@@ -64,115 +65,42 @@ kYorkKnownGoodState = [
 
 ## Native representation of a York A/C message.
 ## This is a direct translation of the C++ union/struct (from ir_York.h lines 26-64)
-class YorkProtocol:
+class YorkProtocol(BitfieldStruct):
+    __slots__ = ("raw",)
+
     def __init__(self):
         # The state array (17 bytes for York)
-        self.raw = [0] * kYorkStateLength
+        self.raw = bytearray(kYorkStateLength)
 
     # byte 0-5 - preamble (from ir_York.h line 30)
     # unknown, fixed 0x08, 0x10, 0x07, 0x02, 0x40, 0x08
 
     # byte 6 (from ir_York.h lines 32-36)
-    @property
-    def Key1(self) -> int:
-        return self.raw[6] & 0x0F
-
-    @Key1.setter
-    def Key1(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Key2(self) -> int:
-        return (self.raw[6] >> 4) & 0x0F
-
-    @Key2.setter
-    def Key2(self, value: int) -> None:
-        self.raw[6] = (self.raw[6] & 0x0F) | ((value & 0x0F) << 4)
+    Key1 = field(6, 0, 4)
+    Key2 = field(6, 4, 4)
 
     # byte 7 (from ir_York.h lines 38-40)
-    @property
-    def Fan(self) -> int:
-        return self.raw[7] & 0x0F
-
-    @Fan.setter
-    def Fan(self, value: int) -> None:
-        self.raw[7] = (self.raw[7] & 0xF0) | (value & 0x0F)
-
-    @property
-    def Power(self) -> int:
-        return (self.raw[7] >> 4) & 0x01
-
-    @Power.setter
-    def Power(self, value: bool) -> None:
-        if value:
-            self.raw[7] |= 0x10
-        else:
-            self.raw[7] &= 0xEF
+    Fan = field(7, 0, 4)
+    Power = field(7, 4, 1)
 
     # byte 8 (from ir_York.h lines 42-43)
-    @property
-    def Mode(self) -> int:
-        return self.raw[8] & 0x0F
-
-    @Mode.setter
-    def Mode(self, value: int) -> None:
-        self.raw[8] = (self.raw[8] & 0xF0) | (value & 0x0F)
+    Mode = field(8, 0, 4)
 
     # byte 9 (from ir_York.h lines 46-47)
-    @property
-    def Temp(self) -> int:
-        return (self.raw[9] >> 2) & 0x3F
-
-    @Temp.setter
-    def Temp(self, value: int) -> None:
-        self.raw[9] = (self.raw[9] & 0x03) | ((value & 0x3F) << 2)
+    Temp = field(9, 2, 6)
 
     # byte 10 (from ir_York.h lines 48-49)
-    @property
-    def OffTimer(self) -> int:
-        return self.raw[10] & 0xFF
-
-    @OffTimer.setter
-    def OffTimer(self, value: int) -> None:
-        self.raw[10] = value & 0xFF
+    OffTimer = field(10)
 
     # byte 11 (from ir_York.h lines 50-51)
-    @property
-    def OnTimer(self) -> int:
-        return self.raw[11] & 0xFF
-
-    @OnTimer.setter
-    def OnTimer(self, value: int) -> None:
-        self.raw[11] = value & 0xFF
+    OnTimer = field(11)
 
     # byte 13 (from ir_York.h lines 56-57)
-    @property
-    def SwingV(self) -> int:
-        return self.raw[13] & 0x01
-
-    @SwingV.setter
-    def SwingV(self, value: bool) -> None:
-        if value:
-            self.raw[13] |= 0x01
-        else:
-            self.raw[13] &= 0xFE
+    SwingV = field(13, 0, 1)
 
     # byte 15-16 (from ir_York.h lines 61-62)
-    @property
-    def Chk1(self) -> int:
-        return self.raw[15] & 0xFF
-
-    @Chk1.setter
-    def Chk1(self, value: int) -> None:
-        self.raw[15] = value & 0xFF
-
-    @property
-    def Chk2(self) -> int:
-        return self.raw[16] & 0xFF
-
-    @Chk2.setter
-    def Chk2(self, value: int) -> None:
-        self.raw[16] = value & 0xFF
+    Chk1 = field(15)
+    Chk2 = field(16)
 
 
 ## Send a York A/C message.
@@ -318,7 +246,7 @@ class IRYorkAc:
     ## IRsend object method.
     ## @return A copy of the internal state.
     ## Direct translation from ir_York.cpp lines 116-122
-    def getRaw(self) -> List[int]:
+    def getRaw(self) -> bytearray:
         self.calcChecksum()
         return self._.raw
 
@@ -1,39 +1,64 @@
 import io
+import sys
 import base64
+import binascii
+from array import array
 from bisect import bisect
-from struct import pack, unpack
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+from app.core.decode_budget import DecodeBudget, TuyaCodeError
 
 
 # MAIN API
 
 
-def decode_ir(code: str) -> list[int]:
+def decode_ir(code: str, budget: Optional[DecodeBudget] = None) -> list[int]:
     """
     Decodes an IR code string from a Tuya blaster.
     Returns the IR signal as a list of µs durations,
     with the first duration belonging to a high state.
-    """
-    payload = base64.decodebytes(code.encode("ascii"))
-    payload = decompress(io.BytesIO(payload))
 
-    signal = []
-    while payload:
-        assert len(payload) >= 2, f"garbage in decompressed payload: {payload.hex()}"
-        signal.append(unpack("<H", payload[:2])[0])
-        payload = payload[2:]
-    return signal
+    Untrusted codes are decoded within a budget (see decode_budget.py).
 
-
-def encode_ir(signal: list[int], compression_level=2) -> str:
+    Raises:
+        TuyaCodeError: If the code is malformed or exceeds the budget
+    """
+    if budget is not None:
+        budget.check_code(code)
+    try:
+        payload = base64.b64decode(code.encode("ascii"))
+    except (UnicodeEncodeError, binascii.Error) as e:
+        raise TuyaCodeError(f"Tuya code is not valid base64: {e}") from None
+    payload = decompress(io.BytesIO(payload), budget)
+
+    if len(payload) % 2:
+        raise TuyaCodeError(f"garbage in decompressed payload: {payload[-8:].hex()}")
+    signal = array("H", payload)
+    if sys.byteorder == "big":
+        signal.byteswap()
+    if budget is not None:
+        budget.check_timings(len(signal))
+    return signal.tolist()
+
+
+def encode_ir(signal: list[int] | array, compression_level: int = 2) -> str:
     """
     Encodes an IR signal (see `decode_tuya_ir`)
     into an IR code string for a Tuya blaster.
 
+    The signal can also be an array('H') frame buffer (see
+    `ir_layout.packFrame`), which is used as is.
+
     Automatically removes trailing gap values (> 8000µs) as they represent
     inter-message gaps used in hardware transmission, not part of the signal pattern.
     """
 
-    payload = b"".join(pack("<H", t) for t in signal)
+    if not isinstance(signal, array) or signal.typecode != "H":
+        signal = array("H", signal)
+    if sys.byteorder == "big":
+        signal = array("H", signal)
+        signal.byteswap()
+    payload = signal.tobytes()
     compress(out := io.BytesIO(), payload, compression_level)
     payload = out.getvalue()
     return base64.encodebytes(payload).decode("ascii").replace("\n", "")
@@ -42,12 +67,17 @@ def encode_ir(signal: list[int], compression_level=2) -> str:
 # DECOMPRESSION
 
 
-def decompress(inf: io.FileIO) -> bytes:
+def decompress(inf: BinaryIO, budget: Optional[DecodeBudget] = None) -> bytes:
     """
     Reads a "Tuya stream" from a binary file,
     and returns the decompressed byte string.
+
+    Raises:
+        TuyaCodeError: If the stream is malformed, or would decompress to
+            more than the budget's max_payload_bytes
     """
     out = bytearray()
+    data: bytes | bytearray
 
     while header := inf.read(1):
         L, D = header[0] >> 5, header[0] & 0b11111
@@ -55,17 +85,24 @@ def decompress(inf: io.FileIO) -> bytes:
             # literal block
             L = D + 1
             data = inf.read(L)
-            assert len(data) == L
+            if len(data) != L:
+                raise TuyaCodeError("Tuya stream ends inside a literal block")
         else:
             # length-distance pair block
+            tail = inf.read(2 if L == 7 else 1)
+            if len(tail) != (2 if L == 7 else 1):
+                raise TuyaCodeError("Tuya stream ends inside a length-distance block")
             if L == 7:
-                L += inf.read(1)[0]
+                L += tail[0]
             L += 2
-            D = (D << 8 | inf.read(1)[0]) + 1
-            assert len(out) >= D
-            data = bytearray()
-            while len(data) < L:
-                data.extend(out[-D:][: L - len(data)])
+            D = (D << 8 | tail[-1]) + 1
+            if len(out) < D:
+                raise TuyaCodeError("Tuya stream refers back past its start")
+            start = len(out) - D
+            # An overlapping reference (D < L) repeats the last D bytes.
+            data = out[start : start + L] if D >= L else (out[start:] * (L // D + 1))[:L]
+        if budget is not None:
+            budget.check_payload(len(out) + L)
         out.extend(data)
 
     return bytes(out)
@@ -74,19 +111,19 @@ def decompress(inf: io.FileIO) -> bytes:
 # COMPRESSION
 
 
-def emit_literal_blocks(out: io.FileIO, data: bytes):
+def emit_literal_blocks(out: BinaryIO, data: bytes) -> None:
     for i in range(0, len(data), 32):
         emit_literal_block(out, data[i : i + 32])
 
 
-def emit_literal_block(out: io.FileIO, data: bytes):
+def emit_literal_block(out: BinaryIO, data: bytes) -> None:
     length = len(data) - 1
     assert 0 <= length < (1 << 5)
     out.write(bytes([length]))
     out.write(data)
 
 
-def emit_distance_block(out: io.FileIO, length: int, distance: int):
+def emit_distance_block(out: BinaryIO, length: int, distance: int) -> None:
     distance -= 1
     assert 0 <= distance < (1 << 13)
     length -= 2
@@ -101,7 +138,7 @@ def emit_distance_block(out: io.FileIO, length: int, distance: int):
     out.write(block)
 
 
-def compress(out: io.FileIO, data: bytes, level=2):
+def compress(out: BinaryIO, data: bytes, level: int = 2) -> None:
     """
     Takes a byte string and outputs a compressed "Tuya stream".
 
@@ -116,7 +153,8 @@ def compress(out: io.FileIO, data: bytes, level=2):
 
     W = 2**13  # window size
     L = 255 + 9  # maximum length
-    distance_candidates = lambda: range(1, min(pos, W) + 1)
+    pos: int  # Current position in data, shared by the helpers below
+    distance_candidates: Callable[[], Iterator[int]] = lambda: iter(range(1, min(pos, W) + 1))
 
     def find_length_for_distance(start: int) -> int:
         length = 0
@@ -134,12 +172,12 @@ def compress(out: io.FileIO, data: bytes, level=2):
     )
 
     if level >= 2:
-        suffixes = []
+        suffixes: List[int] = []
         next_pos = 0
         key = lambda n: data[n:]
 
         # Python 3.9 compatible bisect without key parameter
-        def find_idx(n):
+        def find_idx(n: int) -> int:
             k = key(n)
             lo, hi = 0, len(suffixes)
             while lo < hi:
@@ -150,7 +188,7 @@ def compress(out: io.FileIO, data: bytes, level=2):
                     hi = mid
             return lo
 
-        def distance_candidates():
+        def suffix_distance_candidates() -> Iterator[int]:
             nonlocal next_pos
             while next_pos <= pos:
                 if len(suffixes) == W:
@@ -160,6 +198,8 @@ def compress(out: io.FileIO, data: bytes, level=2):
             idxs = (idx + i for i in (+1, -1))  # try +1 first
             return (pos - suffixes[i] for i in idxs if 0 <= i < len(suffixes))
 
+        distance_candidates = suffix_distance_candidates
+
     if level <= 2:
         find_length = {1: find_length_cheap, 2: find_length_max}[level]
         block_start = pos = 0
@@ -175,7 +215,7 @@ def compress(out: io.FileIO, data: bytes, level=2):
         return
 
     # use topological sort to find shortest path
-    predecessors = [(0, None, None)] + [None] * len(data)
+    predecessors: List[Optional[Tuple[int, int, int]]] = [(0, 0, 0)] + [None] * len(data)
 
     def put_edge(cost, length, distance):
         npos = pos + length
@@ -195,7 +235,9 @@ def compress(out: io.FileIO, data: bytes, level=2):
     blocks = []
     pos = len(data)
     while pos > 0:
-        _, length, distance = predecessors[pos]
+        edge = predecessors[pos]
+        assert edge is not None  # Every position is reached by some literal block
+        _, length, distance = edge
         pos -= length
         blocks.append((pos, length, distance))
     for pos, length, distance in reversed(blocks):
@@ -0,0 +1,189 @@
+"""
+Pre-fork Server
+
+`uvicorn index:app --workers N` spawns each worker as a fresh interpreter, so
+every worker imports the protocol modules, builds its own CommandGenerator
+and warms up on its own. This entry point does all of that once, in a master
+process, then forks the workers from it:
+
+1. The master imports the app and runs its warm-up to completion (see
+   app/services/warmup.py; WARMUP, default "protocols").
+2. It closes its SQLite connections, which must not cross a fork, and calls
+   gc.freeze(), so the warmed objects move to a permanent generation the
+   cyclic GC never walks. Without that, each collection in a worker touches
+   the reference counts of the registry, protocol tables and caches and
+   copies their pages; frozen, they stay shared copy-on-write.
+3. It forks the workers, which reopen the SQLite-backed services and serve
+   the master's listening socket with uvicorn. Their lifespan finds the
+   warm-up inherited from the master, so they are ready at once.
+
+The master restarts workers that die and stops them all on SIGTERM or SIGINT.
+
+    python -m app.server --workers 4 --port 8000
+
+Only POSIX systems can fork; measure against plain uvicorn with
+`python -m benchmarks.bench_prefork`.
+"""
+
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# A worker dying sooner than this after its start is restarted after a pause,
+# so a worker that can't start doesn't make the master fork in a loop.
+RESTART_DELAY = 1.0
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    """The listening socket the workers share."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def close_per_process_resources() -> None:
+    """Close the master's SQLite connections before forking."""
+    from app.services import code_catalog, device_sessions, similarity_index
+
+    device_sessions.store.close()
+    for module, name in ((code_catalog, "_catalog"), (similarity_index, "_index")):
+        service = getattr(module, name)
+        if service is not None:
+            service.close()
+            setattr(module, name, None)
+
+
+def reopen_per_process_resources() -> None:
+    """Open a worker's own SQLite-backed services after the fork."""
+    from app.services import code_catalog, device_sessions, similarity_index
+
+    device_sessions.store = device_sessions._default_store()
+    code_catalog.get_code_catalog()
+    similarity_index.get_similarity_index()
+
+
+def prepare_master(app_path: str = "index:app", level: Optional[str] = None) -> Any:
+    """
+    Import and warm up the app in this process and freeze it for forking.
+
+    Returns:
+        The ASGI app
+    """
+    from uvicorn.importer import import_from_string
+
+    from app.services import warmup
+
+    # No collections between warming up and forking; the workers re-enable it.
+    gc.disable()
+    app = import_from_string(app_path)
+    warmup.run_warmup(level)
+    close_per_process_resources()
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+def _serve_worker(app: Any, sock: socket.socket, uvicorn_options: Dict[str, Any]) -> None:
+    import uvicorn
+
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    gc.enable()
+    reopen_per_process_resources()
+    config = uvicorn.Config(app, lifespan="on", **uvicorn_options)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    """Forks workers from a warmed master process and keeps them running"""
+
+    def __init__(self, app: Any, sock: socket.socket, workers: int, **uvicorn_options: Any):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.uvicorn_options = uvicorn_options
+        self.children: Dict[int, float] = {}  # pid -> when it was forked
+        self.stopping = False
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _serve_worker(self.app, self.sock, self.uvicorn_options)
+            except BaseException:
+                import traceback
+
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        return pid
+
+    def stop(self, signum: int = signal.SIGTERM, frame: Any = None) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        """Fork the workers and wait for them, restarting those that die."""
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        while self.children:
+            try:
+                pid, _ = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            if time.monotonic() - started < RESTART_DELAY:
+                time.sleep(RESTART_DELAY)
+            if not self.stopping:
+                self.spawn()
+        self.sock.close()
+        return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.services.warmup import LEVELS
+    from app.settings import settings
+
+    parser = argparse.ArgumentParser(description="Serve the app from pre-forked workers")
+    parser.add_argument("app", nargs="?", default="index:app", help="ASGI app (module:attr)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=settings.port)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--warmup", choices=LEVELS, default=None, help="default: WARMUP")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        parser.error("pre-forking needs os.fork(); use uvicorn --workers instead")
+
+    sock = bind_socket(args.host, args.port)
+    app = prepare_master(args.app, args.warmup)
+    master = Master(app, sock, max(1, args.workers), log_level=args.log_level)
+    return master.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
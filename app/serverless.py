@@ -0,0 +1,50 @@
+"""
+Serverless Entry Point
+
+Entry point for AWS Lambda. Cold starts are frequent there and the
+first request waits for the whole start-up, so the function is deployed with
+a bundle of prebuilt artifacts (see app/services/serverless_bundle.py), and
+everything a request needs is opened while the platform initialises the
+function, not in the first request:
+
+1. The settings are pointed at the bundle before any service is imported.
+2. The app is imported, mapping the command-set artifact; the protocol
+   registry, which imports every protocol module, is left unbuilt.
+3. The code index is loaded from the artifact and the read-only catalog is
+   opened.
+
+Lambda invokes `handler` (the Mangum adapter). Only Lambda packaging is
+supported: the Vercel deployment still serves index.py, without a bundle. The
+app's lifespan (which starts a long-running worker's warm-up) isn't run per
+invocation; there is nothing left to warm up, and /api/ready reports ready.
+
+Build the bundle before deploying (`make build-bundle`), and measure cold
+starts with `python -m benchmarks.bench_cold_start`.
+"""
+
+from app.services import serverless_bundle
+
+serverless_bundle.configure()
+
+# The services read their settings on import, hence after configure().
+from app.services import code_catalog, code_index, warmup  # noqa: E402
+from index import app  # noqa: E402
+
+try:
+    from mangum import Mangum
+except ImportError:  # Only the Lambda handler needs it.
+    Mangum = None
+
+
+def precompute() -> None:
+    """Open what requests share, while the function initialises."""
+    code_index.get_code_index()
+    code_catalog.get_code_catalog()
+    warmup.run_warmup("none")
+
+
+precompute()
+
+handler = Mangum(app, lifespan="off") if Mangum is not None else None
+
+__all__ = ["app", "handler"]
@@ -0,0 +1,166 @@
+"""
+Timing Canonicalization Service
+
+Learned codes carry the blaster's jitter: a 1300µs space comes back as 1302,
+1288, 1310... Every distinct value breaks the LZ back-references the Tuya
+compressor relies on, so a learned code is often two or three times the size
+of the same command generated from its protocol.
+
+canonicalize() rewrites a learned code with nominal timings:
+1. If it decodes, the decoded state is sent again through the protocol's own
+   send function, and kept only if it decodes back to the same message.
+2. Otherwise the timings are snapped to the centroids of their clusters, so
+   that e.g. all the ~1300µs spaces become one value.
+The shorter of the canonical and original codes is returned, with size stats.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from app.core.decode_budget import DecodeBudget, TuyaCodeError
+from app.core.ir_protocols import decode, decode_results, decode_type_t, send
+from app.core.ir_protocols.ir_layout import packTimings
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services.command_generator import _generator, _prepare_timings_for_tuya
+
+# Durations within this fraction of a cluster's shortest one belong to it...
+SNAP_TOLERANCE = 0.15
+# ...or within this many µs, so that short marks/spaces aren't split hairs.
+SNAP_MIN_WINDOW = 100
+# Anything longer is a gap, trimmed by _prepare_timings_for_tuya.
+TRAILING_GAP = 10000
+
+
+@dataclass
+class CanonicalCode:
+    """Result of canonicalizing a Tuya IR code"""
+
+    tuya_code: str
+    method: str  # "protocol", "clustered" or "unchanged"
+    protocol: Optional[str]  # Decoded protocol name, if any
+    original_length: int  # Length of the original code, in characters
+    canonical_length: int
+
+    @property
+    def ratio(self) -> float:
+        """Canonical size as a fraction of the original"""
+        return self.canonical_length / self.original_length if self.original_length else 1.0
+
+
+def snap_timings(timings: Sequence[int], tolerance: float = SNAP_TOLERANCE) -> List[int]:
+    """
+    Replace each duration with the (rounded) mean of its cluster.
+
+    Durations are sorted and grouped greedily: a duration joins the current
+    cluster if it's within `tolerance` (or SNAP_MIN_WINDOW µs) of the cluster's
+    shortest duration. Marks and spaces share clusters, as pulse-distance
+    protocols reuse the same nominal value for both. Zero length entries (from
+    split gaps) are left alone.
+    """
+    centroid = {}
+    cluster: List[int] = []
+    for t in sorted(set(t for t in timings if t)):
+        if cluster and t > cluster[0] + max(cluster[0] * tolerance, SNAP_MIN_WINDOW):
+            _assign(centroid, cluster, timings)
+            cluster = []
+        cluster.append(t)
+    if cluster:
+        _assign(centroid, cluster, timings)
+    return [centroid.get(t, t) for t in timings]
+
+
+def _assign(centroid: dict, cluster: List[int], timings: Sequence[int]) -> None:
+    # Weight by occurrence, so the centroid sits where most of the samples are.
+    members = set(cluster)
+    samples = [t for t in timings if t in members]
+    mean = round(sum(samples) / len(samples))
+    for t in cluster:
+        centroid[t] = mean
+
+
+def _decode(
+    timings: Sequence[int], budget: Optional[DecodeBudget] = None
+) -> Optional[decode_results]:
+    results = decode_results()
+    results.rawbuf = list(timings)
+    results.rawlen = len(results.rawbuf)
+    return results if decode(results, budget=budget) else None
+
+
+def _same_message(a: decode_results, b: Optional[decode_results]) -> bool:
+    return (
+        b is not None
+        and a.decode_type == b.decode_type
+        and a.bits == b.bits
+        and a.value == b.value
+        and list(a.state[: a.bits // 8]) == list(b.state[: b.bits // 8])
+    )
+
+
+def _resend(results: decode_results) -> Optional[List[int]]:
+    """The decoded message's timings from its protocol's send function, if it has one."""
+    state = list(results.state[: results.bits // 8])
+    metadata = _generator.registry.get(results.decode_type)
+    try:
+        if metadata is not None:
+            return metadata.send_function(state, len(state))
+        return send(results.decode_type, state, len(state), 0)
+    except (TypeError, ValueError, IndexError):  # Partial bindings
+        return None
+
+
+def _encode(timings: Sequence[int], keep_gap: bool) -> str:
+    buf = packTimings(timings)
+    if not keep_gap:
+        buf = _prepare_timings_for_tuya(buf)
+    return encode_ir(buf)
+
+
+def canonicalize(tuya_code: str, budget: Optional[DecodeBudget] = None) -> CanonicalCode:
+    """
+    Rewrite a learned Tuya IR code with canonical timings.
+
+    Args:
+        tuya_code: base64 Tuya IR code, typically learned from a remote
+        budget: Decoding budget for an untrusted code (see decode_budget.py),
+            its deadline covering every decode of the request
+
+    Returns:
+        CanonicalCode with the new code and how it was obtained. If neither
+        method makes the code shorter, the original is returned unchanged.
+
+    Raises:
+        TuyaCodeError: If the code isn't a valid Tuya IR code or is over budget
+    """
+    timings = decode_ir(tuya_code, budget)
+    if not timings:
+        raise TuyaCodeError("Invalid Tuya IR code: no timings")
+    # Keep a trailing gap if the learned code had one; some decoders need it.
+    keep_gap = timings[-1] > TRAILING_GAP
+
+    results = _decode(timings, budget)
+    protocol = decode_type_t(results.decode_type).name if results else None
+    candidate = None
+    method = "clustered"
+    if results is not None:
+        resent = _resend(results)
+        if resent:
+            code = _encode(resent, keep_gap)
+            if _same_message(results, _decode(decode_ir(code), budget)):
+                candidate, method = code, "protocol"
+    if candidate is None:
+        candidate = _encode(snap_timings(timings), keep_gap)
+        if results is not None and not _same_message(
+            results, _decode(decode_ir(candidate), budget)
+        ):
+            candidate = None  # Snapping changed what it decodes as; don't.
+
+    if candidate is None or len(candidate) >= len(tuya_code):
+        candidate, method = tuya_code, "unchanged"
+    return CanonicalCode(
+        tuya_code=candidate,
+        method=method,
+        protocol=protocol,
+        original_length=len(tuya_code),
+        canonical_length=len(candidate),
+    )
@@ -0,0 +1,465 @@
+"""
+Known Codes Catalog Service
+
+The setup wizard lets users pick their manufacturer and model from a catalog
+of known good codes, which has to scale to thousands of manufacturers and
+tolerate typos while the user is still typing. The catalog used to be the
+dict of dicts in test_codes, rebuilt and sorted on every request.
+
+The catalog is now a local SQLite database:
+- manufacturers: display name, lowercase key (exact lookups, as
+  get_test_codes() does) and folded name (lowercase letters and digits only,
+  indexed for prefix search and sorting)
+- codes: one row per (manufacturer, model, name), indexed per manufacturer
+  and model, and per protocol
+- trigrams: the folded name's trigrams, padded at the start so that a
+  query's first letters count as a prefix, for fuzzy search
+
+A search returns the manufacturers whose folded name starts with the folded
+query first (an index range scan), then those sharing at least
+FUZZY_MIN_SCORE of the query's trigrams, which catches transposed, missing
+and wrong letters. The known good codes in test_codes are upserted on open,
+and larger catalogs are imported with:
+
+    python -m app.services.code_catalog import CATALOG.csv [--db PATH]
+
+from a CSV file with manufacturer, model, protocol, name and tuya_code
+columns (an empty protocol is filled in by decoding the code).
+"""
+
+import csv
+import math
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Bump when the schema changes; an older database is rebuilt from scratch.
+SCHEMA_VERSION = 1
+# Fraction of a query's trigrams a fuzzy match must share.
+FUZZY_MIN_SCORE = 0.5
+# Most manufacturers a search ranks (and so can page through).
+MAX_SEARCH_RESULTS = 100
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS manufacturers (
+        id INTEGER PRIMARY KEY,
+        key TEXT NOT NULL UNIQUE,
+        folded TEXT NOT NULL,
+        name TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS manufacturers_folded ON manufacturers (folded, key)",
+    """
+    CREATE TABLE IF NOT EXISTS codes (
+        manufacturer_id INTEGER NOT NULL REFERENCES manufacturers (id),
+        model TEXT NOT NULL,
+        protocol TEXT NOT NULL,
+        name TEXT NOT NULL,
+        tuya_code TEXT NOT NULL,
+        UNIQUE (manufacturer_id, model, name)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS codes_protocol ON codes (protocol)",
+    "CREATE INDEX IF NOT EXISTS codes_model ON codes (model)",
+    """
+    CREATE TABLE IF NOT EXISTS trigrams (
+        trigram TEXT NOT NULL,
+        manufacturer_id INTEGER NOT NULL,
+        PRIMARY KEY (trigram, manufacturer_id)
+    ) WITHOUT ROWID
+    """,
+)
+
+_UPSERT_CODE = """
+    INSERT INTO codes (manufacturer_id, model, protocol, name, tuya_code)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (manufacturer_id, model, name)
+    DO UPDATE SET protocol = excluded.protocol, tuya_code = excluded.tuya_code
+"""
+
+
+@dataclass(frozen=True)
+class CatalogCode:
+    """A known good code"""
+
+    manufacturer: str  # Display name, e.g. "Fujitsu"
+    model: str  # Remote or unit model; "" if unknown
+    protocol: str  # Decoded protocol name, e.g. "FUJITSU_AC"; "" if it doesn't decode
+    name: str  # Code name, e.g. "COOL_24C"
+    tuya_code: str
+
+
+def manufacturer_key(name: str) -> str:
+    """Exact-match key of a manufacturer name: lowercase, single spaces"""
+    return " ".join(name.lower().split())
+
+
+def fold(text: str) -> str:
+    """Search form of a name: lowercase letters and digits only"""
+    return "".join(c for c in text.lower() if c.isalnum())
+
+
+def trigrams(folded: str, prefix: bool = False) -> Set[str]:
+    """
+    Trigrams of a folded name, padded with two spaces at the start.
+
+    Args:
+        folded: Folded name (see fold())
+        prefix: Whether the text is a prefix (a query being typed), which isn't
+            padded at the end
+    """
+    padded = "  " + folded + ("" if prefix else " ")
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _protocol_of(tuya_code: str) -> str:
+    from app.core.ir_protocols import decode, decode_results, decode_type_t
+    from app.core.tuya_encoder import decode_ir
+
+    try:
+        results = decode_results()
+        results.rawbuf = decode_ir(tuya_code)
+        results.rawlen = len(results.rawbuf)
+        if decode(results):
+            return decode_type_t(results.decode_type).name
+    except Exception:  # Not a valid code; catalogued without a protocol.
+        pass
+    return ""
+
+
+class CodeCatalog:
+    """Indexed store of known good codes by manufacturer, model and protocol"""
+
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False):
+        """
+        Args:
+            db_path: SQLite database path; None keeps the catalog in memory only
+            read_only: Open an existing, already seeded database without ever
+                writing to it (a packaged catalog, see app/serverless.py);
+                adding codes then fails. Falls back to an empty, writable
+                in-memory catalog if it can't be opened or is outdated.
+        """
+        self._lock = threading.Lock()
+        self._db = self._open_read_only(db_path) if read_only and db_path is not None else None
+        self.read_only = self._db is not None
+        if self._db is None:
+            self._db = self._open(None if read_only else db_path)
+        self._manufacturer_count = self._db.execute(
+            "SELECT COUNT(*) FROM manufacturers"
+        ).fetchone()[0]
+
+    @staticmethod
+    def _open_read_only(db_path: Path) -> Optional[sqlite3.Connection]:
+        path = Path(db_path).resolve()
+        if not path.is_file():
+            return None
+        try:
+            # immutable: the file can't change under us, so SQLite takes no
+            # locks and needs no journal, as on a read-only file system.
+            db = sqlite3.connect(
+                f"{path.as_uri()}?mode=ro&immutable=1", uri=True, check_same_thread=False
+            )
+            if db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+                return db
+            db.close()
+        except sqlite3.Error:
+            pass
+        return None
+
+    @staticmethod
+    def _open(db_path: Optional[Path]) -> sqlite3.Connection:
+        if db_path is not None:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                db = sqlite3.connect(str(db_path), check_same_thread=False)
+                if db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    for table in ("trigrams", "codes", "manufacturers"):
+                        db.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in _SCHEMA:
+                    db.execute(statement)
+                db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                db.commit()
+                return db
+            except (OSError, sqlite3.Error):
+                pass  # Fall back to memory, like the other local stores.
+        db = sqlite3.connect(":memory:", check_same_thread=False)
+        for statement in _SCHEMA:
+            db.execute(statement)
+        return db
+
+    def __len__(self) -> int:
+        """Number of codes"""
+        return self._db.execute("SELECT COUNT(*) FROM codes").fetchone()[0]
+
+    def close(self) -> None:
+        self._db.close()
+
+    def _manufacturer_id(self, manufacturer: str) -> int:
+        key = manufacturer_key(manufacturer)
+        row = self._db.execute("SELECT id FROM manufacturers WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            return row[0]
+        folded = fold(manufacturer)
+        cursor = self._db.execute(
+            "INSERT INTO manufacturers (key, folded, name) VALUES (?, ?, ?)",
+            (key, folded, " ".join(manufacturer.split())),
+        )
+        self._db.executemany(
+            "INSERT INTO trigrams (trigram, manufacturer_id) VALUES (?, ?)",
+            [(trigram, cursor.lastrowid) for trigram in trigrams(folded)],
+        )
+        self._manufacturer_count += 1
+        return cursor.lastrowid
+
+    def add_codes(self, rows: Iterable[Sequence[Optional[str]]]) -> int:
+        """
+        Add (or replace) codes in one transaction.
+
+        Args:
+            rows: (manufacturer, model, protocol, name, tuya_code) tuples; a
+                None or empty protocol is filled in by decoding the code
+
+        Returns:
+            Number of rows written
+
+        Raises:
+            ValueError: If a row has no manufacturer, name or code
+        """
+        written = 0
+        with self._lock:
+            try:
+                for manufacturer, model, protocol, name, tuya_code in rows:
+                    if not (manufacturer or "").strip() or not name or not tuya_code:
+                        raise ValueError("Catalog codes need a manufacturer, name and code")
+                    self._db.execute(
+                        _UPSERT_CODE,
+                        (
+                            self._manufacturer_id(manufacturer),
+                            model or "",
+                            protocol or _protocol_of(tuya_code),
+                            name,
+                            tuya_code,
+                        ),
+                    )
+                    written += 1
+            except Exception:
+                self._db.rollback()
+                self._manufacturer_count = self._db.execute(
+                    "SELECT COUNT(*) FROM manufacturers"
+                ).fetchone()[0]
+                raise
+            self._db.commit()
+        return written
+
+    def add_code(
+        self,
+        manufacturer: str,
+        name: str,
+        tuya_code: str,
+        model: str = "",
+        protocol: Optional[str] = None,
+    ) -> None:
+        """Add (or replace) one code; see add_codes()"""
+        self.add_codes([(manufacturer, model, protocol, name, tuya_code)])
+
+    def get_codes(self, manufacturer: str, model: Optional[str] = None) -> Dict[str, str]:
+        """
+        A manufacturer's codes, by name.
+
+        Args:
+            manufacturer: Manufacturer name, matched exactly but case-insensitively
+            model: Only this model's codes; None for all models, where the
+                first model (in order) keeps a name shared by several
+
+        Returns:
+            Code name -> Tuya code; empty if the manufacturer isn't catalogued
+        """
+        sql = (
+            "SELECT c.name, c.tuya_code FROM manufacturers m "
+            "JOIN codes c ON c.manufacturer_id = m.id WHERE m.key = ?"
+        )
+        params: Tuple = (manufacturer_key(manufacturer),)
+        if model is not None:
+            sql += " AND c.model = ?"
+            params += (model,)
+        codes: Dict[str, str] = {}
+        with self._lock:
+            for name, tuya_code in self._db.execute(sql + " ORDER BY c.model, c.rowid", params):
+                codes.setdefault(name, tuya_code)
+        return codes
+
+    def models(self, manufacturer: str) -> List[str]:
+        """A manufacturer's models, sorted; "" stands for codes without one"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT c.model FROM manufacturers m "
+                "JOIN codes c ON c.manufacturer_id = m.id WHERE m.key = ? ORDER BY c.model",
+                (manufacturer_key(manufacturer),),
+            ).fetchall()
+        return [model for (model,) in rows]
+
+    def find_codes(
+        self, protocol: Optional[str] = None, model: Optional[str] = None
+    ) -> List[CatalogCode]:
+        """
+        Codes of a protocol and/or model, across manufacturers.
+
+        Raises:
+            ValueError: If neither is given
+        """
+        if protocol is None and model is None:
+            raise ValueError("find_codes() needs a protocol or a model")
+        clauses, params = [], []
+        if protocol is not None:
+            clauses.append("c.protocol = ?")
+            params.append(protocol)
+        if model is not None:
+            clauses.append("c.model = ?")
+            params.append(model)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT m.name, c.model, c.protocol, c.name, c.tuya_code FROM codes c "
+                "JOIN manufacturers m ON m.id = c.manufacturer_id WHERE "
+                + " AND ".join(clauses)
+                + " ORDER BY m.folded, c.model, c.rowid",
+                params,
+            ).fetchall()
+        return [CatalogCode(*row) for row in rows]
+
+    def manufacturers(self, offset: int = 0, limit: Optional[int] = None) -> List[str]:
+        """Manufacturer display names, sorted by folded name"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT name FROM manufacturers ORDER BY folded, key LIMIT ? OFFSET ?",
+                (-1 if limit is None else limit, offset),
+            ).fetchall()
+        return [name for (name,) in rows]
+
+    def manufacturer_count(self) -> int:
+        return self._manufacturer_count
+
+    def search_manufacturers(self, query: str) -> List[str]:
+        """
+        Manufacturers matching a (partly typed, possibly misspelt) name.
+
+        Returns:
+            Up to MAX_SEARCH_RESULTS display names: prefix matches in name
+            order, then fuzzy matches, most shared trigrams first
+        """
+        folded = fold(query)
+        if not folded:
+            return self.manufacturers(limit=MAX_SEARCH_RESULTS)
+        with self._lock:
+            found = self._db.execute(
+                "SELECT id, name FROM manufacturers WHERE folded >= ? AND folded < ? "
+                "ORDER BY folded, key LIMIT ?",
+                (folded, folded + "\U0010ffff", MAX_SEARCH_RESULTS),
+            ).fetchall()
+            grams = sorted(trigrams(folded, prefix=True))
+            if len(found) < MAX_SEARCH_RESULTS and len(folded) >= 3:
+                seen = {row[0] for row in found}
+                placeholders = ", ".join("?" * len(grams))
+                fuzzy = self._db.execute(
+                    "SELECT m.id, m.name FROM ("
+                    "  SELECT manufacturer_id, COUNT(*) AS hits FROM trigrams"
+                    f"  WHERE trigram IN ({placeholders}) GROUP BY manufacturer_id"
+                    "  HAVING hits >= ? ORDER BY hits DESC LIMIT ?"
+                    ") t JOIN manufacturers m ON m.id = t.manufacturer_id "
+                    "ORDER BY t.hits DESC, m.folded",
+                    (*grams, math.ceil(len(grams) * FUZZY_MIN_SCORE), MAX_SEARCH_RESULTS * 2),
+                ).fetchall()
+                found += [row for row in fuzzy if row[0] not in seen]
+        return [name for _, name in found[:MAX_SEARCH_RESULTS]]
+
+
+def seed_known_codes(catalog: CodeCatalog) -> int:
+    """
+    Upsert the known good codes in test_codes, under their manufacturer's
+    title-cased name and without a model.
+
+    Returns:
+        Number of codes written
+    """
+    from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES
+
+    return catalog.add_codes(
+        (manufacturer.title(), "", None, name, tuya_code)
+        for manufacturer, codes in ALL_KNOWN_GOOD_CODES.items()
+        for name, tuya_code in codes.items()
+    )
+
+
+def default_catalog_path() -> Optional[Path]:
+    """The configured database path resolved against the project root, or None"""
+    from app.settings import settings
+    from app.services.command_cache import PROJECT_ROOT
+
+    if not settings.code_catalog_db:
+        return None
+    path = Path(settings.code_catalog_db)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+_catalog: Optional[CodeCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_code_catalog() -> CodeCatalog:
+    """
+    The shared catalog, opened and seeded with the known good codes on first
+    use. A read-only catalog (settings.code_catalog_read_only) was seeded when
+    it was packaged, which saves decoding every known code on open.
+    """
+    from app.settings import settings
+
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            catalog = CodeCatalog(default_catalog_path(), settings.code_catalog_read_only)
+            if not catalog.read_only:
+                seed_known_codes(catalog)
+            _catalog = catalog
+    return _catalog
+
+
+def import_csv(catalog: CodeCatalog, path: Path) -> int:
+    """
+    Import codes from a CSV file with manufacturer, model, protocol, name and
+    tuya_code columns (model and protocol may be empty).
+
+    Returns:
+        Number of codes written
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = csv.DictReader(f)
+        return catalog.add_codes(
+            (r["manufacturer"], r.get("model"), r.get("protocol"), r["name"], r["tuya_code"])
+            for r in rows
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import known good codes into the catalog")
+    parser.add_argument("command", choices=["import"])
+    parser.add_argument("csv", type=Path, help="CSV file of codes")
+    parser.add_argument("--db", type=Path, default=None, help="catalog database path")
+    args = parser.parse_args(argv)
+
+    path = args.db or default_catalog_path()
+    if path is None:
+        parser.error("no catalog database configured; pass --db")
+    catalog = CodeCatalog(path)
+    written = import_csv(catalog, args.csv)
+    print(f"Imported {written} codes into {path} ({len(catalog)} codes in total)")
+    catalog.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+"""
+Reverse Code Index
+
+Installers often re-learn codes this service generated earlier, or codes from
+a remote whose protocol is registered. Recognising one used to take a full
+decode_ir(), a decode() scan over every protocol and a command set generation.
+The reverse index maps a code straight back to the generated command it is:
+(protocol, command name, state bytes).
+
+Every command is indexed under two keys:
+1. A digest of the Tuya code string itself, which recognises a code we
+   generated without decoding it at all.
+2. A timing fingerprint: the payload bytes ir_infer reads from the code's
+   timings (and their bit order), followed by the layout they were read with:
+   the bit timings, and each section's size, header, footer mark and gap.
+   Blaster jitter doesn't change the bits, so a re-learned copy of a
+   generated command has the same payload even though its code string is
+   different. The payload is looked up exactly and the layout within
+   FINGERPRINT_TOLERANCE, so the same bytes sent with another remote's
+   timings don't match; nor does a payload several commands share.
+
+The index is loaded from the prebuilt command cache (see command_cache.py),
+which stores each command's state and fingerprint, so nothing is generated at
+load time. Protocols generated on demand are added as they're generated.
+"""
+
+import hashlib
+import struct
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.core.ir_protocols import decode_type_t
+from app.core.ir_protocols.ir_infer import inferProtocol, inferred_protocol_t
+from app.core.tuya_encoder import decode_ir
+
+# Size of a code digest, in bytes.
+DIGEST_SIZE = 16
+
+# A capture's layout durations must be within this percentage of the indexed
+# command's, or within FINGERPRINT_EXCESS uSeconds of them, to match.
+FINGERPRINT_TOLERANCE = 10
+FINGERPRINT_EXCESS = 200
+
+_KEY_SIZE = struct.Struct("<H")  # Length of the bit order and payload
+_TIMING = struct.Struct("<4I")  # onemark, onespace, zeromark, zerospace
+# nbytes, constant bits, their value, inverted; hdrmark, hdrspace, footermark, gap
+_SECTION = struct.Struct("<HBBB4I")
+
+# A fingerprint's layout: bit timings, then per section its shape (matched
+# exactly) and its durations (matched within the tolerance).
+_Layout = Tuple[Tuple[int, ...], Tuple[Tuple[Tuple[int, ...], Tuple[int, ...]], ...]]
+
+
+@dataclass(frozen=True)
+class CodeMatch:
+    """A generated command recognised by the index"""
+
+    protocol_type: decode_type_t
+    command: str  # Command name, e.g. "24_cool_auto"
+    state: bytes  # State bytes the command was generated from
+    exact: bool  # The code itself matched, not only its timing fingerprint
+
+    @property
+    def protocol(self) -> str:
+        return decode_type_t(self.protocol_type).name
+
+
+def code_digest(tuya_code: str) -> bytes:
+    """Content address of a Tuya code string"""
+    return hashlib.blake2b(tuya_code.encode("ascii", "replace"), digest_size=DIGEST_SIZE).digest()
+
+
+def inferred_fingerprint(inferred: inferred_protocol_t) -> bytes:
+    """
+    Timing fingerprint of an inferred protocol: its bit order and payload, then
+    its bit timings and sections
+    """
+    key = bytes([inferred.layout.timing.MSBfirst]) + bytes(inferred.state)
+    timing = inferred.layout.timing
+    parts = [
+        _KEY_SIZE.pack(len(key)),
+        key,
+        _TIMING.pack(timing.onemark, timing.onespace, timing.zeromark, timing.zerospace),
+    ]
+    for section in inferred.layout.sections:
+        parts.append(
+            _SECTION.pack(
+                section.nbytes or 0,
+                section.bits,
+                section.value,
+                section.inverted,
+                section.hdrmark,
+                section.hdrspace,
+                section.footermark,
+                section.gap,
+            )
+        )
+    return b"".join(parts)
+
+
+def _split_fingerprint(fingerprint: bytes) -> Optional[Tuple[bytes, _Layout]]:
+    """A fingerprint's payload key and layout, or None if it isn't one"""
+    if len(fingerprint) < _KEY_SIZE.size:
+        return None
+    (key_size,) = _KEY_SIZE.unpack_from(fingerprint)
+    offset = _KEY_SIZE.size + key_size
+    rest = len(fingerprint) - offset - _TIMING.size
+    if rest < 0 or rest % _SECTION.size:
+        return None
+    timing = _TIMING.unpack_from(fingerprint, offset)
+    sections = []
+    for start in range(offset + _TIMING.size, len(fingerprint), _SECTION.size):
+        fields = _SECTION.unpack_from(fingerprint, start)
+        sections.append((fields[:4], fields[4:]))
+    return fingerprint[_KEY_SIZE.size : offset], (timing, tuple(sections))
+
+
+def _close(measured: int, desired: int) -> bool:
+    slack = max(desired * FINGERPRINT_TOLERANCE // 100, FINGERPRINT_EXCESS)
+    return abs(measured - desired) <= slack
+
+
+def _layouts_match(measured: _Layout, desired: _Layout) -> bool:
+    """Whether a capture's layout is an indexed command's, give or take jitter"""
+    if len(measured[1]) != len(desired[1]):
+        return False
+    durations = [(measured[0], desired[0])]
+    for (shape, times), (want_shape, want_times) in zip(measured[1], desired[1]):
+        if shape != want_shape:
+            return False
+        durations.append((times, want_times))
+    return all(_close(m, d) for got, want in durations for m, d in zip(got, want))
+
+
+def timing_fingerprint(timings: Sequence[int]) -> Optional[bytes]:
+    """Timing fingerprint of a capture, or None if no payload can be read from it"""
+    inferred = inferProtocol(timings)
+    return inferred_fingerprint(inferred) if inferred is not None else None
+
+
+def code_fingerprint(tuya_code: str) -> Optional[bytes]:
+    """Timing fingerprint of a Tuya code, or None if it has none"""
+    try:
+        timings = decode_ir(tuya_code)
+    except Exception:  # Not a valid code; nothing to fingerprint.
+        return None
+    return timing_fingerprint(timings)
+
+
+class CodeIndex:
+    """Code digest and timing fingerprint -> generated command"""
+
+    def __init__(self):
+        # (protocol, command name, state) per indexed command.
+        self._entries: List[Tuple[decode_type_t, str, bytes]] = []
+        self._by_code: Dict[bytes, int] = {}
+        # Payload key -> (layout, entry) of each command with that payload.
+        self._by_fingerprint: Dict[bytes, List[Tuple[_Layout, int]]] = {}
+        self._protocols: Set[decode_type_t] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, protocol_type: decode_type_t) -> bool:
+        """Whether a protocol's commands are indexed"""
+        return protocol_type in self._protocols
+
+    def add_commands(
+        self,
+        protocol_type: decode_type_t,
+        commands: Iterable,
+        fingerprints: Optional[Iterable[Optional[bytes]]] = None,
+    ) -> None:
+        """
+        Index a protocol's generated command set.
+
+        Args:
+            protocol_type: The protocol the commands were generated for
+            commands: CommandInfo objects; those without state bytes are skipped
+            fingerprints: Each command's timing fingerprint, if already known
+                (e.g. from the command cache). Computed from the codes otherwise.
+        """
+        commands = list(commands)
+        if fingerprints is None:
+            fingerprints = [code_fingerprint(cmd.tuya_code) for cmd in commands]
+        with self._lock:
+            if protocol_type in self._protocols:
+                return
+            for cmd, fingerprint in zip(commands, fingerprints):
+                if cmd.state is None or not cmd.tuya_code:
+                    continue
+                index = len(self._entries)
+                self._entries.append((protocol_type, cmd.name, cmd.state))
+                # The first command to claim a key keeps it.
+                self._by_code.setdefault(code_digest(cmd.tuya_code), index)
+                split = _split_fingerprint(fingerprint) if fingerprint else None
+                if split is not None:
+                    key, layout = split
+                    self._by_fingerprint.setdefault(key, []).append((layout, index))
+            self._protocols.add(protocol_type)
+
+    def _match(self, index: Optional[int], exact: bool) -> Optional[CodeMatch]:
+        if index is None:
+            return None
+        protocol_type, command, state = self._entries[index]
+        return CodeMatch(protocol_type, command, state, exact)
+
+    def lookup_code(self, tuya_code: str) -> Optional[CodeMatch]:
+        """The command a Tuya code is, if we generated exactly this code"""
+        return self._match(self._by_code.get(code_digest(tuya_code)), exact=True)
+
+    def lookup_fingerprint(self, fingerprint: Optional[bytes]) -> Optional[CodeMatch]:
+        """
+        The command with this timing fingerprint, if any: its payload, sent
+        with its layout. None if several commands have both, as the capture
+        could be any of them.
+        """
+        split = _split_fingerprint(fingerprint) if fingerprint else None
+        if split is None:
+            return None
+        key, layout = split
+        found = [
+            index
+            for indexed, index in self._by_fingerprint.get(key, ())
+            if _layouts_match(layout, indexed)
+        ]
+        return self._match(found[0], exact=False) if len(found) == 1 else None
+
+
+def load_code_index(cache) -> CodeIndex:
+    """
+    Build an index from a command cache.
+
+    Args:
+        cache: CommandCache (see command_cache.py), or None for an empty index
+
+    Returns:
+        CodeIndex holding every command in the cache
+    """
+    index = CodeIndex()
+    if cache is None:
+        return index
+    for protocol_name in cache.protocols():
+        try:
+            protocol_type = decode_type_t[protocol_name]
+        except KeyError:
+            continue
+        index.add_commands(
+            protocol_type, cache.commands(protocol_name), cache.fingerprints(protocol_name)
+        )
+    return index
+
+
+_index: Optional[CodeIndex] = None
+
+
+def get_code_index() -> CodeIndex:
+    """The shared index, loaded from the generator's command cache on first use"""
+    global _index
+    if _index is None:
+        from app.services.command_generator import _generator
+
+        _index = load_code_index(_generator.cache)
+    return _index
@@ -0,0 +1,389 @@
+"""
+Command Cache Service
+
+Generated command sets are deterministic per protocol, yet every uvicorn worker
+used to rebuild them from scratch and keep its own copy. This module packs the
+command sets of all registered protocols into a single read-only binary file
+that every worker maps with mmap, so the pages are shared through the OS page
+cache and a lookup is a zero-copy slice of the mapping.
+
+File layout (all integers little-endian):
+
+    header          magic, version, source fingerprint, protocol/command counts
+    protocol table  one record per protocol: name, first command, command
+                    count and info span
+    command table   one record per command: name, description, code, state
+                    and timing fingerprint spans
+    string blob     packed UTF-8 names, descriptions and Tuya code strings,
+                    and the raw state and fingerprint bytes
+
+Records only hold (offset, length) spans into the string blob, so the tables
+have a fixed size and can be indexed directly. The source fingerprint is a
+hash of the protocol modules, the generator, the fingerprint scheme and this
+writer; a file built from different sources is ignored rather than served
+stale.
+
+The state bytes and timing fingerprints (see code_index.py) let the reverse
+code index be loaded from the artifact, rather than regenerating every
+command set to find out which command a code is. An empty span means none.
+
+Each protocol's info (its get_protocol_info() capabilities, as JSON) is kept
+too, so a process serving only protocols in the artifact never registers the
+protocol metadata, which imports every protocol module (see app/serverless.py).
+
+Build the artifact with:
+    python -m app.services.command_cache build [--output PATH]
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.ir_protocols import decode_type_t
+
+MAGIC = b"MTIRCMD\x00"
+VERSION = 3
+
+_HEADER = struct.Struct("<8sI32sII")  # magic, version, fingerprint, protocols, commands
+# name (offset, length), first command, command count, info (offset, length)
+_PROTOCOL = struct.Struct("<IIIIII")
+# name, description, code, state and fingerprint (offset, length) spans
+_COMMAND = struct.Struct("<IIIIIIIIII")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Sources whose changes invalidate a built artifact: everything that computes
+# what is written into it, the codes, states, timing fingerprints (see
+# code_index.py) and protocol info, and the writer itself.
+_FINGERPRINT_SOURCES = (
+    "app/core/ir_protocols/*.py",
+    "app/core/tuya_encoder.py",
+    "app/services/code_index.py",
+    "app/services/command_cache.py",
+    "app/services/command_generator.py",
+)
+
+
+def source_fingerprint() -> bytes:
+    """SHA-256 over the modules that compute the artifact's contents."""
+    digest = hashlib.sha256()
+    for pattern in _FINGERPRINT_SOURCES:
+        for path in sorted(PROJECT_ROOT.glob(pattern)):
+            digest.update(path.relative_to(PROJECT_ROOT).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.digest()
+
+
+def default_cache_path() -> Path:
+    """The configured artifact path, resolved against the project root."""
+    from app.settings import settings
+
+    path = Path(settings.command_cache_path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+class CommandCache:
+    """Read-only, memory-mapped view of a command-set artifact."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        # protocol name -> {command name: record index}, built per protocol on demand.
+        self._indexes: Dict[str, Dict[str, int]] = {}
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, fingerprint, protocol_count, command_count = _HEADER.unpack_from(
+            self._mmap, 0
+        )
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} command cache")
+        self.fingerprint = fingerprint
+
+        self._protocol_table = _HEADER.size
+        self._command_table = self._protocol_table + protocol_count * _PROTOCOL.size
+        self._blob = self._command_table + command_count * _COMMAND.size
+
+        # protocol name -> (first command, command count); tiny, built once.
+        self._protocols: Dict[str, Tuple[int, int]] = {}
+        # protocol name -> info span, parsed on demand
+        self._infos: Dict[str, Tuple[int, int]] = {}
+        for i in range(protocol_count):
+            name_off, name_len, first, count, info_off, info_len = _PROTOCOL.unpack_from(
+                self._mmap, self._protocol_table + i * _PROTOCOL.size
+            )
+            name = self._str(name_off, name_len)
+            self._protocols[name] = (first, count)
+            self._infos[name] = (info_off, info_len)
+
+    def close(self) -> None:
+        self._indexes.clear()
+        if getattr(self, "_view", None) is not None:
+            self._view.release()
+            self._view = None
+        self._mmap.close()
+
+    def _span(self, offset: int, length: int) -> memoryview:
+        start = self._blob + offset
+        return self._view[start : start + length]
+
+    def _str(self, offset: int, length: int) -> str:
+        start = self._blob + offset
+        return self._mmap[start : start + length].decode("utf-8")
+
+    def _bytes(self, offset: int, length: int) -> Optional[bytes]:
+        if not length:
+            return None
+        start = self._blob + offset
+        return self._mmap[start : start + length]
+
+    def _record(self, index: int) -> Tuple[int, ...]:
+        return _COMMAND.unpack_from(self._mmap, self._command_table + index * _COMMAND.size)
+
+    def _index(self, protocol_name: str) -> Optional[Dict[str, int]]:
+        index = self._indexes.get(protocol_name)
+        if index is None:
+            entry = self._protocols.get(protocol_name)
+            if entry is None:
+                return None
+            first, count = entry
+            index = {}
+            for i in range(first, first + count):
+                name_off, name_len = self._record(i)[:2]
+                index[self._str(name_off, name_len)] = i
+            self._indexes[protocol_name] = index
+        return index
+
+    def protocols(self) -> List[str]:
+        """Names of the protocols in the artifact."""
+        return list(self._protocols)
+
+    def __contains__(self, protocol_name: str) -> bool:
+        return protocol_name in self._protocols
+
+    def code(self, protocol_name: str, command_name: str) -> Optional[memoryview]:
+        """
+        Zero-copy lookup of one command's Tuya code.
+
+        Returns:
+            ASCII bytes of the Tuya code as a view into the mapping, or None
+        """
+        index = self._index(protocol_name)
+        if index is None or command_name not in index:
+            return None
+        code_off, code_len = self._record(index[command_name])[4:6]
+        return self._span(code_off, code_len)
+
+    def info(self, protocol_name: str) -> Optional[Dict[str, Any]]:
+        """
+        A protocol's get_protocol_info() dictionary, as built.
+
+        Returns:
+            A new dictionary, or None if the protocol isn't in the artifact or
+            was written without its info
+        """
+        span = self._infos.get(protocol_name)
+        if span is None or not span[1]:
+            return None
+        return json.loads(self._str(*span))
+
+    def commands(self, protocol_name: str):
+        """
+        All commands of a protocol, in generation order.
+
+        Returns:
+            List of CommandInfo, or None if the protocol isn't in the artifact
+        """
+        from app.services.command_generator import CommandInfo
+
+        entry = self._protocols.get(protocol_name)
+        if entry is None:
+            return None
+        first, count = entry
+        commands = []
+        for i in range(first, first + count):
+            name_off, name_len, desc_off, desc_len, code_off, code_len, state_off, state_len = (
+                self._record(i)[:8]
+            )
+            commands.append(
+                CommandInfo(
+                    name=self._str(name_off, name_len),
+                    description=self._str(desc_off, desc_len),
+                    tuya_code=self._str(code_off, code_len),
+                    state=self._bytes(state_off, state_len),
+                )
+            )
+        return commands
+
+    def fingerprints(self, protocol_name: str) -> Optional[List[Optional[bytes]]]:
+        """
+        Timing fingerprints of a protocol's commands, in the order of commands().
+
+        Returns:
+            List of fingerprints (None where a code has none), or None if the
+            protocol isn't in the artifact
+        """
+        entry = self._protocols.get(protocol_name)
+        if entry is None:
+            return None
+        first, count = entry
+        return [self._bytes(*self._record(i)[8:]) for i in range(first, first + count)]
+
+
+def write_command_cache(
+    path: Path,
+    command_sets: Dict[str, list],
+    fingerprint: bytes,
+    infos: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> None:
+    """
+    Serialize command sets to an artifact file.
+
+    Each code's timing fingerprint is computed here, so that loading the
+    reverse code index from the artifact doesn't have to.
+
+    Args:
+        path: Output path (written atomically via a temporary file)
+        command_sets: protocol name -> list of CommandInfo
+        fingerprint: Source fingerprint to stamp into the header
+        infos: protocol name -> get_protocol_info() dictionary, for the
+            protocols that have one
+    """
+    from app.services.code_index import code_fingerprint
+
+    blob = bytearray()
+    spans: Dict[bytes, Tuple[int, int]] = {}
+
+    def put_bytes(data: Optional[bytes]) -> Tuple[int, int]:
+        # Names, descriptions and states repeat across commands; store each once.
+        if not data:
+            return 0, 0
+        if data not in spans:
+            spans[data] = (len(blob), len(data))
+            blob.extend(data)
+        return spans[data]
+
+    def put(text: str) -> Tuple[int, int]:
+        return put_bytes(text.encode("utf-8"))
+
+    protocol_records = []
+    command_records = []
+    for protocol_name, commands in command_sets.items():
+        info = (infos or {}).get(protocol_name)
+        protocol_records.append(
+            (
+                *put(protocol_name),
+                len(command_records),
+                len(commands),
+                *put(json.dumps(info, separators=(",", ":")) if info else ""),
+            )
+        )
+        for cmd in commands:
+            command_records.append(
+                (
+                    *put(cmd.name),
+                    *put(cmd.description),
+                    *put(cmd.tuya_code),
+                    *put_bytes(cmd.state),
+                    *put_bytes(code_fingerprint(cmd.tuya_code)),
+                )
+            )
+
+    out = bytearray(
+        _HEADER.pack(MAGIC, VERSION, fingerprint, len(protocol_records), len(command_records))
+    )
+    for record in protocol_records:
+        out += _PROTOCOL.pack(*record)
+    for record in command_records:
+        out += _COMMAND.pack(*record)
+    out += blob
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per process, as workers warming up may build the artifact at once.
+    tmp = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+    tmp.write_bytes(out)
+    # Atomic so running workers keep their old mapping until they reload.
+    os.replace(tmp, path)
+
+
+def build_command_cache(
+    path: Optional[Path] = None, protocols: Optional[Iterable[decode_type_t]] = None
+) -> Dict[str, int]:
+    """
+    Generate command sets and write them to the artifact.
+
+    Args:
+        path: Output path (defaults to settings.command_cache_path)
+        protocols: Protocols to include (defaults to every registered protocol)
+
+    Returns:
+        protocol name -> number of commands written. Protocols whose generation
+        fails are skipped and left to be generated on demand.
+    """
+    from app.services.command_generator import CommandGenerator
+
+    generator = CommandGenerator()
+    if protocols is None:
+        protocols = list(generator.registry._protocols)
+
+    command_sets = {}
+    infos = {}
+    for protocol_type in protocols:
+        metadata = generator.registry.get(protocol_type)
+        if metadata is None:
+            continue
+        try:
+            command_sets[metadata.protocol_name] = generator.generate_commands(protocol_type, [])
+        except Exception as e:  # Broken protocol bindings shouldn't block the build.
+            print(f"skipping {metadata.protocol_name}: {e}", file=sys.stderr)
+            continue
+        infos[metadata.protocol_name] = generator.get_protocol_info(protocol_type)
+
+    write_command_cache(path or default_cache_path(), command_sets, source_fingerprint(), infos)
+    return {name: len(commands) for name, commands in command_sets.items()}
+
+
+def load_command_cache(path: Optional[Path] = None) -> Optional[CommandCache]:
+    """
+    Map the artifact if it exists and matches the current sources.
+
+    Returns:
+        CommandCache, or None if the file is missing, malformed or stale
+    """
+    path = Path(path) if path else default_cache_path()
+    if not path.is_file():
+        return None
+    try:
+        cache = CommandCache(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    if cache.fingerprint != source_fingerprint():
+        cache.close()
+        return None
+    return cache
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the shared command-set artifact")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--output", type=Path, default=None, help="artifact path")
+    args = parser.parse_args(argv)
+
+    path = args.output or default_cache_path()
+    built = build_command_cache(path)
+    total = sum(built.values())
+    print(f"Wrote {total} commands for {len(built)} protocols to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
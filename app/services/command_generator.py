@@ -11,33 +11,79 @@ Architecture:
 - Extensible: New protocols can be added by registering metadata
 """
 
-from typing import List, Dict, Any, Optional, Callable
-from dataclasses import dataclass
+import threading
+from array import array
+from typing import List, Dict, Any, Optional, Callable, Union
+from dataclasses import dataclass, field
 from app.core.tuya_encoder import encode_ir
 from app.core.ir_protocols import decode_type_t
+from app.core.ir_protocols.ir_layout import frame_layout_t, packFrame, packFrames, packTimings
+from app.services.command_cache import load_command_cache
 
 
-def _prepare_timings_for_tuya(timings: List[int]) -> List[int]:
+def _prepare_timings_for_tuya(timings: Union[List[int], array]) -> array:
     """
     Prepare IR timings for Tuya encoding.
 
-    Some protocols (e.g., Haier) generate large inter-message gaps that exceed
-    the 16-bit limit (65535µs) for Tuya encoding. This function:
-    1. Removes trailing gaps (values > 10000µs at the end)
-    2. Caps all values at 65535µs
+    Tuya codes hold 16-bit durations, but some protocols (e.g., Samsung A/C,
+    Haier) have gaps longer than 65535µs. This function:
+    1. Stores the timings in an array('H') frame buffer, splitting longer
+       durations into 65535µs pieces joined by zero length marks/spaces
+       (see ir_layout.packTimings). A frame buffer is used as is, in place.
+    2. Removes trailing gaps (values > 10000µs at the end), along with the
+       pieces of a split one.
 
     Args:
-        timings: Raw IR timing values in microseconds
+        timings: Raw IR timing values in microseconds, or a frame buffer
 
     Returns:
-        Timings safe for Tuya encoding
+        The frame buffer, safe for Tuya encoding
     """
-    # Remove trailing large gaps (inter-message gaps)
-    result = list(timings)
-    while result and result[-1] > 10000:
-        result = result[:-1]
-    # Cap all values at 65535 (16-bit max)
-    return [min(t, 65535) for t in result]
+    buf = timings if isinstance(timings, array) else packTimings(timings)
+    end = len(buf)
+    while end and (buf[end - 1] > 10000 or not buf[end - 1]):
+        end -= 1
+    del buf[end:]
+    return buf
+
+
+def encode_state(metadata: "ProtocolMetadata", state) -> str:
+    """
+    Encode a protocol state as a Tuya IR code.
+
+    Args:
+        metadata: Protocol metadata providing the send function
+        state: Raw state as returned by the AC class getRaw()
+
+    Returns:
+        Tuya-encoded IR code
+    """
+    if metadata.frame_layout is not None:
+        signal = packFrame(metadata.frame_layout, state, len(state))
+    else:
+        signal = metadata.send_function(state, len(state))
+    return encode_ir(_prepare_timings_for_tuya(signal))
+
+
+def encode_states(metadata: "ProtocolMetadata", states: List[Any]) -> List[str]:
+    """
+    Encode many protocol states as Tuya IR codes, as encode_state() would.
+
+    A protocol with a frame layout has its byte states packed together by
+    ir_layout.packFrames(), which does it as one NumPy computation when
+    NumPy is installed. Other protocols are encoded one state at a time.
+
+    Args:
+        metadata: Protocol metadata providing the send function
+        states: Raw states as returned by the AC class getRaw()
+
+    Returns:
+        Tuya-encoded IR codes, in the order of the states
+    """
+    if metadata.frame_layout is None or any(isinstance(state, int) for state in states):
+        return [encode_state(metadata, state) for state in states]
+    signals = packFrames(metadata.frame_layout, states)
+    return [encode_ir(_prepare_timings_for_tuya(signal)) for signal in signals]
 
 
 @dataclass
@@ -58,6 +104,26 @@ class FanConfig:
     description: str  # Human-readable (e.g., "High fan")
 
 
+@dataclass
+class SwingConfig:
+    """Configuration for a swing setting"""
+
+    value: Any  # Argument passed to the swing setter (constant or bool)
+    name: str  # URL-friendly name (e.g., "on")
+    description: str  # Human-readable (e.g., "Vertical swing")
+
+
+@dataclass
+class FeatureConfig:
+    """Configuration for an on/off feature (e.g., turbo)"""
+
+    method: str  # Setter taking a bool (e.g., "setTurbo")
+    name: str  # URL-friendly name (e.g., "turbo")
+    description: str  # Human-readable (e.g., "Turbo")
+    modes: Optional[List[str]] = None  # Names of the modes it works in; None for all
+    excludes: List[str] = field(default_factory=list)  # Features it can't be combined with
+
+
 @dataclass
 class ProtocolMetadata:
     """Metadata describing a protocol's capabilities"""
@@ -85,19 +151,79 @@ class ProtocolMetadata:
     set_mode_method: str = "setMode"
     set_fan_method: str = "setFan"
     set_power_method: str = "setPower"
+    set_swing_method: str = "setSwing"
     get_raw_method: str = "getRaw"
+    set_raw_method: str = "setRaw"
+
+    # Optional swing settings (empty when the protocol's swing isn't mapped yet)
+    swings: List[SwingConfig] = field(default_factory=list)
+
+    # Optional on/off features (turbo, econo, quiet, ...). Like swing, these
+    # only widen the command space (command_space.py), not generate_commands().
+    features: List[FeatureConfig] = field(default_factory=list)
+
+    # Fahrenheit range, for protocols whose temp setter takes a fahrenheit flag
+    min_temp_f: Optional[int] = None
+    max_temp_f: Optional[int] = None
 
     # Special handling
     fan_temp_override: Optional[int] = None  # Some protocols set temp to specific value in fan mode
+    temp_overrides: Dict[str, int] = field(default_factory=dict)  # Same, by mode name
+    mode_fans: Dict[str, List[str]] = field(default_factory=dict)  # Fans modes are limited to
     supports_raw_init: bool = True  # Whether AC class supports setRaw()
 
+    # The frame layout send_function sends (ir_layout.py), if it has one.
+    # Commands are then packed straight into a frame buffer for encode_ir.
+    frame_layout: Optional[frame_layout_t] = None
+
+
+def set_temp_and_mode(metadata: ProtocolMetadata, ac: Any, mode: ModeConfig, *temp: Any) -> None:
+    """
+    Set an AC object's temperature and mode, as every generated command does.
+
+    The temperature is set both sides of the mode: setTemp() applies the
+    current mode's lock (e.g. Gree's Auto, which a fresh object starts in),
+    while setMode() may set a locked mode's own temperature (e.g. Hitachi's
+    Fan) that must be kept.
+
+    Args:
+        metadata: Protocol metadata providing the setter names and locked modes
+        ac: The AC object
+        mode: The mode to set
+        *temp: setTemp() arguments (the temperature, and a Fahrenheit flag)
+    """
+    set_temp = getattr(ac, metadata.set_temp_method)
+    set_temp(*temp)
+    getattr(ac, metadata.set_mode_method)(mode.value)
+    locked = mode.name in metadata.temp_overrides or (
+        mode.name == "fan" and metadata.fan_temp_override is not None
+    )
+    if not locked:
+        set_temp(*temp)
+
 
 class ProtocolRegistry:
-    """Registry of all supported protocols and their metadata"""
+    """
+    Registry of all supported protocols and their metadata.
+
+    Registering imports every protocol module, so it is put off until the
+    metadata is first needed; requests served from the command-set artifact
+    never need it (see app/serverless.py).
+    """
 
     def __init__(self):
-        self._protocols: Dict[decode_type_t, ProtocolMetadata] = {}
-        self._register_all_protocols()
+        self._metadata: Dict[decode_type_t, ProtocolMetadata] = {}
+        self._registered = False
+        self._lock = threading.Lock()
+
+    @property
+    def _protocols(self) -> Dict[decode_type_t, ProtocolMetadata]:
+        if not self._registered:
+            with self._lock:
+                if not self._registered:
+                    self._register_all_protocols()
+                    self._registered = True
+        return self._metadata
 
     def _register_all_protocols(self):
         """Register all supported protocols with their metadata"""
@@ -106,6 +232,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.fujitsu import (
             IRFujitsuAC,
             sendFujitsuAC,
+            kFujitsuAcLayout,
             kFujitsuAcMinTemp,
             kFujitsuAcMaxTemp,
             kFujitsuAcModeAuto,
@@ -118,13 +245,20 @@ class ProtocolRegistry:
             kFujitsuAcFanMed,
             kFujitsuAcFanLow,
             kFujitsuAcFanQuiet,
+            kFujitsuAcSwingOff,
+            kFujitsuAcSwingVert,
+            kFujitsuAcSwingHoriz,
+            kFujitsuAcSwingBoth,
         )
 
         from app.core.ir_protocols.gree import (
             IRGreeAC,
             sendGree,
+            kGreeLayout,
             kGreeMinTempC,
             kGreeMaxTempC,
+            kGreeMinTempF,
+            kGreeMaxTempF,
             kGreeAuto,
             kGreeCool,
             kGreeHeat,
@@ -138,6 +272,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.panasonic import (
             IRPanasonicAc,
             sendPanasonicAC,
+            kPanasonicAcLayout,
             kPanasonicAcMinTemp,
             kPanasonicAcMaxTemp,
             kPanasonicAcAuto,
@@ -152,6 +287,11 @@ class ProtocolRegistry:
             kPanasonicAcFanMax,
             kPanasonicAcFanAuto,
             kPanasonicAcStateLength,
+            kPanasonicAcFanModeTemp,
+            kPanasonicAcSwingVAuto,
+            kPanasonicAcSwingVHighest,
+            kPanasonicAcSwingVMiddle,
+            kPanasonicAcSwingVLowest,
         )
 
         # Register Fujitsu AC
@@ -162,6 +302,7 @@ class ProtocolRegistry:
                 manufacturer="Fujitsu",
                 ac_class=IRFujitsuAC,
                 send_function=sendFujitsuAC,
+                frame_layout=kFujitsuAcLayout,
                 state_length=16,
                 min_temp=kFujitsuAcMinTemp,
                 max_temp=kFujitsuAcMaxTemp,
@@ -180,6 +321,12 @@ class ProtocolRegistry:
                     FanConfig(kFujitsuAcFanHigh, "high", "High fan"),
                 ],
                 set_fan_method="setFanSpeed",  # Fujitsu uses setFanSpeed not setFan
+                swings=[
+                    SwingConfig(kFujitsuAcSwingOff, "off", "Swing off"),
+                    SwingConfig(kFujitsuAcSwingVert, "vertical", "Vertical swing"),
+                    SwingConfig(kFujitsuAcSwingHoriz, "horizontal", "Horizontal swing"),
+                    SwingConfig(kFujitsuAcSwingBoth, "both", "Vertical and horizontal swing"),
+                ],
             )
         )
 
@@ -191,6 +338,7 @@ class ProtocolRegistry:
                 manufacturer="Gree",
                 ac_class=IRGreeAC,
                 send_function=sendGree,
+                frame_layout=kGreeLayout,
                 state_length=8,
                 min_temp=kGreeMinTempC,
                 max_temp=kGreeMaxTempC,
@@ -207,6 +355,14 @@ class ProtocolRegistry:
                     FanConfig(kGreeFanMin + 1, "med", "Medium fan"),
                     FanConfig(kGreeFanMax, "high", "High fan"),
                 ],
+                features=[
+                    FeatureConfig("setTurbo", "turbo", "Turbo"),
+                    FeatureConfig("setEcono", "econo", "Econo"),
+                ],
+                min_temp_f=kGreeMinTempF,
+                max_temp_f=kGreeMaxTempF,
+                temp_overrides={"auto": 25},  # setTemp() locks Auto to 25C
+                mode_fans={"dry": ["low"]},
             )
         )
 
@@ -218,6 +374,7 @@ class ProtocolRegistry:
                 manufacturer="Panasonic",
                 ac_class=IRPanasonicAc,
                 send_function=sendPanasonicAC,
+                frame_layout=kPanasonicAcLayout,
                 state_length=kPanasonicAcStateLength,
                 min_temp=kPanasonicAcMinTemp,
                 max_temp=kPanasonicAcMaxTemp,
@@ -236,13 +393,25 @@ class ProtocolRegistry:
                     FanConfig(kPanasonicAcFanHigh, "high", "High fan"),
                     FanConfig(kPanasonicAcFanMax, "max", "Max fan"),
                 ],
+                set_swing_method="setSwingVertical",
+                swings=[
+                    SwingConfig(kPanasonicAcSwingVAuto, "auto", "Auto vertical swing"),
+                    SwingConfig(kPanasonicAcSwingVHighest, "highest", "Vane highest"),
+                    SwingConfig(kPanasonicAcSwingVMiddle, "middle", "Vane middle"),
+                    SwingConfig(kPanasonicAcSwingVLowest, "lowest", "Vane lowest"),
+                ],
+                features=[
+                    FeatureConfig("setPowerful", "powerful", "Powerful", excludes=["quiet"]),
+                    FeatureConfig("setQuiet", "quiet", "Quiet", excludes=["powerful"]),
+                ],
+                fan_temp_override=kPanasonicAcFanModeTemp,
             )
         )
 
         # Import Samsung constants
         from app.core.ir_protocols.samsung import (
             IRSamsungAc,
-            sendSAMSUNG,
+            sendSamsungAC,
             kSamsungAcMinTemp,
             kSamsungAcMaxTemp,
             kSamsungAcAuto,
@@ -264,7 +433,7 @@ class ProtocolRegistry:
                 protocol_name="SAMSUNG_AC",
                 manufacturer="Samsung",
                 ac_class=IRSamsungAc,
-                send_function=sendSAMSUNG,
+                send_function=sendSamsungAC,
                 state_length=14,
                 min_temp=kSamsungAcMinTemp,
                 max_temp=kSamsungAcMaxTemp,
@@ -282,6 +451,7 @@ class ProtocolRegistry:
                     FanConfig(kSamsungAcFanHigh, "high", "High fan"),
                     FanConfig(kSamsungAcFanTurbo, "turbo", "Turbo fan"),
                 ],
+                mode_fans={"auto": ["auto"]},  # setMode() locks Auto to its own auto fan
             )
         )
 
@@ -337,6 +507,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.hitachi import (
             IRHitachiAc,
             sendHitachiAC,
+            hitachiAcLayout,
             kHitachiAcMinTemp,
             kHitachiAcMaxTemp,
             kHitachiAcAuto,
@@ -358,6 +529,7 @@ class ProtocolRegistry:
                 manufacturer="Hitachi",
                 ac_class=IRHitachiAc,
                 send_function=sendHitachiAC,
+                frame_layout=hitachiAcLayout(),
                 state_length=28,
                 min_temp=kHitachiAcMinTemp,
                 max_temp=kHitachiAcMaxTemp,
@@ -374,6 +546,13 @@ class ProtocolRegistry:
                     FanConfig(kHitachiAcFanMed, "med", "Medium fan"),
                     FanConfig(kHitachiAcFanHigh, "high", "High fan"),
                 ],
+                set_swing_method="setSwingVertical",
+                swings=[
+                    SwingConfig(False, "off", "Swing off"),
+                    SwingConfig(True, "on", "Vertical swing"),
+                ],
+                fan_temp_override=kHitachiAcMaxTemp,  # setMode() clamps Fan to the max
+                mode_fans={"dry": ["low", "med"], "fan": ["low", "med", "high"]},
             )
         )
 
@@ -381,6 +560,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.mitsubishi import (
             IRMitsubishiAc,
             sendMitsubishiAC,
+            kMitsubishiAcLayout,
             kMitsubishiACStateLength,
             kMitsubishiAcMinTemp,
             kMitsubishiAcMaxTemp,
@@ -403,6 +583,7 @@ class ProtocolRegistry:
                 manufacturer="Mitsubishi",
                 ac_class=IRMitsubishiAc,
                 send_function=sendMitsubishiAC,
+                frame_layout=kMitsubishiAcLayout,
                 state_length=kMitsubishiACStateLength,
                 min_temp=int(kMitsubishiAcMinTemp),
                 max_temp=int(kMitsubishiAcMaxTemp),
@@ -475,6 +656,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.toshiba import (
             IRToshibaAC,
             sendToshibaAC,
+            kToshibaAcLayout,
             kToshibaAcMinTemp,
             kToshibaAcMaxTemp,
             kToshibaAcAuto,
@@ -486,6 +668,8 @@ class ProtocolRegistry:
             kToshibaAcFanMin,
             kToshibaAcFanMed,
             kToshibaAcFanMax,
+            kToshibaAcSwingOff,
+            kToshibaAcSwingOn,
         )
 
         # Register Toshiba AC
@@ -496,6 +680,7 @@ class ProtocolRegistry:
                 manufacturer="Toshiba",
                 ac_class=IRToshibaAC,
                 send_function=sendToshibaAC,
+                frame_layout=kToshibaAcLayout,
                 state_length=9,
                 min_temp=kToshibaAcMinTemp,
                 max_temp=kToshibaAcMaxTemp,
@@ -512,6 +697,10 @@ class ProtocolRegistry:
                     FanConfig(kToshibaAcFanMed, "med", "Medium fan"),
                     FanConfig(kToshibaAcFanMax, "max", "Max fan"),
                 ],
+                swings=[
+                    SwingConfig(kToshibaAcSwingOff, "off", "Swing off"),
+                    SwingConfig(kToshibaAcSwingOn, "on", "Swing on"),
+                ],
             )
         )
 
@@ -519,6 +708,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.haier import (
             IRHaierAC,
             sendHaierAC,
+            kHaierAcLayout,
             kHaierAcMinTemp,
             kHaierAcMaxTemp,
             kHaierAcAuto,
@@ -536,6 +726,8 @@ class ProtocolRegistry:
             kHaierAC176StateLength,
             kHaierAcYrw02MinTempC,
             kHaierAcYrw02MaxTempC,
+            kHaierAcYrw02MinTempF,
+            kHaierAcYrw02MaxTempF,
             kHaierAcYrw02Auto,
             kHaierAcYrw02Cool,
             kHaierAcYrw02Heat,
@@ -555,6 +747,7 @@ class ProtocolRegistry:
                 manufacturer="Haier",
                 ac_class=IRHaierAC,
                 send_function=sendHaierAC,
+                frame_layout=kHaierAcLayout,
                 state_length=9,
                 min_temp=kHaierAcMinTemp,
                 max_temp=kHaierAcMaxTemp,
@@ -582,6 +775,7 @@ class ProtocolRegistry:
                 manufacturer="Haier",
                 ac_class=IRHaierAC176,
                 send_function=sendHaierAC176,
+                frame_layout=kHaierAcLayout,
                 state_length=kHaierAC176StateLength,
                 min_temp=kHaierAcYrw02MinTempC,
                 max_temp=kHaierAcYrw02MaxTempC,
@@ -598,6 +792,8 @@ class ProtocolRegistry:
                     FanConfig(kHaierAcYrw02FanMed, "med", "Medium fan"),
                     FanConfig(kHaierAcYrw02FanHigh, "high", "High fan"),
                 ],
+                min_temp_f=kHaierAcYrw02MinTempF,
+                max_temp_f=kHaierAcYrw02MaxTempF,
             )
         )
 
@@ -649,6 +845,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.corona import (
             IRCoronaAc,
             sendCoronaAc,
+            kCoronaAcLayout,
             kCoronaAcMinTemp,
             kCoronaAcMaxTemp,
             kCoronaAcModeCool,
@@ -669,6 +866,7 @@ class ProtocolRegistry:
                 manufacturer="Corona",
                 ac_class=IRCoronaAc,
                 send_function=sendCoronaAc,
+                frame_layout=kCoronaAcLayout,
                 state_length=8,
                 min_temp=kCoronaAcMinTemp,
                 max_temp=kCoronaAcMaxTemp,
@@ -684,6 +882,7 @@ class ProtocolRegistry:
                     FanConfig(kCoronaAcFanMedium, "med", "Medium fan"),
                     FanConfig(kCoronaAcFanHigh, "high", "High fan"),
                 ],
+                features=[FeatureConfig("setEcono", "econo", "Econo")],
             )
         )
 
@@ -691,6 +890,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.argo import (
             IRArgoAC,
             sendArgo,
+            kArgoLayout,
             kArgoMinTemp,
             kArgoMaxTemp,
             kArgoStateLength,
@@ -713,6 +913,7 @@ class ProtocolRegistry:
                 manufacturer="Argo",
                 ac_class=IRArgoAC,
                 send_function=sendArgo,
+                frame_layout=kArgoLayout,
                 state_length=kArgoStateLength,
                 min_temp=kArgoMinTemp,
                 max_temp=kArgoMaxTemp,
@@ -777,6 +978,11 @@ class ProtocolRegistry:
                     FanConfig(kAirtonFanHigh, "high", "High fan"),
                     FanConfig(kAirtonFanMax, "max", "Max fan"),
                 ],
+                features=[
+                    FeatureConfig("setTurbo", "turbo", "Turbo"),
+                    FeatureConfig("setEcono", "econo", "Econo", modes=["cool"]),
+                ],
+                temp_overrides={"auto": kAirtonMaxTemp},  # setTemp() locks Auto to the max
             )
         )
 
@@ -828,6 +1034,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.amcor import (
             IRAmcorAc,
             sendAmcor,
+            kAmcorLayout,
             kAmcorMinTemp,
             kAmcorMaxTemp,
             kAmcorStateLength,
@@ -850,6 +1057,7 @@ class ProtocolRegistry:
                 manufacturer="Amcor",
                 ac_class=IRAmcorAc,
                 send_function=sendAmcor,
+                frame_layout=kAmcorLayout,
                 state_length=kAmcorStateLength,
                 min_temp=kAmcorMinTemp,
                 max_temp=kAmcorMaxTemp,
@@ -873,6 +1081,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.electra import (
             IRElectraAc,
             sendElectraAC,
+            kElectraAcLayout,
             kElectraAcMinTemp,
             kElectraAcMaxTemp,
             kElectraAcStateLength,
@@ -895,6 +1104,7 @@ class ProtocolRegistry:
                 manufacturer="Electra",
                 ac_class=IRElectraAc,
                 send_function=sendElectraAC,
+                frame_layout=kElectraAcLayout,
                 state_length=kElectraAcStateLength,
                 min_temp=kElectraAcMinTemp,
                 max_temp=kElectraAcMaxTemp,
@@ -911,6 +1121,10 @@ class ProtocolRegistry:
                     FanConfig(kElectraAcFanMed, "med", "Medium fan"),
                     FanConfig(kElectraAcFanHigh, "high", "High fan"),
                 ],
+                features=[
+                    FeatureConfig("setTurbo", "turbo", "Turbo"),
+                    FeatureConfig("setQuiet", "quiet", "Quiet"),
+                ],
             )
         )
 
@@ -920,6 +1134,7 @@ class ProtocolRegistry:
             sendKelvinator,
             kKelvinatorMinTemp,
             kKelvinatorMaxTemp,
+            kKelvinatorAutoTemp,
             kKelvinatorStateLength,
             kKelvinatorAuto,
             kKelvinatorCool,
@@ -954,6 +1169,11 @@ class ProtocolRegistry:
                     FanConfig(kKelvinatorFanMin, "min", "Min fan"),
                     FanConfig(kKelvinatorFanMax, "max", "Max fan"),
                 ],
+                features=[
+                    FeatureConfig("setTurbo", "turbo", "Turbo"),
+                    FeatureConfig("setQuiet", "quiet", "Quiet"),
+                ],
+                temp_overrides={"auto": kKelvinatorAutoTemp, "dry": kKelvinatorAutoTemp},
             )
         )
 
@@ -1005,6 +1225,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.mirage import (
             IRMirageAc,
             sendMirage,
+            kMirageLayout,
             kMirageAcMinTemp,
             kMirageAcMaxTemp,
             kMirageStateLength,
@@ -1026,6 +1247,7 @@ class ProtocolRegistry:
                 manufacturer="Mirage",
                 ac_class=IRMirageAc,
                 send_function=sendMirage,
+                frame_layout=kMirageLayout,
                 state_length=kMirageStateLength,
                 min_temp=kMirageAcMinTemp,
                 max_temp=kMirageAcMaxTemp,
@@ -1041,6 +1263,7 @@ class ProtocolRegistry:
                     FanConfig(kMirageAcFanMed, "med", "Medium fan"),
                     FanConfig(kMirageAcFanHigh, "high", "High fan"),
                 ],
+                features=[FeatureConfig("setTurbo", "turbo", "Turbo", modes=["cool"])],
             )
         )
 
@@ -1048,6 +1271,7 @@ class ProtocolRegistry:
         from app.core.ir_protocols.neoclima import (
             IRNeoclimaAc,
             sendNeoclima,
+            kNeoclimaLayout,
             kNeoclimaMinTempC,
             kNeoclimaMaxTempC,
             kNeoclimaStateLength,
@@ -1070,6 +1294,7 @@ class ProtocolRegistry:
                 manufacturer="Neoclima",
                 ac_class=IRNeoclimaAc,
                 send_function=sendNeoclima,
+                frame_layout=kNeoclimaLayout,
                 state_length=kNeoclimaStateLength,
                 min_temp=kNeoclimaMinTempC,
                 max_temp=kNeoclimaMaxTempC,
@@ -1086,6 +1311,7 @@ class ProtocolRegistry:
                     FanConfig(kNeoclimaFanMed, "med", "Medium fan"),
                     FanConfig(kNeoclimaFanHigh, "high", "High fan"),
                 ],
+                mode_fans={"dry": ["low"]},
             )
         )
 
@@ -1170,6 +1396,7 @@ class ProtocolRegistry:
                     FanConfig(kTrumaFanMed, "med", "Medium fan"),
                     FanConfig(kTrumaFanHigh, "high", "High fan"),
                 ],
+                features=[FeatureConfig("setQuiet", "quiet", "Quiet", modes=["cool"])],
             )
         )
 
@@ -1214,6 +1441,7 @@ class ProtocolRegistry:
                     FanConfig(kVestelAcFanMed, "med", "Medium fan"),
                     FanConfig(kVestelAcFanHigh, "high", "High fan"),
                 ],
+                features=[FeatureConfig("setTurbo", "turbo", "Turbo")],
             )
         )
 
@@ -1312,7 +1540,9 @@ class ProtocolRegistry:
             IRDaikin,
             IRDaikin216,
             sendDaikin,
+            kDaikinLayout,
             sendDaikin216,
+            kDaikin216Layout,
             kDaikinStateLength,
             kDaikin216StateLength,
             kDaikinMinTemp,
@@ -1337,6 +1567,7 @@ class ProtocolRegistry:
                 manufacturer="Daikin",
                 ac_class=IRDaikin,
                 send_function=sendDaikin,
+                frame_layout=kDaikinLayout,
                 state_length=kDaikinStateLength,
                 min_temp=kDaikinMinTemp,
                 max_temp=kDaikinMaxTemp,
@@ -1356,6 +1587,11 @@ class ProtocolRegistry:
                     FanConfig(kDaikinFanMed + 1, "4", "Fan 4"),
                     FanConfig(kDaikinFanMax, "5", "Fan 5"),
                 ],
+                set_swing_method="setSwingVertical",
+                swings=[
+                    SwingConfig(False, "off", "Swing off"),
+                    SwingConfig(True, "on", "Vertical swing"),
+                ],
             )
         )
 
@@ -1367,6 +1603,7 @@ class ProtocolRegistry:
                 manufacturer="Daikin",
                 ac_class=IRDaikin216,
                 send_function=sendDaikin216,
+                frame_layout=kDaikin216Layout,
                 state_length=kDaikin216StateLength,
                 min_temp=kDaikinMinTemp,
                 max_temp=kDaikinMaxTemp,
@@ -1386,12 +1623,18 @@ class ProtocolRegistry:
                     FanConfig(kDaikinFanMed + 1, "4", "Fan 4"),
                     FanConfig(kDaikinFanMax, "5", "Fan 5"),
                 ],
+                set_swing_method="setSwingVertical",
+                swings=[
+                    SwingConfig(False, "off", "Swing off"),
+                    SwingConfig(True, "on", "Vertical swing"),
+                ],
+                features=[FeatureConfig("setPowerful", "powerful", "Powerful")],
             )
         )
 
     def register(self, metadata: ProtocolMetadata):
         """Register a protocol's metadata"""
-        self._protocols[metadata.protocol_type] = metadata
+        self._metadata[metadata.protocol_type] = metadata
 
     def get(self, protocol_type: decode_type_t) -> Optional[ProtocolMetadata]:
         """Get metadata for a protocol"""
@@ -1406,6 +1649,11 @@ class ProtocolRegistry:
         return [meta.protocol_name for meta in self._protocols.values()]
 
 
+def _state_bytes(raw) -> Optional[bytes]:
+    """A generated state as bytes; None for protocols whose state is an integer"""
+    return None if isinstance(raw, int) else bytes(raw)
+
+
 @dataclass
 class CommandInfo:
     """Information about a generated command"""
@@ -1413,13 +1661,21 @@ class CommandInfo:
     name: str
     description: str
     tuya_code: str
+    state: Optional[bytes] = None  # State bytes the code was generated from
 
 
 class CommandGenerator:
     """Generic command generator for all protocols"""
 
-    def __init__(self):
+    def __init__(self, cache=None):
+        """
+        Args:
+            cache: Optional CommandCache (see command_cache.py) holding prebuilt
+                command sets. Protocols found in it are served from the shared
+                mapping instead of being regenerated.
+        """
         self.registry = ProtocolRegistry()
+        self.cache = cache
 
     def generate_commands(
         self, protocol_type: decode_type_t, state_bytes: List[int]
@@ -1437,6 +1693,14 @@ class CommandGenerator:
         Raises:
             ValueError: If protocol is not supported for full command generation
         """
+        # Command sets don't depend on the captured state, so a prebuilt set
+        # for this protocol can be served as-is. Protocols are registered
+        # under their decode_type_t name.
+        if self.cache is not None:
+            cached = self.cache.commands(decode_type_t(protocol_type).name)
+            if cached is not None:
+                return cached
+
         metadata = self.registry.get(protocol_type)
 
         if not metadata:
@@ -1444,7 +1708,7 @@ class CommandGenerator:
                 f"Protocol {decode_type_t(protocol_type).name} does not have full command generation support"
             )
 
-        commands = []
+        states = []  # (name, description, raw state) of each command
 
         # Generate all combinations of temp + mode + fan
         for temp in range(metadata.min_temp, metadata.max_temp + 1):
@@ -1453,13 +1717,8 @@ class CommandGenerator:
                     # Create AC instance
                     ac = metadata.ac_class()
 
-                    # Set temperature
-                    set_temp = getattr(ac, metadata.set_temp_method)
-                    set_temp(temp)
-
-                    # Set mode
-                    set_mode = getattr(ac, metadata.set_mode_method)
-                    set_mode(mode.value)
+                    # Set temperature and mode
+                    set_temp_and_mode(metadata, ac, mode, temp)
 
                     # Set fan speed
                     set_fan = getattr(ac, metadata.set_fan_method)
@@ -1473,19 +1732,11 @@ class CommandGenerator:
                     get_raw = getattr(ac, metadata.get_raw_method)
                     new_bytes = get_raw()
 
-                    # Generate timings and prepare for Tuya encoding
-                    signal = metadata.send_function(new_bytes, len(new_bytes))
-                    signal = _prepare_timings_for_tuya(signal)
-
-                    # Encode to Tuya format
-                    tuya_code = encode_ir(signal)
-
-                    # Create command
-                    commands.append(
-                        CommandInfo(
-                            name=f"{temp}_{mode.name}_{fan.name}",
-                            description=f"{temp}°C, {mode.description}, {fan.description}",
-                            tuya_code=tuya_code,
+                    states.append(
+                        (
+                            f"{temp}_{mode.name}_{fan.name}",
+                            f"{temp}°C, {mode.description}, {fan.description}",
+                            new_bytes,
                         )
                     )
 
@@ -1518,20 +1769,20 @@ class CommandGenerator:
             get_raw = getattr(ac, metadata.get_raw_method)
             new_bytes = get_raw()
 
-            signal = metadata.send_function(new_bytes, len(new_bytes))
-            signal = _prepare_timings_for_tuya(signal)
-            tuya_code = encode_ir(signal)
-
             power_name = "on" if power_state else "off"
-            commands.append(
-                CommandInfo(
-                    name=f"power_{power_name}",
-                    description=f"Turn power {power_name}",
-                    tuya_code=tuya_code,
-                )
+            states.append((f"power_{power_name}", f"Turn power {power_name}", new_bytes))
+
+        # Generate timings and encode to Tuya format, all states at once
+        tuya_codes = encode_states(metadata, [raw for _, _, raw in states])
+        return [
+            CommandInfo(
+                name=name,
+                description=description,
+                tuya_code=tuya_code,
+                state=_state_bytes(raw),
             )
-
-        return commands
+            for (name, description, raw), tuya_code in zip(states, tuya_codes)
+        ]
 
     def get_protocol_info(self, protocol_type: decode_type_t) -> Dict[str, Any]:
         """
@@ -1547,6 +1798,11 @@ class CommandGenerator:
             For protocols with full command generation support, returns complete metadata.
             For other protocols, returns basic information based on protocol type.
         """
+        if self.cache is not None:
+            info = self.cache.info(decode_type_t(protocol_type).name)
+            if info is not None:
+                return info
+
         metadata = self.registry.get(protocol_type)
 
         # If we have full metadata, return it
@@ -1666,11 +1922,14 @@ class CommandGenerator:
 
     def is_supported(self, protocol_type: decode_type_t) -> bool:
         """Check if protocol has full command generation support"""
+        if self.cache is not None and decode_type_t(protocol_type).name in self.cache:
+            return True
         return self.registry.is_supported(protocol_type)
 
 
-# Global instance
-_generator = CommandGenerator()
+# Global instance, backed by the shared command-set artifact when one has been
+# built for the current sources.
+_generator = CommandGenerator(cache=load_command_cache())
 
 
 def generate_commands(protocol_type: decode_type_t, state_bytes: List[int]) -> List[CommandInfo]:
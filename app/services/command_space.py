@@ -0,0 +1,480 @@
+"""
+Command Space Service
+
+generate_commands() builds every temperature x mode x fan command of a
+protocol up front. That's a few hundred commands, but swing positions, on/off
+features (turbo, econo, quiet, ...) and Fahrenheit temperatures multiply it
+into the thousands, most of which a client never asks for. A command space
+describes all of them without building any:
+
+- Commands are numbered mode by mode (Celsius before Fahrenheit), and within
+  each such block in mixed radix over temperature, fan, swing and feature
+  combination, so a command's index and its settings convert into each other
+  arithmetically (rank/unrank). The last two indexes are power_on and
+  power_off, built exactly as generate_commands() builds them.
+- A filtered listing (e.g. mode=cool) fixes some of the digits; a page of it is
+  found by skipping whole blocks and unranking the offset over the free digits.
+- Codes are only encoded for the commands actually returned, with the
+  temperature and mode set as generate_commands() sets them, so a command
+  both list is the same code.
+
+The protocol metadata shapes the blocks: modes that lock the temperature
+(fan_temp_override, temp_overrides) have a single one, modes that limit the fan
+(mode_fans) only their fans, features
+only exist in the modes they work in (FeatureConfig.modes), and features that
+cancel each other (FeatureConfig.excludes) are never combined. That way the
+space doesn't list the same state under several names, as far as the metadata
+knows the unit.
+
+Names extend generate_commands()' names: "24_cool_auto" is the same command in
+both, "75F_cool_auto_swing-off_turbo" adds a Fahrenheit temperature, a swing
+position other than the unit's default and a feature.
+"""
+
+import bisect
+import itertools
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.ir_protocols import decode_type_t
+from app.services.command_generator import (
+    CommandInfo,
+    ModeConfig,
+    ProtocolMetadata,
+    SwingConfig,
+    _generator,
+    _state_bytes,
+    encode_state,
+    set_temp_and_mode,
+)
+
+
+@dataclass(frozen=True)
+class CommandSettings:
+    """The settings one command of a command space transmits"""
+
+    power: bool
+    mode: Optional[str] = None  # None for the power_on/power_off commands
+    temperature: Optional[int] = None
+    fahrenheit: bool = False
+    fan: Optional[str] = None
+    swing: Optional[str] = None  # None leaves the unit's default swing
+    features: Tuple[str, ...] = ()  # Features switched on, in metadata order
+
+
+@dataclass
+class _Block:
+    """Commands sharing a mode and temperature unit, numbered in mixed radix"""
+
+    offset: int  # Index of the block's first command
+    mode: Optional[ModeConfig]  # None for the power commands
+    fahrenheit: bool
+    temps: range
+    fans: Sequence[int]  # Indexes into metadata.fans
+    combos: List[Tuple[str, ...]]  # Feature combinations allowed in the mode
+    radices: Tuple[int, ...]  # Temperature, fan, swing, feature combination
+    size: int
+
+
+def _rank(digits: Iterable[int], radices: Iterable[int]) -> int:
+    index = 0
+    for digit, radix in zip(digits, radices):
+        index = index * radix + digit
+    return index
+
+
+def _unrank(index: int, radices: Sequence[int]) -> List[int]:
+    digits = [0] * len(radices)
+    for i in range(len(radices) - 1, -1, -1):
+        index, digits[i] = divmod(index, radices[i])
+    return digits
+
+
+def _product(values: Iterable[int]) -> int:
+    size = 1
+    for value in values:
+        size *= value
+    return size
+
+
+def _feature_combos(metadata: ProtocolMetadata, mode: str) -> List[Tuple[str, ...]]:
+    """Feature combinations usable in a mode; the first one has every feature off."""
+    usable = [f for f in metadata.features if f.modes is None or mode in f.modes]
+    combos = []
+    for flags in itertools.product((False, True), repeat=len(usable)):
+        on = [f for f, flag in zip(usable, flags) if flag]
+        names = tuple(f.name for f in on)
+        if not any(other in names for f in on for other in f.excludes):
+            combos.append(names)
+    return combos
+
+
+def _index_of(options, name: Optional[str], kind: str, protocol_name: str) -> int:
+    for i, option in enumerate(options):
+        if option.name == name:
+            return i
+    names = ", ".join(o.name for o in options) or "none"
+    raise ValueError(f"Unknown {kind} '{name}' for {protocol_name} (available: {names})")
+
+
+class CommandSpace:
+    """Every command of a protocol, addressable by index or name"""
+
+    def __init__(self, metadata: ProtocolMetadata):
+        self.metadata = metadata
+
+        # Names leave out the swing position a fresh AC object starts with, so
+        # "24_cool_auto" is the command generate_commands() sends. When that
+        # position isn't one of the protocol's swings, it gets a digit of its own
+        # (None: the swing setter isn't called).
+        self._swings: List[Optional[SwingConfig]] = list(metadata.swings)
+        self._default_swing = 0
+        if metadata.swings:
+            getter = getattr(metadata.ac_class(), "g" + metadata.set_swing_method[1:], None)
+            value = getter() if getter is not None else None
+            values = [swing.value for swing in metadata.swings]
+            if value in values:
+                self._default_swing = values.index(value)
+            else:
+                self._swings.insert(0, None)
+
+        self._temp_overrides = dict(metadata.temp_overrides)
+        if metadata.fan_temp_override is not None:
+            self._temp_overrides.setdefault("fan", metadata.fan_temp_override)
+        units = [False] if metadata.min_temp_f is None else [False, True]
+
+        self._blocks: List[_Block] = []
+        self._by_mode: Dict[Tuple[str, bool], _Block] = {}
+        offset = 0
+        for mode in metadata.modes:
+            fans: Sequence[int] = range(len(metadata.fans))
+            if mode.name in metadata.mode_fans:
+                fans = [
+                    _index_of(metadata.fans, fan, "fan", metadata.protocol_name)
+                    for fan in metadata.mode_fans[mode.name]
+                ]
+            combos = _feature_combos(metadata, mode.name)
+            # A mode locking the temperature sends it in Celsius only.
+            locked = mode.name in self._temp_overrides
+            for fahrenheit in [False] if locked else units:
+                if locked:
+                    temp = self._temp_overrides[mode.name]
+                    temps = range(temp, temp + 1)
+                elif fahrenheit:
+                    temps = range(metadata.min_temp_f, metadata.max_temp_f + 1)
+                else:
+                    temps = range(metadata.min_temp, metadata.max_temp + 1)
+                radices = (len(temps), len(fans), max(len(self._swings), 1), len(combos))
+                size = _product(radices)
+                block = _Block(offset, mode, fahrenheit, temps, fans, combos, radices, size)
+                self._blocks.append(block)
+                self._by_mode[mode.name, fahrenheit] = block
+                offset += size
+        self._power = _Block(offset, None, False, range(0), [], [()], (2,), 2)
+        self._blocks.append(self._power)
+        self._offsets = [block.offset for block in self._blocks]
+        self._size = offset + self._power.size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _block(self, index: int) -> _Block:
+        if not 0 <= index < self._size:
+            raise IndexError(
+                f"Command {index} out of range for {self.metadata.protocol_name} "
+                f"(0-{self._size - 1})"
+            )
+        return self._blocks[bisect.bisect_right(self._offsets, index) - 1]
+
+    def _swing_digit(self, swing: Optional[str]) -> int:
+        if swing is None:
+            return self._default_swing
+        if not self.metadata.swings:
+            raise ValueError(f"{self.metadata.protocol_name} has no swing settings")
+        i = _index_of(self.metadata.swings, swing, "swing", self.metadata.protocol_name)
+        return i + len(self._swings) - len(self.metadata.swings)
+
+    def settings(self, index: int) -> CommandSettings:
+        """
+        The settings of the command at an index (unrank).
+
+        Raises:
+            IndexError: If the index is out of range
+        """
+        block = self._block(index)
+        if block.mode is None:
+            return CommandSettings(power=index == block.offset)
+        temp, fan, swing, combo = _unrank(index - block.offset, block.radices)
+        return CommandSettings(
+            power=True,
+            mode=block.mode.name,
+            temperature=block.temps[temp],
+            fahrenheit=block.fahrenheit,
+            fan=self.metadata.fans[block.fans[fan]].name,
+            swing=self._swings[swing].name if self._swings and self._swings[swing] else None,
+            features=block.combos[combo],
+        )
+
+    def index(self, settings: CommandSettings) -> int:
+        """
+        The index of the command with the given settings (rank).
+
+        Raises:
+            ValueError: If a setting is unknown, out of range or can't be
+                combined with the others for the protocol
+        """
+        meta = self.metadata
+        name = meta.protocol_name
+        if settings.mode is None:
+            return self._power.offset + (0 if settings.power else 1)
+        if not settings.power:
+            raise ValueError("Only power_off turns the unit off")
+        _index_of(meta.modes, settings.mode, "mode", name)
+        block = self._by_mode.get((settings.mode, settings.fahrenheit))
+        if block is None:
+            raise ValueError(f"{name} has no Fahrenheit temperatures in {settings.mode} mode")
+        if settings.temperature not in block.temps:
+            unit = "F" if settings.fahrenheit else "C"
+            raise ValueError(
+                f"Temperature {settings.temperature}{unit} out of range for {name} "
+                f"in {settings.mode} mode ({block.temps[0]}-{block.temps[-1]}{unit})"
+            )
+        fan = _index_of(meta.fans, settings.fan, "fan", name)
+        if fan not in block.fans:
+            names = ", ".join(meta.fans[i].name for i in block.fans)
+            raise ValueError(f"{settings.mode} mode limits the fan of {name} to {names}")
+        wanted = set(settings.features)
+        combo = next((i for i, c in enumerate(block.combos) if set(c) == wanted), None)
+        if combo is None:
+            raise ValueError(
+                f"Features {', '.join(settings.features)} can't be combined "
+                f"in {settings.mode} mode for {name}"
+            )
+        digits = (
+            settings.temperature - block.temps.start,
+            block.fans.index(fan),
+            self._swing_digit(settings.swing),
+            combo,
+        )
+        return block.offset + _rank(digits, block.radices)
+
+    def name(self, index: int) -> str:
+        """The name of the command at an index."""
+        settings = self.settings(index)
+        if settings.mode is None:
+            return "power_on" if settings.power else "power_off"
+        temp = f"{settings.temperature}F" if settings.fahrenheit else str(settings.temperature)
+        parts = [temp, settings.mode, settings.fan]
+        if self._swing_digit(settings.swing) != self._default_swing:
+            parts.append(f"swing-{settings.swing}")
+        parts.extend(settings.features)
+        return "_".join(parts)
+
+    def lookup(self, name: str) -> int:
+        """
+        The index of the command with a name.
+
+        Raises:
+            ValueError: If no command of the space has this name
+        """
+        meta = self.metadata
+        error = ValueError(f"Unknown command '{name}' for {meta.protocol_name}")
+        if name in ("power_on", "power_off"):
+            return self._power.offset + (0 if name == "power_on" else 1)
+
+        temp, _, rest = name.partition("_")
+        if not temp.rstrip("F").isdigit():
+            raise error
+        # Mode and fan names may contain "_" themselves (e.g. "heat_auto"), so
+        # try every split; the suffix parts are swings and features.
+        for mode in meta.modes:
+            if not rest.startswith(mode.name + "_"):
+                continue
+            after_mode = rest[len(mode.name) + 1 :]
+            for fan in meta.fans:
+                if after_mode != fan.name and not after_mode.startswith(fan.name + "_"):
+                    continue
+                parts = after_mode[len(fan.name) + 1 :].split("_")
+                swings = [p[len("swing-") :] for p in parts if p.startswith("swing-")]
+                settings = CommandSettings(
+                    power=True,
+                    mode=mode.name,
+                    temperature=int(temp.rstrip("F")),
+                    fahrenheit=temp.endswith("F"),
+                    fan=fan.name,
+                    swing=swings[0] if swings else None,
+                    features=tuple(p for p in parts if p and not p.startswith("swing-")),
+                )
+                try:
+                    index = self.index(settings)
+                except ValueError:
+                    continue
+                # Only the canonical spelling names a command (no default swing,
+                # features in metadata order), so every command has one name.
+                if self.name(index) == name:
+                    return index
+        raise error
+
+    def _digits(
+        self,
+        mode: Optional[str],
+        temperature: Optional[int],
+        fan: Optional[str],
+        swing: Optional[str],
+        features: Sequence[str],
+    ) -> List[Tuple[_Block, List[Sequence[int]]]]:
+        """The blocks matching a filter, with the digits it allows in each."""
+        meta = self.metadata
+        name = meta.protocol_name
+        if mode is not None:
+            _index_of(meta.modes, mode, "mode", name)
+        fan_index = None if fan is None else _index_of(meta.fans, fan, "fan", name)
+        swings: Sequence[int] = range(max(len(self._swings), 1))
+        if swing is not None:
+            swings = [self._swing_digit(swing)]
+        for feature in features:
+            _index_of(meta.features, feature, "feature", name)
+
+        if (mode, temperature, fan, swing) == (None, None, None, None) and not features:
+            return [(block, [range(n) for n in block.radices]) for block in self._blocks]
+        matches = []
+        for block in self._blocks[:-1]:  # The power commands match no filter.
+            if mode is not None and block.mode.name != mode:
+                continue
+            temps: Sequence[int] = range(len(block.temps))
+            if temperature is not None:
+                if temperature not in block.temps:
+                    continue
+                temps = [temperature - block.temps.start]
+            fans: Sequence[int] = range(len(block.fans))
+            if fan_index is not None:
+                if fan_index not in block.fans:
+                    continue
+                fans = [block.fans.index(fan_index)]
+            combos = [i for i, c in enumerate(block.combos) if set(features) <= set(c)]
+            if combos:
+                matches.append((block, [temps, fans, swings, combos]))
+        return matches
+
+    def count(
+        self,
+        mode: Optional[str] = None,
+        temperature: Optional[int] = None,
+        fan: Optional[str] = None,
+        swing: Optional[str] = None,
+        features: Sequence[str] = (),
+    ) -> int:
+        """
+        The number of commands matching a filter; with none, len(space).
+
+        Raises:
+            ValueError: If a filter names an unknown mode, fan, swing or feature
+        """
+        matches = self._digits(mode, temperature, fan, swing, features)
+        return sum(_product(len(d) for d in digits) for _, digits in matches)
+
+    def select(
+        self,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        mode: Optional[str] = None,
+        temperature: Optional[int] = None,
+        fan: Optional[str] = None,
+        swing: Optional[str] = None,
+        features: Sequence[str] = (),
+    ) -> List[int]:
+        """
+        Indexes of a page of the commands matching a filter, in index order.
+
+        Only the page is computed: whole blocks before it are skipped by size.
+        Temperatures filter within the unit of each block (24 matches 24C,
+        75 matches 75F), features select the commands having at least those on.
+
+        Raises:
+            ValueError: If a filter names an unknown mode, fan, swing or feature
+        """
+        limit = self._size if limit is None else limit
+        indexes: List[int] = []
+        for block, digits in self._digits(mode, temperature, fan, swing, features):
+            radices = [len(d) for d in digits]
+            size = _product(radices)
+            if offset >= size:
+                offset -= size
+                continue
+            for local in range(offset, min(size, offset + limit - len(indexes))):
+                picked = [d[i] for d, i in zip(digits, _unrank(local, radices))]
+                indexes.append(block.offset + _rank(picked, block.radices))
+            offset = 0
+            if len(indexes) >= limit:
+                break
+        return indexes
+
+    def command(self, index: int) -> CommandInfo:
+        """
+        Encode the command at an index.
+
+        Raises:
+            IndexError: If the index is out of range
+        """
+        meta = self.metadata
+        settings = self.settings(index)
+        ac = meta.ac_class()
+        if settings.mode is None:
+            # The same default state generate_commands() sends power commands with.
+            getattr(ac, meta.set_mode_method)(meta.modes[0].value)
+            getattr(ac, meta.set_temp_method)((meta.min_temp + meta.max_temp) // 2)
+            getattr(ac, meta.set_fan_method)(meta.fans[0].value)
+            description = f"Turn power {'on' if settings.power else 'off'}"
+        else:
+            mode = meta.modes[_index_of(meta.modes, settings.mode, "mode", meta.protocol_name)]
+            fan = meta.fans[_index_of(meta.fans, settings.fan, "fan", meta.protocol_name)]
+            unit = "°F" if settings.fahrenheit else "°C"
+            described = [f"{settings.temperature}{unit}", mode.description, fan.description]
+
+            # As generate_commands() sets them, so its commands are the same codes here.
+            temp = (settings.temperature, True) if settings.fahrenheit else (settings.temperature,)
+            set_temp_and_mode(meta, ac, mode, *temp)
+            getattr(ac, meta.set_fan_method)(fan.value)
+            digit = self._swing_digit(settings.swing)
+            swing = self._swings[digit] if self._swings else None
+            if swing is not None:
+                getattr(ac, meta.set_swing_method)(swing.value)
+                if digit != self._default_swing:
+                    described.append(swing.description)
+            for feature in meta.features:
+                if feature.name in settings.features:
+                    getattr(ac, feature.method)(True)
+                    described.append(feature.description)
+            description = ", ".join(described)
+        getattr(ac, meta.set_power_method)(settings.power)
+
+        raw = getattr(ac, meta.get_raw_method)()
+        return CommandInfo(
+            name=self.name(index),
+            description=description,
+            tuya_code=encode_state(meta, raw),
+            state=_state_bytes(raw),
+        )
+
+
+# Spaces by protocol, built on first use
+_spaces: Dict[decode_type_t, CommandSpace] = {}
+
+
+def get_command_space(protocol_type: decode_type_t) -> CommandSpace:
+    """
+    The command space of a protocol.
+
+    Raises:
+        ValueError: If the protocol is not supported for full command generation
+    """
+    space = _spaces.get(protocol_type)
+    if space is None:
+        metadata = _generator.registry.get(protocol_type)
+        if metadata is None:
+            raise ValueError(
+                f"Protocol {decode_type_t(protocol_type).name} does not have full "
+                "command generation support"
+            )
+        space = _spaces[protocol_type] = CommandSpace(metadata)
+    return space
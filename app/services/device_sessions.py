@@ -0,0 +1,290 @@
+"""
+Device Session Service
+
+A real remote always transmits its full state, so changing only the fan speed
+means re-sending the current temperature and mode as well. Instead of
+regenerating (or looking up) a whole command set for every change, a device
+session keeps the AC object seeded from an identified code and applies deltas
+to it, encoding just the one resulting command.
+
+Sessions live in a bounded in-memory LRU. Every change is written through to a
+local SQLite database, so sessions evicted from memory (or lost on restart)
+are rebuilt from their stored state bytes on the next access. If the database
+can't be opened the store keeps working in memory only.
+"""
+
+import inspect
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.decode_budget import DecodeBudget
+from app.core.ir_protocols import decode, decode_results, decode_type_t
+from app.core.tuya_encoder import decode_ir
+from app.services.command_generator import (
+    ProtocolMetadata,
+    _generator,
+    encode_state,
+    set_temp_and_mode,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    protocol INTEGER NOT NULL,
+    state BLOB NOT NULL,
+    updated REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class DeviceSession:
+    """A device's protocol and the AC object holding its current state"""
+
+    device_id: str
+    metadata: ProtocolMetadata
+    ac: Any  # Instance of metadata.ac_class
+
+    def raw_state(self) -> List[int]:
+        return list(getattr(self.ac, self.metadata.get_raw_method)())
+
+    def current_state(self) -> Dict[str, Any]:
+        """Best-effort readback of the settings the session can change."""
+        meta = self.metadata
+        state: Dict[str, Any] = {}
+        fields = [
+            ("power", meta.set_power_method, None),
+            ("temperature", meta.set_temp_method, None),
+            ("mode", meta.set_mode_method, meta.modes),
+            ("fan", meta.set_fan_method, meta.fans),
+            ("swing", meta.set_swing_method, meta.swings),
+        ]
+        for key, setter, options in fields:
+            if key == "swing" and not options:
+                continue
+            getter = getattr(self.ac, "g" + setter[1:], None)
+            if getter is None:
+                continue
+            try:
+                value = getter()
+            except Exception:  # Partial bindings; leave the field out.
+                continue
+            if options is not None:
+                value = next((o.name for o in options if o.value == value), value)
+            state[key] = value
+        return state
+
+
+def _set_raw(metadata: ProtocolMetadata, ac: Any, state: List[int]) -> None:
+    set_raw = getattr(ac, metadata.set_raw_method)
+    params = [
+        p
+        for p in inspect.signature(set_raw).parameters.values()
+        if p.default is inspect.Parameter.empty
+    ]
+    # Some bindings (e.g. Fujitsu) need the length, others default it.
+    if len(params) >= 2:
+        set_raw(state, len(state))
+    else:
+        set_raw(state)
+
+
+def _lookup(options, name: Optional[str], kind: str, protocol_name: str):
+    for option in options:
+        if option.name == name:
+            return option
+    names = ", ".join(o.name for o in options) or "none"
+    raise ValueError(f"Unknown {kind} '{name}' for {protocol_name} (available: {names})")
+
+
+class DeviceSessionStore:
+    """Bounded LRU of device sessions with SQLite write-through"""
+
+    def __init__(self, capacity: int = 1024, db_path: Optional[Path] = None):
+        """
+        Args:
+            capacity: Maximum number of sessions kept in memory
+            db_path: SQLite database path; None keeps sessions in memory only
+        """
+        self.capacity = capacity
+        self._sessions: "OrderedDict[str, DeviceSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+                self._db.execute(_SCHEMA)
+                self._db.commit()
+            except (OSError, sqlite3.Error):
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _remember(self, session: DeviceSession) -> None:
+        self._sessions[session.device_id] = session
+        self._sessions.move_to_end(session.device_id)
+        while len(self._sessions) > self.capacity:
+            self._sessions.popitem(last=False)
+
+    def _persist(self, session: DeviceSession) -> None:
+        if self._db is None:
+            return
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions (id, protocol, state, updated) VALUES (?, ?, ?, ?)",
+            (
+                session.device_id,
+                int(session.metadata.protocol_type),
+                bytes(session.raw_state()),
+                time.time(),
+            ),
+        )
+        self._db.commit()
+
+    def _restore(self, device_id: str) -> Optional[DeviceSession]:
+        if self._db is None:
+            return None
+        row = self._db.execute(
+            "SELECT protocol, state FROM sessions WHERE id = ?", (device_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        metadata = _generator.registry.get(decode_type_t(row[0]))
+        if metadata is None:
+            return None
+        ac = metadata.ac_class()
+        _set_raw(metadata, ac, list(row[1]))
+        return DeviceSession(device_id, metadata, ac)
+
+    def create(self, tuya_code: str, budget: Optional[DecodeBudget] = None) -> DeviceSession:
+        """
+        Seed a session from an identified Tuya code, decoded within budget if
+        given (see decode_budget.py).
+
+        Raises:
+            ValueError: If the code can't be decoded or is over budget, or the
+                protocol has no command generation support
+        """
+        results = decode_results()
+        results.rawbuf = decode_ir(tuya_code, budget)
+        results.rawlen = len(results.rawbuf)
+        if not decode(results, budget=budget):
+            raise ValueError("IR code not recognized by any supported protocol")
+
+        metadata = _generator.registry.get(results.decode_type)
+        if metadata is None or not metadata.supports_raw_init:
+            name = decode_type_t(results.decode_type).name
+            raise ValueError(f"Protocol {name} does not support device sessions")
+
+        ac = metadata.ac_class()
+        _set_raw(metadata, ac, list(results.state[: results.bits // 8]))
+        session = DeviceSession(uuid.uuid4().hex, metadata, ac)
+        with self._lock:
+            self._remember(session)
+            self._persist(session)
+        return session
+
+    def get(self, device_id: str) -> DeviceSession:
+        """
+        Raises:
+            KeyError: If no session with this id exists
+        """
+        with self._lock:
+            session = self._sessions.get(device_id)
+            if session is None:
+                session = self._restore(device_id)
+                if session is None:
+                    raise KeyError(device_id)
+                self._remember(session)
+            else:
+                self._sessions.move_to_end(device_id)
+            return session
+
+    def apply(
+        self,
+        device_id: str,
+        temperature: Optional[int] = None,
+        mode: Optional[str] = None,
+        fan: Optional[str] = None,
+        swing: Optional[str] = None,
+        power: Optional[bool] = None,
+    ) -> str:
+        """
+        Apply a delta to a session and encode the resulting full-state command.
+
+        Returns:
+            Tuya-encoded IR code for the new state
+
+        Raises:
+            KeyError: If no session with this id exists
+            ValueError: If a setting is out of range or unknown for the protocol
+        """
+        session = self.get(device_id)
+        meta = session.metadata
+        name = meta.protocol_name
+
+        # Resolve everything before touching the AC object so a bad delta
+        # leaves the session unchanged.
+        updates = []
+        temp_and_mode = None
+        if temperature is not None:
+            if not meta.min_temp <= temperature <= meta.max_temp:
+                raise ValueError(
+                    f"Temperature {temperature} out of range for {name} "
+                    f"({meta.min_temp}-{meta.max_temp})"
+                )
+            if mode is None:
+                updates.append((meta.set_temp_method, temperature))
+        if mode is not None:
+            option = _lookup(meta.modes, mode, "mode", name)
+            if temperature is None:
+                updates.append((meta.set_mode_method, option.value))
+            else:
+                # Set together, as generated commands are: a temperature set
+                # first would get the current mode's lock (e.g. Gree's Auto).
+                temp_and_mode = option
+        if fan is not None:
+            updates.append((meta.set_fan_method, _lookup(meta.fans, fan, "fan", name).value))
+        if swing is not None:
+            updates.append(
+                (meta.set_swing_method, _lookup(meta.swings, swing, "swing", name).value)
+            )
+        if power is not None:
+            updates.append((meta.set_power_method, power))
+
+        with self._lock:
+            if temp_and_mode is not None:
+                set_temp_and_mode(meta, session.ac, temp_and_mode, temperature)
+            for method, value in updates:
+                getattr(session.ac, method)(value)
+            tuya_code = encode_state(meta, getattr(session.ac, meta.get_raw_method)())
+            self._persist(session)
+        return tuya_code
+
+
+def _default_store() -> DeviceSessionStore:
+    from app.services.command_cache import PROJECT_ROOT
+    from app.settings import settings
+
+    db_path = None
+    if settings.device_session_db:
+        db_path = Path(settings.device_session_db)
+        if not db_path.is_absolute():
+            db_path = PROJECT_ROOT / db_path
+    return DeviceSessionStore(settings.device_session_capacity, db_path)
+
+
+# Global instance
+store = _default_store()
@@ -0,0 +1,149 @@
+"""
+Request Coalescing Service
+
+During a fleet rollout many devices of the same model ask for the same command
+set within seconds, and each request would otherwise regenerate it. A
+RequestCoalescer deduplicates this work in-process:
+
+- Requests are keyed on what the result actually depends on (for /api/identify
+  the decoded protocol, and the state for protocols without a full command
+  set; not the learned code's exact timings).
+- The first request for a key computes the result in the threadpool; identical
+  requests arriving meanwhile await the same in-flight task instead of
+  starting their own ("single-flight").
+- Results are then kept for a short TTL in a bounded LRU, so a burst of
+  requests right after the computation finished is served from memory.
+  Failures are shared with the waiters but never cached.
+
+Counters of cache hits, coalesced waiters and computations are exposed by
+GET /api/metrics to show how much work is being saved.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+
+class RequestCoalescer:
+    """Single-flight deduplication of identical requests, with a TTL cache"""
+
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        capacity: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._clock = clock
+        self._results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0  # Served from the TTL cache
+        self.coalesced = 0  # Waited for another request's computation
+        self.misses = 0  # Computed
+
+    def _cached(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._results.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires <= self._clock():
+                del self._results[key]
+                return False, None
+            self._results.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0 or self.capacity <= 0:
+            return
+        with self._lock:
+            self._results[key] = (self._clock() + self.ttl, value)
+            self._results.move_to_end(key)
+            while len(self._results) > self.capacity:
+                self._results.popitem(last=False)
+
+    async def run(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return compute()'s result for key, computing it at most once at a time.
+
+        compute runs in the threadpool, so the event loop keeps accepting the
+        requests that will wait for it. The result (and any exception) is
+        shared by every request for key that arrives before it finishes.
+        """
+        found, value = self._cached(key)
+        if found:
+            return value
+
+        # Only the event loop touches _inflight, so no lock is needed here.
+        task = self._inflight.get(key)
+        if task is not None:
+            with self._lock:
+                self.coalesced += 1
+            # Shielded, so a waiter going away doesn't cancel everyone's work.
+            return await asyncio.shield(task)
+
+        with self._lock:
+            self.misses += 1
+        task = asyncio.ensure_future(run_in_threadpool(compute))
+        self._inflight[key] = task
+        task.add_done_callback(partial(self._finish, key))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        # Runs even if the request that started the computation went away.
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result())
+
+    def clear(self) -> None:
+        """Forget the cached results (in-flight computations carry on)."""
+        with self._lock:
+            self._results.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = self.hits + self.coalesced + self.misses
+            return {
+                "requests": requests,
+                "hits": self.hits,
+                "coalesced": self.coalesced,
+                "computed": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "coalesce_rate": self.coalesced / requests if requests else 0.0,
+                "cached": len(self._results),
+                "in_flight": len(self._inflight),
+            }
+
+
+_coalescers: Dict[str, RequestCoalescer] = {}
+_coalescers_lock = threading.Lock()
+
+
+def get_coalescer(name: str) -> RequestCoalescer:
+    """The coalescer of one kind of request (e.g. "identify"), created on first use."""
+    with _coalescers_lock:
+        coalescer = _coalescers.get(name)
+        if coalescer is None:
+            from app.settings import settings
+
+            coalescer = RequestCoalescer(
+                settings.request_coalescing_ttl, settings.request_coalescing_capacity
+            )
+            _coalescers[name] = coalescer
+        return coalescer
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics of every coalescer, by name."""
+    with _coalescers_lock:
+        coalescers = sorted(_coalescers.items())
+    return {name: coalescer.metrics() for name, coalescer in coalescers}
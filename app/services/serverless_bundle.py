@@ -0,0 +1,122 @@
+"""
+Serverless Bundle
+
+A serverless instance (AWS Lambda) starts cold far more often than a
+long-running worker, and its first request waits for the whole start-up. A
+long-running worker can afford to build its state on start (see warmup.py);
+a cold start can't, so the state is built once, at deploy time, and shipped
+with the function as a bundle:
+
+    command_cache.bin     command sets and protocol info of every registered
+                          protocol (see command_cache.py)
+    code_catalog.sqlite3  the known codes catalog, seeded, opened read-only
+                          (see code_catalog.py)
+
+With the bundle, a cold start maps the artifact and opens the catalog, and
+the protocol registry, which imports every protocol module, is never built:
+requests for protocols in the artifact are served from it, and the protocol
+dispatcher only imports the modules of the codes it decodes. Anything not in
+the bundle is still generated on demand.
+
+The function's file system is read-only apart from the temporary directory,
+so device sessions and the similarity library live there, per instance.
+
+Build the bundle before deploying with:
+    python -m app.services.serverless_bundle build [--output DIR]
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.core.ir_protocols import decode_type_t
+
+COMMAND_CACHE = "command_cache.bin"
+CODE_CATALOG = "code_catalog.sqlite3"
+
+
+def default_bundle_path() -> Path:
+    """The configured bundle directory, resolved against the project root."""
+    from app.services.command_cache import PROJECT_ROOT
+    from app.settings import settings
+
+    path = Path(settings.serverless_bundle_path)
+    return path if path.is_absolute() else PROJECT_ROOT / path
+
+
+def build_bundle(
+    path: Optional[Path] = None, protocols: Optional[Iterable[decode_type_t]] = None
+) -> Dict[str, int]:
+    """
+    Build the command-set artifact and the seeded catalog into a bundle directory.
+
+    Args:
+        path: Bundle directory (defaults to settings.serverless_bundle_path)
+        protocols: Protocols to include (defaults to every registered protocol)
+
+    Returns:
+        protocol name -> number of commands in the artifact
+    """
+    from app.services.code_catalog import CodeCatalog, seed_known_codes
+    from app.services.command_cache import build_command_cache
+
+    path = Path(path) if path else default_bundle_path()
+    path.mkdir(parents=True, exist_ok=True)
+    built = build_command_cache(path / COMMAND_CACHE, protocols)
+
+    # Built afresh, so codes no longer in test_codes don't linger.
+    catalog_path = path / CODE_CATALOG
+    catalog_path.unlink(missing_ok=True)
+    catalog = CodeCatalog(catalog_path)
+    try:
+        seed_known_codes(catalog)
+    finally:
+        catalog.close()
+    return built
+
+
+def configure(path: Optional[Path] = None) -> bool:
+    """
+    Point the settings at a bundle, and the writable stores at the temporary
+    directory. Call before importing the services, which read their settings
+    when imported or first used.
+
+    Args:
+        path: Bundle directory (defaults to settings.serverless_bundle_path)
+
+    Returns:
+        Whether the bundle is complete; without it, the app still works but
+        builds what is missing on demand
+    """
+    from app.settings import settings
+
+    path = Path(path) if path else default_bundle_path()
+    tmp = Path(tempfile.gettempdir())
+    settings.command_cache_path = str(path / COMMAND_CACHE)
+    settings.code_catalog_db = str(path / CODE_CATALOG)
+    settings.code_catalog_read_only = True
+    settings.device_session_db = str(tmp / "device_sessions.sqlite3")
+    settings.similarity_index_db = str(tmp / "similarity_index.sqlite3")
+    # A function instance serves as soon as it's initialised.
+    settings.warmup = "none"
+    return (path / COMMAND_CACHE).is_file() and (path / CODE_CATALOG).is_file()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the serverless deployment bundle")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--output", type=Path, default=None, help="bundle directory")
+    args = parser.parse_args(argv)
+
+    path = args.output or default_bundle_path()
+    built = build_bundle(path)
+    total = sum(built.values())
+    print(f"Wrote {total} commands for {len(built)} protocols and the catalog to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
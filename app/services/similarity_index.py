@@ -0,0 +1,365 @@
+"""
+Similarity Index Service
+
+Support engineers are often handed a learned code from a remote that decode()
+doesn't know, and want to know which remote in our library it is closest to.
+Comparing it against every stored code doesn't scale with the library, so
+codes are indexed with MinHash signatures and banded locality-sensitive
+hashing (LSH), and a query only compares against codes that share a band.
+
+A code's features come from its decode_ir() timings. Marks and spaces are
+clustered separately (as ir_infer does), and two kinds of feature are taken:
+1. Shingles (runs of SHINGLE_SIZE consecutive symbols) of the cluster stream,
+   where each duration's symbol is its cluster's rank. Ranks don't move with
+   jitter, and a shingle spans enough bits to capture a protocol's fixed bytes
+   and frame structure.
+2. Each cluster's mean, quantized on a logarithmic scale on two grids offset by
+   half a bin, weighted TIMING_WEIGHT times. Jitter may push a mean over a bin
+   edge on one grid, but rarely on both, so it only costs a few features.
+
+The fraction of MinHash slots two signatures agree on estimates the Jaccard
+similarity of their feature sets. Signatures are split into LSH_BANDS bands;
+codes with an identical band are candidates, which are ranked by estimated
+similarity.
+
+The library is seeded from the known good codes in test_codes and grows with
+every code added. Codes and signatures are written through to a local SQLite
+database, so the index is rebuilt from stored signatures rather than
+recomputed on restart. If the database can't be opened the index keeps working
+in memory only.
+"""
+
+import math
+import sqlite3
+import threading
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.decode_budget import DecodeBudget
+from app.core.ir_protocols.ir_infer import clusterDurations, joinSplitDurations
+from app.core.tuya_encoder import decode_ir
+
+# Logarithmic quantization: durations (µs) per bin grow by this ratio...
+QUANT_RATIO = 1.3
+# ...from this base, below which everything falls in the first bin.
+QUANT_BASE_US = 100
+# Symbols per shingle.
+SHINGLE_SIZE = 12
+# Copies of each quantized cluster mean, balancing timing against structure.
+TIMING_WEIGHT = 4
+# MinHash signature length, split into LSH_BANDS bands of equal size.
+NUM_HASHES = 120
+LSH_BANDS = 24
+# Stored signatures made with other parameters are recomputed on load.
+SIGNATURE_VERSION = f"{QUANT_RATIO}:{QUANT_BASE_US}:{SHINGLE_SIZE}:{TIMING_WEIGHT}:{NUM_HASHES}"
+
+_PRIME = (1 << 61) - 1
+# h(x) = (a * x + b) mod p, fixed so that signatures stay comparable across
+# processes and restarts.
+_HASH_A = 0x1F3D5B79A2C4E68
+_HASH_B = 0x0B7E151628AED2A
+# Added per bin skipped when filling an empty bin from its neighbour.
+_DENSIFY_STEP = 0x9E3779B1
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS codes (
+        protocol TEXT NOT NULL,
+        name TEXT NOT NULL,
+        source TEXT NOT NULL,
+        tuya_code TEXT NOT NULL,
+        signature BLOB NOT NULL,
+        PRIMARY KEY (protocol, name)
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+
+@dataclass(frozen=True)
+class SimilarCode:
+    """A library code and its estimated similarity to a query"""
+
+    protocol: str  # Library protocol (or remote) name, e.g. "fujitsu"
+    name: str  # Code name, e.g. "COOL_24C"
+    source: str  # "catalog" for the known good codes, else who added it
+    similarity: float  # Estimated Jaccard similarity of the feature sets, 0-1
+
+
+def _quantize(duration: float, offset: float) -> int:
+    if duration <= QUANT_BASE_US:
+        return 0
+    return int(math.log(duration / QUANT_BASE_US) / math.log(QUANT_RATIO) + offset)
+
+
+def timing_features(timings: Sequence[int]) -> Set[int]:
+    """
+    A capture's shingles and quantized cluster means.
+
+    Every feature is packed into one integer, low bit 0 for shingles and 1 for
+    cluster means, so the set is the same in every process.
+
+    Args:
+        timings: Alternating mark/space durations in µs, e.g. from decode_ir()
+    """
+    durations = joinSplitDurations(timings)
+    symbols = [0] * len(durations)
+    features: Set[int] = set()
+    for parity in (0, 1):
+        clusters, lookup = clusterDurations(durations[parity::2])
+        for i in range(parity, len(durations), 2):
+            symbols[i] = lookup[durations[i]] << 1 | parity
+        for rank, cluster in enumerate(clusters):
+            for grid, offset in enumerate((0.0, 0.5)):
+                mean = ((rank << 1 | parity) << 8 | _quantize(cluster.mean, offset)) << 1 | grid
+                for copy in range(TIMING_WEIGHT):
+                    features.add((mean << 2 | copy) << 1 | 1)
+    for i in range(max(1, len(symbols) - SHINGLE_SIZE + 1)):
+        shingle = 1  # Sentinel, so that leading zero symbols count.
+        for symbol in symbols[i : i + SHINGLE_SIZE]:
+            shingle = shingle << 8 | (symbol & 0xFF)
+        features.add(shingle << 1)
+    return features
+
+
+def timing_signature(timings: Sequence[int]) -> array:
+    """
+    MinHash signature of a capture.
+
+    One-permutation hashing: each feature is hashed once, its low bits pick
+    one of NUM_HASHES bins and the bin keeps the smallest rest. Empty bins
+    take the value of the next bin that isn't (rotation densification), so
+    that short captures still get a full signature.
+
+    Raises:
+        ValueError: If there are no timings
+    """
+    if not timings:
+        raise ValueError("No timings to index")
+    bins = [-1] * NUM_HASHES
+    for feature in timing_features(timings):
+        h = (_HASH_A * feature + _HASH_B) % _PRIME
+        slot, value = h % NUM_HASHES, (h // NUM_HASHES) & 0xFFFFFFFF
+        if bins[slot] < 0 or value < bins[slot]:
+            bins[slot] = value
+    signature = array("I", bytes(4 * NUM_HASHES))
+    for slot in range(NUM_HASHES):
+        distance = 0
+        while bins[(slot + distance) % NUM_HASHES] < 0:
+            distance += 1
+        value = bins[(slot + distance) % NUM_HASHES] + distance * _DENSIFY_STEP
+        signature[slot] = value & 0xFFFFFFFF
+    return signature
+
+
+def code_signature(tuya_code: str, budget: Optional[DecodeBudget] = None) -> array:
+    """
+    MinHash signature of a Tuya code, decoded within budget if given.
+
+    Raises:
+        TuyaCodeError: If the code can't be decoded or is over budget
+    """
+    return timing_signature(decode_ir(tuya_code, budget))
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimated Jaccard similarity of the features behind two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+
+def _bands(signature: array) -> List[bytes]:
+    # Strided, not consecutive slots: a densified slot copies its neighbour,
+    # so neighbours in one band would make bands collide far too often.
+    return [signature[band::LSH_BANDS].tobytes() for band in range(LSH_BANDS)]
+
+
+class SimilarityIndex:
+    """MinHash/LSH index of a library of learned codes, with SQLite write-through"""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Args:
+            db_path: SQLite database path; None keeps the index in memory only
+        """
+        # (protocol, name) -> (source, signature)
+        self._codes: Dict[Tuple[str, str], Tuple[str, array]] = {}
+        # One bucket table per band: band bytes -> keys of the codes sharing it
+        self._buckets: List[Dict[bytes, Set[Tuple[str, str]]]] = [
+            {} for _ in range(LSH_BANDS)
+        ]
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            try:
+                Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+                for statement in _SCHEMA:
+                    self._db.execute(statement)
+                self._db.commit()
+                self._load()
+            except (OSError, sqlite3.Error):
+                self._db = None
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        """Whether a (protocol, name) is in the library"""
+        return (key[0].lower(), key[1]) in self._codes
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _load(self) -> None:
+        row = self._db.execute(
+            "SELECT value FROM meta WHERE key = 'signature_version'"
+        ).fetchone()
+        stale = row is None or row[0] != SIGNATURE_VERSION
+        rows = self._db.execute(
+            "SELECT protocol, name, source, tuya_code, signature FROM codes"
+        ).fetchall()
+        for protocol, name, source, tuya_code, blob in rows:
+            if stale:
+                try:
+                    signature = code_signature(tuya_code)
+                except ValueError:
+                    continue
+                self._db.execute(
+                    "UPDATE codes SET signature = ? WHERE protocol = ? AND name = ?",
+                    (signature.tobytes(), protocol, name),
+                )
+            else:
+                signature = array("I")
+                signature.frombytes(blob)
+            self._insert((protocol, name), source, signature)
+        if stale:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('signature_version', ?)",
+                (SIGNATURE_VERSION,),
+            )
+            self._db.commit()
+
+    def _insert(self, key: Tuple[str, str], source: str, signature: array) -> None:
+        old = self._codes.get(key)
+        if old is not None:
+            for buckets, band in zip(self._buckets, _bands(old[1])):
+                buckets[band].discard(key)
+        self._codes[key] = (source, signature)
+        for buckets, band in zip(self._buckets, _bands(signature)):
+            buckets.setdefault(band, set()).add(key)
+
+    def add(
+        self,
+        protocol: str,
+        name: str,
+        tuya_code: str,
+        source: str = "learned",
+        budget: Optional[DecodeBudget] = None,
+    ) -> None:
+        """
+        Add a code to the library, replacing any code of the same name.
+
+        Args:
+            protocol: Protocol or remote name (case-insensitive)
+            name: Code name, unique per protocol
+            tuya_code: Base64 encoded Tuya IR code
+            source: Where the code came from
+            budget: Decoding budget for an untrusted code (see decode_budget.py)
+
+        Raises:
+            ValueError: If the code can't be decoded or is over budget
+        """
+        signature = code_signature(tuya_code, budget)
+        key = (protocol.lower(), name)
+        with self._lock:
+            self._insert(key, source, signature)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO codes "
+                    "(protocol, name, source, tuya_code, signature) VALUES (?, ?, ?, ?, ?)",
+                    (*key, source, tuya_code, signature.tobytes()),
+                )
+                self._db.commit()
+
+    def candidates(self, signature: array) -> Set[Tuple[str, str]]:
+        """Keys of the codes sharing at least one band with a signature"""
+        found: Set[Tuple[str, str]] = set()
+        for buckets, band in zip(self._buckets, _bands(signature)):
+            found.update(buckets.get(band, ()))
+        return found
+
+    def query(
+        self, tuya_code: str, limit: int = 5, budget: Optional[DecodeBudget] = None
+    ) -> List[SimilarCode]:
+        """
+        The library codes most similar to a Tuya code.
+
+        Only codes sharing an LSH band with the query are compared, so codes
+        less than about 40% similar are often missed.
+
+        Returns:
+            Up to `limit` codes, most similar first
+
+        Raises:
+            ValueError: If the code can't be decoded or is over budget
+        """
+        signature = code_signature(tuya_code, budget)
+        with self._lock:
+            scored = [
+                (similarity(signature, self._codes[key][1]), key, self._codes[key][0])
+                for key in self.candidates(signature)
+            ]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            SimilarCode(protocol, name, source, score)
+            for score, (protocol, name), source in scored[:limit]
+        ]
+
+
+def seed_catalog(index: SimilarityIndex) -> int:
+    """
+    Add the known good codes in test_codes that the index doesn't hold yet.
+
+    Returns:
+        Number of codes added
+    """
+    from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES
+
+    added = 0
+    for protocol, codes in ALL_KNOWN_GOOD_CODES.items():
+        for name, tuya_code in codes.items():
+            if (protocol, name) in index:
+                continue
+            try:
+                index.add(protocol, name, tuya_code, source="catalog")
+            except ValueError:
+                continue
+            added += 1
+    return added
+
+
+_index: Optional[SimilarityIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """The shared index, opened and seeded from the catalog on first use"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            from app.services.command_cache import PROJECT_ROOT
+            from app.settings import settings
+
+            db_path = None
+            if settings.similarity_index_db:
+                db_path = Path(settings.similarity_index_db)
+                if not db_path.is_absolute():
+                    db_path = PROJECT_ROOT / db_path
+            index = SimilarityIndex(db_path)
+            seed_catalog(index)
+            _index = index
+    return _index
@@ -0,0 +1,226 @@
+"""
+Warm-up Service
+
+The first request after a deploy used to pay for everything done on first
+use: opening the code index, catalog and similarity library, and the first
+run through each protocol's encoder and decoder. A worker warms these up when
+it starts instead (see the lifespan in index.py), and reports itself ready on
+GET /api/ready only once done, so an orchestrator routes traffic to warm
+workers only and the first request costs what any other does.
+
+Warm-up levels, each including the ones before it:
+
+    none       Nothing; the worker is ready at once
+    imports    Import every protocol module and open the shared services
+               (code index, known codes catalog, similarity library)
+    protocols  Encode and decode one state of every registered protocol and
+               lay out its command space
+    commands   Build the command-set artifact first if it is missing or
+               stale (see command_cache.py), so command sets and the code
+               index are served from it rather than generated on demand
+
+Warm-up runs in a background thread, so the worker answers GET /api/health
+(liveness) meanwhile. A protocol failing to warm up is recorded and skipped;
+it is just left cold.
+"""
+
+import importlib
+import pkgutil
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+LEVELS = ("none", "imports", "protocols", "commands")
+
+Stage = Tuple[str, Callable[[], Any]]  # Name, and what it runs
+
+
+@dataclass
+class WarmupStatus:
+    """Progress of a worker's warm-up"""
+
+    level: str = "none"
+    stage: str = "pending"  # Stage running, or "done"
+    ready: bool = False
+    durations: Dict[str, float] = field(default_factory=dict)  # Seconds per finished stage
+    failures: List[str] = field(default_factory=list)  # "<stage>: <what>: <error>"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "level": self.level,
+            "stage": self.stage,
+            "ready": self.ready,
+            "durations": dict(self.durations),
+            "failures": list(self.failures),
+        }
+
+
+def import_protocols() -> int:
+    """Import every protocol module. Returns how many there are."""
+    from app.core import ir_protocols
+
+    names = [module.name for module in pkgutil.iter_modules(ir_protocols.__path__)]
+    for name in names:
+        importlib.import_module(f"{ir_protocols.__name__}.{name}")
+    return len(names)
+
+
+def open_services() -> None:
+    """Load the lazily created shared services."""
+    from app.services import code_catalog, code_index, similarity_index
+
+    code_index.get_code_index()
+    code_catalog.get_code_catalog()
+    similarity_index.get_similarity_index()
+
+
+def warm_protocol(protocol_type) -> None:
+    """Run one state of a protocol through its encoder, the decoders and its command space."""
+    from app.core.ir_protocols import decode, decode_results
+    from app.core.tuya_encoder import decode_ir
+    from app.services.command_generator import _generator, encode_state
+    from app.services.command_space import get_command_space
+
+    metadata = _generator.registry.get(protocol_type)
+    ac = metadata.ac_class()
+    tuya_code = encode_state(metadata, getattr(ac, metadata.get_raw_method)())
+    results = decode_results()
+    results.rawbuf = decode_ir(tuya_code)
+    results.rawlen = len(results.rawbuf)
+    decode(results)
+    get_command_space(protocol_type)
+
+
+def ensure_command_cache() -> bool:
+    """
+    Build and load the command-set artifact unless a current one is loaded.
+
+    Returns:
+        True if it had to be built
+    """
+    from app.services import code_index
+    from app.services.command_cache import build_command_cache, load_command_cache
+    from app.services.command_generator import _generator
+
+    if _generator.cache is not None:
+        return False
+    build_command_cache()
+    _generator.cache = load_command_cache()
+    code_index._index = None  # Reloaded from the artifact on next use
+    return True
+
+
+class Warmup:
+    """Runs the warm-up stages of a level and tracks their progress"""
+
+    def __init__(self, level: str = "none"):
+        if level not in LEVELS:
+            raise ValueError(f"Unknown warm-up level '{level}', expected one of {LEVELS}")
+        self.status = WarmupStatus(level=level)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _stages(self) -> List[Stage]:
+        depth = LEVELS.index(self.status.level)
+        stages: List[Stage] = []
+        if depth >= LEVELS.index("imports"):
+            stages.append(("imports", import_protocols))
+        if depth >= LEVELS.index("commands"):
+            stages.append(("commands", ensure_command_cache))
+        if depth >= LEVELS.index("imports"):
+            # After the artifact is built, so the code index loads from it.
+            stages.append(("services", open_services))
+        if depth >= LEVELS.index("protocols"):
+            stages.append(("protocols", self._warm_protocols))
+        return stages
+
+    def _warm_protocols(self) -> None:
+        from app.services.command_generator import _generator
+
+        for protocol_type, metadata in list(_generator.registry._protocols.items()):
+            try:
+                warm_protocol(protocol_type)
+            except Exception as e:  # Broken bindings only leave that protocol cold.
+                self._fail("protocols", metadata.protocol_name, e)
+
+    def _fail(self, stage: str, what: str, error: Exception) -> None:
+        with self._lock:
+            self.status.failures.append(f"{stage}: {what}: {type(error).__name__}: {error}")
+
+    def _set(self, **changes: Any) -> None:
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self.status, name, value)
+
+    def run(self) -> WarmupStatus:
+        """Run every stage in this thread, then mark the worker ready."""
+        for stage, fn in self._stages():
+            self._set(stage=stage)
+            start = time.perf_counter()
+            try:
+                fn()
+            except Exception as e:  # A failed stage leaves the worker colder, not down.
+                self._fail(stage, "stage", e)
+            with self._lock:
+                self.status.durations[stage] = time.perf_counter() - start
+        self._set(stage="done", ready=True)
+        return self.status
+
+    def start(self) -> None:
+        """Run the stages in a background thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a started warm-up to finish. Returns whether it has."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.status.ready
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return self.status.to_dict()
+
+
+# The process's warm-up, once started. Workers forked by app/server.py
+# inherit the master's finished one.
+_warmup: Optional[Warmup] = None
+
+
+def _configured(level: Optional[str]) -> str:
+    if level is None:
+        from app.settings import settings
+
+        level = settings.warmup
+    return level
+
+
+def start_warmup(level: Optional[str] = None) -> Warmup:
+    """
+    Start warming this process up at level (default settings.warmup) in the
+    background, unless it already was.
+    """
+    global _warmup
+    if _warmup is None:
+        _warmup = Warmup(_configured(level))
+        _warmup.start()
+    return _warmup
+
+
+def run_warmup(level: Optional[str] = None) -> Warmup:
+    """Warm this process up at level in the calling thread (see app/server.py)."""
+    global _warmup
+    _warmup = Warmup(_configured(level))
+    _warmup.run()
+    return _warmup
+
+
+def status() -> Dict[str, Any]:
+    """The warm-up's progress; "pending" if it was never started."""
+    if _warmup is None:
+        return WarmupStatus().to_dict()
+    return _warmup.snapshot()
+
@@ -38,6 +38,55 @@ class Settings(BaseSettings):
     # Vercel configuration
     vercel_project_id: Optional[str] = None
 
+    # Prebuilt command-set artifact shared by all workers (see
+    # app/services/command_cache.py). Relative paths are resolved against the
+    # project root. Rebuild with `make build-cache`.
+    command_cache_path: str = "build/command_cache.bin"
+
+    # Device sessions (see app/services/device_sessions.py): how many stay in
+    # memory, and the SQLite file they are written through to. An empty path
+    # keeps sessions in memory only.
+    device_session_capacity: int = 1024
+    device_session_db: str = "build/device_sessions.sqlite3"
+
+    # Library of learned codes searched by /api/similar (see
+    # app/services/similarity_index.py). An empty path keeps it in memory only.
+    similarity_index_db: str = "build/similarity_index.sqlite3"
+
+    # Catalog of known good codes by manufacturer and model (see
+    # app/services/code_catalog.py), seeded from test_codes. An empty path
+    # keeps it in memory only.
+    code_catalog_db: str = "build/code_catalog.sqlite3"
+    # Open code_catalog_db read-only and unseeded, as packaged for serverless
+    # deployments (see app/serverless.py).
+    code_catalog_read_only: bool = False
+
+    # Budgets for decoding a Tuya code from a request (see
+    # app/core/decode_budget.py): base64 characters, decompressed bytes and
+    # timings accepted, and seconds decode() may take. A code over budget is
+    # rejected with a 413 or 422; 0 lifts a limit.
+    decode_max_code_length: int = 8192
+    decode_max_payload_bytes: int = 8192
+    decode_max_timings: int = 2048
+    decode_time_limit: float = 0.25
+
+    # Identical /api/identify and /api/generate-from-manufacturer requests
+    # share one computation, and its result is kept this many seconds (see
+    # app/services/request_coalescing.py). Capacity bounds the kept results
+    # of each endpoint; a TTL of 0 only shares in-flight computations.
+    request_coalescing_ttl: float = 30.0
+    request_coalescing_capacity: int = 256
+
+    # Directory of the prebuilt artifacts a serverless function is deployed
+    # with (see app/services/serverless_bundle.py). Relative paths are
+    # resolved against the project root. Build with `make build-bundle`.
+    serverless_bundle_path: str = "build/serverless"
+
+    # How much each worker warms up before GET /api/ready reports it ready:
+    # "none", "imports", "protocols" or "commands", which also builds a
+    # missing command-set artifact (see app/services/warmup.py).
+    warmup: str = "protocols"
+
     # Hubitat integration (optional, for testing)
     hubitat: HubitatSettings = HubitatSettings()
 
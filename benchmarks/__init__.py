@@ -0,0 +1 @@
+"""Microbenchmarks. Run one with `python -m benchmarks.<name>` or all with `make bench`."""
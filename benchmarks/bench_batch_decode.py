@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark: decoding a corpus one capture at a time (decode()) vs as a batch
+(decodeBatch(), NumPy; see app/core/ir_protocols/ir_batch.py). The corpus is
+every generated command set, decoded from its Tuya codes, with and without
+decode()'s skew normalization. Then, for each protocol's frame layout alone,
+matching every capture with matchFrame() vs once with matchFrames(): the
+part of decoding the batch vectorizes. Needs NumPy.
+
+    python -m benchmarks.bench_batch_decode
+"""
+
+import time
+
+from app.core.ir_protocols import decode, decode_results
+from app.core.ir_protocols import ir_batch
+from app.core.ir_protocols.ir_batch import decodeBatch, frame_batch_t
+from app.core.ir_protocols.ir_layout import matchFrame, matchFrames
+from app.core.tuya_encoder import decode_ir
+from app.services.command_generator import CommandGenerator
+
+
+def _seconds(f):
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def _decode_each(captures, normalize):
+    for timings in captures:
+        results = decode_results()
+        results.rawbuf = timings
+        results.rawlen = len(timings)
+        decode(results, normalize=normalize)
+
+
+def bench_batch_decode():
+    if ir_batch.np is None:
+        print("NumPy is not installed; decodeBatch() would call decode() per capture.")
+        return
+    generator = CommandGenerator()
+    protocols, captures = [], []
+    for protocol, meta in generator.registry._protocols.items():
+        try:
+            commands = generator.generate_commands(protocol, [])
+        except (AttributeError, TypeError):  # Registered, but can't generate commands yet
+            continue
+        protocols.append(meta)
+        captures.extend(list(decode_ir(command.tuya_code)) for command in commands)
+
+    print(f"{len(captures)} captures  {'decode() s':>10s} {'batch s':>8s} {'speedup':>8s}")
+    for normalize in (True, False):
+        each = _seconds(lambda: _decode_each(captures, normalize))
+        batch = _seconds(lambda: decodeBatch(captures, normalize=normalize))
+        label = "normalize" if normalize else "no normalize"
+        print(f"{label:16s} {each:10.2f} {batch:8.2f} {each / batch:7.2f}x")
+
+    print()
+    print(
+        f"{'frames (ms)':20s} {'captures':>8s} {'matchFrame':>11s} {'matchFrames':>12s} "
+        f"{'speedup':>8s}"
+    )
+    batch = frame_batch_t(captures)
+    for meta in protocols:
+        layout = meta.frame_layout
+        if layout is None:
+            continue
+        nbytes = len(getattr(meta.ac_class(), meta.get_raw_method)())
+
+        def each():
+            for timings in captures:
+                results = decode_results()
+                results.rawbuf = timings
+                results.rawlen = len(timings)
+                matchFrame(results, 0, layout, nbytes)
+
+        single = _seconds(each)
+        vectorized = _seconds(lambda: matchFrames(batch.raw, batch.lengths, 0, layout, nbytes))
+        print(
+            f"{meta.protocol_name:20s} {len(captures):8d} {single * 1e3:11.1f} "
+            f"{vectorized * 1e3:12.1f} {single / vectorized:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    bench_batch_decode()
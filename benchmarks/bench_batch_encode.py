@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: packing a protocol's whole command set one state at a time
+(packFrame() per state) vs all at once (packFrames(), NumPy), over the
+states generate_commands() encodes for each registered protocol with a frame
+layout. Then the same for the full encoding, Tuya compression included
+(encode_state() per state vs encode_states()), which is what a command set
+request pays. Needs NumPy.
+
+    python -m benchmarks.bench_batch_encode
+"""
+
+import timeit
+
+from app.core.ir_protocols import ir_layout
+from app.core.ir_protocols.ir_layout import packFrame, packFrames
+from app.services.command_generator import CommandGenerator, encode_state, encode_states
+
+NUMBER = 2
+
+
+def _ms_per_op(f, number=NUMBER):
+    return min(timeit.repeat(f, number=number, repeat=3)) / number * 1e3
+
+
+def bench_batch_encode():
+    if ir_layout.np is None:
+        print("NumPy is not installed; packFrames() would call packFrame() per state.")
+        return
+    generator = CommandGenerator()
+    print(
+        f"{'command set (ms)':20s} {'states':>6s} {'packFrame':>10s} {'packFrames':>11s} "
+        f"{'speedup':>8s} {'encode':>8s} {'batch':>8s} {'speedup':>8s}"
+    )
+    for protocol, meta in generator.registry._protocols.items():
+        if meta.frame_layout is None:
+            continue
+        try:
+            commands = generator.generate_commands(protocol, [])
+        except AttributeError as e:  # A registered protocol whose AC class lacks a setter
+            print(f"{meta.protocol_name:20s} skipped: {e}")
+            continue
+        states = [command.state for command in commands]
+        layout = meta.frame_layout
+        assert packFrames(layout, states) == [packFrame(layout, s, len(s)) for s in states]
+        single = _ms_per_op(lambda: [packFrame(layout, s, len(s)) for s in states])
+        batch = _ms_per_op(lambda: packFrames(layout, states))
+        encode = _ms_per_op(lambda: [encode_state(meta, s) for s in states])
+        encode_batch = _ms_per_op(lambda: encode_states(meta, states))
+        print(
+            f"{meta.protocol_name:20s} {len(states):6d} {single:10.2f} {batch:11.2f} "
+            f"{single / batch:7.2f}x {encode:8.1f} {encode_batch:8.1f} "
+            f"{encode / encode_batch:7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    bench_batch_encode()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: declarative bitfields vs hand-written @property classes.
+
+Compares getter/setter throughput of the compiled field() properties on a
+bytearray-backed, __slots__ class against the hand-written list-backed
+properties they replaced, and against the same field() properties over a list,
+which shows how much of the difference is the bytearray's. Also compares the
+cost of whole-state operations on a list vs a bytearray, and times getRaw()
+and a full state build on migrated protocols.
+
+    python -m benchmarks.bench_bitfields
+"""
+
+import timeit
+
+from app.core.ir_protocols.fujitsu import FujitsuProtocol, IRFujitsuAC
+from app.core.ir_protocols.gree import IRGreeAC
+from app.core.ir_protocols.haier import IRHaierAC176
+from app.core.ir_protocols.samsung import IRSamsungAc
+
+NUMBER = 200_000
+
+
+## The hand-written style the *Protocol classes used before field().
+class LegacyFujitsuProtocol:
+    def __init__(self):
+        self.longcode = [0] * 16
+
+    @property
+    def Power(self) -> int:
+        return self.longcode[8] & 0x01
+
+    @Power.setter
+    def Power(self, value: bool) -> None:
+        if value:
+            self.longcode[8] |= 0x01
+        else:
+            self.longcode[8] &= 0xFE
+
+    @property
+    def Temp(self) -> int:
+        return (self.longcode[8] >> 2) & 0x3F
+
+    @Temp.setter
+    def Temp(self, value: int) -> None:
+        self.longcode[8] = (self.longcode[8] & 0x03) | ((value & 0x3F) << 2)
+
+    @property
+    def Fan(self) -> int:
+        return self.longcode[10] & 0x07
+
+    @Fan.setter
+    def Fan(self, value: int) -> None:
+        self.longcode[10] = (self.longcode[10] & 0xF8) | (value & 0x07)
+
+    @property
+    def OffTimer(self) -> int:
+        return self.longcode[11] | ((self.longcode[12] & 0x07) << 8)
+
+    @OffTimer.setter
+    def OffTimer(self, value: int) -> None:
+        self.longcode[11] = value & 0xFF
+        self.longcode[12] = (self.longcode[12] & 0xF8) | ((value >> 8) & 0x07)
+
+
+## The same compiled field() properties over a list, to tell the cost of the
+## properties apart from the cost of the bytearray behind them.
+class ListFujitsuProtocol(FujitsuProtocol):
+    __slots__ = ()
+
+    def __init__(self):
+        self.longcode = [0] * 16
+
+
+def _ns_per_op(stmt, setup_globals, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=setup_globals, number=number, repeat=5))
+    return best / number * 1e9
+
+
+def bench_fields():
+    print(
+        f"{'field access (ns/op)':32s} {'hand-written':>12s} {'field() list':>13s} "
+        f"{'bytearray':>10s} {'speedup':>8s}"
+    )
+    for label, stmt in [
+        ("get Temp", "p.Temp"),
+        ("set Temp", "p.Temp = 24"),
+        ("get/set Power", "p.Power = not p.Power"),
+        ("set Fan", "p.Fan = 3"),
+        ("set OffTimer (2 bytes)", "p.OffTimer = 1234"),
+    ]:
+        legacy = _ns_per_op(stmt, {"p": LegacyFujitsuProtocol()})
+        listed = _ns_per_op(stmt, {"p": ListFujitsuProtocol()})
+        compiled = _ns_per_op(stmt, {"p": FujitsuProtocol()})
+        print(
+            f"{label:32s} {legacy:12.1f} {listed:13.1f} {compiled:10.1f} "
+            f"{legacy / compiled:7.2f}x"
+        )
+
+
+def bench_bulk():
+    print()
+    print(f"{'21-byte state (ns/op)':32s} {'list':>12s} {'bytearray':>10s} {'speedup':>8s}")
+    for label, stmt in [
+        ("copy (getRaw snapshot)", "b[:]"),
+        ("bytes() (hash / BLOB key)", "bytes(b)"),
+        ("compare", "b == c"),
+        ("checksum sum() & 0xFF", "sum(b) & 0xFF"),
+        ("load (setRaw)", "b[:] = c"),
+    ]:
+        legacy = _ns_per_op(stmt, {"b": [7] * 21, "c": [9] * 21})
+        compiled = _ns_per_op(stmt, {"b": bytearray([7] * 21), "c": bytearray([9] * 21)})
+        print(f"{label:32s} {legacy:12.1f} {compiled:10.1f} {legacy / compiled:7.2f}x")
+
+
+def bench_protocols():
+    print()
+    print(f"{'protocol (us/op)':32s} {'getRaw()':>10s} {'state build':>12s}")
+    for name, cls in [
+        ("IRFujitsuAC", IRFujitsuAC),
+        ("IRGreeAC", IRGreeAC),
+        ("IRHaierAC176", IRHaierAC176),
+        ("IRSamsungAc", IRSamsungAc),
+    ]:
+        ac = cls()
+        get_raw = _ns_per_op("ac.getRaw()", {"ac": ac}, 20_000) / 1000
+        build = (
+            _ns_per_op(
+                "ac.setTemp(24); ac.setMode(1); set_fan(2); ac.setPower(True); ac.getRaw()",
+                {"ac": ac, "set_fan": getattr(ac, "setFanSpeed", None) or ac.setFan},
+                20_000,
+            )
+            / 1000
+        )
+        print(f"{name:32s} {get_raw:10.2f} {build:12.2f}")
+
+
+if __name__ == "__main__":
+    bench_fields()
+    bench_bulk()
+    bench_protocols()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: known codes catalog lookups at growing catalog sizes, one
+code per synthetic manufacturer (the worst case for manufacturer search):
+a page of the sorted list, an exact get_codes(), a prefix search while typing
+and a fuzzy search for a misspelt name.
+
+    python -m benchmarks.bench_code_catalog
+"""
+
+import random
+import tempfile
+import timeit
+from pathlib import Path
+
+from app.services.code_catalog import CodeCatalog
+
+NUMBER = 200
+SYLLABLES = [a + b for a in "bcdfghklmnprstvz" for b in "aeiou"]
+
+
+def _name(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+def _typo(name, rng):
+    i = rng.randrange(1, len(name) - 2)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2 :]  # Transposed letters
+
+
+def _ms_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=3))
+    return best / number * 1e3
+
+
+def bench_catalog():
+    print(f"{'codes':>7s} {'page':>7s} {'exact':>7s} {'prefix':>7s} {'fuzzy':>7s}   (ms/op)")
+    rng = random.Random(1)
+    names = []
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog = CodeCatalog(Path(tmp) / "catalog.sqlite3")
+        for size in (1000, 10000, 100000):
+            batch = [_name(rng) + f" {len(names) + i}" for i in range(size - len(names))]
+            catalog.add_codes((name, "", "NEC", "OFF", "BvQM") for name in batch)
+            names += batch
+            target = rng.choice(names)
+            env = {
+                "catalog": catalog,
+                "target": target,
+                "prefix": target[:4],
+                "typo": _typo(target.split()[0], rng),
+            }
+            page = _ms_per_op("catalog.manufacturers(500, 100)", env)
+            exact = _ms_per_op("catalog.get_codes(target)", env)
+            prefix = _ms_per_op("catalog.search_manufacturers(prefix)", env)
+            fuzzy = _ms_per_op("catalog.search_manufacturers(typo)", env)
+            print(f"{len(catalog):7d} {page:7.2f} {exact:7.2f} {prefix:7.2f} {fuzzy:7.2f}")
+        catalog.close()
+
+
+if __name__ == "__main__":
+    bench_catalog()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: recognising a generated command through the reverse code
+index vs decoding it, per protocol. "code" is an exact lookup of the code
+string; "print" decodes the code's timings and looks up its fingerprint, as
+for a re-learned copy; "decode" is decode_ir() plus the decode() scan, before
+any command set is generated.
+
+    python -m benchmarks.bench_code_index
+"""
+
+import timeit
+
+from app.core.ir_protocols import decode, decode_results
+from app.core.tuya_encoder import decode_ir
+from app.services.code_index import CodeIndex, code_fingerprint
+from app.services.command_generator import _generator
+
+NUMBER = 200
+
+
+def _decode(tuya_code):
+    results = decode_results()
+    results.rawbuf = decode_ir(tuya_code)
+    results.rawlen = len(results.rawbuf)
+    return decode(results)
+
+
+def _us_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=3))
+    return best / number * 1e6
+
+
+def bench_lookup():
+    print(f"{'protocol (us/op)':20s} {'code':>8s} {'print':>8s} {'decode':>8s}")
+    for protocol_type, meta in _generator.registry._protocols.items():
+        try:
+            commands = _generator.generate_commands(protocol_type, [])
+        except Exception:
+            continue  # Broken registration.
+        index = CodeIndex()
+        index.add_commands(protocol_type, commands[::10])
+        code = commands[0].tuya_code
+        env = {
+            "index": index,
+            "code": code,
+            "fingerprint": code_fingerprint,
+            "decode": _decode,
+        }
+        exact = _us_per_op("index.lookup_code(code)", env)
+        printed = _us_per_op("index.lookup_fingerprint(fingerprint(code))", env)
+        decoded = _us_per_op("decode(code)", env)
+        print(f"{meta.protocol_name:20s} {exact:8.1f} {printed:8.1f} {decoded:8.1f}")
+
+
+if __name__ == "__main__":
+    bench_lookup()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of a serverless function, from starting a fresh
+interpreter to its first response, for the plain app (index:app, nothing
+prebuilt) vs the serverless entry point with its bundle (app.serverless:app,
+see app/services/serverless_bundle.py). Each run is a new process making one
+/api/identify or /api/generate-from-manufacturer request straight through
+ASGI, as the Lambda adapter does; "init" is the part spent importing the
+entry point (Lambda's init phase). The bundle is built once, in a temporary
+directory, and not timed.
+
+    python -m benchmarks.bench_cold_start
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RUNS = 5
+
+_FUNCTION = """
+import asyncio, importlib, json, sys, time
+t = time.perf_counter()
+module, attr = {entry!r}.split(":")
+app = getattr(importlib.import_module(module), attr)
+init = time.perf_counter() - t
+
+async def call(path, body):
+    body = json.dumps(body).encode()
+    scope = {{
+        "type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1",
+        "method": "POST", "scheme": "https", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 0),
+        "server": ("localhost", 443), "headers": [(b"content-type", b"application/json")],
+    }}
+    received = []
+    async def receive():
+        return {{"type": "http.request", "body": body, "more_body": False}}
+    async def send(message):
+        received.append(message)
+    await app(scope, receive, send)
+    return received[0]["status"]
+
+status = asyncio.run(call({path!r}, {body!r}))
+print(json.dumps({{"init": init, "status": status}}))
+"""
+
+REQUESTS = [("identify", "/api/identify"), ("manufacturer", "/api/generate-from-manufacturer")]
+
+
+def _cold_start(entry, path, body, env):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", _FUNCTION.format(entry=entry, path=path, body=body)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stdout
+    total = time.perf_counter() - start
+    result = json.loads(output.strip().splitlines()[-1])
+    assert result["status"] == 200, result
+    return result["init"], total
+
+
+def bench_cold_start():
+    from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+    from app.services.serverless_bundle import build_bundle
+
+    bodies = {
+        "identify": {"tuya_code": FUJITSU_KNOWN_GOOD_CODES["24C_High"]},
+        "manufacturer": {"manufacturer": "Fujitsu"},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        bundle = os.path.join(tmp, "bundle")
+        build_bundle(bundle)
+        # The plain app gets its own empty state, as a fresh instance would.
+        plain_env = dict(
+            os.environ,
+            COMMAND_CACHE_PATH=os.path.join(tmp, "missing.bin"),
+            CODE_CATALOG_DB=os.path.join(tmp, "catalog.sqlite3"),
+            DEVICE_SESSION_DB="",
+            SIMILARITY_INDEX_DB="",
+        )
+        bundle_env = dict(os.environ, SERVERLESS_BUNDLE_PATH=bundle)
+        entries = [
+            ("index:app", "index:app", plain_env),
+            ("serverless", "app.serverless:app", bundle_env),
+        ]
+
+        print(f"{'entry (ms)':12s} {'request':14s} {'init':>8s} {'to 1st response':>16s}")
+        for label, entry, env in entries:
+            for name, path in REQUESTS:
+                runs = [_cold_start(entry, path, bodies[name], env) for _ in range(RUNS)]
+                init = statistics.median(run[0] for run in runs)
+                total = statistics.median(run[1] for run in runs)
+                print(f"{label:12s} {name:14s} {init * 1e3:8.0f} {total * 1e3:16.0f}")
+
+
+if __name__ == "__main__":
+    bench_cold_start()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: serving one page of a protocol's extended command space
+(swing, features and Fahrenheit temperatures included) by unranking just the
+page, vs building the whole space eagerly the way generate_commands() builds
+temperature x mode x fan. Also times rank/unrank and a name lookup alone.
+
+    python -m benchmarks.bench_command_space
+"""
+
+import timeit
+
+from app.core.ir_protocols import decode_type_t
+from app.services.command_space import CommandSpace, get_command_space
+
+NUMBER = 20
+PAGE_SIZE = 50
+
+PROTOCOLS = (
+    decode_type_t.FUJITSU_AC,
+    decode_type_t.GREE,
+    decode_type_t.PANASONIC_AC,
+    decode_type_t.DAIKIN216,
+)
+
+
+def _eager(space: CommandSpace):
+    return [space.command(index) for index in range(len(space))]
+
+
+def _page(space: CommandSpace, page: int):
+    indexes = space.select(page * PAGE_SIZE, PAGE_SIZE, mode="cool")
+    return [space.command(index) for index in indexes]
+
+
+def _us_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=3))
+    return best / number * 1e6
+
+
+def bench_space():
+    print(
+        f"{'protocol':14s} {'commands':>8s} {'eager (ms)':>11s} {'page (ms)':>10s} "
+        f"{'unrank (us)':>12s} {'lookup (us)':>12s}"
+    )
+    for protocol in PROTOCOLS:
+        space = get_command_space(protocol)
+        index = len(space) // 2
+        env = {
+            "space": space,
+            "eager": _eager,
+            "page": _page,
+            "index": index,
+            "name": space.name(index),
+        }
+        eager = _us_per_op("eager(space)", env, number=1) / 1e3
+        page = _us_per_op("page(space, 3)", env) / 1e3
+        unrank = _us_per_op("space.index(space.settings(index))", env, number=2000)
+        lookup = _us_per_op("space.lookup(name)", env, number=2000)
+        print(
+            f"{protocol.name:14s} {len(space):8d} {eager:11.1f} {page:10.2f} "
+            f"{unrank:12.1f} {lookup:12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    bench_space()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the hot IR modules (ir_recv, ir_send, bitops, tuya_encoder) as
+pure Python vs compiled with mypyc (see scripts/build_extensions.py). Each
+build is measured in a process of its own, the pure Python one with the
+compiled modules hidden from the import system, on the same work:
+
+    generate   every registered protocol's full command set, uncached
+    tuya encode  the generated timings compressed into Tuya codes
+    tuya decode  the generated Tuya codes decompressed back into timings
+    decode     decode() over those timings, as identify does
+
+Build the compiled modules first, or only the pure Python build is measured:
+
+    python -m scripts.build_extensions
+    python -m benchmarks.bench_compiled
+"""
+
+import json
+import subprocess
+import sys
+import time
+from importlib.abc import MetaPathFinder
+from importlib.util import spec_from_file_location
+from pathlib import Path
+
+from scripts.build_extensions import MODULES, built
+
+WORKLOADS = ["generate", "tuya encode", "tuya decode", "decode"]
+
+
+class _SourceFinder(MetaPathFinder):
+    """Imports the compiled modules from their .py sources."""
+
+    def find_spec(self, name, path, target=None):
+        if name not in MODULES:
+            return None
+        return spec_from_file_location(name, Path(path[0]) / f"{name.rpartition('.')[2]}.py")
+
+
+def _measure() -> dict:
+    """Items/second of each workload, in this process."""
+    from app.core.ir_protocols import decode, decode_results
+    from app.core.tuya_encoder import decode_ir, encode_ir
+    from app.services.command_generator import CommandGenerator
+    from scripts.build_extensions import compiled_modules
+
+    rates = {}
+    start = time.perf_counter()
+    generator = CommandGenerator()
+    commands = []
+    for protocol in generator.registry._protocols:
+        try:
+            commands += generator.generate_commands(protocol, [])
+        except (AttributeError, TypeError):  # Registered, but can't generate commands yet
+            continue
+    rates["generate"] = len(commands) / (time.perf_counter() - start)
+
+    codes = [command.tuya_code for command in commands]
+    start = time.perf_counter()
+    captures = [decode_ir(code) for code in codes]
+    rates["tuya decode"] = len(codes) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for timings in captures:
+        encode_ir(timings)
+    rates["tuya encode"] = len(captures) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for timings in captures:
+        results = decode_results()
+        results.rawbuf = timings
+        results.rawlen = len(timings)
+        decode(results)
+    rates["decode"] = len(captures) / (time.perf_counter() - start)
+    return {"compiled": all(compiled_modules().values()), "rates": rates}
+
+
+def _run(pure: bool) -> dict:
+    args = [sys.executable, "-m", "benchmarks.bench_compiled", "--worker"]
+    if pure:
+        args.append("--pure")
+    output = subprocess.run(args, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def bench_compiled():
+    pure = _run(pure=True)
+    if not built():
+        print("The compiled modules aren't built (python -m scripts.build_extensions);")
+        print("pure Python only:")
+        for workload in WORKLOADS:
+            print(f"  {workload:12s} {pure['rates'][workload]:10.0f} /s")
+        return
+    compiled = _run(pure=False)
+    assert compiled["compiled"] and not pure["compiled"]
+    print(f"{'per second':12s} {'pure':>10s} {'compiled':>10s} {'speedup':>8s}")
+    for workload in WORKLOADS:
+        a, b = pure["rates"][workload], compiled["rates"][workload]
+        print(f"{workload:12s} {a:10.0f} {b:10.0f} {b / a:7.2f}x")
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        if "--pure" in sys.argv:
+            sys.meta_path.insert(0, _SourceFinder())
+        print(json.dumps(_measure()))
+    else:
+        bench_compiled()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark: size of a full /api/generate-from-manufacturer-shaped body per
+available encoding, the time to compress it once ("compress"), the time to
+answer a request for it once the encoded body is kept ("cached"), and the time
+to send it over a 1 Mbit/s cellular link ("link"), per protocol.
+
+    python -m benchmarks.bench_compression
+"""
+
+import asyncio
+import time
+
+from app.api import responses
+from app.api.responses import command_set_response, prepare_command_set
+from app.core.ir_protocols import decode_type_t
+from app.services import command_generator
+
+PROTOCOLS = (decode_type_t.FUJITSU_AC, decode_type_t.GREE, decode_type_t.DAIKIN216)
+LINK_BYTES_PER_S = 1_000_000 / 8
+
+
+def _ms(fn, number):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e3
+
+
+def bench_compression():
+    codings = ["identity"] + [c for c in responses.PREFERENCE if c in responses.ENCODERS]
+    print(
+        f"{'protocol':20s} {'coding':>8s} {'bytes':>8s} {'compress':>9s} {'cached':>8s}"
+        f" {'link':>8s}  (ms)"
+    )
+    for protocol_type in PROTOCOLS:
+        result = command_generator.identify_protocol_and_generate_commands(protocol_type, [])
+        command_set = prepare_command_set(result)
+        for coding in codings:
+            response = asyncio.run(command_set_response(command_set, coding))
+            identity = command_set._body({}).encoded["identity"]
+            encoder = responses.ENCODERS.get(coding)
+            compress = _ms(lambda: encoder(identity), 3) if encoder else 0.0
+            cached = _ms(lambda: asyncio.run(command_set_response(command_set, coding)), 200)
+            size = len(response.body)
+            print(
+                f"{result['protocol']:20s} {coding:>8s} {size:8d} {compress:9.2f} {cached:8.3f}"
+                f" {size / LINK_BYTES_PER_S * 1e3:8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    bench_compression()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: worst-case latency of decoding untrusted Tuya codes within the
+configured budget (see app/core/decode_budget.py). Fuzzed codes (random
+base64, corrupted known codes, random timings, repeated frames and
+decompression bombs) go through what /api/identify does with a request's
+code: decode_ir() and decode() under code_budget.request_budget(). Reported
+per kind: what became of the codes, and the median and worst latency; the
+worst over all codes is the bound a single request can cost. The same bombs
+decoded without a budget show what that bound saves.
+
+    python -m benchmarks.bench_decode_budget
+"""
+
+import base64
+import random
+import statistics
+import time
+from collections import Counter
+
+from app.api.code_budget import request_budget
+from app.core.decode_budget import TuyaCodeError
+from app.core.ir_protocols import decode, decode_results
+from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.settings import settings
+
+CASES = 300  # Per kind
+
+KNOWN = [code for codes in ALL_KNOWN_GOOD_CODES.values() for code in codes.values()]
+_BASE64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def _random_base64(rng):
+    return "".join(rng.choice(_BASE64) for _ in range(4 * rng.randrange(1, 3000)))
+
+
+def _corrupted(rng):
+    code = list(rng.choice(KNOWN))
+    for _ in range(rng.randrange(1, 8)):
+        code[rng.randrange(len(code))] = rng.choice(_BASE64)
+    return "".join(code)
+
+
+def _random_timings(rng):
+    durations = [450, 560, 1300, 1690, 3300, 4500, 9000, rng.randrange(1, 65535)]
+    return encode_ir([rng.choice(durations) for _ in range(rng.randrange(2, 2600))])
+
+
+def _repeated(rng):
+    timings = decode_ir(rng.choice(KNOWN))
+    return encode_ir(timings * rng.randrange(1, 9))
+
+
+def _bomb(rng):
+    # A 2-byte literal, then back-references repeating it 264 bytes at a time.
+    size = rng.randrange(100, 2000)
+    stream = bytes([0x01, 0x41, 0x41]) + bytes([0xE0, 0xFF, 0x01]) * size
+    return base64.b64encode(stream).decode()
+
+
+KINDS = {
+    "known": lambda rng: rng.choice(KNOWN),
+    "random base64": _random_base64,
+    "corrupted": _corrupted,
+    "random timings": _random_timings,
+    "repeated": _repeated,
+    "bomb": _bomb,
+}
+
+
+def _identify(code, budget):
+    """decode_ir() and decode() as /api/identify runs them; returns the outcome."""
+    try:
+        results = decode_results()
+        results.rawbuf = decode_ir(code, budget)
+        results.rawlen = len(results.rawbuf)
+        return "decoded" if decode(results, budget=budget) else "unknown"
+    except TuyaCodeError as e:
+        return e.reason
+
+
+def bench_decode_budget():
+    rng = random.Random(46)
+    for code in KNOWN:  # Import the decoders, untimed
+        _identify(code, None)
+    print(
+        f"budget: {settings.decode_max_code_length} chars, "
+        f"{settings.decode_max_payload_bytes} bytes, {settings.decode_max_timings} timings, "
+        f"{settings.decode_time_limit * 1e3:.0f} ms"
+    )
+    print(f"{'kind':16s} {'median ms':>10s} {'worst ms':>10s}  outcomes")
+    worst = 0.0
+    for kind, make in KINDS.items():
+        codes = [make(rng) for _ in range(CASES)]
+        outcomes = Counter()
+        times = []
+        for code in codes:
+            start = time.perf_counter()
+            outcomes[_identify(code, request_budget())] += 1
+            times.append(time.perf_counter() - start)
+        worst = max(worst, max(times))
+        summary = ", ".join(f"{outcome} {count}" for outcome, count in outcomes.most_common())
+        print(
+            f"{kind:16s} {statistics.median(times) * 1e3:10.2f} {max(times) * 1e3:10.2f}  {summary}"
+        )
+    print(f"worst case within the budget: {worst * 1e3:.1f} ms")
+
+    bomb = _bomb(random.Random(0))
+    start = time.perf_counter()
+    _identify(bomb, None)
+    print(
+        f"one {len(bomb)}-character bomb without a budget: "
+        f"{(time.perf_counter() - start) * 1e3:.0f} ms, {len(decode_ir(bomb))} timings"
+    )
+
+
+if __name__ == "__main__":
+    bench_decode_budget()
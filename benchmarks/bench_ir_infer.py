@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: inferring an unknown protocol's layout vs decode() trying
+every decoder on it and giving up, for captures of growing length.
+
+    python -m benchmarks.bench_ir_infer
+"""
+
+import random
+import timeit
+
+from app.core.ir_protocols import decode, decode_results
+from app.core.ir_protocols.ir_infer import inferProtocol
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    sendFrame,
+)
+
+NUMBER = 200
+
+## Not any protocol decode() knows.
+kLayout = frame_layout_t(
+    timing=bit_timing_t(560, 1690, 560, 560),
+    sections=(frame_section_t(hdrmark=6000, hdrspace=7400, footermark=560, gap=20000),),
+)
+
+
+def _capture(nbytes, seed=1):
+    rng = random.Random(seed)
+    state = [rng.randrange(256) for _ in range(nbytes)]
+    return [t + rng.randint(-40, 40) for t in sendFrame(kLayout, state, nbytes)]
+
+
+def _decode(timings):
+    results = decode_results()
+    results.rawbuf = list(timings)
+    results.rawlen = len(results.rawbuf)
+    return decode(results)
+
+
+def _us_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=3))
+    return best / number * 1e6
+
+
+def bench_infer():
+    print(f"{'bytes':>6s} {'timings':>8s} {'decode (us)':>12s} {'infer (us)':>11s}")
+    for nbytes in (8, 16, 32, 64):
+        timings = _capture(nbytes)
+        assert not _decode(timings) and inferProtocol(timings) is not None
+        env = {"decode": _decode, "infer": inferProtocol, "timings": timings}
+        failed = _us_per_op("decode(timings)", env)
+        inferred = _us_per_op("infer(timings)", env)
+        print(f"{nbytes:6d} {len(timings):8d} {failed:12.1f} {inferred:11.1f}")
+
+
+if __name__ == "__main__":
+    bench_infer()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: sendFrame vs the per-section sendGeneric() calls it replaced.
+
+The legacy sender below strings sendGeneric()/sendData() together section by
+section, the way the hand-written send*() functions did. Both are run over
+the layouts of the migrated protocols with the class default states.
+
+Then times getting from a registered protocol's state to the Tuya payload
+bytes (everything before the compressor): send_function, the Tuya timing
+prep on lists and a pack("<H") per timing vs packFrame() into one
+array('H').
+
+    python -m benchmarks.bench_ir_layout
+"""
+
+import timeit
+from struct import pack
+
+from app.core.ir_protocols import corona, daikin, gree, haier, mitsubishi, panasonic, samsung
+from app.core.ir_protocols.coolix import kCoolixLayout
+from app.core.ir_protocols.ir_layout import packFrame, sendFrame
+from app.core.ir_protocols.ir_send import sendData, sendGeneric
+from app.services.command_generator import _generator, _prepare_timings_for_tuya
+
+NUMBER = 2_000
+
+
+def legacy_sendFrame(layout, data, nbytes, repeat=0):
+    t = layout.timing
+    timings = []
+    for r in range(repeat + 1):
+        pos = 0
+        for section in layout.sections:
+            if section.bits:
+                if section.hdrmark:
+                    timings.append(section.hdrmark)
+                if section.hdrspace:
+                    timings.append(section.hdrspace)
+                timings += sendData(
+                    t.onemark,
+                    t.onespace,
+                    t.zeromark,
+                    t.zerospace,
+                    section.value,
+                    section.bits,
+                    t.MSBfirst,
+                )
+                if section.footermark:
+                    timings.append(section.footermark)
+                if section.gap:
+                    timings.append(section.gap)
+                continue
+            size = section.size(nbytes - pos)
+            chunk = data[pos : pos + size]
+            if section.inverted:
+                chunk = [b for byte in chunk for b in (byte, byte ^ 0xFF)]
+            timings += sendGeneric(
+                section.hdrmark,
+                section.hdrspace,
+                t.onemark,
+                t.onespace,
+                t.zeromark,
+                t.zerospace,
+                section.footermark,
+                section.gap,
+                chunk,
+                len(chunk),
+                t.MSBfirst,
+            )
+            pos += size
+        if layout.repeatgap and r < repeat:
+            timings.append(layout.repeatgap)
+    return timings
+
+
+def _us_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def bench_send():
+    cases = [
+        ("COOLIX", kCoolixLayout, [0xB2, 0xBF, 0x50]),
+        ("GREE", gree.kGreeLayout, gree.IRGreeAC().getRaw()),
+        ("HAIER_AC", haier.kHaierAcLayout, haier.IRHaierAC().getRaw()),
+        ("MITSUBISHI_AC", mitsubishi.kMitsubishiAcLayout, mitsubishi.IRMitsubishiAc().getRaw()),
+        ("CORONA_AC", corona.kCoronaAcLayout, corona.IRCoronaAc().getRaw()),
+        ("SAMSUNG_AC", samsung.samsungAcLayout(), samsung.IRSamsungAc().getRaw()),
+        ("PANASONIC_AC", panasonic.kPanasonicAcLayout, panasonic.IRPanasonicAc().getRaw()),
+        ("DAIKIN", daikin.kDaikinLayout, daikin.IRDaikin().getRaw()),
+    ]
+    print(f"{'send (us/op)':32s} {'generic':>10s} {'layout':>10s} {'speedup':>8s}")
+    for name, layout, state in cases:
+        state = list(state)
+        nbytes = len(state)
+        assert sendFrame(layout, state, nbytes, 1) == legacy_sendFrame(layout, state, nbytes, 1)
+        env = {"layout": layout, "state": state, "nbytes": nbytes}
+        env["f"] = legacy_sendFrame
+        legacy = _us_per_op("f(layout, state, nbytes)", env)
+        env["f"] = sendFrame
+        table = _us_per_op("f(layout, state, nbytes)", env)
+        print(f"{name:32s} {legacy:10.1f} {table:10.1f} {legacy / table:7.2f}x")
+
+
+def legacy_payload(meta, state):
+    signal = list(meta.send_function(state, len(state)))
+    while signal and signal[-1] > 10000:
+        signal = signal[:-1]
+    return b"".join(pack("<H", min(t, 65535)) for t in signal)
+
+
+def frame_payload(meta, state):
+    return _prepare_timings_for_tuya(packFrame(meta.frame_layout, state, len(state))).tobytes()
+
+
+def bench_payload():
+    print()
+    print(f"{'payload (us/op)':32s} {'lists':>10s} {'buffer':>10s} {'speedup':>8s}")
+    for meta in _generator.registry._protocols.values():
+        if meta.frame_layout is None:
+            continue
+        state = getattr(meta.ac_class(), meta.get_raw_method)()
+        assert frame_payload(meta, state) == legacy_payload(meta, state), meta.protocol_name
+        env = {"meta": meta, "state": state}
+        env["f"] = legacy_payload
+        legacy = _us_per_op("f(meta, state)", env)
+        env["f"] = frame_payload
+        buffer = _us_per_op("f(meta, state)", env)
+        print(f"{meta.protocol_name:32s} {legacy:10.1f} {buffer:10.1f} {legacy / buffer:7.2f}x")
+
+
+if __name__ == "__main__":
+    bench_send()
+    bench_payload()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory per worker and first-request latency of the pre-fork server
+(`python -m app.server`) vs plain `uvicorn index:app --workers N`.
+
+Each server is started on a free port and sent a burst of requests once
+GET /api/ready answers, so every worker has served some (and collected
+garbage). "rss" counts every page a worker maps, shared or not; "uss" only
+the pages private to it (what a worker really costs); "pss" splits shared
+pages between their users. "first" is the first /api/identify request,
+"steady" the median of the following ones. With WARMUP=commands the command
+sets come from an artifact built during warm-up (into a temporary directory)
+instead of being generated by the first request. Linux only (reads /proc).
+
+    python -m benchmarks.bench_prefork
+"""
+
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+
+WORKERS = 4
+REQUESTS = 200
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == pid:
+                children.append(int(entry))
+    return children
+
+
+def _memory_kb(pid):
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                memory[name] = int(value.split()[0])
+    private = memory["Private_Clean"] + memory["Private_Dirty"]
+    return memory["Rss"], memory["Pss"], private
+
+
+def _request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"}
+    start = time.perf_counter()
+    with urllib.request.urlopen(urllib.request.Request(url, data, headers), timeout=60) as r:
+        r.read()
+    return time.perf_counter() - start
+
+
+def _wait_ready(base, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _request(f"{base}/api/ready")
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    raise TimeoutError("server never got ready")
+
+
+def _bench(name, argv, level):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    tmp = tempfile.TemporaryDirectory()
+    env = dict(
+        os.environ,
+        WARMUP=level,
+        COMMAND_CACHE_PATH=os.path.join(tmp.name, "command_cache.bin"),
+    )
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", *argv, "--port", str(port), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=env,
+    )
+    try:
+        _wait_ready(base)
+        ready = time.perf_counter() - start
+        body = {"tuya_code": FUJITSU_KNOWN_GOOD_CODES["24C_High"]}
+        first = _request(f"{base}/api/identify", body)
+        times = [_request(f"{base}/api/identify", body) for _ in range(REQUESTS)]
+        workers = [
+            pid
+            for pid in _children(server.pid)
+            if "resource_tracker" not in open(f"/proc/{pid}/cmdline").read()
+        ]
+        memory = [_memory_kb(pid) for pid in workers]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(30)
+        tmp.cleanup()
+
+    rss, pss, uss = (statistics.mean(m[i] for m in memory) / 1024 for i in range(3))
+    print(
+        f"{name:10s} {level:9s} {len(workers):7d} {ready:7.1f} {rss:7.1f} {pss:7.1f} {uss:7.1f}"
+        f" {first * 1e3:8.1f} {statistics.median(times) * 1e3:8.1f}"
+    )
+
+
+def bench_prefork():
+    print(
+        f"{'server':10s} {'WARMUP':9s} {'workers':>7s} {'ready s':>7s} {'rss MB':>7s}"
+        f" {'pss MB':>7s} {'uss MB':>7s} {'first ms':>8s} {'steady':>8s}"
+    )
+    for level in ("protocols", "commands"):
+        _bench("uvicorn", ["uvicorn", "index:app", "--workers", str(WORKERS)], level)
+        _bench("prefork", ["app.server", "--workers", str(WORKERS)], level)
+
+
+if __name__ == "__main__":
+    bench_prefork()
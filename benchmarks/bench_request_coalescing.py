@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a burst of identical requests generating the same command set, each
+computing it in the threadpool ("each") vs coalesced into one computation
+("shared"), per burst size. The generator runs without the command cache, as
+for a protocol or state the cache doesn't cover.
+
+    python -m benchmarks.bench_request_coalescing
+"""
+
+import asyncio
+import time
+from functools import partial
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.ir_protocols import decode_type_t
+from app.services.command_generator import CommandGenerator
+from app.services.request_coalescing import RequestCoalescer
+
+PROTOCOL = decode_type_t.FUJITSU_AC
+
+
+def _ms_per_burst(burst, size, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        asyncio.run(burst(size))
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def bench_burst():
+    compute = partial(CommandGenerator().generate_commands, PROTOCOL, [])
+
+    async def each(size):
+        await asyncio.gather(*(run_in_threadpool(compute) for _ in range(size)))
+
+    async def shared(size):
+        coalescer = RequestCoalescer(ttl=0)  # Only the in-flight computation is shared
+        await asyncio.gather(*(coalescer.run("key", compute) for _ in range(size)))
+
+    print(f"{'burst (ms)':12s} {'each':>10s} {'shared':>10s}")
+    for size in (1, 5, 20):
+        print(f"{size:<12d} {_ms_per_burst(each, size):10.1f} {_ms_per_burst(shared, size):10.1f}")
+
+
+if __name__ == "__main__":
+    bench_burst()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: time per /api/identify-shaped request whose command set is already
+generated (as when it is served by request coalescing), rendered through the
+pydantic response models ("model") vs spliced around pre-encoded commands
+("fast"), per protocol. "empty" is a request returning {} and "share" is the
+part of a request spent building and serializing the response.
+
+    python -m benchmarks.bench_responses
+"""
+
+import time
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.api import responses
+from app.api.identify import CommandInfo, IdentifyResponse
+from app.api.responses import command_set_response, prepare_command_set
+from app.core.ir_protocols import decode_type_t
+from app.services import command_generator
+
+NUMBER = 200
+PROTOCOLS = (decode_type_t.FUJITSU_AC, decode_type_t.GREE, decode_type_t.DAIKIN216)
+
+
+def _app(result):
+    command_set = prepare_command_set(result)
+    app = FastAPI()
+
+    @app.post("/model", response_model=IdentifyResponse)
+    async def model():
+        return IdentifyResponse(
+            protocol=result["protocol"],
+            manufacturer=result["manufacturer"],
+            commands=[
+                CommandInfo(name=cmd.name, description=cmd.description, tuya_code=cmd.tuya_code)
+                for cmd in result["commands"]
+            ],
+            min_temperature=result["min_temperature"],
+            max_temperature=result["max_temperature"],
+            operation_modes=result["operation_modes"],
+            fan_modes=result["fan_modes"],
+            confidence=result.get("confidence", 1.0),
+            notes=result.get("notes"),
+        )
+
+    @app.post("/fast", response_model=IdentifyResponse)
+    async def fast():
+        return await command_set_response(
+            command_set, None, command=None, command_match=None, inferred=None
+        )
+
+    @app.post("/empty")
+    async def empty():
+        return Response(b"{}", media_type="application/json")
+
+    return app
+
+
+def _us_per_request(client, path, number=NUMBER):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(number):
+            client.post(path)
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def bench_responses():
+    encoder = "orjson" if responses.orjson is not None else "json"
+    print(f"encoder: {encoder}")
+    print(
+        f"{'protocol (us/req)':20s} {'cmds':>5s} {'empty':>8s} {'model':>8s} {'share':>6s}"
+        f" {'fast':>8s} {'share':>6s}"
+    )
+    for protocol_type in PROTOCOLS:
+        result = command_generator.identify_protocol_and_generate_commands(protocol_type, [])
+        with TestClient(_app(result)) as client:
+            empty = _us_per_request(client, "/empty")
+            model = _us_per_request(client, "/model")
+            fast = _us_per_request(client, "/fast")
+        print(
+            f"{result['protocol']:20s} {len(result['commands']):5d} {empty:8.0f} {model:8.0f}"
+            f" {1 - empty / model:6.0%} {fast:8.0f} {1 - empty / fast:6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    bench_responses()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: nearest-neighbour queries through the MinHash/LSH buckets vs
+comparing the query's signature with every code in the library, for growing
+libraries of synthetic remotes (two codes each).
+
+    python -m benchmarks.bench_similarity_index
+"""
+
+import random
+import timeit
+
+from app.core.ir_protocols.ir_layout import bit_timing_t, frame_layout_t, frame_section_t, sendFrame
+from app.core.tuya_encoder import encode_ir
+from app.services.similarity_index import SimilarityIndex, code_signature, similarity
+
+NUMBER = 20
+
+
+def _remote(rng):
+    mark = rng.randrange(300, 700)
+    layout = frame_layout_t(
+        timing=bit_timing_t(mark, rng.randrange(1000, 2000), mark, rng.randrange(300, 700)),
+        sections=(
+            frame_section_t(
+                hdrmark=rng.randrange(2000, 9000),
+                hdrspace=rng.randrange(1500, 4500),
+                footermark=mark,
+                gap=20000,
+            ),
+        ),
+    )
+    return layout, [rng.randrange(256) for _ in range(4)]
+
+
+def _code(rng, remote, jitter=0):
+    layout, ident = remote
+    state = ident + [rng.randrange(256) for _ in range(4)]
+    return encode_ir([t + rng.randint(-jitter, jitter) for t in sendFrame(layout, state, 8)])
+
+
+def _linear(index, query, limit=5):
+    signature = code_signature(query)
+    scored = [(similarity(signature, sig), key) for key, (_, sig) in index._codes.items()]
+    return sorted(scored, reverse=True)[:limit]
+
+
+def _us_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=3))
+    return best / number * 1e6
+
+
+def bench_query():
+    print(f"{'codes':>6s} {'candidates':>11s} {'lsh (us)':>9s} {'linear (us)':>12s}")
+    rng = random.Random(1)
+    index = SimilarityIndex()
+    remotes = []
+    for size in (200, 1000, 4000):
+        while len(index) < size:
+            remotes.append(_remote(rng))
+            for j in range(2):
+                index.add(f"remote{len(remotes)}", f"code{j}", _code(rng, remotes[-1]))
+        query = _code(rng, remotes[len(remotes) // 2], jitter=60)
+        env = {"index": index, "query": query, "linear": _linear}
+        candidates = len(index.candidates(code_signature(query)))
+        lsh = _us_per_op("index.query(query)", env)
+        linear = _us_per_op("linear(index, query)", env)
+        print(f"{size:6d} {candidates:11d} {lsh:9.1f} {linear:12.1f}")
+
+
+if __name__ == "__main__":
+    bench_query()
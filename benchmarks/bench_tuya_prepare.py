@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: Tuya timing preparation, the copy/slice/rebuild version vs
+the array-backed one, over every registered protocol's output.
+
+The legacy version clamps long gaps rather than splitting them, so its
+output only matches where there's nothing to split; the speedup is what's
+compared here, tests/test_tuya_prepare.py checks the output. "frame" times
+_prepare_timings_for_tuya() on a packFrame() buffer, for protocols that
+have a frame layout.
+
+    python -m benchmarks.bench_tuya_prepare
+"""
+
+import timeit
+
+from app.core.ir_protocols.ir_layout import packFrame
+from app.services.command_generator import _generator, _prepare_timings_for_tuya
+
+NUMBER = 5_000
+
+
+## _prepare_timings_for_tuya as it was: copy, trim by slicing, cap.
+def legacy_prepare(timings):
+    result = list(timings)
+    while result and result[-1] > 10000:
+        result = result[:-1]
+    return [min(t, 65535) for t in result]
+
+
+def _us_per_op(stmt, env, number=NUMBER):
+    best = min(timeit.repeat(stmt, globals=env, number=number, repeat=5))
+    return best / number * 1e6
+
+
+def bench_prepare():
+    print(
+        f"{'prepare (us/op)':24s} {'repeat':>6s} {'legacy':>8s} {'array':>8s} {'frame':>8s}"
+        f" {'speedup':>8s}"
+    )
+    for meta in _generator.registry._protocols.values():
+        state = getattr(meta.ac_class(), meta.get_raw_method)()
+        for repeat in (0, 1):
+            try:
+                signal = meta.send_function(state, len(state), repeat)
+            except TypeError:
+                continue  # Broken registration, or no repeat parameter.
+            env = {"f": legacy_prepare, "signal": signal}
+            legacy = _us_per_op("f(signal)", env)
+            env["f"] = _prepare_timings_for_tuya
+            new = _us_per_op("f(signal)", env)
+            frame = "-"
+            if meta.frame_layout is not None:
+                env.update(
+                    pack=packFrame, layout=meta.frame_layout, state=state, repeat=repeat
+                )
+                frame = _us_per_op("f(pack(layout, state, len(state), repeat))", env)
+                frame = f"{frame:8.1f}"
+            print(
+                f"{meta.protocol_name:24s} {repeat:6d} {legacy:8.1f} {new:8.1f} {frame:>8s}"
+                f" {legacy / new:7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    bench_prepare()
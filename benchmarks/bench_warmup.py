@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of the first /api/identify and /api/commands requests of a
+fresh worker vs the steady state, per warm-up level. Each level runs in a new
+process, so nothing is warm beyond what its warm-up did ("warmup" is the time
+that took). Without a command-set artifact, identify's steady state is the
+coalesced result and its first request generates the set; "commands" builds
+the artifact (in a temporary directory) during warm-up instead.
+
+    python -m benchmarks.bench_warmup
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+LEVELS = ("none", "imports", "protocols", "commands")
+
+_WORKER = """
+import json, statistics, time
+t = time.perf_counter()
+from fastapi.testclient import TestClient
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+from app.services.warmup import Warmup
+from index import app
+imported = time.perf_counter() - t
+
+t = time.perf_counter()
+Warmup({level!r}).run()
+warmed = time.perf_counter() - t
+
+client = TestClient(app)
+client.get("/api/health")  # The test client's own first-request setup
+requests = [
+    ("identify", lambda: client.post(
+        "/api/identify", json={{"tuya_code": FUJITSU_KNOWN_GOOD_CODES["24C_High"]}})),
+    ("commands", lambda: client.get(
+        "/api/commands", params={{"protocol": "GREE", "mode": "heat", "page_size": 5}})),
+]
+out = {{"import": imported, "warmup": warmed}}
+for name, request in requests:
+    t = time.perf_counter(); request(); first = time.perf_counter() - t
+    times = []
+    for _ in range(20):
+        t = time.perf_counter(); request(); times.append(time.perf_counter() - t)
+    out[name] = (first, statistics.median(times))
+print(json.dumps(out))
+"""
+
+
+def bench_warmup():
+    print(
+        f"{'level (ms)':12s} {'import':>8s} {'warmup':>8s} {'identify 1st':>13s} {'steady':>8s}"
+        f" {'commands 1st':>13s} {'steady':>8s}"
+    )
+    for level in LEVELS:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, COMMAND_CACHE_PATH=os.path.join(tmp, "command_cache.bin"))
+            output = subprocess.run(
+                [sys.executable, "-c", _WORKER.format(level=level)],
+                capture_output=True,
+                text=True,
+                check=True,
+                env=env,
+            ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        identify, commands = result["identify"], result["commands"]
+        print(
+            f"{level:12s} {result['import'] * 1e3:8.0f} {result['warmup'] * 1e3:8.0f}"
+            f" {identify[0] * 1e3:13.1f} {identify[1] * 1e3:8.1f}"
+            f" {commands[0] * 1e3:13.1f} {commands[1] * 1e3:8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    bench_warmup()
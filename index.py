@@ -6,13 +6,43 @@ It provides endpoints for:
   1. GET /api/manufacturers - List manufacturers with known good codes
   2. POST /api/generate-from-manufacturer - Generate commands from known codes
   3. POST /api/identify - Identify protocol from Tuya IR code and generate commands
+  4. POST/PATCH /api/devices - Stateful device sessions returning single commands
+  5. POST /api/canonicalize - Shrink a learned code by re-emitting canonical timings
+  6. POST /api/similar - Find the known codes closest to a learned code
+  7. GET /api/commands - Page through a protocol's full command space
+  8. GET /api/metrics - Request coalescing hit and coalesce rates
+  9. GET /api/health, GET /api/ready - Liveness and warm-up readiness probes
+ 10. WebSocket /ws/capture - Decode a raw capture streamed as it arrives
+
+Each worker warms up in the background when it starts (see
+app/services/warmup.py), and reports ready once done.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 from app.api.identify import router as identify_router
 from app.api.manufacturers import router as manufacturers_router
+from app.api.devices import router as devices_router
+from app.api.canonicalize import router as canonicalize_router
+from app.api.similar import router as similar_router
+from app.api.commands import router as commands_router
+from app.api.metrics import router as metrics_router
+from app.api.health import router as health_router
+from app.api.capture import router as capture_router
+from app.api.code_budget import tuya_code_error_handler
+from app.core.decode_budget import TuyaCodeError
+from app.services import warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start warming the worker up; GET /api/ready reports when it's done."""
+    warmup.start_warmup()
+    yield
+
 
 # Create FastAPI app with Swagger UI at root
 app = FastAPI(
@@ -21,6 +51,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -32,9 +63,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Malformed and over-budget Tuya codes get a structured 4xx (see app/api/code_budget.py)
+app.add_exception_handler(TuyaCodeError, tuya_code_error_handler)
+
 # Register routers
 app.include_router(identify_router, prefix="/api", tags=["identify"])
 app.include_router(manufacturers_router, prefix="/api", tags=["manufacturers"])
+app.include_router(devices_router, prefix="/api", tags=["devices"])
+app.include_router(canonicalize_router, prefix="/api", tags=["canonicalize"])
+app.include_router(similar_router, prefix="/api", tags=["similar"])
+app.include_router(commands_router, prefix="/api", tags=["commands"])
+app.include_router(metrics_router, prefix="/api", tags=["metrics"])
+app.include_router(health_router, prefix="/api", tags=["health"])
+app.include_router(capture_router, tags=["capture"])
 
 
 # Redirect root to Swagger UI
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Build the optional compiled versions of the hot IR modules.
+
+The timing matchers (ir_recv), the timing encoders (ir_send), the bit and
+checksum helpers (bitops) and the Tuya codec (tuya_encoder) take most of the
+CPU of identify and generate requests. mypyc compiles their unchanged,
+type-annotated Python source into C extension modules, built in place next
+to the sources. Python imports an extension module in preference to its .py
+file, so nothing else changes. Where they aren't built, or were built for
+another Python version, the same modules simply run as pure Python.
+
+    uv sync --group compiled
+    python -m scripts.build_extensions          # or: make build-extensions
+    python -m scripts.build_extensions --clean  # or: make clean-extensions
+
+Rebuild (or clean) after editing any of these modules: a stale extension
+module shadows its edited source. `python -m benchmarks.bench_compiled`
+compares the two builds.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+from importlib.machinery import EXTENSION_SUFFIXES
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The modules compiled, in import order.
+MODULES = [
+    "app.core.ir_protocols.bitops",
+    "app.core.ir_protocols.ir_send",
+    "app.core.ir_protocols.ir_recv",
+    "app.core.tuya_encoder",
+]
+# The support library the compiled modules share, built inside the package too.
+GROUP = "app.core.ir_compiled"
+
+
+def _source(module: str) -> Path:
+    return ROOT.joinpath(*module.split(".")).with_suffix(".py")
+
+
+def built() -> List[Path]:
+    """The extension modules built for this Python, if any."""
+    paths = []
+    for pattern in [str(_source(m).with_suffix("")) for m in MODULES + [f"{GROUP}__mypyc"]]:
+        paths += [Path(pattern + suffix) for suffix in EXTENSION_SUFFIXES]
+    return [path for path in paths if path.exists()]
+
+
+def compiled_modules() -> Dict[str, bool]:
+    """Which of the modules this process imported compiled, by name."""
+    return {
+        module: not importlib.import_module(module).__file__.endswith(".py") for module in MODULES
+    }
+
+
+def build() -> None:
+    try:
+        from mypyc.build import mypycify
+        from setuptools import setup
+    except ImportError:
+        sys.exit("Building the compiled modules needs mypy & setuptools: uv sync --group compiled")
+    os.chdir(ROOT)
+    setup(
+        name="maestro-tuya-ir-bridge-compiled",
+        ext_modules=mypycify(
+            # Only the compiled modules need to type check; the rest are just imported.
+            ["--follow-imports=silent"] + [str(_source(m).relative_to(ROOT)) for m in MODULES],
+            opt_level="3",
+            group_name=GROUP,
+        ),
+        script_args=["build_ext", "--inplace", "--build-temp", "build/mypyc"],
+    )
+
+
+def clean() -> None:
+    for path in built():
+        path.unlink()
+        print(f"removed {path.relative_to(ROOT)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clean", action="store_true", help="Remove the compiled modules")
+    args = parser.parse_args()
+    if args.clean:
+        clean()
+    else:
+        build()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Shared test configuration: the SQLite stores the services open by default
+(device sessions, the known codes catalog and the similarity library) live in
+a temporary directory of the test session instead of build/.
+"""
+
+import pytest
+
+from app.settings import settings
+
+# The device session store is opened when its module is imported, i.e. while
+# the tests are collected; until the fixture below runs, stores stay in memory.
+settings.device_session_db = ""
+settings.code_catalog_db = ""
+settings.similarity_index_db = ""
+
+
+@pytest.fixture(scope="session", autouse=True)
+def sqlite_stores(tmp_path_factory):
+    """Point the settings at SQLite files under tmp_path, and reopen the stores."""
+    from app.services import code_catalog, device_sessions, similarity_index
+
+    path = tmp_path_factory.mktemp("stores")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "device_session_db", str(path / "device_sessions.sqlite3"))
+        mp.setattr(settings, "code_catalog_db", str(path / "code_catalog.sqlite3"))
+        mp.setattr(settings, "similarity_index_db", str(path / "similarity_index.sqlite3"))
+        mp.setattr(device_sessions, "store", device_sessions._default_store())
+        mp.setattr(code_catalog, "_catalog", None)
+        mp.setattr(similarity_index, "_index", None)
+        yield path
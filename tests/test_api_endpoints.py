@@ -97,6 +97,14 @@ def test_identify_endpoint_invalid_code():
     print(f"✓ Invalid code rejected: {data['detail']}")
 
 
+def test_identify_endpoint_zero_header_space():
+    """A capture with a 0us header space is unknown, not a server error"""
+    response = client.post("/api/identify", json={"tuya_code": "BeQMAACQAUABAbAE4PEH"})
+
+    assert response.status_code == 200
+    assert response.json()["protocol"] == "UNKNOWN"
+
+
 def test_root_redirects_to_docs():
     """Test that root URL redirects to /docs"""
     response = client.get("/", follow_redirects=False)
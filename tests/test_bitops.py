@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared bit utilities (bitops.py): the table-driven helpers must
+give the same results as the per-bit/per-byte IRutils.cpp loops.
+"""
+
+import random
+
+import pytest
+
+from app.core.ir_protocols import bitops
+from app.core.ir_protocols.bitops import (
+    GETBIT8,
+    GETBITS8,
+    GETBITS64,
+    checkInvertedBytePairs,
+    countBits,
+    invertBits,
+    invertBytePairs,
+    reverseBits,
+    sumBytes,
+    sumNibbles,
+    xorBytes,
+)
+
+
+# Reference implementations, written as loops like IRutils.cpp.
+def ref_reverseBits(data, nbits):
+    if nbits <= 1:
+        return data
+    output = 0
+    for _ in range(nbits):
+        output = (output << 1) | (data & 1)
+        data >>= 1
+    return (data << nbits) | output
+
+
+def ref_sumNibbles_int(data, count, init=0):
+    total = init
+    for _ in range(min(count, 16)):
+        total += data & 0xF
+        data >>= 4
+    return total
+
+
+def ref_countBits(data, nbits, ones=True):
+    count = sum((data >> i) & 1 for i in range(nbits))
+    return count if ones else nbits - count
+
+
+def _states(n=50):
+    rng = random.Random(1234)
+    for _ in range(n):
+        yield bytearray(rng.getrandbits(8) for _ in range(rng.randint(0, 40)))
+
+
+@pytest.mark.parametrize("nbits", list(range(0, 65)))
+def test_reverse_bits_matches_loop(nbits):
+    rng = random.Random(nbits)
+    for _ in range(200):
+        # Include values wider than nbits: the upper bits are kept unreversed.
+        value = rng.getrandbits(rng.choice([max(nbits, 1), nbits + 5, 64]))
+        assert reverseBits(value, nbits) == ref_reverseBits(value, nbits)
+
+
+def test_reverse_bits_known_values():
+    assert reverseBits(0b0001, 4) == 0b1000
+    assert reverseBits(0x01, 8) == 0x80
+    assert reverseBits(0x0001, 16) == 0x8000
+    assert reverseBits(0x1F0, 4) == 0x1F0  # 0b0000 reversed; upper bits kept
+    assert reverseBits(1, 64) == 1 << 63
+
+
+@pytest.mark.parametrize("kind", [bytearray, list, bytes])
+def test_byte_sums_match_loops(kind):
+    for state in _states():
+        data = kind(state)
+        for length in {0, len(state) // 2, len(state)}:
+            for init in (0, 0xF4):
+                assert sumBytes(data, length, init) == (init + sum(state[:length])) & 0xFF
+                xor = init
+                for byte in state[:length]:
+                    xor ^= byte
+                assert xorBytes(data, length, init) == xor & 0xFF
+                nibbles = init + sum((b >> 4) + (b & 0xF) for b in state[:length])
+                assert sumNibbles(data, length, init) == nibbles & 0xFF
+
+
+def test_integer_sums():
+    rng = random.Random(99)
+    for _ in range(200):
+        value = rng.getrandbits(64)
+        length = rng.randint(0, 8)
+        expected = sum((value >> (8 * i)) & 0xFF for i in range(length)) & 0xFF
+        assert sumBytes(value, length) == expected
+        count = rng.randint(0, 20)
+        assert sumNibbles(value, count) == ref_sumNibbles_int(value, count) & 0xF
+        assert sumNibbles(value, count, 3, False) == ref_sumNibbles_int(value, count, 3) & 0xFF
+
+
+def test_count_bits():
+    rng = random.Random(7)
+    for _ in range(200):
+        value = rng.getrandbits(64)
+        nbits = rng.randint(0, 64)
+        assert countBits(value, nbits) == ref_countBits(value, nbits)
+        assert countBits(value, nbits, False) == ref_countBits(value, nbits, False)
+        assert countBits(value, nbits, True, 2) == ref_countBits(value, nbits) + 2
+    for state in _states(10):
+        ones = sum(bin(b).count("1") for b in state)
+        assert countBits(state, len(state)) == ones
+        assert countBits(state, len(state), False) == len(state) * 8 - ones
+
+
+def test_invert_bits():
+    assert invertBits(0b1010, 4) == 0b0101
+    assert invertBits(0xFF00, 16) == 0x00FF
+    assert invertBits(0x1234, 0) == 0x1234
+    assert invertBits(0xF0, 4) == 0xF  # Only the low nbits are returned.
+
+
+@pytest.mark.parametrize("kind", [bytearray, list])
+def test_inverted_byte_pairs(kind):
+    for state in _states():
+        data = kind(state)
+        for length in {0, 1, max(len(state) - 1, 0), len(state)}:
+            expected = list(state)
+            for i in range(0, length - 1, 2):
+                expected[i + 1] = expected[i] ^ 0xFF
+            copy = kind(state)
+            invertBytePairs(copy, length)
+            assert list(copy) == expected
+            assert checkInvertedBytePairs(copy, length)
+            loop_ok = all(data[i] == data[i + 1] ^ 0xFF for i in range(0, length - 1, 2))
+            assert checkInvertedBytePairs(data, length) == loop_ok
+
+
+def test_getbits():
+    assert GETBIT8(0b100, 2) == 1
+    assert GETBIT8(0b100, 1) == 0
+    assert GETBITS8(0xA5, 4, 4) == 0xA
+    assert GETBITS64(0x0123456789ABCDEF, 56, 8) == 0x01
+    assert bitops.GETBITS16 is bitops.GETBITS32 is GETBITS64
+
+
+def test_protocol_modules_share_the_helpers():
+    from app.core.ir_protocols import daikin, hitachi, ir_recv, midea, sharp, toshiba
+
+    assert ir_recv.reverseBits is reverseBits
+    assert midea.reverseBits is sharp.reverseBits is hitachi.reverseBits is reverseBits
+    assert daikin.sumBytes is sumBytes
+    assert toshiba.checkInvertedBytePairs is checkInvertedBytePairs
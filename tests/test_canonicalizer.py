@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for timing canonicalization (POST /api/canonicalize).
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode, decode_results
+from app.core.ir_protocols.test_codes import (
+    FUJITSU_KNOWN_GOOD_CODES,
+    MITSUBISHI_KNOWN_GOOD_CODES,
+    PANASONIC_KNOWN_GOOD_CODES,
+)
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services.canonicalizer import canonicalize, snap_timings
+from index import app
+
+client = TestClient(app)
+
+
+def _decode(tuya_code):
+    results = decode_results()
+    results.rawbuf = decode_ir(tuya_code)
+    results.rawlen = len(results.rawbuf)
+    assert decode(results)
+    return results
+
+
+def _jittered(rng, header, bit, zero, one, nbits=40):
+    timings = list(header)
+    for _ in range(nbits):
+        timings.append(bit + rng.randint(-40, 40))
+        timings.append(rng.choice([zero, one]) + rng.randint(-40, 40))
+    return timings + [bit]
+
+
+def test_learned_codes_are_re_sent_through_their_protocol():
+    for code in [
+        FUJITSU_KNOWN_GOOD_CODES["OFF"],
+        FUJITSU_KNOWN_GOOD_CODES["24C_High"],
+        PANASONIC_KNOWN_GOOD_CODES["OFF"],
+    ]:
+        result = canonicalize(code)
+        assert result.method == "protocol"
+        assert result.canonical_length < 0.5 * result.original_length
+        assert result.ratio == result.canonical_length / result.original_length
+        original, canonical = _decode(code), _decode(result.tuya_code)
+        assert canonical.decode_type == original.decode_type
+        assert canonical.state[: canonical.bits // 8] == original.state[: original.bits // 8]
+
+
+def test_generated_codes_are_left_alone():
+    code = MITSUBISHI_KNOWN_GOOD_CODES["OFF"]
+    result = canonicalize(code)
+    assert result.method == "unchanged"
+    assert result.tuya_code == code
+    assert result.protocol == "MITSUBISHI_AC"
+
+
+def test_unknown_codes_are_snapped_to_clusters():
+    rng = random.Random(3)
+    timings = _jittered(rng, [3000, 3000], 700, 700, 2100)
+    code = encode_ir(timings)
+    result = canonicalize(code)
+    assert result.method == "clustered"
+    assert result.protocol is None
+    assert result.canonical_length < 0.5 * result.original_length
+    snapped = decode_ir(result.tuya_code)
+    assert len(snapped) == len(timings)
+    assert len(set(snapped)) == 3  # 3000, ~700 and ~2100
+    assert all(abs(s - t) <= 0.15 * t for s, t in zip(snapped, timings))
+
+
+def test_snap_timings():
+    assert snap_timings([500, 520, 480, 1500, 1480, 9000]) == [500, 500, 500, 1490, 1490, 9000]
+    # Zero length pieces of split gaps stay as they are.
+    assert snap_timings([65535, 0, 34465, 40]) == [65535, 0, 34465, 40]
+    assert snap_timings([]) == []
+
+
+def test_invalid_code():
+    with pytest.raises(ValueError):
+        canonicalize("not a code")
+
+
+def test_endpoint():
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    response = client.post("/api/canonicalize", json={"tuya_code": code})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["method"] == "protocol"
+    assert data["protocol"] == "FUJITSU_AC"
+    assert data["original_length"] == len(code)
+    assert data["canonical_length"] == len(data["tuya_code"])
+    assert 0 < data["ratio"] < 0.5
+
+    response = client.post("/api/canonicalize", json={"tuya_code": "!!"})
+    assert response.status_code == 400
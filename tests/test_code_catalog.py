@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the known codes catalog: indexed lookups, typo-tolerant manufacturer
+search, paginated GET /api/manufacturers?q= and the test_codes functions it
+backs.
+"""
+
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import test_codes
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES, get_test_codes
+from app.services import code_catalog
+from app.services.code_catalog import CodeCatalog, seed_known_codes
+from index import app
+
+NAMES = ["Fujitsu", "Mitsubishi", "Mitsubishi Heavy", "Panasonic", "De'Longhi", "Gree", "Midea"]
+
+
+@pytest.fixture
+def catalog():
+    catalog = CodeCatalog()
+    catalog.add_codes((name, "", "NEC", "OFF", "BvQM") for name in NAMES)
+    return catalog
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    catalog = CodeCatalog(tmp_path / "catalog.sqlite3")
+    seed_known_codes(catalog)
+    catalog.add_codes((name, "", "NEC", "OFF", "BvQM") for name in NAMES[2:])
+    monkeypatch.setattr(code_catalog, "_catalog", catalog)
+    return TestClient(app)
+
+
+def test_seeded_codes_are_indexed():
+    catalog = CodeCatalog()
+    seed_known_codes(catalog)
+    assert catalog.get_codes("FUJITSU") == FUJITSU_KNOWN_GOOD_CODES
+    assert catalog.get_codes(" fujitsu ") == FUJITSU_KNOWN_GOOD_CODES
+    assert catalog.get_codes("Samsung") == {}  # No codes yet, so not catalogued.
+    assert "Samsung" not in catalog.manufacturers()
+    assert catalog.models("Fujitsu") == [""]
+
+    # Protocols are filled in by decoding the codes.
+    codes = catalog.find_codes(protocol="FUJITSU_AC")
+    assert {(c.manufacturer, c.name) for c in codes} == {
+        ("Fujitsu", name) for name in FUJITSU_KNOWN_GOOD_CODES
+    }
+    # Seeding again replaces rather than duplicates.
+    size = len(catalog)
+    seed_known_codes(catalog)
+    assert len(catalog) == size
+
+
+def test_models(catalog):
+    catalog.add_code("Fujitsu", "COOL_24C", "AAAA", model="AR-RY13", protocol="FUJITSU_AC")
+    catalog.add_code("Fujitsu", "OFF", "BBBB", model="AR-RY13", protocol="FUJITSU_AC")
+    assert catalog.models("fujitsu") == ["", "AR-RY13"]
+    assert catalog.get_codes("Fujitsu", model="AR-RY13") == {"COOL_24C": "AAAA", "OFF": "BBBB"}
+    # Across models, the first model keeps a shared name.
+    assert catalog.get_codes("Fujitsu") == {"OFF": "BvQM", "COOL_24C": "AAAA"}
+    assert [c.name for c in catalog.find_codes(model="AR-RY13")] == ["COOL_24C", "OFF"]
+    with pytest.raises(ValueError):
+        catalog.find_codes()
+
+
+def test_manufacturers_are_sorted_and_paged(catalog):
+    names = catalog.manufacturers()
+    assert names == sorted(NAMES, key=code_catalog.fold)
+    assert catalog.manufacturers(2, 3) == names[2:5]
+    assert catalog.manufacturer_count() == len(NAMES)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("mits", "Mitsubishi"),  # Prefix
+        ("Fujistu", "Fujitsu"),  # Transposed letters
+        ("mitsubshi", "Mitsubishi"),  # Missing letter
+        ("panasonik", "Panasonic"),  # Wrong letter
+        ("delonghi", "De'Longhi"),  # Punctuation
+    ],
+)
+def test_search_tolerates_typos(catalog, query, expected):
+    assert catalog.search_manufacturers(query)[0] == expected
+
+
+def test_search_ranks_prefix_matches_first(catalog):
+    assert catalog.search_manufacturers("mitsubishi")[:2] == ["Mitsubishi", "Mitsubishi Heavy"]
+    assert catalog.search_manufacturers("m") == ["Midea", "Mitsubishi", "Mitsubishi Heavy"]
+    assert catalog.search_manufacturers("xyzzy") == []
+
+
+def test_failed_import_is_rolled_back(catalog):
+    size, count = len(catalog), catalog.manufacturer_count()
+    with pytest.raises(ValueError):
+        catalog.add_codes([("Acme", "", "NEC", "OFF", "AAAA"), ("", "", "NEC", "OFF", "AAAA")])
+    assert len(catalog) == size
+    assert catalog.manufacturer_count() == count
+    assert catalog.get_codes("Acme") == {}
+
+
+def test_catalog_is_persisted(tmp_path):
+    path = tmp_path / "catalog.sqlite3"
+    catalog = CodeCatalog(path)
+    catalog.add_code("Acme", "OFF", "AAAA", protocol="NEC")
+    catalog.close()
+
+    reopened = CodeCatalog(path)
+    assert reopened.get_codes("acme") == {"OFF": "AAAA"}
+    assert reopened.search_manufacturers("acm") == ["Acme"]
+    reopened.close()
+
+    # A database from another schema version is rebuilt.
+    with sqlite3.connect(str(path)) as db:
+        db.execute("PRAGMA user_version = 0")
+    assert len(CodeCatalog(path)) == 0
+
+
+def test_test_codes_use_the_catalog(monkeypatch):
+    catalog = CodeCatalog()
+    monkeypatch.setattr(code_catalog, "_catalog", catalog)
+    monkeypatch.setattr(test_codes, "ALL_KNOWN_GOOD_CODES", {"fujitsu": {}})
+    test_codes.add_test_code("Acme", "COOL_24C", "AAAA")
+    assert get_test_codes("ACME") == {"COOL_24C": "AAAA"}
+    assert test_codes.ALL_KNOWN_GOOD_CODES["acme"] == {"COOL_24C": "AAAA"}
+    assert test_codes.list_protocols() == ["acme"]
+    assert test_codes.list_test_codes("acme") == ["COOL_24C"]
+
+
+def test_manufacturers_endpoint_searches_and_pages(client):
+    data = client.get("/api/manufacturers").json()
+    assert data["total"] == len(data["manufacturers"]) == 7
+    assert (data["offset"], data["limit"]) == (0, 100)
+
+    data = client.get("/api/manufacturers", params={"q": "mitsbishi"}).json()
+    assert data["manufacturers"][:2] == ["Mitsubishi", "Mitsubishi Heavy"]
+
+    data = client.get("/api/manufacturers", params={"offset": 2, "limit": 2}).json()
+    assert data["manufacturers"] == ["Gree", "Midea"]
+    assert data["total"] == 7
+
+    assert client.get("/api/manufacturers", params={"limit": 0}).status_code == 400
+    assert client.get("/api/manufacturers", params={"offset": -1}).status_code == 400
+
+
+def test_unknown_manufacturer_suggests_names(client):
+    response = client.post("/api/generate-from-manufacturer", json={"manufacturer": "Fujistu"})
+    assert response.status_code == 404
+    assert "No known codes" in response.json()["detail"]
+    assert "Did you mean: Fujitsu" in response.json()["detail"]
+
+
+def test_packaged_catalog_opens_read_only(tmp_path):
+    path = tmp_path / "catalog.sqlite3"
+    catalog = CodeCatalog(path)
+    seed_known_codes(catalog)
+    catalog.close()
+
+    packaged = CodeCatalog(path, read_only=True)
+    assert packaged.read_only
+    assert packaged.get_codes("fujitsu") == FUJITSU_KNOWN_GOOD_CODES
+    with pytest.raises(sqlite3.OperationalError):
+        packaged.add_code("Acme", "OFF", "AAAA", protocol="NEC")
+    packaged.close()
+
+    # Without a usable file, it falls back to an empty catalog in memory.
+    missing = CodeCatalog(tmp_path / "missing.sqlite3", read_only=True)
+    assert not missing.read_only and len(missing) == 0
+    assert not (tmp_path / "missing.sqlite3").exists()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for the reverse code index: generated codes, and re-learned copies of
+them, must be recognised as the command they were generated as.
+"""
+
+import dataclasses
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode_type_t
+from app.core.ir_protocols.ir_infer import inferProtocol
+from app.core.ir_protocols.ir_layout import bit_timing_t, sendFrame
+from app.core.ir_protocols.test_codes import MITSUBISHI_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services import code_index
+from app.services.code_index import (
+    CodeIndex,
+    code_fingerprint,
+    inferred_fingerprint,
+    load_code_index,
+)
+from app.services.command_cache import build_command_cache, load_command_cache
+from app.services.command_generator import CommandInfo, _generator
+from index import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def fujitsu_commands():
+    return _generator.generate_commands(decode_type_t.FUJITSU_AC, [])
+
+
+@pytest.fixture(scope="module")
+def fujitsu_index(tmp_path_factory):
+    path = tmp_path_factory.mktemp("cache") / "commands.bin"
+    build_command_cache(path, [decode_type_t.FUJITSU_AC])
+    return load_code_index(load_command_cache(path))
+
+
+@pytest.fixture
+def shared_index(monkeypatch, fujitsu_index):
+    monkeypatch.setattr(code_index, "_index", fujitsu_index)
+    return fujitsu_index
+
+
+@pytest.fixture(scope="module")
+def gree_commands():
+    return _generator.generate_commands(decode_type_t.GREE, [])
+
+
+@pytest.fixture(scope="module")
+def gree_index(gree_commands):
+    index = CodeIndex()
+    index.add_commands(decode_type_t.GREE, gree_commands)
+    return index
+
+
+def _resent(tuya_code, hdrmark, hdrspace, bitmark, onespace, zerospace):
+    # The same payload and sections, sent with another remote's timings.
+    inferred = inferProtocol(decode_ir(tuya_code))
+    timing = bit_timing_t(bitmark, onespace, bitmark, zerospace, inferred.layout.timing.MSBfirst)
+    sections = tuple(
+        dataclasses.replace(
+            section,
+            hdrmark=hdrmark if section.hdrmark else 0,
+            hdrspace=hdrspace if section.hdrspace else 0,
+            footermark=bitmark if section.footermark else 0,
+        )
+        for section in inferred.layout.sections
+    )
+    layout = dataclasses.replace(inferred.layout, timing=timing, sections=sections)
+    return encode_ir(sendFrame(layout, inferred.state, len(inferred.state)))
+
+
+def _relearned(tuya_code, seed=7):
+    # What a blaster would hand back: the same command, with timing jitter.
+    rng = random.Random(seed)
+    return encode_ir([t + rng.randint(-60, 60) for t in decode_ir(tuya_code)])
+
+
+def test_index_loads_from_the_cache(fujitsu_index, fujitsu_commands):
+    assert decode_type_t.FUJITSU_AC in fujitsu_index
+    assert decode_type_t.GREE not in fujitsu_index
+    assert len(fujitsu_index) == len(fujitsu_commands)
+
+
+def test_generated_codes_are_found_by_code(fujitsu_index, fujitsu_commands):
+    by_name = {cmd.name: cmd for cmd in fujitsu_commands}
+    for cmd in fujitsu_commands:
+        match = fujitsu_index.lookup_code(cmd.tuya_code)
+        assert match is not None and match.exact
+        assert match.protocol == "FUJITSU_AC"
+        # Identical states give identical codes; the first command keeps them.
+        assert by_name[match.command].tuya_code == cmd.tuya_code
+        assert match.state == cmd.state
+
+
+def test_relearned_codes_are_found_by_fingerprint(fujitsu_index, fujitsu_commands):
+    cmd = next(c for c in fujitsu_commands if c.name == "24_cool_auto")
+    relearned = _relearned(cmd.tuya_code)
+    assert fujitsu_index.lookup_code(relearned) is None
+    match = fujitsu_index.lookup_fingerprint(code_fingerprint(relearned))
+    assert match is not None and not match.exact
+    assert match.command == "24_cool_auto"
+    assert match.state == cmd.state
+
+
+def test_unknown_codes_miss(fujitsu_index):
+    code = MITSUBISHI_KNOWN_GOOD_CODES["OFF"]
+    assert fujitsu_index.lookup_code(code) is None
+    assert fujitsu_index.lookup_fingerprint(code_fingerprint(code)) is None
+    assert fujitsu_index.lookup_fingerprint(None) is None
+    assert code_fingerprint("not a code") is None
+
+
+@pytest.mark.parametrize(
+    "timings",
+    [(8000, 4000, 600, 1600, 600), (4400, 4400, 550, 1600, 550), (3400, 1750, 450, 1300, 420)],
+)
+def test_foreign_timings_miss(gree_index, gree_commands, timings):
+    cmd = next(c for c in gree_commands if c.name == "18_heat_med")
+    assert gree_index.lookup_fingerprint(code_fingerprint(_relearned(cmd.tuya_code))) is not None
+    resent = _resent(cmd.tuya_code, *timings)
+    assert inferProtocol(decode_ir(resent)).state == inferProtocol(decode_ir(cmd.tuya_code)).state
+    assert gree_index.lookup_fingerprint(code_fingerprint(resent)) is None
+
+
+def test_shared_fingerprints_miss(gree_index, gree_commands):
+    # In auto mode the temperature isn't sent: 16_auto_low is also 17_auto_low, ...
+    cmd = next(c for c in gree_commands if c.name == "16_auto_low")
+    assert sum(c.state == cmd.state for c in gree_commands) > 1
+    assert gree_index.lookup_code(cmd.tuya_code) is not None
+    assert gree_index.lookup_fingerprint(code_fingerprint(_relearned(cmd.tuya_code))) is None
+
+
+def test_add_commands():
+    index = CodeIndex()
+    state = bytes([1, 2, 3])
+    fingerprint = inferred_fingerprint(inferProtocol(decode_ir(MITSUBISHI_KNOWN_GOOD_CODES["OFF"])))
+    commands = [
+        CommandInfo("a", "first", "AAAA", state),
+        CommandInfo("b", "same code", "AAAA", state),
+        CommandInfo("c", "no state", "BBBB"),
+        CommandInfo("d", "unique", "DDDD", state),
+    ]
+    index.add_commands(decode_type_t.GREE, commands, [b"fp", b"fp", None, fingerprint])
+    assert decode_type_t.GREE in index
+    assert len(index) == 3
+    assert index.lookup_code("AAAA").command == "a"
+    assert index.lookup_code("BBBB") is None
+    # Not a fingerprint inferred_fingerprint() made.
+    assert index.lookup_fingerprint(b"fp") is None
+    assert index.lookup_fingerprint(fingerprint).command == "d"
+    # A protocol is only indexed once.
+    index.add_commands(decode_type_t.GREE, [CommandInfo("e", "", "CCCC", state)])
+    assert index.lookup_code("CCCC") is None
+
+
+def test_identify_reports_the_command(shared_index, fujitsu_commands):
+    cmd = next(c for c in fujitsu_commands if c.name == "24_cool_auto")
+    response = client.post("/api/identify", json={"tuya_code": cmd.tuya_code})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["protocol"] == "FUJITSU_AC"
+    assert data["command"] == "24_cool_auto"
+    assert data["command_match"] == "code"
+    assert len(data["commands"]) == len(fujitsu_commands)
+
+    response = client.post("/api/identify", json={"tuya_code": _relearned(cmd.tuya_code)})
+    data = response.json()
+    assert data["protocol"] == "FUJITSU_AC"
+    assert data["command"] == "24_cool_auto"
+    assert data["command_match"] == "fingerprint"
+
+
+def test_identify_indexes_what_it_generates(monkeypatch):
+    index = CodeIndex()
+    monkeypatch.setattr(code_index, "_index", index)
+    response = client.post(
+        "/api/identify", json={"tuya_code": MITSUBISHI_KNOWN_GOOD_CODES["OFF"]}
+    )
+    data = response.json()
+    assert data["protocol"] == "MITSUBISHI_AC"
+    assert data["command"] is None
+    assert decode_type_t.MITSUBISHI_AC in index
+
+    generated = data["commands"][0]
+    response = client.post("/api/identify", json={"tuya_code": generated["tuya_code"]})
+    data = response.json()
+    assert data["command"] == generated["name"]
+    assert data["command_match"] == "code"
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared, memory-mapped command-set artifact.
+"""
+
+import pytest
+
+from app.core.ir_protocols import decode_type_t
+from app.services import command_cache
+from app.services.command_cache import (
+    CommandCache,
+    build_command_cache,
+    load_command_cache,
+    write_command_cache,
+)
+from app.services.command_generator import CommandGenerator, CommandInfo
+
+PROTOCOLS = [decode_type_t.FUJITSU_AC, decode_type_t.GREE]
+
+
+@pytest.fixture(scope="module")
+def artifact(tmp_path_factory):
+    path = tmp_path_factory.mktemp("cache") / "commands.bin"
+    built = build_command_cache(path, PROTOCOLS)
+    return path, built
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return CommandGenerator()
+
+
+def test_build_reports_written_protocols(artifact):
+    _, built = artifact
+    assert set(built) == {"FUJITSU_AC", "GREE"}
+    assert all(count > 0 for count in built.values())
+
+
+def test_cached_commands_match_generated(artifact, generator):
+    path, _ = artifact
+    cache = load_command_cache(path)
+    assert cache is not None
+    for protocol_type in PROTOCOLS:
+        name = generator.registry.get(protocol_type).protocol_name
+        assert cache.commands(name) == generator.generate_commands(protocol_type, [])
+
+
+def test_code_lookup_is_zero_copy_slice(artifact, generator):
+    path, _ = artifact
+    cache = load_command_cache(path)
+    expected = {c.name: c.tuya_code for c in generator.generate_commands(decode_type_t.GREE, [])}
+
+    view = cache.code("GREE", "24_cool_auto")
+    assert isinstance(view, memoryview)
+    assert view.obj is cache._mmap
+    assert bytes(view).decode("ascii") == expected["24_cool_auto"]
+
+    assert cache.code("GREE", "no_such_command") is None
+    assert cache.code("NO_SUCH_PROTOCOL", "power_on") is None
+
+
+def test_unknown_protocol_has_no_commands(artifact):
+    cache = load_command_cache(artifact[0])
+    assert "DAIKIN" not in cache
+    assert cache.commands("DAIKIN") is None
+    assert sorted(cache.protocols()) == ["FUJITSU_AC", "GREE"]
+
+
+def test_missing_artifact_is_ignored(tmp_path):
+    assert load_command_cache(tmp_path / "missing.bin") is None
+
+
+def test_stale_artifact_is_ignored(tmp_path):
+    path = tmp_path / "stale.bin"
+    write_command_cache(path, {"GREE": [CommandInfo("a", "b", "c")]}, b"\0" * 32)
+    assert load_command_cache(path) is None
+    # Still readable when asked for explicitly.
+    assert CommandCache(path).commands("GREE") == [CommandInfo("a", "b", "c")]
+
+
+def test_source_fingerprint_covers_the_artifact_contents():
+    root = command_cache.PROJECT_ROOT
+    sources = {
+        path.relative_to(root).as_posix()
+        for pattern in command_cache._FINGERPRINT_SOURCES
+        for path in root.glob(pattern)
+    }
+    assert {
+        "app/core/ir_protocols/ir_infer.py",
+        "app/core/tuya_encoder.py",
+        "app/services/code_index.py",
+        "app/services/command_cache.py",
+        "app/services/command_generator.py",
+    } <= sources
+
+
+def test_malformed_artifact_is_ignored(tmp_path):
+    path = tmp_path / "garbage.bin"
+    path.write_bytes(b"not a command cache at all, just some bytes" * 4)
+    assert load_command_cache(path) is None
+
+
+def test_generator_serves_from_cache(tmp_path, monkeypatch):
+    path = tmp_path / "commands.bin"
+    sentinel = [CommandInfo("power_on", "Turn power on", "CACHED")]
+    write_command_cache(path, {"FUJITSU_AC": sentinel}, command_cache.source_fingerprint())
+
+    generator = CommandGenerator(cache=load_command_cache(path))
+    assert generator.generate_commands(decode_type_t.FUJITSU_AC, []) == sentinel
+    # Protocols missing from the artifact still get generated.
+    assert len(generator.generate_commands(decode_type_t.GREE, [])) > 1
+
+
+def test_protocol_info_is_served_without_the_registry(artifact, generator):
+    path, _ = artifact
+    cached = CommandGenerator(cache=load_command_cache(path))
+    for protocol_type in PROTOCOLS:
+        assert cached.get_protocol_info(protocol_type) == generator.get_protocol_info(
+            protocol_type
+        )
+        assert cached.is_supported(protocol_type)
+        assert len(cached.generate_commands(protocol_type, [])) > 1
+    assert not cached.registry._registered
+
+    # Protocols missing from the artifact fall back to the registry.
+    assert cached.get_protocol_info(decode_type_t.DAIKIN)["manufacturer"] == "Daikin"
+    assert cached.registry._registered
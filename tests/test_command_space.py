@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Tests for command spaces (GET /api/commands): rank/unrank and names must agree
+for every command, pages of filtered listings must match filtering the whole
+space, and the metadata's constraints must keep commands distinct.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode_type_t
+from app.services.command_generator import CommandGenerator
+from app.services.command_space import CommandSettings, CommandSpace, get_command_space
+from index import app
+
+PROTOCOLS = (
+    decode_type_t.FUJITSU_AC,
+    decode_type_t.GREE,
+    decode_type_t.PANASONIC_AC,
+    decode_type_t.HAIER_AC176,
+    decode_type_t.ARGO,  # Has a mode name with "_" in it
+    decode_type_t.DAIKIN216,
+)
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return CommandGenerator()  # Without the command cache
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _matches(settings, mode=None, temperature=None, fan=None, swing=None, features=()):
+    return (
+        settings.mode is not None
+        and mode in (None, settings.mode)
+        and temperature in (None, settings.temperature)
+        and fan in (None, settings.fan)
+        and swing in (None, settings.swing)
+        and set(features) <= set(settings.features)
+    )
+
+
+@pytest.mark.parametrize("protocol", PROTOCOLS, ids=lambda p: p.name)
+def test_rank_unrank_and_names_agree(protocol):
+    space = get_command_space(protocol)
+    names = set()
+    for index in range(len(space)):
+        assert space.index(space.settings(index)) == index
+        name = space.name(index)
+        assert space.lookup(name) == index
+        names.add(name)
+    assert len(names) == len(space)
+    with pytest.raises(IndexError):
+        space.settings(len(space))
+
+
+@pytest.mark.parametrize(
+    "protocol", list(CommandGenerator().registry._protocols), ids=lambda p: p.name
+)
+def test_default_commands_match_generate_commands(generator, protocol):
+    space = get_command_space(protocol)
+    try:
+        commands = generator.generate_commands(protocol, [])
+    except (AttributeError, TypeError):
+        pytest.skip("Registered, but can't generate codes yet")
+    for cmd in commands:
+        try:
+            index = space.lookup(cmd.name)
+        except ValueError:
+            # Only commands of modes locking the temperature or limiting the fan
+            # are left out.
+            rest = cmd.name.split("_", 1)[1]
+            limited = set(space._temp_overrides) | set(space.metadata.mode_fans)
+            assert any(rest.startswith(mode + "_") for mode in limited), cmd.name
+            continue
+        assert space.command(index) == cmd
+
+
+@pytest.mark.parametrize(
+    "protocol",
+    [decode_type_t.GREE, decode_type_t.HAIER_AC176, decode_type_t.ELECTRA_AC],
+    ids=lambda p: p.name,
+)
+def test_commands_are_distinct(protocol):
+    space = get_command_space(protocol)
+    codes = [space.command(index).tuya_code for index in range(len(space) - 2)]
+    assert len(set(codes)) == len(codes)
+
+
+def test_constraints_shape_the_space():
+    gree = get_command_space(decode_type_t.GREE)
+    # Auto locks the temperature (in Celsius), dry the fan.
+    assert gree.count(mode="auto", fan="auto") == 4  # Feature combinations
+    assert gree.count(mode="auto", temperature=77) == 0
+    assert {gree.settings(i).fan for i in gree.select(mode="dry")} == {"low"}
+    assert gree.count(temperature=75) == (4 + 4 + 1 + 4) * 4  # Cool, heat, dry, fan
+    with pytest.raises(ValueError, match="out of range"):
+        gree.index(CommandSettings(power=True, mode="auto", temperature=16, fan="auto"))
+    with pytest.raises(ValueError, match="limits the fan"):
+        gree.index(CommandSettings(power=True, mode="dry", temperature=20, fan="high"))
+
+    # Powerful and quiet cancel each other out.
+    panasonic = get_command_space(decode_type_t.PANASONIC_AC)
+    assert panasonic.count(features=["powerful", "quiet"]) == 0
+    with pytest.raises(ValueError, match="can't be combined"):
+        panasonic.index(
+            CommandSettings(
+                power=True, mode="cool", temperature=24, fan="auto", features=("powerful", "quiet")
+            )
+        )
+    with pytest.raises(ValueError, match="Unknown command"):
+        panasonic.lookup("24_cool_auto_powerful_quiet")
+
+    # Econo only works when cooling.
+    airton = get_command_space(decode_type_t.AIRTON)
+    assert {airton.settings(i).mode for i in airton.select(features=["econo"])} == {"cool"}
+
+
+def test_names():
+    fujitsu = get_command_space(decode_type_t.FUJITSU_AC)
+    # The unit's default swing is left out of names.
+    assert fujitsu.settings(fujitsu.lookup("24_cool_high")).swing == "vertical"
+    index = fujitsu.lookup("24_cool_high_swing-off")
+    cmd = fujitsu.command(index)
+    assert cmd.description == "24°C, Cool, High fan, Swing off"
+    assert fujitsu.lookup("power_off") == len(fujitsu) - 1
+
+    gree = get_command_space(decode_type_t.GREE)
+    assert gree.command(gree.lookup("75F_cool_high_turbo_econo")).description == (
+        "75°F, Cool, High fan, Turbo, Econo"
+    )
+    argo = get_command_space(decode_type_t.ARGO)
+    assert argo.settings(argo.lookup("20_heat_auto_auto")).mode == "heat_auto"
+
+    for space, name in [
+        (fujitsu, "24_cool"),
+        (fujitsu, "24_cool_high_swing-vertical"),  # Default swing spelt out
+        (fujitsu, "24_cool_high_swing-sideways"),
+        (fujitsu, "75F_cool_high"),  # No Fahrenheit temperatures
+        (fujitsu, "hot_cool_high"),
+        (gree, "75F_cool_high_econo_turbo"),  # Features out of order
+        (gree, "24F_cool_high"),
+    ]:
+        with pytest.raises(ValueError, match="Unknown command"):
+            space.lookup(name)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"mode": "cool"},
+        {"temperature": 22, "fan": "low"},
+        {"swing": "off", "mode": "heat"},
+        {"mode": "fan", "temperature": 24},
+    ],
+)
+def test_pages_match_filtering_the_whole_space(filters):
+    space = get_command_space(decode_type_t.FUJITSU_AC)
+    if filters:
+        expected = [i for i in range(len(space)) if _matches(space.settings(i), **filters)]
+    else:
+        expected = list(range(len(space)))
+    assert space.count(**filters) == len(expected)
+    pages = []
+    for offset in range(0, len(expected) + 70, 70):
+        page = space.select(offset, 70, **filters)
+        assert len(page) <= 70
+        pages.extend(page)
+    assert pages == expected
+
+    gree = get_command_space(decode_type_t.GREE)
+    features = {"features": ["turbo"], "fan": "low"}
+    expected = [i for i in range(len(gree)) if _matches(gree.settings(i), **features)]
+    assert gree.select(5, 10, **features) == expected[5:15]
+
+
+def test_unknown_filters_are_rejected():
+    space = get_command_space(decode_type_t.FUJITSU_AC)
+    for filters in [{"mode": "turbo"}, {"fan": "max"}, {"swing": "up"}, {"features": ["econo"]}]:
+        with pytest.raises(ValueError, match="Unknown"):
+            space.select(**filters)
+
+
+def test_space_of_a_protocol_without_extras(generator):
+    metadata = generator.registry.get(decode_type_t.MITSUBISHI_AC)
+    space = CommandSpace(metadata)
+    commands = generator.generate_commands(decode_type_t.MITSUBISHI_AC, [])
+    assert len(space) == len(commands)
+    assert sorted(space.name(i) for i in range(len(space))) == sorted(c.name for c in commands)
+
+
+def test_commands_endpoint(client):
+    response = client.get(
+        "/api/commands",
+        params={"protocol": "fujitsu_ac", "mode": "cool", "page": 3, "page_size": 2},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["protocol"] == "FUJITSU_AC"
+    assert (data["total"], data["page"], data["page_size"]) == (300, 3, 2)
+    space = get_command_space(decode_type_t.FUJITSU_AC)
+    assert [c["index"] for c in data["commands"]] == space.select(4, 2, mode="cool")
+    assert data["commands"][0]["tuya_code"] == space.command(data["commands"][0]["index"]).tuya_code
+
+    data = client.get(
+        "/api/commands", params={"protocol": "GREE", "features": "turbo, econo", "temperature": 75}
+    ).json()
+    assert data["total"] == 13
+    assert all(c["name"].endswith("_turbo_econo") for c in data["commands"])
+
+    beyond = client.get("/api/commands", params={"protocol": "GREE", "page": 1000}).json()
+    assert beyond["commands"] == []
+    assert beyond["total"] == len(get_command_space(decode_type_t.GREE))
+
+    for params in [
+        {"protocol": "NOPE"},
+        {"protocol": "NEC"},  # No command generation support
+        {"protocol": "GREE", "mode": "turbo"},
+        {"protocol": "GREE", "page": 0},
+        {"protocol": "GREE", "page_size": 501},
+    ]:
+        assert client.get("/api/commands", params=params).status_code == 400
+
+
+def test_command_endpoint(client):
+    space = get_command_space(decode_type_t.FUJITSU_AC)
+    index = space.lookup("24_cool_high_swing-off")
+    by_name = client.get("/api/commands/FUJITSU_AC/24_cool_high_swing-off")
+    assert by_name.status_code == 200
+    assert by_name.json()["index"] == index
+    by_index = client.get(f"/api/commands/fujitsu_ac/{index}")
+    assert by_index.json() == by_name.json()
+
+    assert client.get("/api/commands/FUJITSU_AC/24_cool_turbo").status_code == 404
+    assert client.get(f"/api/commands/FUJITSU_AC/{len(space)}").status_code == 404
+    assert client.get("/api/commands/NOPE/0").status_code == 400
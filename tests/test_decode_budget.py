@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for decoding budgets: malformed Tuya streams must raise TuyaCodeError
+rather than trip asserts, each budget must stop an oversized code, and the
+endpoints must answer such codes with structured 4xx errors.
+"""
+
+import base64
+import io
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.decode_budget import DecodeBudget, TuyaCodeError
+from app.core.ir_protocols import decode, decode_results
+from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES, FUJITSU_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir, decompress, encode_ir
+from app.settings import settings
+from index import app
+
+client = TestClient(app)
+
+
+def _bomb(blocks=1000):
+    # A 2-byte literal, then back-references repeating it 264 bytes at a time.
+    stream = bytes([0x01, 0x41, 0x41]) + bytes([0xE0, 0xFF, 0x01]) * blocks
+    return base64.b64encode(stream).decode()
+
+
+@pytest.mark.parametrize(
+    "stream",
+    [
+        bytes([0x03, 0x41]),  # Literal block cut short
+        bytes([0x00, 0x41, 0xE0]),  # Length-distance block cut short
+        bytes([0x00, 0x41, 0x20, 0x05]),  # Refers back past the start
+    ],
+)
+def test_malformed_streams_raise(stream):
+    with pytest.raises(TuyaCodeError) as error:
+        decompress(io.BytesIO(stream))
+    assert error.value.reason == "malformed_code" and error.value.status_code == 400
+
+
+def test_known_codes_decode_as_before():
+    for codes in ALL_KNOWN_GOOD_CODES.values():
+        for code in codes.values():
+            timings = decode_ir(code, DecodeBudget(8192, 8192, 2048))
+            assert decode_ir(encode_ir(timings)) == timings
+
+    with pytest.raises(TuyaCodeError, match="base64"):
+        decode_ir("invalid_base64_code")
+    with pytest.raises(TuyaCodeError, match="garbage"):
+        decode_ir(base64.b64encode(bytes([0x02, 1, 2, 3])).decode())
+
+
+def test_budgets_stop_oversized_codes():
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    timings = decode_ir(code)
+    cases = [
+        (DecodeBudget(max_code_length=len(code) - 1), "code_too_long"),
+        (DecodeBudget(max_payload_bytes=2 * len(timings) - 2), "payload_too_large"),
+        (DecodeBudget(max_timings=len(timings) - 1), "too_many_timings"),
+    ]
+    for budget, reason in cases:
+        with pytest.raises(TuyaCodeError) as error:
+            decode_ir(code, budget)
+        assert error.value.reason == reason and error.value.status_code == 413
+        assert error.value.detail()["limit"] is not None
+    assert decode_ir(code, DecodeBudget(len(code), 2 * len(timings), len(timings))) == timings
+
+    # A bomb stops once past the budget, not after decompressing it all.
+    with pytest.raises(TuyaCodeError, match="8192 bytes"):
+        decode_ir(_bomb(100_000), DecodeBudget(max_payload_bytes=8192))
+
+
+def test_decode_deadline():
+    results = decode_results()
+    results.rawbuf = decode_ir(FUJITSU_KNOWN_GOOD_CODES["OFF"])
+    results.rawlen = len(results.rawbuf)
+    expired = DecodeBudget(time_limit=0.01, deadline=0.0)
+    with pytest.raises(TuyaCodeError) as error:
+        decode(results, budget=expired)
+    assert error.value.reason == "decode_deadline_exceeded" and error.value.status_code == 422
+    assert decode(results, budget=DecodeBudget(time_limit=10).start())
+
+
+@pytest.mark.parametrize(
+    "path", ["/api/identify", "/api/canonicalize", "/api/similar", "/api/devices"]
+)
+def test_endpoints_answer_structured_errors(path):
+    response = client.post(path, json={"tuya_code": "invalid_base64_code"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "malformed_code"
+
+    response = client.post(path, json={"tuya_code": _bomb()})
+    assert response.status_code == 413
+    assert response.json()["detail"] == {
+        "error": "payload_too_large",
+        "message": f"Tuya code decompresses to more than {settings.decode_max_payload_bytes} bytes",
+        "limit": settings.decode_max_payload_bytes,
+    }
+
+
+def test_limits_are_configurable(monkeypatch):
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    monkeypatch.setattr(settings, "decode_max_timings", 10)
+    response = client.post("/api/identify", json={"tuya_code": code + " "})
+    assert response.status_code == 413
+    assert response.json()["detail"]["error"] == "too_many_timings"
+
+    monkeypatch.setattr(settings, "decode_max_timings", 0)  # Unlimited
+    response = client.post("/api/identify", json={"tuya_code": code + " "})
+    assert response.status_code == 200
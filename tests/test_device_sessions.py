@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for stateful device sessions (POST/PATCH /api/devices).
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode, decode_results, decode_type_t
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir
+from app.services import device_sessions
+from app.services.command_generator import _generator
+from app.services.device_sessions import DeviceSessionStore
+from index import app
+
+FUJITSU_CODE = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+
+
+def _decode(tuya_code):
+    results = decode_results()
+    results.rawbuf = decode_ir(tuya_code)
+    results.rawlen = len(results.rawbuf)
+    assert decode(results)
+    return results
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        device_sessions, "store", DeviceSessionStore(16, tmp_path / "sessions.sqlite3")
+    )
+    return TestClient(app)
+
+
+def test_create_seeds_state_from_code(client):
+    response = client.post("/api/devices", json={"tuya_code": FUJITSU_CODE})
+    assert response.status_code == 201
+    data = response.json()
+
+    results = _decode(FUJITSU_CODE)
+    assert data["protocol"] == "FUJITSU_AC"
+    assert data["manufacturer"] == "Fujitsu"
+    assert data["state"] == bytes(results.state[: results.bits // 8]).hex()
+    assert data["current_state"]["power"] is True
+    assert data["current_state"]["temperature"] == 24
+    assert data["current_state"]["mode"] == "heat"
+
+
+def test_delta_keeps_the_rest_of_the_state(client):
+    device_id = client.post("/api/devices", json={"tuya_code": FUJITSU_CODE}).json()["device_id"]
+
+    response = client.patch(f"/api/devices/{device_id}", json={"fan": "low"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["current_state"]["fan"] == "low"
+    assert data["current_state"]["temperature"] == 24
+
+    # The returned code carries the full new state.
+    results = _decode(data["tuya_code"])
+    assert results.decode_type == decode_type_t.FUJITSU_AC
+    assert bytes(results.state[: results.bits // 8]).hex() == data["state"]
+
+    data = client.patch(
+        f"/api/devices/{device_id}", json={"temperature": 20, "swing": "vertical"}
+    ).json()
+    assert data["current_state"]["fan"] == "low"
+    assert data["current_state"]["temperature"] == 20
+    assert data["current_state"]["swing"] == "vertical"
+
+
+def test_delta_matches_generated_command(client):
+    # Seeded from a generated command, a delta lands on the generated code
+    # for the same settings.
+    generated = _generator.generate_commands(decode_type_t.FUJITSU_AC, [])
+    commands = {c.name: c.tuya_code for c in generated}
+    device_id = client.post(
+        "/api/devices", json={"tuya_code": commands["24_cool_auto"]}
+    ).json()["device_id"]
+
+    data = client.patch(
+        f"/api/devices/{device_id}", json={"temperature": 20, "fan": "high", "power": True}
+    ).json()
+    assert data["tuya_code"] == commands["20_cool_high"]
+
+
+def test_temperature_and_mode_delta(client):
+    # Gree's Auto locks the temperature; one delta leaving it for Cool sets
+    # the new temperature, not the locked one.
+    generated = _generator.generate_commands(decode_type_t.GREE, [])
+    commands = {c.name: c.tuya_code for c in generated}
+    device_id = client.post(
+        "/api/devices", json={"tuya_code": commands["24_auto_med"]}
+    ).json()["device_id"]
+
+    data = client.patch(
+        f"/api/devices/{device_id}", json={"temperature": 20, "mode": "cool"}
+    ).json()
+    assert data["current_state"]["temperature"] == 20
+    assert data["current_state"]["mode"] == "cool"
+    assert data["tuya_code"] == commands["20_cool_med"]
+
+
+def test_invalid_delta_is_rejected_without_changing_state(client):
+    created = client.post("/api/devices", json={"tuya_code": FUJITSU_CODE}).json()
+    device_id = created["device_id"]
+
+    assert client.patch(f"/api/devices/{device_id}", json={"fan": "turbo"}).status_code == 400
+    delta = {"fan": "low", "temperature": 99}
+    assert client.patch(f"/api/devices/{device_id}", json=delta).status_code == 400
+    assert device_sessions.store.get(device_id).current_state() == created["current_state"]
+
+
+def test_unknown_device_is_404(client):
+    assert client.patch("/api/devices/nope", json={"power": False}).status_code == 404
+
+
+def test_unrecognized_code_is_400(client):
+    # A short burst of uniform pulses matches no protocol.
+    from app.core.tuya_encoder import encode_ir
+
+    response = client.post("/api/devices", json={"tuya_code": encode_ir([500] * 20)})
+    assert response.status_code == 400
+
+
+def test_lru_evicts_and_restores_from_sqlite(tmp_path):
+    store = DeviceSessionStore(2, tmp_path / "sessions.sqlite3")
+    ids = [store.create(FUJITSU_CODE).device_id for _ in range(3)]
+    assert len(store) == 2
+
+    store.apply(ids[1], temperature=18)
+    # The first session was evicted from memory but is rebuilt from SQLite.
+    assert store.get(ids[0]).current_state()["temperature"] == 24
+
+    reopened = DeviceSessionStore(2, tmp_path / "sessions.sqlite3")
+    assert reopened.get(ids[1]).current_state()["temperature"] == 18
+
+
+def test_memory_only_store_forgets_evicted_sessions():
+    store = DeviceSessionStore(1, None)
+    first = store.create(FUJITSU_CODE).device_id
+    store.create(FUJITSU_CODE)
+    with pytest.raises(KeyError):
+        store.get(first)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for batch decoding (ir_batch.py): decodeBatch must give every capture
+of a corpus the same result decode() does, whether its frames are matched
+for the whole batch at once (NumPy) or one at a time, and flag the captures
+whose frames it matched one at a time.
+"""
+
+import random
+
+import pytest
+
+from app.core.ir_protocols import decode, decode_results, decode_type_t, ir_batch
+from app.core.ir_protocols.ir_batch import decodeBatch
+from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir
+from app.services.command_generator import _generator, encode_state
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def batch(request, monkeypatch):
+    """decodeBatch() with NumPy, and without it."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ir_batch, "np", None)
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Known good codes, a few states of each registered protocol, and damaged copies."""
+    rng = random.Random(48)
+    captures = [
+        list(decode_ir(code)) for codes in ALL_KNOWN_GOOD_CODES.values() for code in codes.values()
+    ]
+    for meta in _generator.registry._protocols.values():
+        for temp in range(meta.min_temp, meta.max_temp + 1, 3):
+            try:
+                ac = meta.ac_class()
+                getattr(ac, meta.set_temp_method)(temp)
+                state = getattr(ac, meta.get_raw_method)()
+                captures.append(list(decode_ir(encode_state(meta, state))))
+            except (AttributeError, TypeError):  # Registered, but can't generate codes yet
+                break
+    damaged = []
+    for timings in captures:
+        kind = rng.randrange(4)
+        if kind == 1:  # Skewed, for decode() to normalize
+            damaged.append([int(t * 1.15) for t in timings])
+        elif kind == 2:  # Truncated
+            damaged.append(timings[: rng.randrange(10, len(timings))])
+        elif kind == 3:  # One duration corrupted
+            timings = list(timings)
+            timings[rng.randrange(len(timings))] = rng.randrange(100, 9000)
+            damaged.append(timings)
+    return captures + damaged
+
+
+def _decoded(results):
+    nbytes = results.bits // 8 if results.decode_type else 0
+    return (
+        decode_type_t(results.decode_type),
+        results.bits,
+        results.value,
+        results.address,
+        results.command,
+        results.state[:nbytes],
+        results.timing_skew is not None,
+    )
+
+
+def _decode(timings):
+    results = decode_results()
+    results.rawbuf = list(timings)
+    results.rawlen = len(timings)
+    decode(results)
+    return results
+
+
+@pytest.fixture(scope="module")
+def expected(corpus):
+    return [_decoded(_decode(timings)) for timings in corpus]
+
+
+def test_agrees_with_decode(batch, corpus, expected):
+    batched = decodeBatch(corpus)
+    assert [_decoded(r) for r in batched] == expected
+    assert sum(bool(r.decode_type) for r in batched) > len(corpus) // 4
+    if batch == "fallback":
+        assert all(r.fallback for r in batched)
+    else:
+        # Only the captures decode() normalized had frames matched one at a time.
+        assert any(r.fallback for r in batched)
+        assert all(r.fallback == (r.timing_skew is not None) for r in batched)
+
+
+def test_batches_of_any_size(batch, corpus, expected, monkeypatch):
+    monkeypatch.setattr(ir_batch, "kBatchSize", 7)
+    assert [_decoded(r) for r in decodeBatch(corpus[:20])] == expected[:20]
+    assert decodeBatch([]) == []
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for layout inference of unknown protocols (ir_infer.py): the inferred
+layout must read back the bytes it was inferred from, and re-send them with
+changed bytes and recomputed checksums.
+"""
+
+import random
+
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode_results
+from app.core.ir_protocols.ir_infer import (
+    applyChecksums,
+    checksum_t,
+    clusterDurations,
+    inferProtocol,
+    matchInferred,
+    sendInferred,
+)
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    packTimings,
+    sendFrame,
+)
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import encode_ir
+from app.services.command_generator import _generator
+from index import app
+
+client = TestClient(app)
+
+kUnknownLayout = frame_layout_t(
+    timing=bit_timing_t(560, 1690, 560, 560),
+    sections=(
+        frame_section_t(nbytes=6, hdrmark=6000, hdrspace=7400, footermark=560, gap=20000),
+    ),
+)
+kUnknownState = [0x12, 0x34, 0x56, 0x78, 0x9A, 0xAE]  # Last byte: sum of the rest.
+
+
+def _results(timings):
+    results = decode_results()
+    results.rawbuf = list(timings)
+    results.rawlen = len(results.rawbuf)
+    return results
+
+
+def _jitter(timings, seed=1, amount=40):
+    rng = random.Random(seed)
+    return [t + rng.randint(-amount, amount) for t in timings]
+
+
+def test_unknown_protocol():
+    timings = _jitter(sendFrame(kUnknownLayout, kUnknownState, 6))
+    inferred = inferProtocol(timings)
+    assert inferred is not None
+    assert inferred.encoding == "pulse_distance"
+    assert list(inferred.state) == kUnknownState
+    assert inferred.checksums == (checksum_t("sum8", 0, 5),)
+    timing = inferred.layout.timing
+    assert not timing.MSBfirst
+    assert abs(timing.onespace - 1690) < 40 and abs(timing.zerospace - 560) < 40
+    (section,) = inferred.layout.sections
+    assert section.nbytes == 6
+    assert abs(section.hdrmark - 6000) <= 40 and abs(section.gap - 20000) <= 40
+    assert matchInferred(_results(timings), inferred) == kUnknownState
+
+
+def test_bit_order_follows_the_checksum():
+    layout = frame_layout_t(
+        timing=bit_timing_t(560, 1690, 560, 560, MSBfirst=True),
+        sections=kUnknownLayout.sections,
+    )
+    inferred = inferProtocol(_jitter(sendFrame(layout, kUnknownState, 6)))
+    assert inferred.layout.timing.MSBfirst
+    assert list(inferred.state) == kUnknownState
+
+
+def test_flipping_a_byte_recomputes_the_checksum():
+    inferred = inferProtocol(_jitter(sendFrame(kUnknownLayout, kUnknownState, 6)))
+    state = list(inferred.state)
+    state[2] = 0x57
+    timings = sendInferred(inferred, state)
+    expected = state[:5] + [sum(state[:5]) & 0xFF]
+    assert applyChecksums(inferred, state) == expected
+    assert matchInferred(_results(timings), inferred) == expected
+    assert timings == sendFrame(inferred.layout, expected, 6)
+
+
+def test_pulse_width():
+    layout = frame_layout_t(
+        timing=bit_timing_t(1200, 600, 600, 600),
+        sections=(frame_section_t(nbytes=4, hdrmark=2400, hdrspace=600, footermark=600),),
+    )
+    state = [0xA5, 0x0F, 0x33, 0xC1]
+    inferred = inferProtocol(_jitter(sendFrame(layout, state, 4)))
+    assert inferred.encoding == "pulse_width"
+    assert list(inferred.state) == state
+
+
+def test_inverted_sections_and_odd_bits():
+    layout = frame_layout_t(
+        timing=bit_timing_t(500, 1500, 500, 500),
+        sections=(
+            frame_section_t(nbytes=3, hdrmark=4400, hdrspace=4400, inverted=True),
+            frame_section_t(bits=5, value=0b10110, footermark=500, gap=8000),
+            frame_section_t(hdrmark=4400, hdrspace=4400, footermark=500, gap=30000),
+        ),
+    )
+    state = [0xB2, 0x4D, 0x1F, 0x6E, 0x01]
+    timings = sendFrame(layout, state, len(state))
+    inferred = inferProtocol(timings)
+    assert list(inferred.state) == state
+    sections = inferred.layout.sections
+    assert sections[0].inverted and sections[0].nbytes == 3
+    assert (sections[1].bits, sections[1].value) == (5, 0b10110)
+    assert sections[2].nbytes == 2
+    assert sendInferred(inferred) == timings
+
+
+def test_split_gaps_are_joined():
+    layout = frame_layout_t(
+        timing=kUnknownLayout.timing,
+        sections=(
+            frame_section_t(nbytes=3, hdrmark=6000, hdrspace=7400, footermark=560, gap=100000),
+            frame_section_t(hdrmark=6000, hdrspace=7400, footermark=560),
+        ),
+    )
+    state = [0x01, 0x02, 0x03, 0x04, 0x05, 0x06]
+    inferred = inferProtocol(list(packTimings(sendFrame(layout, state, 6))))
+    assert list(inferred.state) == state
+    assert inferred.layout.sections[0].gap == 100000
+
+
+def test_registered_protocols():
+    # Every sender's output must be read back, as it was inferred, by both
+    # the original timings and the inferred layout's own.
+    checked = 0
+    for meta in _generator.registry._protocols.values():
+        state = getattr(meta.ac_class(), meta.get_raw_method)()
+        if isinstance(state, int):
+            continue
+        try:
+            timings = meta.send_function(list(state), len(state))
+        except TypeError:
+            continue  # Broken registration.
+        inferred = inferProtocol(timings)
+        assert inferred is not None, meta.protocol_name
+        assert inferred.nbytes == len(state), meta.protocol_name
+        expected = list(inferred.state)
+        assert matchInferred(_results(timings), inferred) == expected, meta.protocol_name
+        resent = sendInferred(inferred)
+        assert matchInferred(_results(resent), inferred) == expected, meta.protocol_name
+        checked += 1
+    assert checked >= 15
+
+
+def test_not_a_message():
+    assert inferProtocol([]) is None
+    assert inferProtocol([9000, 4500, 560, 560, 560]) is None
+    rng = random.Random(5)
+    assert inferProtocol([rng.randint(200, 20000) for _ in range(200)]) is None
+
+
+def test_cluster_durations():
+    clusters, lookup = clusterDurations([390, 420, 446, 1173, 1190, 1574])
+    assert [(c.count, c.mean) for c in clusters] == [(3, 419), (2, 1182), (1, 1574)]
+    assert lookup[446] == 0 and lookup[1574] == 2
+
+
+def test_identify_infers_unknown_codes():
+    code = encode_ir(_jitter(sendFrame(kUnknownLayout, kUnknownState, 6)))
+    response = client.post("/api/identify", json={"tuya_code": code})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["protocol"] == "UNKNOWN"
+    inferred = data["inferred"]
+    assert inferred["encoding"] == "pulse_distance"
+    assert inferred["state"] == kUnknownState
+    assert inferred["checksums"] == [{"kind": "sum8", "start": 0, "index": 5}]
+    assert inferred["sections"][0]["nbytes"] == 6
+    assert inferred["tuya_code"]
+
+    response = client.post(
+        "/api/identify", json={"tuya_code": FUJITSU_KNOWN_GOOD_CODES["24C_High"]}
+    )
+    assert response.json()["inferred"] is None
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Tests for the frame-layout interpreters (ir_layout.py) and the protocols
+migrated to them: sendFrame must give the same timings as the sendGeneric()
+calls it replaced, and matchFrame must decode what sendFrame sends.
+"""
+
+import random
+from array import array
+
+import pytest
+
+from app.core.ir_protocols import (
+    amcor,
+    argo,
+    corona,
+    daikin,
+    decode_results,
+    electra,
+    fujitsu,
+    gree,
+    haier,
+    hitachi,
+    mirage,
+    mitsubishi,
+    neoclima,
+    panasonic,
+    samsung,
+    toshiba,
+)
+from app.core.ir_protocols.coolix import (
+    decodeCOOLIX,
+    kCoolixLayout,
+    kCoolixOneSpace,
+    kCoolixZeroSpace,
+    sendCOOLIX,
+)
+from app.core.ir_protocols.ir_layout import (
+    bit_timing_t,
+    frame_layout_t,
+    frame_section_t,
+    frameLength,
+    matchFrame,
+    matchFrames,
+    packFrame,
+    packFrames,
+    sendFrame,
+    writeFrame,
+)
+from app.core.ir_protocols import ir_layout
+from app.core.ir_protocols.ir_send import sendData, sendGeneric
+from app.core.tuya_encoder import encode_ir
+from app.services.command_generator import (
+    _generator,
+    _prepare_timings_for_tuya,
+    encode_state,
+    encode_states,
+)
+
+kTiming = bit_timing_t(500, 1500, 500, 500)
+kLayout = frame_layout_t(
+    timing=kTiming,
+    sections=(
+        frame_section_t(nbytes=2, hdrmark=9000, hdrspace=4500, footermark=500, gap=8000),
+        frame_section_t(bits=3, value=0b010),
+        frame_section_t(hdrmark=500, hdrspace=20000, footermark=500, gap=20000),
+    ),
+    repeatgap=40000,
+)
+
+
+def _results(timings):
+    results = decode_results()
+    results.rawbuf = [0] + list(timings)
+    results.rawlen = len(results.rawbuf)
+    return results
+
+
+def _states(nbytes, n=20):
+    rng = random.Random(nbytes)
+    for _ in range(n):
+        yield [rng.getrandbits(8) for _ in range(nbytes)]
+
+
+class TestSendFrame:
+    def test_matches_the_equivalent_send_generic_calls(self):
+        for state in _states(6):
+            expected = []
+            for r in range(3):
+                expected += sendGeneric(9000, 4500, 500, 1500, 500, 500, 500, 8000, state, 2, False)
+                expected += sendData(500, 1500, 500, 500, 0b010, 3, False)
+                expected += sendGeneric(
+                    500, 20000, 500, 1500, 500, 500, 500, 20000, state[2:], 4, False
+                )
+                if r < 2:
+                    expected.append(40000)
+            assert sendFrame(kLayout, state, 6, 2) == expected
+
+    @pytest.mark.parametrize("MSBfirst", [True, False])
+    def test_byte_table_matches_send_data(self, MSBfirst):
+        layout = frame_layout_t(
+            timing=bit_timing_t(400, 1200, 600, 300, MSBfirst),
+            sections=(frame_section_t(),),
+        )
+        for byte in range(256):
+            assert sendFrame(layout, [byte], 1) == sendData(400, 1200, 600, 300, byte, 8, MSBfirst)
+
+    def test_inverted_section(self):
+        layout = frame_layout_t(
+            timing=bit_timing_t(500, 1500, 500, 500, True),
+            sections=(frame_section_t(inverted=True, footermark=500),),
+        )
+        expected = []
+        for byte in (0x12, 0xF0):
+            expected += sendData(500, 1500, 500, 500, byte, 8, True)
+            expected += sendData(500, 1500, 500, 500, byte ^ 0xFF, 8, True)
+        assert sendFrame(layout, [0x12, 0xF0], 2) == expected + [500]
+
+    def test_rest_section_with_nothing_left(self):
+        # A "rest of the state" section with no bytes left still sends its
+        # header and footer, as sendGeneric() did.
+        assert sendFrame(kLayout, [0, 0], 2)[-4:] == [500, 20000, 500, 20000]
+
+
+class TestPackFrame:
+    @pytest.mark.parametrize(
+        "layout",
+        [kLayout, kCoolixLayout, daikin.kDaikinLayout, daikin.kDaikinShortLayout],
+        ids=["generic", "coolix", "daikin", "daikin_short"],
+    )
+    def test_matches_send_frame(self, layout):
+        for state in _states(35, 5):
+            for nbytes in (3, 19, 35):
+                for repeat in (0, 2):
+                    expected = [min(t, 0xFFFF) for t in sendFrame(layout, state, nbytes, repeat)]
+                    assert frameLength(layout, nbytes, repeat) == len(expected)
+                    buf = packFrame(layout, state, nbytes, repeat)
+                    assert buf.typecode == "H"
+                    assert buf.tolist() == expected
+
+    def test_short_data(self):
+        # Fewer state bytes than nbytes: send what there is, like sendFrame().
+        assert packFrame(kLayout, [1, 2, 3], 6).tolist() == sendFrame(kLayout, [1, 2, 3], 6)
+
+    def test_write_at_an_offset(self):
+        first, second = [1, 2, 3, 4, 5, 6], [6, 5, 4, 3, 2, 1]
+        buf = array("H", bytes(2 * 2 * frameLength(kLayout, 6)))
+        end = writeFrame(buf, 0, kLayout, first, 6)
+        assert writeFrame(buf, end, kLayout, second, 6) == len(buf)
+        assert buf.tolist() == sendFrame(kLayout, first, 6) + sendFrame(kLayout, second, 6)
+
+    def test_encode_ir_takes_the_buffer(self):
+        state = list(daikin.IRDaikin().getRaw())
+        buf = packFrame(daikin.kDaikinLayout, state, len(state))
+        assert encode_ir(buf) == encode_ir(buf.tolist())
+
+    def test_registered_layouts_match_their_send_functions(self):
+        registered = [m for m in _generator.registry._protocols.values() if m.frame_layout]
+        assert len(registered) >= 15
+        for meta in registered:
+            state = getattr(meta.ac_class(), meta.get_raw_method)()
+            legacy = _prepare_timings_for_tuya(meta.send_function(state, len(state)))
+            assert encode_state(meta, state) == encode_ir(legacy), meta.protocol_name
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def batch(request, monkeypatch):
+    """packFrames() with NumPy, and with its pure-Python fallback."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(ir_layout, "np", None)
+    return request.param
+
+
+class TestPackFrames:
+    def test_matches_pack_frame(self, batch):
+        inverted = frame_layout_t(
+            timing=bit_timing_t(500, 1500, 500, 500, True),
+            sections=(frame_section_t(nbytes=2, inverted=True, footermark=500, gap=9000),),
+        )
+        for layout in (kLayout, inverted, kCoolixLayout, daikin.kDaikinLayout):
+            states = list(_states(35, 8))
+            for nbytes in (None, 3, 19, 35):
+                for repeat in (0, 2):
+                    expected = [
+                        packFrame(layout, state, len(state) if nbytes is None else nbytes, repeat)
+                        for state in states
+                    ]
+                    assert packFrames(layout, states, nbytes, repeat) == expected
+
+    def test_registered_layouts(self, batch):
+        registered = [m for m in _generator.registry._protocols.values() if m.frame_layout]
+        for meta in registered:
+            state = bytes(getattr(meta.ac_class(), meta.get_raw_method)())
+            states = [state] + [bytes(s) for s in _states(len(state))]
+            codes = encode_states(meta, states)
+            assert codes == [encode_state(meta, s) for s in states], meta.protocol_name
+
+    def test_states_of_different_lengths(self, batch):
+        states = [[1, 2, 3, 4, 5, 6], [1, 2, 3], [6, 5, 4, 3, 2, 1]]
+        expected = [packFrame(kLayout, state, len(state)) for state in states]
+        assert packFrames(kLayout, states) == expected
+        assert packFrames(kLayout, []) == []
+
+
+class TestMatchFrame:
+    def test_round_trip(self):
+        for state in _states(6):
+            results = _results(sendFrame(kLayout, state, 6))
+            assert matchFrame(results, 1, kLayout, 6) == results.rawlen - 1
+            assert list(results.state[:6]) == state
+
+    def test_state_is_written_in_place(self):
+        state = list(range(6))
+        results = _results(sendFrame(kLayout, state, 6))
+        save = [0xAA] * 8
+        assert matchFrame(results, 1, kLayout, 6, state=save)
+        assert save == state + [0xAA, 0xAA]
+
+    def test_constant_sections_are_verified(self):
+        bad = frame_layout_t(
+            timing=kTiming,
+            sections=(kLayout.sections[0], frame_section_t(bits=3, value=0b111))
+            + kLayout.sections[2:],
+        )
+        results = _results(sendFrame(bad, [1, 2, 3, 4, 5, 6], 6))
+        assert not matchFrame(results, 1, kLayout, 6)
+
+    def test_timing_mismatch_fails(self):
+        timings = sendFrame(kLayout, [1, 2, 3, 4, 5, 6], 6)
+        timings[0] = 3000  # Not a header mark.
+        assert not matchFrame(_results(timings), 1, kLayout, 6)
+
+    def test_inverted_bytes_are_checked_when_strict(self):
+        timings = sendCOOLIX(0xB2BF50, 24)
+        results = _results(timings)
+        assert decodeCOOLIX(results, 1)
+        assert results.value == 0xB2BF50
+        # Corrupt the inverted copy of the first byte: 0x4D -> 0x4C.
+        corrupt = list(timings)
+        space = 2 + 2 * 15 + 1  # The space of the inverted byte's last bit.
+        assert corrupt[space] == kCoolixOneSpace
+        corrupt[space] = kCoolixZeroSpace
+        assert not decodeCOOLIX(_results(corrupt), 1)
+        assert decodeCOOLIX(_results(corrupt), 1, strict=False)
+
+
+def _protocol_cases():
+    return [
+        ("fujitsu", fujitsu.IRFujitsuAC, fujitsu.sendFujitsuAC, None, 16),
+        ("gree", gree.IRGreeAC, gree.sendGree, gree.decodeGree, 8),
+        (
+            "panasonic",
+            panasonic.IRPanasonicAc,
+            panasonic.sendPanasonicAC,
+            panasonic.decodePanasonicAC,
+            27,
+        ),
+        ("hitachi", hitachi.IRHitachiAc, hitachi.sendHitachiAC, hitachi.decodeHitachiAC, 28),
+        ("toshiba", toshiba.IRToshibaAC, toshiba.sendToshibaAC, toshiba.decodeToshibaAC, 9),
+        ("haier", haier.IRHaierAC, haier.sendHaierAC, haier.decodeHaierAC, 9),
+        ("haier176", haier.IRHaierAC176, haier.sendHaierAC176, haier.decodeHaierAC176, 22),
+        ("corona", corona.IRCoronaAc, corona.sendCoronaAc, corona.decodeCoronaAc, 21),
+        ("argo", argo.IRArgoAC, argo.sendArgo, argo.decodeArgo, 12),
+        ("amcor", amcor.IRAmcorAc, amcor.sendAmcor, amcor.decodeAmcor, 8),
+        ("electra", electra.IRElectraAc, electra.sendElectraAC, electra.decodeElectraAC, 13),
+        ("mirage", mirage.IRMirageAc, mirage.sendMirage, mirage.decodeMirage, 15),
+        ("neoclima", neoclima.IRNeoclimaAc, neoclima.sendNeoclima, neoclima.decodeNeoclima, 12),
+        ("daikin", daikin.IRDaikin, daikin.sendDaikin, daikin.decodeDaikin, 35),
+        ("daikin216", daikin.IRDaikin216, daikin.sendDaikin216, daikin.decodeDaikin216, 27),
+        ("samsung", samsung.IRSamsungAc, samsung.sendSamsungAC, samsung.decodeSamsungAC, 14),
+    ]
+
+
+class TestMigratedProtocols:
+    @pytest.mark.parametrize(
+        "name,cls,send,decode,nbytes", _protocol_cases(), ids=[c[0] for c in _protocol_cases()]
+    )
+    def test_strict_round_trip(self, name, cls, send, decode, nbytes):
+        state = list(cls().getRaw())[:nbytes]
+        timings = send(state, nbytes)
+        if decode is None:
+            assert fujitsu.IRFujitsuAC.validChecksum(bytearray(state), nbytes)
+            return
+        results = _results(timings)
+        assert decode(results, 1)
+        assert list(results.state[:nbytes]) == state
+
+    def test_mitsubishi_round_trip_with_repeat(self):
+        state = list(mitsubishi.IRMitsubishiAc().getRaw())
+        timings = mitsubishi.sendMitsubishiAC(state, 18)
+        results = _results(timings + timings)
+        assert mitsubishi.decodeMitsubishiAC(results, 1)
+        assert list(results.state[:18]) == state
+        assert not mitsubishi.decodeMitsubishiAC(_results(timings), 1)
+
+    def test_daikin_legacy_short_message(self):
+        state = list(daikin.IRDaikin().getRaw())[8:]
+        timings = daikin.sendDaikin(state, daikin.kDaikinStateLengthShort)
+        results = _results(timings)
+        assert daikin.decodeDaikin(results, 1, daikin.kDaikinBitsShort, strict=False)
+        assert list(results.state[: len(state)]) == state
+
+    def test_panasonic_second_section_is_stored(self):
+        # Section 2 used to be decoded into a copy of the state and lost.
+        state = list(panasonic.IRPanasonicAc().getRaw())
+        results = _results(panasonic.sendPanasonicAC(state, 27))
+        assert panasonic.decodePanasonicAC(results, 1)
+        assert results.state[8:10] == [0x02, 0x20]
+
+    def test_repeats_are_separated_by_the_message_gap(self):
+        state = list(panasonic.IRPanasonicAc().getRaw())
+        once = panasonic.sendPanasonicAC(state, 27)
+        assert panasonic.sendPanasonicAC(state, 27, 1) == (
+            once + [panasonic.kPanasonicAcMessageGap] + once
+        )
+
+    def test_corona_short_message_is_one_section(self):
+        state = list(corona.IRCoronaAc().getRaw())
+        full = corona.sendCoronaAc(state, 21)
+        short = corona.sendCoronaAc(state, 7)
+        assert full[: len(short)] == short
+        assert len(full) == 3 * len(short)
+
+
+class TestMatchFrames:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    def _captures(self, layout, nbytes):
+        rng = random.Random(nbytes)
+        captures = []
+        for state in _states(nbytes, 30):
+            timings = sendFrame(layout, state, nbytes, rng.choice([0, 1]))
+            kind = rng.randrange(4)
+            if kind == 1:  # Skewed, some in & some out of tolerance
+                timings = [int(t * rng.uniform(0.8, 1.2)) for t in timings]
+            elif kind == 2:  # Truncated
+                timings = timings[: rng.randrange(len(timings))]
+            elif kind == 3:  # One duration corrupted
+                timings[rng.randrange(len(timings))] = rng.randrange(5000)
+            captures.append(timings)
+        return captures
+
+    @pytest.mark.parametrize(
+        "layout",
+        [kLayout, kCoolixLayout, daikin.kDaikinLayout, gree.kGreeLayout, hitachi.hitachiAcLayout()],
+        ids=["generic", "coolix", "daikin", "gree", "hitachi"],
+    )
+    def test_matches_match_frame(self, numpy, layout):
+        for nbytes in (3, 8, 19, 35):
+            captures = self._captures(layout, nbytes)
+            raw = numpy.zeros((len(captures), max(map(len, captures)) + 1), dtype=numpy.int64)
+            for row, timings in enumerate(captures):
+                raw[row, : len(timings)] = timings
+            lengths = [len(timings) for timings in captures]
+            for tolerance, atleast, strict in [(None, None, True), (40, False, False)]:
+                used, states = matchFrames(
+                    raw, lengths, 0, layout, nbytes, tolerance, atleast, strict
+                )
+                for row, timings in enumerate(captures):
+                    results = _results(timings)
+                    expected = matchFrame(
+                        results, 1, layout, nbytes, None, tolerance, atleast, strict
+                    )
+                    assert used[row] == expected
+                    if expected:
+                        assert states[row].tolist() == results.state[: states.shape[1]]
+
+    def test_inverted_and_constant_sections(self, numpy):
+        layout = frame_layout_t(
+            timing=bit_timing_t(500, 1500, 500, 500, True),
+            sections=(
+                frame_section_t(nbytes=2, inverted=True, hdrmark=9000, hdrspace=4500),
+                frame_section_t(bits=3, value=0b010, footermark=500, gap=20000),
+            ),
+        )
+        good = sendFrame(layout, [0x12, 0xF0], 2)
+        not_inverted = list(good)
+        not_inverted[2 + 16 + 1] = 500  # First bit of ~0x12 (0xED) sent as a zero
+        wrong_constant = list(good)
+        wrong_constant[2 + 64 + 1] = 1500  # First bit of the constant sent as a one
+        captures = [good, not_inverted, wrong_constant]
+        raw = numpy.array(captures)
+        used, states = matchFrames(raw, [len(good)] * 3, 0, layout, 2)
+        assert used.tolist() == [len(good), 0, 0]
+        assert states[0].tolist() == [0x12, 0xF0]
+        used, _ = matchFrames(raw, [len(good)] * 3, 0, layout, 2, strict=False)
+        assert used.tolist() == [len(good), len(good), 0]
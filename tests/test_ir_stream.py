@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental decoding (ir_stream.py) and the /ws/capture WebSocket:
+captures streamed in chunks of any size, several to a stream, must decode to
+what decode() makes of each whole capture, and be reported as soon as a
+frame completes them.
+"""
+
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.decode_budget import DecodeBudget
+from app.core.ir_protocols import decode, decode_results, decode_type_t, ir_stream
+from app.core.ir_protocols.fujitsu import kFujitsuAcHdrMark, kFujitsuAcHdrSpace
+from app.core.ir_protocols.ir_stream import kStreamCaptureGap, stream_decoder_t
+from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services import code_index
+from app.services.code_index import CodeIndex, code_fingerprint, load_code_index
+from app.services.command_cache import build_command_cache, load_command_cache
+from app.services.command_generator import CommandInfo, _generator, encode_state
+from index import app
+
+client = TestClient(app)
+
+SILENCE = kStreamCaptureGap + 50000
+
+
+def _capture(tuya_code):
+    """A Tuya code's timings as streamed: ending in a mark, the silence that follows."""
+    timings = list(decode_ir(tuya_code))
+    return timings[: len(timings) - 1 + len(timings) % 2]
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    """Known good codes, and a few states of each registered protocol."""
+    captures = [
+        _capture(code) for codes in ALL_KNOWN_GOOD_CODES.values() for code in codes.values()
+    ]
+    for meta in _generator.registry._protocols.values():
+        for temp in range(meta.min_temp, meta.max_temp + 1, 4):
+            try:
+                ac = meta.ac_class()
+                getattr(ac, meta.set_temp_method)(temp)
+                state = getattr(ac, meta.get_raw_method)()
+                captures.append(_capture(encode_state(meta, state)))
+            except (AttributeError, TypeError):  # Registered, but can't generate codes yet
+                break
+    return captures
+
+
+@pytest.fixture(scope="module")
+def fujitsu_commands():
+    return _generator.generate_commands(decode_type_t.FUJITSU_AC, [])
+
+
+@pytest.fixture
+def fujitsu_capture(fujitsu_commands):
+    return _capture(next(c for c in fujitsu_commands if c.name == "24_cool_auto").tuya_code)
+
+
+def _decoded(results):
+    if results is None:
+        return None
+    return decode_type_t(results.decode_type), results.bits, results.state[: results.bits // 8]
+
+
+def _decode(timings):
+    results = decode_results()
+    results.rawbuf = list(timings)
+    results.rawlen = len(timings)
+    return results if decode(results) else None
+
+
+def _stream(decoder, timings, rng):
+    """Feed timings to decoder in random chunks, then end it."""
+    events, i = [], 0
+    while i < len(timings):
+        n = rng.randint(1, 50)
+        events += decoder.feed(timings[i : i + n])
+        i += n
+    return events + decoder.end()
+
+
+def test_agrees_with_decode(corpus):
+    stream = []
+    for timings in corpus:
+        stream += timings + [SILENCE]
+    events = _stream(stream_decoder_t(), stream, random.Random(50))
+
+    outcomes = [e for e in events if e.kind != "candidates"]
+    assert [e.capture for e in outcomes] == list(range(len(corpus)))
+    expected = [_decoded(_decode(timings)) for timings in corpus]
+    assert [_decoded(e.results) if e.results else None for e in outcomes] == expected
+    assert [e.kind for e in outcomes] == ["decoded" if x else "unknown" for x in expected]
+    assert sum(x is not None for x in expected) > len(corpus) // 3
+
+
+def test_decodes_as_soon_as_a_frame_completes_it(fujitsu_capture):
+    # A message, then its repeat after a gap too short to end the capture.
+    decoder = stream_decoder_t()
+    events = decoder.feed(fujitsu_capture + [20000])
+    assert [e.kind for e in events if e.kind != "candidates"] == ["decoded"]
+    assert events[-1].results.decode_type == decode_type_t.FUJITSU_AC
+    assert events[-1].timings == fujitsu_capture
+
+    # The rest of the capture is skipped; the next one is decoded again.
+    assert decoder.feed(fujitsu_capture) == []
+    assert decoder.feed([SILENCE]) == []
+    events = decoder.feed(fujitsu_capture) + decoder.end()
+    assert [(e.kind, e.capture) for e in events if e.kind != "candidates"] == [("decoded", 1)]
+
+
+def test_candidates_narrow_as_the_header_arrives():
+    decoder = stream_decoder_t()
+    events = decoder.feed([kFujitsuAcHdrMark])
+    events += decoder.feed([kFujitsuAcHdrSpace])
+    assert all(e.kind == "candidates" for e in events)
+    assert "FUJITSU_AC" in events[-1].protocols
+    assert "GREE" not in events[-1].protocols
+    assert len(events[-1].protocols) < len(events[0].protocols)
+
+    # Nothing fits a mark of 20ms, and nothing else is decoded until the capture ends.
+    assert decoder.feed([20000])[-1].protocols == []
+    assert [e.kind for e in decoder.end()] == ["unknown"]
+
+
+def test_budget(fujitsu_capture):
+    decoder = stream_decoder_t(DecodeBudget(max_timings=len(fujitsu_capture) - 1))
+    events = decoder.feed(fujitsu_capture + [SILENCE] + fujitsu_capture[:9]) + decoder.end()
+    outcomes = [(e.kind, e.capture) for e in events if e.kind != "candidates"]
+    assert outcomes == [("error", 0), ("unknown", 1)]
+    assert next(e for e in events if e.kind == "error").error.reason == "too_many_timings"
+
+
+def test_decoder_failures_are_reported(fujitsu_capture, monkeypatch):
+    def broken(results, **kwargs):
+        raise ZeroDivisionError("float division by zero")
+
+    monkeypatch.setattr(ir_stream, "decode", broken)
+    decoder = stream_decoder_t()
+    events = decoder.feed(fujitsu_capture + [SILENCE] + fujitsu_capture) + decoder.end()
+    errors = [e for e in events if e.kind != "candidates"]
+    assert [(e.kind, e.capture) for e in errors] == [("error", 0), ("error", 1)]
+    assert errors[0].error.reason == "decode_failed"
+
+
+def test_fuzz(corpus):
+    """Damaged captures, in random chunks: every capture ends in exactly one outcome."""
+    rng = random.Random(51)
+    for _ in range(200):
+        captures = [list(rng.choice(corpus)) for _ in range(rng.randint(1, 3))]
+        for timings in captures:
+            for _ in range(rng.randint(0, 8)):
+                timings[rng.randrange(len(timings))] = rng.choice(
+                    [0, 1, rng.randint(0, 20000), rng.randint(0, 2 * kStreamCaptureGap)]
+                )
+        stream = [t for timings in captures for t in timings + [SILENCE]]
+        stream = stream[: rng.randint(1, len(stream))]
+        events = _stream(stream_decoder_t(DecodeBudget(max_timings=512)), stream, rng)
+        outcomes = [e.capture for e in events if e.kind != "candidates"]
+        assert outcomes == list(range(len(outcomes)))
+
+
+@pytest.fixture
+def shared_index(monkeypatch, tmp_path):
+    path = tmp_path / "commands.bin"
+    build_command_cache(path, [decode_type_t.FUJITSU_AC])
+    monkeypatch.setattr(code_index, "_index", load_code_index(load_command_cache(path)))
+
+
+def test_websocket_reports_the_command(shared_index, fujitsu_capture):
+    rng = random.Random(3)
+    relearned = [t + rng.randint(-40, 40) for t in fujitsu_capture]
+    with client.websocket_connect("/ws/capture") as ws:
+        ws.send_json({"timings": relearned[:2]})
+        candidates = ws.receive_json()
+        assert candidates["event"] == "candidates"
+        assert "FUJITSU_AC" in candidates["protocols"]
+
+        ws.send_json({"timings": relearned[2:], "end": True})
+        message = ws.receive_json()
+        while message["event"] == "candidates":
+            message = ws.receive_json()
+        assert message["event"] == "decoded"
+        assert message["capture"] == 0
+        assert message["protocol"] == "FUJITSU_AC"
+        assert message["command"] == "24_cool_auto"
+        assert message["command_match"] == "fingerprint"
+
+
+def _described(timings):
+    """The message the WebSocket answers a whole capture with."""
+    with client.websocket_connect("/ws/capture") as ws:
+        ws.send_json({"timings": timings, "end": True})
+        message = ws.receive_json()
+        while message["event"] == "candidates":
+            message = ws.receive_json()
+    return message
+
+
+def _index_as(monkeypatch, timings, state):
+    """An index holding one GREE command, with the fingerprint of these timings."""
+    index = CodeIndex()
+    command = CommandInfo("power_on", "", "AAAA", state)
+    index.add_commands(decode_type_t.GREE, [command], [code_fingerprint(encode_ir(timings))])
+    monkeypatch.setattr(code_index, "_index", index)
+
+
+def test_websocket_prefers_the_decoder(monkeypatch, fujitsu_capture):
+    results = decode_results()
+    results.rawbuf = fujitsu_capture
+    results.rawlen = len(fujitsu_capture)
+    assert decode(results)
+    _index_as(monkeypatch, fujitsu_capture, bytes([1, 2, 3]))
+    message = _described(fujitsu_capture)
+    assert message["event"] == "decoded"
+    assert message["protocol"] == "FUJITSU_AC"
+    assert message["state"] == bytes(results.state[: results.bits // 8]).hex()
+    assert message["command"] is None
+    assert message["command_match"] is None
+
+
+def test_websocket_recognises_undecodable_captures(monkeypatch, fujitsu_capture):
+    # No decoder knows a Fujitsu payload behind a 5 ms header.
+    timings = [5000, 5000] + fujitsu_capture[2:]
+    assert _described(timings)["event"] == "unknown"
+    _index_as(monkeypatch, timings, bytes([1, 2, 3]))
+    message = _described(timings)
+    assert message["event"] == "decoded"
+    assert message["protocol"] == "GREE"
+    assert message["state"] == "010203"
+    assert message["command"] == "power_on"
+    assert message["command_match"] == "fingerprint"
+
+
+def test_websocket_rejects_malformed_messages():
+    with client.websocket_connect("/ws/capture") as ws:
+        for bad in ["not json", "[1, 2]", '{"timings": [1, -2]}', '{"timings": "9000"}']:
+            ws.send_text(bad)
+            message = ws.receive_json()
+            assert message["event"] == "error"
+            assert message["error"] == "invalid_message"
+
+        # The connection carries on.
+        ws.send_json({"timings": [9000, 4500, 560], "end": True})
+        message = ws.receive_json()
+        while message["event"] == "candidates":
+            message = ws.receive_json()
+        assert message == {"event": "unknown", "capture": 0, "frame": 0, "timings": 3}
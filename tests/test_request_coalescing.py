@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing: concurrent identical requests must share one
+computation, results must be kept only for their TTL and within capacity,
+failures must not be cached, and /api/metrics must report the savings.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services import request_coalescing
+from app.services.request_coalescing import RequestCoalescer
+from index import app
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(request_coalescing, "_coalescers", {})
+    return TestClient(app)
+
+
+def _counting(value, release=None):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if release is not None:
+            release.wait(5)
+        return value
+
+    return compute, calls
+
+
+def test_concurrent_requests_share_one_computation():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    compute, calls = _counting("result", release)
+
+    async def burst():
+        tasks = [asyncio.ensure_future(coalescer.run("key", compute)) for _ in range(20)]
+        await asyncio.sleep(0.05)  # Let them all arrive while the first computes
+        release.set()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(burst()) == ["result"] * 20
+    assert len(calls) == 1
+    metrics = coalescer.metrics()
+    assert (metrics["computed"], metrics["coalesced"], metrics["hits"]) == (1, 19, 0)
+    assert metrics["coalesce_rate"] == pytest.approx(0.95)
+    assert metrics["in_flight"] == 0
+
+
+def test_results_are_kept_for_their_ttl():
+    clock = Clock()
+    coalescer = RequestCoalescer(ttl=30, capacity=2, clock=clock)
+    compute, calls = _counting("a")
+
+    assert asyncio.run(coalescer.run("a", compute)) == "a"
+    clock.now = 29
+    assert asyncio.run(coalescer.run("a", compute)) == "a"
+    assert len(calls) == 1
+    clock.now = 61  # Kept 30s from when it was computed
+    asyncio.run(coalescer.run("a", compute))
+    assert len(calls) == 2
+    assert coalescer.metrics()["hit_rate"] == pytest.approx(1 / 3)
+
+    # Least recently used results are dropped beyond capacity.
+    for key in ("b", "c"):
+        asyncio.run(coalescer.run(key, _counting(key)[0]))
+    assert coalescer.metrics()["cached"] == 2
+    asyncio.run(coalescer.run("a", compute))
+    assert len(calls) == 3
+
+    # Without a TTL only in-flight computations are shared.
+    uncached = RequestCoalescer(ttl=0)
+    for _ in range(2):
+        asyncio.run(uncached.run("a", compute))
+    assert len(calls) == 5
+
+
+def test_failures_are_shared_but_not_cached():
+    coalescer = RequestCoalescer()
+    release = threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError("bad code")
+
+    async def burst():
+        tasks = [asyncio.ensure_future(coalescer.run("key", fail)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert all(isinstance(e, ValueError) for e in results)
+    assert len(calls) == 1
+    with pytest.raises(ValueError):
+        asyncio.run(coalescer.run("key", fail))
+    assert len(calls) == 2
+
+
+def test_identify_is_keyed_on_the_decoded_state(client):
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    first = client.post("/api/identify", json={"tuya_code": code})
+    assert first.status_code == 200
+
+    # A re-learned copy with different timings decodes to the same state.
+    relearned = encode_ir([t + 40 for t in decode_ir(code)])
+    assert relearned != code
+    second = client.post("/api/identify", json={"tuya_code": relearned})
+    assert second.json()["commands"] == first.json()["commands"]
+
+    metrics = client.get("/api/metrics").json()["coalescing"]["identify"]
+    assert (metrics["requests"], metrics["computed"], metrics["hits"]) == (2, 1, 1)
+
+
+def test_identify_shares_a_protocols_command_set(client):
+    # Different states of a fully supported protocol have the same command set.
+    codes = [FUJITSU_KNOWN_GOOD_CODES[name] for name in ("24C_High", "OFF")]
+    responses = [client.post("/api/identify", json={"tuya_code": code}) for code in codes]
+    assert responses[0].json()["commands"] == responses[1].json()["commands"]
+
+    metrics = client.get("/api/metrics").json()["coalescing"]["identify"]
+    assert (metrics["requests"], metrics["computed"], metrics["hits"]) == (2, 1, 1)
+
+
+def test_generate_from_manufacturer_is_coalesced(client):
+    responses = [
+        client.post("/api/generate-from-manufacturer", json={"manufacturer": name})
+        for name in ("Fujitsu", " fujitsu ")
+    ]
+    assert responses[0].json() == responses[1].json()
+
+    metrics = client.get("/api/metrics").json()["coalescing"]
+    assert metrics["generate-from-manufacturer"]["computed"] == 1
+    assert metrics["generate-from-manufacturer"]["hit_rate"] == 0.5
+    assert "identify" not in metrics
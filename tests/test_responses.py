@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Tests for the fast command set responses: bodies spliced around pre-encoded
+commands must be what the pydantic response models would have rendered, with
+orjson or the standard library encoder, compressed as the client accepts and
+only once per body, and the OpenAPI schema must still describe them.
+"""
+
+import asyncio
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import responses
+from app.api.identify import IdentifyResponse, InferredProtocol
+from app.api.manufacturers import GenerateResponse
+from app.api.responses import command_set_response, negotiate, prepare_command_set
+from app.core.ir_protocols import decode_type_t
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+from app.services import command_generator, request_coalescing
+from index import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(request_coalescing, "_coalescers", {})
+    return TestClient(app)
+
+
+def _model(model, result, **extra):
+    return model(
+        protocol=result["protocol"],
+        manufacturer=result["manufacturer"],
+        commands=[
+            {"name": cmd.name, "description": cmd.description, "tuya_code": cmd.tuya_code}
+            for cmd in result["commands"]
+        ],
+        min_temperature=result["min_temperature"],
+        max_temperature=result["max_temperature"],
+        operation_modes=result["operation_modes"],
+        fan_modes=result["fan_modes"],
+        confidence=result.get("confidence", 1.0),
+        notes=result.get("notes"),
+        detected_state=result.get("detected_state"),
+        model=result.get("model"),
+        **extra,
+    )
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize(
+    "protocol", [decode_type_t.FUJITSU_AC, decode_type_t.GREE, decode_type_t.NEC]
+)
+def test_bodies_match_the_response_models(monkeypatch, use_orjson, protocol):
+    if use_orjson and responses.orjson is None:
+        pytest.skip("orjson isn't installed")
+    if not use_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    result = command_generator.identify_protocol_and_generate_commands(protocol, [])
+    command_set = prepare_command_set(result)
+
+    body = asyncio.run(command_set_response(command_set)).body
+    assert body == _model(GenerateResponse, result).model_dump_json().encode()
+
+    inferred = InferredProtocol(
+        encoding="pulse_distance", onemark=400, onespace=1200, zeromark=400, zerospace=400,
+        msb_first=False, sections=[], state=[1, 2], checksums=[], tuya_code="AAAA",
+    )  # fmt: skip
+    extra = {"command": "24_cool_auto", "command_match": "code", "inferred": inferred}
+    body = asyncio.run(command_set_response(command_set, **extra)).body
+    expected = _model(IdentifyResponse, result, **extra).model_dump()
+    assert list(json.loads(body).items()) == list(expected.items())  # In field order
+
+
+def test_endpoints_return_the_model_fields(client):
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    response = client.post("/api/identify", json={"tuya_code": code})
+    assert response.headers["content-type"] == "application/json"
+    data = response.json()
+    assert list(data) == list(IdentifyResponse.model_fields)
+    assert data["commands"][0].keys() == {"name", "description", "tuya_code"}
+    # Served from the coalesced result, with a different command recognised.
+    other = client.post("/api/identify", json={"tuya_code": data["commands"][5]["tuya_code"]})
+    assert other.json()["command"] == data["commands"][5]["name"]
+    assert other.json()["commands"] == data["commands"]
+
+    response = client.post("/api/generate-from-manufacturer", json={"manufacturer": "Fujitsu"})
+    assert list(response.json()) == list(GenerateResponse.model_fields)
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        (None, "identity"),
+        ("", "identity"),
+        ("gzip", "gzip"),
+        ("GZIP;q=0.5, identity", "gzip"),
+        ("deflate, gzip;q=0", "identity"),
+        ("*", "gzip"),
+        ("*;q=0.1, gzip;q=0", "identity"),
+        ("gzip;q=oops", "identity"),
+    ],
+)
+def test_negotiate_gzip(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr(responses, "ENCODERS", {"gzip": responses.ENCODERS["gzip"]})
+    assert negotiate(accept_encoding) == expected
+
+
+def test_negotiate_prefers_the_smallest_encoding(monkeypatch):
+    encoders = {name: gzip.compress for name in ("gzip", "br", "zstd")}
+    monkeypatch.setattr(responses, "ENCODERS", encoders)
+    assert negotiate("gzip, deflate, br, zstd") == "zstd"
+    assert negotiate("gzip, br") == "br"
+    assert negotiate("gzip, br;q=0.8") == "gzip"  # The client's weights come first
+
+
+def test_bodies_are_compressed_once(monkeypatch):
+    calls = []
+
+    def counting(body):
+        calls.append(len(body))
+        return gzip.compress(body)
+
+    monkeypatch.setattr(responses, "ENCODERS", {"gzip": counting})
+    result = command_generator.identify_protocol_and_generate_commands(decode_type_t.GREE, [])
+    command_set = prepare_command_set(result)
+
+    plain = asyncio.run(command_set_response(command_set, None, command="a"))
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["Vary"] == "Accept-Encoding"
+
+    repeated = [
+        asyncio.run(command_set_response(command_set, "gzip", command="a")) for _ in range(3)
+    ]
+    assert len(calls) == 1
+    packed = repeated[0]
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(packed.body) == plain.body
+    assert len(packed.body) < len(plain.body) / 2
+    # Each representation is tagged by its content and encoding.
+    assert packed.headers["ETag"] == plain.headers["ETag"][:-1] + '-gzip"'
+    assert {r.headers["ETag"] for r in repeated} == {packed.headers["ETag"]}
+
+    other = asyncio.run(command_set_response(command_set, "gzip", command="b"))
+    assert other.headers["ETag"] != packed.headers["ETag"]
+    assert len(calls) == 2
+
+    # Beyond BODY_VARIANTS bodies, the least recently used are dropped.
+    for i in range(responses.BODY_VARIANTS):
+        asyncio.run(command_set_response(command_set, "gzip", command=str(i)))
+    asyncio.run(command_set_response(command_set, "gzip", command="a"))
+    assert len(calls) == 3 + responses.BODY_VARIANTS
+
+
+def test_endpoints_negotiate_the_encoding(client):
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    plain = client.post(
+        "/api/identify", json={"tuya_code": code}, headers={"Accept-Encoding": "identity"}
+    )
+    assert "content-encoding" not in plain.headers
+    packed = client.post(
+        "/api/identify", json={"tuya_code": code}, headers={"Accept-Encoding": "gzip"}
+    )
+    assert packed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in packed.headers["vary"]
+    assert int(packed.headers["content-length"]) < int(plain.headers["content-length"]) / 2
+    assert packed.json() == plain.json()  # Decompressed by the client
+
+    response = client.post(
+        "/api/generate-from-manufacturer",
+        json={"manufacturer": "Fujitsu"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].endswith('-gzip"')
+
+
+def test_openapi_schema_is_unchanged():
+    paths = app.openapi()["paths"]
+    for path, model in [
+        ("/api/identify", "IdentifyResponse"),
+        ("/api/generate-from-manufacturer", "GenerateResponse"),
+    ]:
+        operation = paths[path]["post"]
+        schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema == {"$ref": f"#/components/schemas/{model}"}
+        assert "parameters" not in operation  # Accept-Encoding isn't documented
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-fork server: workers forked from a warmed master must be
+ready at once and serve requests, a worker that dies must be replaced, and
+SIGTERM must stop them all.
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork") or not os.path.isdir("/proc"), reason="Needs fork() and /proc"
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(url, data, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.status, json.loads(response.read())
+
+
+def _workers(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def _wait(condition, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if condition():
+                return True
+        except (OSError, urllib.error.URLError):
+            pass
+        time.sleep(0.1)
+    return False
+
+
+@pytest.fixture
+def server(tmp_path):
+    port = _free_port()
+    env = dict(
+        os.environ,
+        WARMUP="imports",
+        DEVICE_SESSION_DB=str(tmp_path / "sessions.sqlite3"),
+        CODE_CATALOG_DB=str(tmp_path / "catalog.sqlite3"),
+        SIMILARITY_INDEX_DB=str(tmp_path / "similarity.sqlite3"),
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server", "--workers", "2", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    assert _wait(lambda: _get(f"{base}/api/ready")[0] == 200), "Never got ready"
+    yield process, base
+    if process.poll() is None:
+        process.kill()
+        process.wait()
+
+
+def test_forked_workers_serve_warm(server):
+    process, base = server
+    status, ready = _get(f"{base}/api/ready")
+    assert ready["level"] == "imports"
+    assert ready["stage"] == "done"
+    assert len(_workers(process.pid)) == 2
+
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    for _ in range(4):
+        status, data = _get(f"{base}/api/identify", {"tuya_code": code})
+        assert status == 200 and data["protocol"] == "FUJITSU_AC"
+    # Each worker writes sessions through its own SQLite connection.
+    for _ in range(4):
+        status, data = _get(f"{base}/api/devices", {"tuya_code": code})
+        assert status == 201 and data["device_id"]
+
+
+def test_dead_workers_are_replaced_and_sigterm_stops_all(server):
+    process, base = server
+    first, second = _workers(process.pid)
+    os.kill(first, signal.SIGKILL)
+    assert _wait(lambda: len(set(_workers(process.pid)) - {second}) == 1)
+    assert _get(f"{base}/api/ready")[0] == 200
+
+    workers = _workers(process.pid)
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(30) == 0
+    assert not any(os.path.exists(f"/proc/{pid}") for pid in workers)  # Reaped too
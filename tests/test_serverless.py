@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the serverless entry point: with its bundle, a fresh process must
+serve command sets from the prebuilt artifact and catalog without building
+the protocol registry, and without the bundle it must still serve them,
+generated on demand.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core.ir_protocols import decode_type_t
+from app.services.serverless_bundle import COMMAND_CACHE, CODE_CATALOG, build_bundle
+
+_FUNCTION = """
+import json, sys
+from fastapi.testclient import TestClient
+from app.core.ir_protocols.test_codes import FUJITSU_KNOWN_GOOD_CODES
+import app.serverless as serverless
+from app.services.command_generator import _generator
+from app.settings import settings
+
+client = TestClient(serverless.app)
+identify = client.post("/api/identify", json={"tuya_code": FUJITSU_KNOWN_GOOD_CODES["OFF"]})
+generate = client.post("/api/generate-from-manufacturer", json={"manufacturer": "fujitsu"})
+print(json.dumps({
+    "cached": _generator.cache is not None,
+    "registered": _generator.registry._registered,
+    "read_only": settings.code_catalog_read_only,
+    "identify": [identify.status_code, identify.json()["protocol"],
+                 len(identify.json()["commands"])],
+    "generate": [generate.status_code, len(generate.json()["commands"])],
+    "ready": client.get("/api/ready").status_code,
+}))
+"""
+
+
+@pytest.fixture(scope="module")
+def bundle(tmp_path_factory):
+    path = tmp_path_factory.mktemp("bundle")
+    built = build_bundle(path, [decode_type_t.FUJITSU_AC])
+    assert set(built) == {"FUJITSU_AC"}
+    return path
+
+
+def _run(bundle_path, tmp_path):
+    env = dict(os.environ, SERVERLESS_BUNDLE_PATH=str(bundle_path), TMPDIR=str(tmp_path))
+    output = subprocess.run(
+        [sys.executable, "-c", _FUNCTION], capture_output=True, text=True, env=env, timeout=300
+    )
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def test_bundle_has_artifact_and_catalog(bundle):
+    assert (bundle / COMMAND_CACHE).is_file()
+    assert (bundle / CODE_CATALOG).is_file()
+
+
+def test_cold_start_serves_from_bundle(bundle, tmp_path):
+    result = _run(bundle, tmp_path)
+    assert result["cached"] and result["read_only"]
+    assert result["registered"] is False  # No protocol metadata needed
+    status, protocol, commands = result["identify"]
+    assert status == 200 and protocol == "FUJITSU_AC" and commands > 2
+    assert result["generate"] == [200, commands]
+    assert result["ready"] == 200
+
+
+def test_cold_start_without_bundle_generates(tmp_path):
+    result = _run(tmp_path / "missing", tmp_path)
+    assert not result["cached"]
+    assert result["registered"] is True
+    assert result["identify"][0] == 200 and result["identify"][2] > 2
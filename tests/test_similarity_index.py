@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for the similarity index (POST /api/similar): re-learned codes must find
+the remote they came from among candidates from the LSH buckets, and the
+library must survive a restart.
+"""
+
+import random
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode_type_t
+from app.core.ir_protocols.ir_layout import bit_timing_t, frame_layout_t, frame_section_t, sendFrame
+from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES, FUJITSU_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services import similarity_index
+from app.services.command_generator import _generator
+from app.services.similarity_index import (
+    SimilarityIndex,
+    code_signature,
+    seed_catalog,
+    similarity,
+)
+from index import app
+
+PROTOCOLS = (
+    decode_type_t.FUJITSU_AC,
+    decode_type_t.DAIKIN,
+    decode_type_t.GREE,
+    decode_type_t.SAMSUNG_AC,
+    decode_type_t.MITSUBISHI_AC,
+)
+
+
+@pytest.fixture(scope="module")
+def generated():
+    # Six commands per protocol: five for the library, one to query with.
+    rng = random.Random(1)
+    return {
+        protocol: rng.sample(_generator.generate_commands(protocol, []), 6)
+        for protocol in PROTOCOLS
+    }
+
+
+@pytest.fixture
+def library(generated):
+    index = SimilarityIndex()
+    for protocol, commands in generated.items():
+        for cmd in commands[:5]:
+            index.add(protocol.name, cmd.name, cmd.tuya_code, source="generated")
+    return index
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    index = SimilarityIndex(tmp_path / "similar.sqlite3")
+    seed_catalog(index)
+    monkeypatch.setattr(similarity_index, "_index", index)
+    return TestClient(app)
+
+
+def _relearned(tuya_code, seed=3):
+    rng = random.Random(seed)
+    return encode_ir([t + rng.randint(-60, 60) for t in decode_ir(tuya_code)])
+
+
+def _unknown_remote(rng):
+    # A pulse-distance remote with its own timings and fixed ID bytes.
+    mark = rng.randrange(300, 700)
+    layout = frame_layout_t(
+        timing=bit_timing_t(mark, rng.randrange(1000, 2000), mark, rng.randrange(300, 700)),
+        sections=(
+            frame_section_t(
+                hdrmark=rng.randrange(2000, 9000),
+                hdrspace=rng.randrange(1500, 4500),
+                footermark=mark,
+                gap=20000,
+            ),
+        ),
+    )
+    ident = [rng.randrange(256) for _ in range(4)]
+    return layout, ident
+
+
+def test_relearned_codes_find_their_protocol(library, generated):
+    for protocol, commands in generated.items():
+        matches = library.query(_relearned(commands[5].tuya_code), limit=3)
+        assert matches, protocol.name
+        assert matches[0].protocol == protocol.name.lower()
+        assert matches[0].source == "generated"
+        assert matches[0].similarity > 0.6
+        assert [m.similarity for m in matches] == sorted(
+            (m.similarity for m in matches), reverse=True
+        )
+
+
+def test_queries_only_compare_candidates():
+    rng = random.Random(11)
+    index = SimilarityIndex()
+    remotes = [_unknown_remote(rng) for _ in range(150)]
+    for i, (layout, ident) in enumerate(remotes):
+        for j in range(2):
+            state = ident + [rng.randrange(256) for _ in range(4)]
+            index.add(f"remote{i}", f"code{j}", encode_ir(sendFrame(layout, state, 8)))
+
+    layout, ident = remotes[42]
+    state = ident + [rng.randrange(256) for _ in range(4)]
+    query = _relearned(encode_ir(sendFrame(layout, state, 8)))
+    assert len(index.candidates(code_signature(query))) < len(index) // 4
+    assert index.query(query, limit=1)[0].protocol == "remote42"
+
+
+def test_signatures_are_stable():
+    code = FUJITSU_KNOWN_GOOD_CODES["24C_High"]
+    assert code_signature(code) == code_signature(code)
+    assert similarity(code_signature(code), code_signature(_relearned(code))) > 0.8
+    with pytest.raises(ValueError):
+        code_signature("not a code")
+
+
+def test_replacing_a_code_rebuckets_it(library, generated):
+    fujitsu = generated[decode_type_t.FUJITSU_AC][0]
+    daikin = generated[decode_type_t.DAIKIN][0]
+    size = len(library)
+    library.add("FUJITSU_AC", fujitsu.name, daikin.tuya_code)
+    assert len(library) == size
+    names = [(m.protocol, m.name) for m in library.query(fujitsu.tuya_code, limit=10)]
+    assert ("fujitsu_ac", fujitsu.name) not in names
+
+
+def test_library_is_persisted(tmp_path, generated):
+    path = tmp_path / "similar.sqlite3"
+    index = SimilarityIndex(path)
+    commands = generated[decode_type_t.GREE]
+    for cmd in commands[:5]:
+        index.add("GREE", cmd.name, cmd.tuya_code)
+    query = _relearned(commands[5].tuya_code)
+    expected = index.query(query)
+    index.close()
+
+    reopened = SimilarityIndex(path)
+    assert len(reopened) == 5
+    assert ("gree", commands[0].name) in reopened
+    assert reopened.query(query) == expected
+    reopened.close()
+
+    # Signatures from other index parameters are recomputed, not trusted.
+    with sqlite3.connect(str(path)) as db:
+        db.execute("UPDATE meta SET value = 'old'")
+        db.execute("UPDATE codes SET signature = zeroblob(256)")
+    assert SimilarityIndex(path).query(query) == expected
+
+
+def test_seed_catalog():
+    index = SimilarityIndex()
+    expected = sum(len(codes) for codes in ALL_KNOWN_GOOD_CODES.values())
+    assert seed_catalog(index) == expected
+    assert seed_catalog(index) == 0
+    assert ("fujitsu", "24C_High") in index
+    match = index.query(FUJITSU_KNOWN_GOOD_CODES["24C_High"], limit=1)[0]
+    assert (match.protocol, match.name, match.source) == ("fujitsu", "24C_High", "catalog")
+    assert match.similarity == 1.0
+
+
+def test_similar_endpoint(client, generated):
+    commands = generated[decode_type_t.DAIKIN]
+    for cmd in commands[:2]:
+        response = client.post(
+            "/api/similar/codes",
+            json={"protocol": "Acme_R51", "name": cmd.name, "tuya_code": cmd.tuya_code},
+        )
+        assert response.status_code == 201
+        assert response.json()["protocol"] == "acme_r51"
+
+    response = client.post(
+        "/api/similar", json={"tuya_code": _relearned(commands[5].tuya_code), "limit": 2}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["indexed"] == len(similarity_index._index)
+    assert [m["protocol"] for m in data["matches"]] == ["acme_r51", "acme_r51"]
+
+    assert client.post("/api/similar", json={"tuya_code": "not a code"}).status_code == 400
+    code = commands[0].tuya_code
+    assert client.post("/api/similar", json={"tuya_code": code, "limit": 0}).status_code == 400
+    response = client.post(
+        "/api/similar/codes", json={"protocol": "", "name": "x", "tuya_code": code}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for capture-wide timing skew estimation (ir_skew.py).
+
+Builds a synthetic corpus by taking generated messages for the protocols
+decode() supports, then applying a global clock skew, a mark excess and
+per-timing jitter, and checks that decode() recovers the original protocol
+and state once the pre-pass has normalised the capture.
+"""
+
+import random
+
+import pytest
+
+from app.core.ir_protocols import decode, decode_results, decode_type_t
+from app.core.ir_protocols.ir_skew import (
+    estimateTimingSkew,
+    measureTimingFeatures,
+    normalizeTimings,
+    timing_skew_t,
+)
+from app.core.ir_protocols.test_codes import ALL_KNOWN_GOOD_CODES
+from app.core.tuya_encoder import decode_ir
+from app.services.command_generator import _generator, _prepare_timings_for_tuya
+
+# Protocols whose generated messages round-trip through decode().
+CORPUS_PROTOCOLS = [
+    decode_type_t.FUJITSU_AC,
+    decode_type_t.PANASONIC_AC,
+    decode_type_t.HITACHI_AC,
+    decode_type_t.HAIER_AC176,
+    decode_type_t.DAIKIN,
+    decode_type_t.DAIKIN216,
+    decode_type_t.GREE,
+    decode_type_t.SAMSUNG_AC,
+]
+
+# (scale, mark excess in uSeconds)
+SKEWS = [(0.8, 0), (1.2, 0), (0.85, 80), (1.15, -60), (1.0, 150), (1.12, 50)]
+
+JITTER = 0.02  # 2% standard deviation per timing
+
+
+def _nominal_timings(protocol_type):
+    meta = _generator.registry.get(protocol_type)
+    ac = meta.ac_class()
+    getattr(ac, meta.set_temp_method)(24)
+    getattr(ac, meta.set_power_method)(True)
+    state = getattr(ac, meta.get_raw_method)()
+    return _prepare_timings_for_tuya(meta.send_function(state, len(state)))
+
+
+def _skew(timings, scale, excess, rng):
+    """Apply a clock skew, mark excess and jitter to nominal timings."""
+    return [
+        max(1, int(t * scale * rng.gauss(1.0, JITTER) + (excess if i % 2 == 0 else -excess)))
+        for i, t in enumerate(timings)
+    ]
+
+
+def _decode(timings, normalize=True):
+    results = decode_results()
+    results.rawbuf = list(timings)
+    results.rawlen = len(timings)
+    ok = decode(results, normalize=normalize)
+    return ok, results
+
+
+def _corpus():
+    rng = random.Random(2024)
+    for protocol_type in CORPUS_PROTOCOLS:
+        nominal = _nominal_timings(protocol_type)
+        for scale, excess in SKEWS:
+            yield protocol_type, scale, excess, nominal, _skew(nominal, scale, excess, rng)
+
+
+class TestSkewEstimation:
+    def test_nominal_capture_is_left_alone(self):
+        for protocol_type in CORPUS_PROTOCOLS:
+            skew = estimateTimingSkew(_nominal_timings(protocol_type))
+            assert skew is not None
+            assert not skew.is_significant(), protocol_type.name
+
+    def test_real_captures_are_not_rewritten(self):
+        for manufacturer, codes in ALL_KNOWN_GOOD_CODES.items():
+            for name, code in codes.items():
+                ok, results = _decode(decode_ir(code))
+                assert results.timing_skew is None, f"{manufacturer} {name}"
+
+    def test_pure_scale_is_recovered(self):
+        nominal = _nominal_timings(decode_type_t.DAIKIN)
+        skew = estimateTimingSkew([int(t * 0.8) for t in nominal])
+        assert skew.is_significant()
+        fixed = normalizeTimings([int(t * 0.8) for t in nominal], skew)
+        # Header and bit mark land back within a few percent of nominal.
+        assert measureTimingFeatures(fixed)[0] == pytest.approx(
+            measureTimingFeatures(nominal)[0], rel=0.05
+        )
+        assert measureTimingFeatures(fixed)[2] == pytest.approx(
+            measureTimingFeatures(nominal)[2], rel=0.05
+        )
+
+    def test_short_or_headerless_capture_has_no_estimate(self):
+        assert estimateTimingSkew([500, 500] * 4) is None
+        assert estimateTimingSkew([500, 1500, 500, 500] * 20) is None
+
+    def test_zero_duration_feature_has_no_estimate(self):
+        # A 0us header space, as in the Tuya code "BeQMAACQAUABAbAE4PEH".
+        timings = list(decode_ir("BeQMAACQAUABAbAE4PEH"))
+        assert timings == [3300, 0] + [400, 400, 400, 1200] * 32 + [400]
+        assert measureTimingFeatures(timings) is None
+        assert estimateTimingSkew(timings) is None
+        ok, results = _decode(timings)
+        assert not ok and results.decode_type == decode_type_t.UNKNOWN
+
+    def test_normalize_does_not_modify_input(self):
+        timings = [3000, 1500, 400, 1200]
+        normalizeTimings(timings, timing_skew_t(scale=0.5, mark_excess=10))
+        assert timings == [3000, 1500, 400, 1200]
+
+
+class TestSkewedCorpusDecoding:
+    @pytest.mark.parametrize(
+        "protocol_type,scale,excess,nominal,skewed",
+        list(_corpus()),
+        ids=lambda v: v.name if isinstance(v, decode_type_t) else None,
+    )
+    def test_skewed_capture_decodes_to_original_state(
+        self, protocol_type, scale, excess, nominal, skewed
+    ):
+        ok, expected = _decode(nominal, normalize=False)
+        assert ok and expected.decode_type == protocol_type
+
+        ok, results = _decode(skewed)
+        assert ok, f"{protocol_type.name} x{scale} {excess:+}us not decoded"
+        assert results.decode_type == protocol_type
+        nbytes = expected.bits // 8
+        assert results.state[:nbytes] == expected.state[:nbytes]
+
+    def test_normalization_rescues_captures_that_failed_before(self):
+        rescued = 0
+        for protocol_type, scale, excess, nominal, skewed in _corpus():
+            ok, results = _decode(skewed, normalize=False)
+            if not ok or results.decode_type != protocol_type:
+                ok, results = _decode(skewed)
+                assert ok and results.decode_type == protocol_type
+                rescued += 1
+        assert rescued > 0
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for the Tuya timing preparation (_prepare_timings_for_tuya): over every
+registered protocol's output it must drop the trailing gap and fit the rest
+into 16 bits without losing any time, splitting long gaps into 65535us pieces
+joined by zero length marks/spaces.
+"""
+
+from array import array
+
+import pytest
+
+from app.core.ir_protocols.ir_layout import packFrame, packTimings
+from app.core.ir_protocols.samsung import (
+    IRSamsungAc,
+    kSamsungAcSectionGap,
+    sendSamsungAC,
+)
+from app.core.tuya_encoder import decode_ir, encode_ir
+from app.services.command_generator import _generator, _prepare_timings_for_tuya
+
+
+# Reference implementation: trim, then split, one step at a time.
+def ref_prepare(timings):
+    result = list(timings)
+    while result and result[-1] > 10000:
+        result.pop()
+    out = []
+    for t in result:
+        while t > 65535:
+            out += [65535, 0]
+            t -= 65535
+        out.append(t)
+    return out
+
+
+# Undo the splitting: add each zero length entry's neighbours back together.
+def join_pieces(timings):
+    out = []
+    i = 0
+    while i < len(timings):
+        t = timings[i]
+        while i + 2 < len(timings) and timings[i + 1] == 0:
+            t += timings[i + 2]
+            i += 2
+        out.append(t)
+        i += 1
+    return out
+
+
+# Protocols whose send function can't send their own getRaw() state yet.
+_INT_STATE = "getRaw() returns an int, the send function takes a state array"
+KNOWN_UNSENDABLE = {
+    "AIRTON": _INT_STATE,
+    "AIRWELL": _INT_STATE,
+    "FUJITSU_AC": "sendFujitsuAC() takes no repeat argument",
+    "KELON": _INT_STATE,
+    "KELVINATOR": "sendKelvinator() passes nbits to sendGeneric(), which has no such argument",
+    "LG": _INT_STATE,
+    "MIDEA": _INT_STATE,
+    "SHARP_AC": "sendSharpAc() shifts the bytearray it is given",
+    "TECO": _INT_STATE,
+    "TRUMA": _INT_STATE,
+    "VESTEL_AC": _INT_STATE,
+}
+
+
+def _registered(frame_layout=False):
+    params = []
+    for meta in _generator.registry._protocols.values():
+        if frame_layout and not meta.frame_layout:
+            continue
+        reason = KNOWN_UNSENDABLE.get(meta.protocol_name)
+        marks = [pytest.mark.xfail(raises=TypeError, reason=reason, strict=True)] if reason else []
+        params.append(pytest.param(meta, marks=marks, id=meta.protocol_name))
+    return params
+
+
+def _signal(meta, repeat):
+    state = getattr(meta.ac_class(), meta.get_raw_method)()
+    return meta.send_function(state, len(state), repeat)
+
+
+@pytest.mark.parametrize("meta", _registered())
+@pytest.mark.parametrize("repeat", [0, 1])
+def test_every_registered_protocol(meta, repeat):
+    signal = _signal(meta, repeat)
+    prepared = _prepare_timings_for_tuya(signal)
+    assert isinstance(prepared, array) and prepared.typecode == "H"
+    assert prepared.tolist() == ref_prepare(signal)
+    # Nothing lost but the trailing gap.
+    trimmed = list(signal)
+    while trimmed and trimmed[-1] > 10000:
+        trimmed.pop()
+    assert join_pieces(prepared.tolist()) == trimmed
+    assert decode_ir(encode_ir(prepared)) == prepared.tolist()
+
+
+@pytest.mark.parametrize("meta", _registered(frame_layout=True))
+@pytest.mark.parametrize("repeat", [0, 1])
+def test_frame_buffers_match_the_list_path(meta, repeat):
+    state = getattr(meta.ac_class(), meta.get_raw_method)()
+    signal = _signal(meta, repeat)
+    if repeat and len(signal) == len(_signal(meta, 0)):
+        pytest.skip(f"{meta.protocol_name} ignores repeat")
+    buf = packFrame(meta.frame_layout, state, len(state), repeat)
+    assert _prepare_timings_for_tuya(buf) == _prepare_timings_for_tuya(signal)
+
+
+def test_long_gaps_are_split_not_clamped():
+    state = IRSamsungAc().getRaw()
+    signal = sendSamsungAC(state, len(state), 1)
+    gap = 100000 - kSamsungAcSectionGap
+    i = signal.index(gap)
+    prepared = _prepare_timings_for_tuya(signal).tolist()
+    assert prepared[i : i + 3] == [65535, 0, gap - 65535]
+    assert len(prepared) == len(signal) - 1 + 2  # Trailing gap gone, one split.
+
+
+def test_frame_buffer_is_prepared_in_place():
+    buf = array("H", [9000, 4500, 560, 65535, 0, 34465])
+    assert _prepare_timings_for_tuya(buf) is buf
+    assert buf.tolist() == [9000, 4500, 560]
+
+
+def test_pack_timings():
+    assert packTimings([1, 2, 3]).tolist() == [1, 2, 3]
+    assert packTimings([65535, 65536, 131070, 200000]).tolist() == [
+        65535,
+        65535, 0, 1,
+        65535, 0, 65535,
+        65535, 0, 65535, 0, 65535, 0, 3395,
+    ]  # fmt: skip
+    assert packTimings([]).tolist() == []
+    with pytest.raises(OverflowError):
+        packTimings([-1])
+
+
+def test_short_and_empty_signals():
+    assert _prepare_timings_for_tuya([]).tolist() == []
+    assert _prepare_timings_for_tuya([20000, 30000]).tolist() == []
+    assert _prepare_timings_for_tuya([500]).tolist() == [500]
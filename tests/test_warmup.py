@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for worker warm-up: each level must run its stages and leave broken
+protocols cold rather than failing, the commands level must build a missing
+artifact, and /api/ready must only succeed once warm-up is done while
+/api/health always does.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.ir_protocols import decode_type_t
+from app.services import code_index, command_cache, warmup
+from app.services.command_generator import _generator
+from app.services.warmup import Warmup
+from app.settings import settings
+from index import app
+
+
+def test_levels_run_their_stages():
+    assert Warmup("none").run().durations == {}
+
+    status = Warmup("imports").run()
+    assert status.ready and status.stage == "done"
+    assert list(status.durations) == ["imports", "services"]
+
+    status = Warmup("protocols").run()
+    assert list(status.durations) == ["imports", "services", "protocols"]
+    failed = {failure.split(": ")[1] for failure in status.failures}
+    assert failed and "FUJITSU_AC" not in failed and "GREE" not in failed
+    assert all(failure.startswith("protocols: ") for failure in status.failures)
+
+    with pytest.raises(ValueError, match="Unknown warm-up level"):
+        Warmup("everything")
+
+
+def test_commands_level_builds_a_missing_artifact(monkeypatch, tmp_path):
+    path = tmp_path / "command_cache.bin"
+    build = command_cache.build_command_cache
+    monkeypatch.setattr(command_cache, "default_cache_path", lambda: path)
+    monkeypatch.setattr(
+        command_cache,
+        "build_command_cache",
+        lambda: build(path, protocols=[decode_type_t.FUJITSU_AC]),
+    )
+    monkeypatch.setattr(_generator, "cache", None)
+    monkeypatch.setattr(code_index, "_index", None)
+
+    status = Warmup("commands").run()
+    assert list(status.durations)[:3] == ["imports", "commands", "services"]
+    assert path.is_file()
+    assert _generator.cache.commands("FUJITSU_AC") is not None
+    assert decode_type_t.FUJITSU_AC in code_index.get_code_index()
+
+    # A loaded artifact isn't rebuilt.
+    path.unlink()
+    assert warmup.ensure_command_cache() is False
+    assert not path.exists()
+
+
+def test_ready_only_once_warm(monkeypatch):
+    monkeypatch.setattr(warmup, "_warmup", None)
+    client = TestClient(app)  # Without running the lifespan
+    response = client.get("/api/ready")
+    assert response.status_code == 503
+    assert response.json()["stage"] == "pending"
+    health = client.get("/api/health")
+    assert health.status_code == 200
+    assert health.json()["status"] == "ok"
+    assert health.json()["protocols"] == len(_generator.registry.list_supported())
+
+    monkeypatch.setattr(settings, "warmup", "imports")
+    with TestClient(app) as client:
+        assert warmup._warmup.wait(60)
+        response = client.get("/api/ready")
+        assert response.status_code == 200
+        assert response.json()["level"] == "imports"
+        assert client.get("/api/health").json()["warmup"]["ready"] is True